@@ -1,9 +1,9 @@
-from typing import Literal
+from typing import Callable, Literal
 
-def startAria(port: int, aria2_path: str | None=None) -> str | None: ...
+def startAria(port: int, aria2_path: str | None=None, session_path: str | None=None, daemons: int=1) -> str | None: ...
 def aria2Version() -> str: ...
+def shardOf(gid: str, shards: int) -> int: ...
 def tellActive() -> (list[str] | None, list[dict[str, str]] | None): ...
-def findDownloadPath(file_name: str, download_path: str, subfolder: str) -> str: ...
 def shutDown() -> bool: ...
 def downloadPause(gid: str) -> str | None: ...
 def downloadUnpause(gid: str) -> str | None: ...
@@ -34,6 +34,10 @@ def remove(file_path: str) -> Literal['ok', 'cant', 'no']: ...
 def removeDir(folder_path: str) -> Literal['ok', 'cant', 'no']: ...
 def makeDirs(folder_path: str, hidden: bool=False) -> str: ...
 def moveFile(old_file_path: str, new_path: str, new_path_type: str='folder') -> bool: ...
+def moveFileWithProgress(
+    old_file_path: str, new_file_path: str, progress: Callable[[int, int], None] | None=None,
+) -> None: ...
+def reserveFilePath(folder_path: str, file_name: str) -> str: ...
 
 class TempDB:
   def __init__(self) -> None: ...
@@ -62,6 +66,27 @@ class DataBase:
   def insertInAddLinkTable(self, addlink_list: list[dict[str, str]]) -> None: ...
   def insertInVideoFinderTable(self, video_list: list[dict[str, str]]) -> None: ...
   def searchGidInVideoFinderTable(self, gid: str) -> dict[str, str] | None: ...
+  def insertInMirrorTable(self, mirror_list: list[dict[str, str]]) -> None: ...
+  def searchGidInMirrorTable(self, gid: str) -> list[str]: ...
+  def updateHostTable(self, host_dict: dict[str, str]) -> None: ...
+  def searchHostInHostTable(self, host: str) -> dict[str, str] | None: ...
+  def updateRetryTable(self, retry_dict: dict[str, str]) -> None: ...
+  def deleteItemInRetryTable(self, gid: str) -> None: ...
+  def returnItemsInRetryTable(self) -> list[dict[str, str]]: ...
+  def updateBreakerTable(self, breaker_dict: dict[str, str]) -> None: ...
+  def returnItemsInBreakerTable(self) -> list[dict[str, str]]: ...
+  def insertInMoveTable(self, move_list: list[dict[str, str]]) -> None: ...
+  def returnItemsInMoveTable(self) -> list[dict[str, str]]: ...
+  def finishMoves(self, move_list: list[dict[str, str]]) -> None: ...
+  def insertInChecksumTable(self, checksum_list: list[dict[str, str]]) -> None: ...
+  def searchGidInChecksumTable(self, gid: str) -> dict[str, str] | None: ...
+  def setChecksumStatus(self, gid: str, status: str) -> None: ...
+  def returnChecksumStatuses(self) -> dict[str, str]: ...
+  def setPriority(self, gid: str, priority: int) -> None: ...
+  def setQueuePriority(self, category: str, priority: int) -> None: ...
+  def searchGidInPriorityTable(self, gid: str) -> int: ...
+  def searchCategoryInQueuePriorityTable(self, category: str) -> int: ...
+  def returnPriorities(self) -> dict[str, int]: ...
   def searchGidInDownloadTable(self, gid: str) -> dict[str, str] | None: ...
   def returnItemsInDownloadTable(self, category: str | None) -> dict[str, str]: ...
   def searchLinkInAddLinkTable(self, link: str) -> bool: ...
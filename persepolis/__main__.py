@@ -11,6 +11,16 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import sys
+
+from persepolis.scripts.engine_protocol import isCommand
+
+# subcommands talk to running engine and don't start user interface. see cli.py
+if isCommand(sys.argv[1:]):
+    from persepolis.scripts import cli
+
+    sys.exit(cli.main(sys.argv[1:]))
+
 from persepolis.scripts import persepolis
 
 persepolis.main()
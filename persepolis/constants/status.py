@@ -11,7 +11,7 @@ class ShutdownNotification(Enum):
     Ok = 2
 
 
-# checking_flag
+# state of CheckingGate (see scripts/checking_gate.py)
 # 0 >> normal situation
 # 1 >> remove button or delete button pressed or sorting form viewMenu or ... toggled by user
 # 2 >> check_download_info function is stopping until remove operation done
@@ -19,7 +19,7 @@ class ShutdownNotification(Enum):
 class CheckingFlag(Enum):
     Normal = 0
 
-    # if checking_flag is equal to 1, it means that user pressed
+    # if state is equal to 1, it means that user pressed
     # remove or delete button . so checking download information
     # must stop until removing is done! It avoids possibility of crashing!
     RemoveButtonPressed = 1
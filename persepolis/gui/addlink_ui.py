@@ -350,6 +350,15 @@ class AddLinkWindow_Ui(QWidget):  # noqa: N801
         self.connections_spinBox.setMaximum(16)
         self.connections_spinBox.setProperty('value', 16)
         horizontalLayout_3.addWidget(self.connections_spinBox)
+
+        # priority
+        self.priority_label = QLabel(self.connections_frame)
+        horizontalLayout_3.addWidget(self.priority_label)
+
+        self.priority_spinBox = QSpinBox(self.connections_frame)
+        self.priority_spinBox.setMinimum(-10)
+        self.priority_spinBox.setMaximum(10)
+        horizontalLayout_3.addWidget(self.priority_spinBox)
         connections_horizontalLayout.addWidget(self.connections_frame)
         connections_horizontalLayout.addStretch(1)
 
@@ -408,6 +417,28 @@ class AddLinkWindow_Ui(QWidget):  # noqa: N801
 
         advance_options_tab_verticalLayout.addLayout(load_cookies_horizontalLayout)
 
+        # mirrors
+        mirrors_horizontalLayout = QHBoxLayout()
+
+        self.mirrors_label = QLabel(self.advance_options_tab)
+        mirrors_horizontalLayout.addWidget(self.mirrors_label)
+
+        self.mirrors_lineEdit = QLineEdit(self.advance_options_tab)
+        mirrors_horizontalLayout.addWidget(self.mirrors_lineEdit)
+
+        advance_options_tab_verticalLayout.addLayout(mirrors_horizontalLayout)
+
+        # checksum
+        checksum_horizontalLayout = QHBoxLayout()
+
+        self.checksum_label = QLabel(self.advance_options_tab)
+        checksum_horizontalLayout.addWidget(self.checksum_label)
+
+        self.checksum_lineEdit = QLineEdit(self.advance_options_tab)
+        checksum_horizontalLayout.addWidget(self.checksum_lineEdit)
+
+        advance_options_tab_verticalLayout.addLayout(checksum_horizontalLayout)
+
         advance_options_tab_verticalLayout.addStretch(1)
 
         self.add_link_tabWidget.addTab(self.advance_options_tab, '')
@@ -467,6 +498,14 @@ class AddLinkWindow_Ui(QWidget):  # noqa: N801
         self.limit_comboBox.setItemText(1, 'MiB/s')
 
         self.connections_label.setText(QCoreApplication.translate('addlink_ui_tr', 'Number of connections:'))
+        self.priority_label.setText(QCoreApplication.translate('addlink_ui_tr', 'Priority:'))
+        self.priority_spinBox.setToolTip(
+            QCoreApplication.translate(
+                'addlink_ui_tr',
+                '<html><head/><body><p>Downloads with higher priority start sooner. \
+                0 means priority of queue is used.</p></body></html>',
+            ),
+        )
 
         self.cancel_pushButton.setText(QCoreApplication.translate('addlink_ui_tr', 'Cancel'))
         self.ok_pushButton.setText(QCoreApplication.translate('addlink_ui_tr', 'OK'))
@@ -500,3 +539,13 @@ class AddLinkWindow_Ui(QWidget):  # noqa: N801
         self.load_cookies_label.setText(QCoreApplication.translate('addlink_ui_tr', 'Load cookies: '))
 
         self.user_agent_label.setText(QCoreApplication.translate('addlink_ui_tr', 'User agent: '))
+
+        self.mirrors_label.setText(QCoreApplication.translate('addlink_ui_tr', 'Mirrors: '))
+        self.mirrors_lineEdit.setPlaceholderText(
+            QCoreApplication.translate('addlink_ui_tr', 'Other links of the same file, separated by spaces'),
+        )
+
+        self.checksum_label.setText(QCoreApplication.translate('addlink_ui_tr', 'Checksum: '))
+        self.checksum_lineEdit.setPlaceholderText(
+            QCoreApplication.translate('addlink_ui_tr', 'For example sha-256=e3b0c442...'),
+        )
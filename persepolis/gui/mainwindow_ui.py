@@ -27,6 +27,7 @@ try:
         QMenu,
         QMenuBar,
         QPushButton,
+        QSpinBox,
         QSplitter,
         QStatusBar,
         QTableWidget,
@@ -54,6 +55,7 @@ except ImportError:
         QMenuBar,
         QPushButton,
         QShortcut,
+        QSpinBox,
         QSplitter,
         QStatusBar,
         QTableWidget,
@@ -142,6 +144,10 @@ class MenuWidget(QPushButton):
 
         fileMenu.addAction(self.parent.addtextfileAction)
 
+        fileMenu.addAction(self.parent.importDownloadListAction)
+
+        fileMenu.addAction(self.parent.exportDownloadListAction)
+
         downloadMenu.addAction(self.parent.resumeAction)
 
         downloadMenu.addAction(self.parent.pauseAction)
@@ -417,6 +423,18 @@ class MainWindow_Ui(QMainWindow):  # noqa: N801
         after_frame_verticalLayout.addWidget(self.after_pushButton)
 
         queue_panel_verticalLayout.addWidget(self.limit_after_frame)
+
+        # queue_priority_spinBox
+        queue_priority_horizontalLayout = QHBoxLayout()
+        self.queue_priority_label = QLabel(self)
+        queue_priority_horizontalLayout.addWidget(self.queue_priority_label)
+
+        self.queue_priority_spinBox = QSpinBox(self)
+        self.queue_priority_spinBox.setMinimum(-10)
+        self.queue_priority_spinBox.setMaximum(10)
+        queue_priority_horizontalLayout.addWidget(self.queue_priority_spinBox)
+        queue_panel_verticalLayout.addLayout(queue_priority_horizontalLayout)
+
         category_tree_verticalLayout.addWidget(self.queue_panel_widget)
 
         # keep_awake_checkBox
@@ -697,6 +715,34 @@ class MainWindow_Ui(QMainWindow):  # noqa: N801
 
         fileMenu.addAction(self.addtextfileAction)
 
+        # importDownloadListAction >> import aria2 input file or Metalink
+        self.importDownloadListAction = QAction(
+            QIcon(icons + 'file'),
+            QCoreApplication.translate('mainwindow_ui_tr', 'Import aria2 Input File or Metalink...'),
+            self,
+            statusTip=QCoreApplication.translate(
+                'mainwindow_ui_tr',
+                'Import downloads from aria2 input file or Metalink',
+            ),
+            triggered=self.importDownloadList,
+        )
+
+        fileMenu.addAction(self.importDownloadListAction)
+
+        # exportDownloadListAction
+        self.exportDownloadListAction = QAction(
+            QIcon(icons + 'file'),
+            QCoreApplication.translate('mainwindow_ui_tr', 'Export Category to aria2 Input File or Metalink...'),
+            self,
+            statusTip=QCoreApplication.translate(
+                'mainwindow_ui_tr',
+                'Export downloads of selected category to aria2 input file or Metalink',
+            ),
+            triggered=self.exportDownloadList,
+        )
+
+        fileMenu.addAction(self.exportDownloadListAction)
+
         # resumeAction
         self.resumeAction = QAction(
             QIcon(icons + 'play'),
@@ -1023,6 +1069,14 @@ class MainWindow_Ui(QMainWindow):  # noqa: N801
             QCoreApplication.translate('mainwindow_ui_tr', 'Download bottom of\n the list first'),
         )
 
+        self.queue_priority_label.setText(QCoreApplication.translate('mainwindow_ui_tr', 'Priority: '))
+        self.queue_priority_spinBox.setToolTip(
+            QCoreApplication.translate(
+                'mainwindow_ui_tr',
+                '<html><head/><body><p>Downloads of queues with higher priority start sooner.</p></body></html>',
+            ),
+        )
+
         self.limit_checkBox.setText(QCoreApplication.translate('mainwindow_ui_tr', 'Limit Speed'))
         self.limit_comboBox.setItemText(0, 'KiB/s')
         self.limit_comboBox.setItemText(1, 'MiB/s')
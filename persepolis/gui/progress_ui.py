@@ -109,6 +109,11 @@ class ProgressWindow_Ui(QWidget):  # noqa: N801
         self.connections_label = QLabel(self.information_tab)
         information_verticalLayout.addWidget(self.connections_label)
 
+        # mirrors_label shows download speed of every mirror
+        self.mirrors_label = QLabel(self.information_tab)
+        information_verticalLayout.addWidget(self.mirrors_label)
+        self.mirrors_label.hide()
+
         information_verticalLayout.addStretch(1)
 
         # add information_tab to progress_tabWidget
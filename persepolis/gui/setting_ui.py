@@ -24,6 +24,7 @@ try:
         QHBoxLayout,
         QLabel,
         QLineEdit,
+        QPlainTextEdit,
         QPushButton,
         QSpinBox,
         QTableWidget,
@@ -45,6 +46,7 @@ except ImportError:
         QHBoxLayout,
         QLabel,
         QLineEdit,
+        QPlainTextEdit,
         QPushButton,
         QSpinBox,
         QTableWidget,
@@ -198,6 +200,29 @@ class Setting_Ui(QWidget):  # noqa: N801
 
         download_options_tab_verticalLayout.addLayout(connections_horizontalLayout)
 
+        # auto_tune_connections
+        self.auto_tune_connections_checkBox = QCheckBox(self.download_options_tab)
+        download_options_tab_verticalLayout.addWidget(self.auto_tune_connections_checkBox)
+
+        # file_allocation
+        file_allocation_horizontalLayout = QHBoxLayout()
+
+        self.file_allocation_label = QLabel(self.download_options_tab)
+        file_allocation_horizontalLayout.addWidget(self.file_allocation_label)
+
+        self.file_allocation_comboBox = QComboBox(self.download_options_tab)
+        file_allocation_horizontalLayout.addWidget(self.file_allocation_comboBox)
+
+        download_options_tab_verticalLayout.addLayout(file_allocation_horizontalLayout)
+
+        # bandwidth_schedule
+        self.bandwidth_schedule_label = QLabel(self.download_options_tab)
+        download_options_tab_verticalLayout.addWidget(self.bandwidth_schedule_label)
+
+        self.bandwidth_schedule_plainTextEdit = QPlainTextEdit(self.download_options_tab)
+        self.bandwidth_schedule_plainTextEdit.setMaximumHeight(80)
+        download_options_tab_verticalLayout.addWidget(self.bandwidth_schedule_plainTextEdit)
+
         # rpc_port
         self.rpc_port_label = QLabel(self.download_options_tab)
         self.rpc_horizontalLayout = QHBoxLayout()
@@ -210,6 +235,18 @@ class Setting_Ui(QWidget):  # noqa: N801
 
         download_options_tab_verticalLayout.addLayout(self.rpc_horizontalLayout)
 
+        # aria2_daemons
+        aria2_daemons_horizontalLayout = QHBoxLayout()
+        self.aria2_daemons_label = QLabel(self.download_options_tab)
+        aria2_daemons_horizontalLayout.addWidget(self.aria2_daemons_label)
+
+        self.aria2_daemons_spinBox = QSpinBox(self.download_options_tab)
+        self.aria2_daemons_spinBox.setMinimum(1)
+        self.aria2_daemons_spinBox.setMaximum(16)
+        aria2_daemons_horizontalLayout.addWidget(self.aria2_daemons_spinBox)
+
+        download_options_tab_verticalLayout.addLayout(aria2_daemons_horizontalLayout)
+
         # wait_queue
         wait_queue_horizontalLayout = QHBoxLayout()
 
@@ -286,6 +323,14 @@ class Setting_Ui(QWidget):  # noqa: N801
         self.subfolder_checkBox = QCheckBox(self.save_as_tab)
         save_as_tab_verticalLayout.addWidget(self.subfolder_checkBox)
 
+        # download_rules
+        self.download_rules_label = QLabel(self.save_as_tab)
+        save_as_tab_verticalLayout.addWidget(self.download_rules_label)
+
+        self.download_rules_plainTextEdit = QPlainTextEdit(self.save_as_tab)
+        self.download_rules_plainTextEdit.setMaximumHeight(120)
+        save_as_tab_verticalLayout.addWidget(self.download_rules_plainTextEdit)
+
         save_as_tab_verticalLayout.addStretch(1)
 
         self.setting_tabWidget.addTab(self.save_as_tab, '')
@@ -641,6 +686,41 @@ class Setting_Ui(QWidget):  # noqa: N801
             ),
         )
 
+        self.auto_tune_connections_checkBox.setText(
+            QCoreApplication.translate('setting_ui_tr', 'Find the best number of connections for every server'),
+        )
+        self.auto_tune_connections_checkBox.setToolTip(
+            QCoreApplication.translate(
+                'setting_ui_tr',
+                '<html><head/><body><p>Number of connections is changed during download and the fastest number is\
+                used for next downloads from the same server.</p></body></html>',
+            ),
+        )
+
+        self.file_allocation_label.setText(QCoreApplication.translate('setting_ui_tr', 'File allocation method: '))
+        self.file_allocation_comboBox.setToolTip(
+            QCoreApplication.translate(
+                'setting_ui_tr',
+                '<html><head/><body><p>prealloc and falloc take disk space of whole file before download starts,\
+                so download does not fail for lack of space. falloc is fast on ext4, btrfs, xfs and NTFS.<br>\
+                none and trunc write file gradually.</p></body></html>',
+            ),
+        )
+
+        self.bandwidth_schedule_label.setText(
+            QCoreApplication.translate('setting_ui_tr', 'Bandwidth schedule (one rule in every line): '),
+        )
+        self.bandwidth_schedule_plainTextEdit.setPlaceholderText('mon-fri 09:00-18:00 2M\nsat,sun 00:00-24:00 0')
+        self.bandwidth_schedule_plainTextEdit.setToolTip(
+            QCoreApplication.translate(
+                'setting_ui_tr',
+                '<html><head/><body><p>Every rule is written as: days start-end limit<br>\
+                days: * or mon-fri or sat,sun<br>limit: 2M (MiB/s) or 500K (KiB/s) or 0 (unlimited)<br>\
+                The first matching rule limits total download speed and it is shared fairly between queues.\
+                </p></body></html>',
+            ),
+        )
+
         self.rpc_port_label.setText(QCoreApplication.translate('setting_ui_tr', 'RPC port number: '))
         self.rpc_port_spinbox.setToolTip(
             QCoreApplication.translate(
@@ -650,6 +730,16 @@ class Setting_Ui(QWidget):  # noqa: N801
             ),
         )
 
+        self.aria2_daemons_label.setText(QCoreApplication.translate('setting_ui_tr', 'Number of Aria2 processes: '))
+        self.aria2_daemons_spinBox.setToolTip(
+            QCoreApplication.translate(
+                'setting_ui_tr',
+                '<html><head/><body><p>Downloads are divided between Aria2 processes that listen to\
+                consecutive ports after RPC port. Use more than one process for thousands of\
+                downloads at the same time. Default: 1 </p></body></html>',
+            ),
+        )
+
         self.wait_queue_label.setText(
             QCoreApplication.translate('setting_ui_tr', 'Wait period between each download in queue:'),
         )
@@ -694,6 +784,24 @@ class Setting_Ui(QWidget):  # noqa: N801
             ),
         )
 
+        self.download_rules_label.setText(
+            QCoreApplication.translate('setting_ui_tr', 'Download rules (one rule in every line): '),
+        )
+        self.download_rules_plainTextEdit.setPlaceholderText(
+            'domain=youtube.com,googlevideo.com folder=Videos/YouTube connections=8\n'
+            "ext=iso min_size=1G folder='/mnt/big disk/iso' limit=2M",
+        )
+        self.download_rules_plainTextEdit.setToolTip(
+            QCoreApplication.translate(
+                'setting_ui_tr',
+                '<html><head/><body><p>Every rule is written as key=value conditions and actions.<br>\
+                conditions: domain, ext, mime, name, category, min_size, max_size<br>\
+                actions: folder, limit (500K or 2M), connections<br>\
+                Relative folders are created in default download folder. Every action is taken from\
+                the first matching rule that has it.</p></body></html>',
+            ),
+        )
+
         self.setting_tabWidget.setTabText(
             self.setting_tabWidget.indexOf(self.save_as_tab),
             QCoreApplication.translate('setting_ui_tr', 'Save As'),
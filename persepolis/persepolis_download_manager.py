@@ -13,6 +13,16 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # this file is created for building persepolis with pyinstaller.
+import sys
+
+from persepolis.scripts.engine_protocol import isCommand
+
+# subcommands talk to running engine and don't start user interface. see cli.py
+if isCommand(sys.argv[1:]):
+    from persepolis.scripts import cli
+
+    sys.exit(cli.main(sys.argv[1:]))
+
 from persepolis.scripts import persepolis
 
 persepolis.main()
@@ -32,6 +32,7 @@ import ghermez
 from persepolis.gui.addlink_ui import AddLinkWindow_Ui
 from persepolis.scripts import spider
 from persepolis.scripts.check_proxy import getProxy
+from persepolis.scripts.link_import import expandLinkPattern
 
 # find file name and file size
 
@@ -282,7 +283,10 @@ class AddLinkWindow(AddLinkWindow_Ui):
             self.ok_pushButton.setEnabled(False)
             self.download_later_pushButton.setEnabled(False)
         else:  # find file size
-            link_dict = {'link': str(self.link_lineEdit.text())}
+            # if link has a pattern, find size of the first link of pattern.
+            # empty pattern (for example [3-1]) is possible while user is typing.
+            link_text = str(self.link_lineEdit.text())
+            link_dict = {'link': next(expandLinkPattern(link_text), link_text)}
 
             # spider is finding file size
             new_spider = AddLinkSpiderThread(link_dict)
@@ -404,6 +408,12 @@ class AddLinkWindow(AddLinkWindow_Ui):
         # load_cookies
         load_cookies = self.load_cookies_lineEdit.text() if self.load_cookies_lineEdit.text() != '' else None
 
+        # mirrors
+        mirrors = self.mirrors_lineEdit.text() if self.mirrors_lineEdit.text() != '' else None
+
+        # checksum
+        checksum = self.checksum_lineEdit.text() if self.checksum_lineEdit.text() != '' else None
+
         # save information in a dictionary(add_link_dictionary).
         self.add_link_dictionary = {
             'referer': referer,
@@ -423,6 +433,9 @@ class AddLinkWindow(AddLinkWindow_Ui):
             'connections': connections,
             'limit_value': limit,
             'download_path': download_path,
+            'mirrors': mirrors,
+            'checksum': checksum,
+            'priority': self.priority_spinBox.value(),
         }
 
         # convert values to pystring
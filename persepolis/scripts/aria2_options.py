@@ -0,0 +1,294 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import ast
+import os
+import urllib.parse
+from typing import TYPE_CHECKING, Any
+
+import ghermez
+from ghermez import humanReadableSize
+from persepolis.constants.status import DownloadStatus
+from persepolis.scripts.os_commands import makeTempDownloadDir
+
+if TYPE_CHECKING:
+    from persepolis.scripts.engine import EngineSettings
+
+    try:
+        from PySide6.QtCore import QSettings
+    except ImportError:
+        from PyQt5.QtCore import QSettings
+
+    Settings = QSettings | EngineSettings
+
+# this file doesn't import Qt, so both of MainWindow (see download.py) and
+# the engine without user interface (see engine.py) use it.
+
+
+# convert Mega to Kilo, RPC does not Support floating point numbers.
+def convertLimit(limit: str) -> str:
+    if limit != '0':
+        limit_number = limit[:-1]
+        limit_number = float(limit_number)
+        limit_unit = limit[-1]
+        if limit_unit == 'K':
+            limit_number = round(limit_number)
+        else:
+            limit_number = round(1024 * limit_number)
+            limit_unit = 'K'
+        limit = str(limit_number) + limit_unit
+
+    return limit
+
+
+# if download_path_temp and download_path aren't in same partition on hard disk,
+# then create new temp folder in that partition.
+# Why? when download is completed, file must be moved to download_path from temp folder.
+# It helps moving speed :)
+def findDownloadPathTemp(download_path: str, persepolis_setting: Settings) -> str:
+    # Find default download_path_temp
+    download_path_temp = persepolis_setting.value('settings/download_path_temp')
+
+    # check is download_path is existed
+    if os.path.isdir(download_path):
+        if os.lstat(download_path).st_dev != os.lstat(download_path_temp).st_dev:
+            # Create folder and give new temp address from makeTempDownloadDir function.
+            # Please checkout osCommands.py for more information.
+            download_path_temp = makeTempDownloadDir(download_path)
+    else:
+        # write an error in ghermez
+        ghermez.sendToLog('download_path is not found!', 'ERROR')
+
+    return download_path_temp
+
+
+# create options of aria2.addUri from add_link_dictionary
+def ariaDictionary(
+    gid: str,
+    add_link_dictionary: dict[str, str],
+    limit: str,
+    download_path_temp: str,
+    persepolis_setting: Settings,
+) -> dict:
+    link = add_link_dictionary['link']
+    ip = add_link_dictionary['ip']
+    port = add_link_dictionary['port']
+    proxy_user = add_link_dictionary['proxy_user']
+    proxy_passwd = add_link_dictionary['proxy_passwd']
+    download_user = add_link_dictionary['download_user']
+    download_passwd = add_link_dictionary['download_passwd']
+    connections = add_link_dictionary['connections']
+    header = add_link_dictionary['header']
+    out = add_link_dictionary['out']
+    user_agent = add_link_dictionary['user_agent']
+    cookies = add_link_dictionary['load_cookies']
+    referer = add_link_dictionary['referer']
+
+    # make header option
+    header_list = []
+    header_list.append('Cookie: ' + str(cookies))
+
+    # create header list
+    if header is not None:
+        semicolon_split_header = header.split('; ')
+        for i in semicolon_split_header:
+            equal_split_header = i.split('=', 1)
+            join_header = ':'.join(equal_split_header)
+            if i != '':
+                header_list.append(join_header)
+
+    if len(header_list) == 0:
+        header_list = None
+
+    # create ip_port from ip and port in desired format.
+    # for example "127.0.0.1:8118"
+    ip_port = str(ip) + ':' + str(port) if ip else ''
+
+    aria_dict = {
+        'gid': gid,
+        'max-tries': str(persepolis_setting.value('settings/max-tries')),
+        'retry-wait': int(persepolis_setting.value('settings/retry-wait')),
+        'timeout': int(persepolis_setting.value('settings/timeout')),
+        'header': header_list,
+        'out': out,
+        'user-agent': user_agent,
+        'referer': referer,
+        'all-proxy': ip_port,
+        'max-download-limit': limit,
+        'all-proxy-user': str(proxy_user),
+        'all-proxy-passwd': str(proxy_passwd),
+        'http-user': str(download_user),
+        'http-passwd': str(download_passwd),
+        'split': '16',
+        'max-connection-per-server': str(connections),
+        'min-split-size': '1M',
+        'continue': 'true',
+        'dir': str(download_path_temp),
+    }
+
+    if str(persepolis_setting.value('settings/dont-check-certificate')) == 'yes':
+        aria_dict['check-certificate'] = 'false'
+
+    # none, prealloc, trunc or falloc. see --file-allocation in aria2c manual.
+    file_allocation = persepolis_setting.value('settings/file-allocation')
+    if file_allocation:
+        aria_dict['file-allocation'] = str(file_allocation)
+
+    if not link.startswith('https'):
+        aria_dict['http-user'] = str(download_user)
+        aria_dict['http-passwd'] = str(download_passwd)
+
+    aria_dict_copy = aria_dict.copy()
+    # remove empty key[value] from aria_dict
+    for aria_dict_key, aria_dict_value in aria_dict_copy.items():
+        if aria_dict_value in [None, 'None', '']:
+            del aria_dict[aria_dict_key]
+
+    return aria_dict
+
+
+# this function converts download information that received from aria2 in desired format.
+# input format must be a dictionary.
+def convertDownloadInformation(download_status: dict[str, str]) -> dict[str, Any]:
+    # find file_name
+    try:
+        # file_status contains name of download file and link of download file
+        file_status = str(download_status['files'])
+        file_status = file_status[1:-1]
+        file_status = ast.literal_eval(file_status)
+        path = str(file_status['path'])
+        file_name = urllib.parse.unquote(os.path.basename(path))
+        if not (file_name):
+            file_name = None
+
+        uris = file_status['uris']
+        uri = uris[0]
+        link = uri['uri']
+
+    except Exception:
+        file_name = None
+        link = None
+
+    for key, value in download_status.items():
+        if not (value):
+            download_status[key] = None
+
+    # find file_size
+    try:
+        file_size = float(download_status['totalLength'])
+    except ValueError:
+        file_size = None
+
+    # find downloaded size
+    try:
+        downloaded = float(download_status['completedLength'])
+    except ValueError:
+        downloaded = None
+
+    # convert file_size and downloaded_size to KiB and MiB and GiB
+    if downloaded is not None and file_size is not None and file_size != 0:
+        file_size_back = file_size
+
+        # converting file_size to KiB or MiB or GiB
+        size_str = humanReadableSize(file_size)
+        downloaded_back = downloaded
+
+        downloaded_str = humanReadableSize(downloaded)
+
+        # find download percent from file_size and downloaded_size
+        file_size = file_size_back
+        downloaded = downloaded_back
+        percent = int(downloaded * 100 / file_size)
+        percent_str = str(percent) + '%'
+    else:
+        percent_str = None
+        size_str = None
+        downloaded_str = None
+
+    # find download_speed
+    try:
+        download_speed = int(download_status['downloadSpeed'])
+    except ValueError:
+        download_speed = 0
+
+    # convert download_speed to desired units.
+    # and find estimate_time_left
+    if downloaded is not None and download_speed != 0:
+        estimate_time_left = int((file_size - downloaded) / download_speed)
+
+        # converting file_size to KiB or MiB or GiB
+        download_speed_str = humanReadableSize(download_speed, 'speed') + '/s'
+
+        eta = ''
+        ONE_HOUR = 3600
+        ONE_MIN = 60
+        if estimate_time_left >= ONE_HOUR:
+            eta = eta + str(int(estimate_time_left / 3600)) + 'h'
+            estimate_time_left = estimate_time_left % 3600
+            eta = eta + str(int(estimate_time_left / 60)) + 'm'
+            estimate_time_left = estimate_time_left % 60
+            eta = eta + str(estimate_time_left) + 's'
+        elif estimate_time_left >= ONE_MIN:
+            eta = eta + str(int(estimate_time_left / 60)) + 'm'
+            estimate_time_left = estimate_time_left % 60
+            eta = eta + str(estimate_time_left) + 's'
+        else:
+            eta = eta + str(estimate_time_left) + 's'
+        estimate_time_left_str = eta
+
+    else:
+        download_speed_str = '0'
+        estimate_time_left_str = None
+
+    # find number of connections
+    try:
+        connections_str = str(download_status['connections'])
+    except (UnicodeEncodeError, KeyError):
+        connections_str = None
+
+    # find status of download
+    try:
+        status_str = str(download_status['status'])
+    except (UnicodeEncodeError, KeyError):
+        status_str = None
+
+    # rename active status to downloading
+    if status_str == 'active':
+        status_str = DownloadStatus.Downloading
+
+    # rename removed status to stopped
+    if status_str == 'removed':
+        status_str = DownloadStatus.Stopped
+
+    if status_str == 'None':
+        status_str = None
+
+    # set 0 second for estimate_time_left_str if download is completed.
+    if status_str == 'complete':
+        estimate_time_left_str = '0s'
+
+    # return information in dictionary format
+    return {
+        'gid': download_status['gid'],
+        'file_name': file_name,
+        'status': status_str,
+        'size': size_str,
+        'downloaded_size': downloaded_str,
+        'percent': percent_str,
+        'connections': connections_str,
+        'rate': download_speed_str,
+        'estimate_time_left': estimate_time_left_str,
+        'link': link,
+    }
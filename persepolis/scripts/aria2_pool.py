@@ -0,0 +1,182 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import functools
+import xmlrpc.client
+from typing import Any
+
+import ghermez
+
+# methods that return list of downloads. answers of all aria2 processes are joined.
+LIST_METHODS = ('tellActive', 'tellWaiting', 'tellStopped')
+
+# methods that change all aria2 processes. answer of first process is returned.
+BROADCAST_METHODS = (
+    'changeGlobalOption',
+    'forcePauseAll',
+    'forceShutdown',
+    'getVersion',
+    'pauseAll',
+    'purgeDownloadResult',
+    'saveSession',
+    'shutdown',
+    'unpauseAll',
+)
+
+# speed limits of changeGlobalOption are divided between aria2 processes,
+# so all processes together don't download faster than the limit.
+SPEED_LIMIT_OPTIONS = ('max-overall-download-limit', 'max-overall-upload-limit')
+
+# methods that add download. gid is in options.
+ADD_METHODS = ('addUri', 'addTorrent', 'addMetalink')
+
+# methods that return numbers of every aria2 process. numbers of all processes are added.
+SUM_METHODS = ('getGlobalStat',)
+
+
+# tellWaiting and tellStopped return num downloads from offset.
+# negative offset counts from the end of the queue of every process, so it's sent as it is.
+def isPage(name: str, params: list[Any] | tuple[Any, ...]) -> bool:
+    return name != 'tellActive' and len(params) >= 2 and params[0] >= 0  # noqa: PLR2004
+
+
+# divide speed limit of aria2 format (for example 100K or 2M) between shard_number processes.
+# 0 is unlimited and it's not divided. invalid values are returned as they are, so aria2 returns the error.
+def splitSpeedLimit(value: str, shard_number: int) -> str:
+    text = str(value).strip().upper()
+    multiplier = {'K': 1024, 'M': 1024 * 1024}.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+
+    try:
+        limit = int(float(text) * multiplier)
+    except ValueError:
+        return value
+
+    if limit <= 0:
+        return '0'
+
+    return str(max(1, limit // shard_number))
+
+
+class MethodGroup:
+    def __init__(self, pool: Aria2Pool, prefix: str) -> None:
+        self.pool = pool
+        self.prefix = prefix
+
+    def __getattr__(self, name: str) -> functools.partial:
+        return functools.partial(self.pool.call, self.prefix + '.' + name)
+
+
+# Aria2Pool sends XML-RPC requests to many aria2 processes that ghermez.startAria started
+# on consecutive ports. it has the same interface as xmlrpc.client.ServerProxy, so
+# functions of download.py don't know how many aria2 processes are running.
+#
+# every download belongs to one aria2 process. ghermez.shardOf finds it from gid, so
+# gid of a download always goes to the same process, even after restart.
+# requests of system.multicall are grouped by process and every process gets one multicall.
+#
+# downloads of every process have their own queue in aria2, so changePosition and
+# tellWaiting are relative to downloads of that process.
+class Aria2Pool:
+    def __init__(self, server_uri_list: list[str]) -> None:
+        self.proxy_list = [xmlrpc.client.ServerProxy(server_uri, allow_none=True) for server_uri in server_uri_list]
+        self.aria2 = MethodGroup(self, 'aria2')
+        self.system = MethodGroup(self, 'system')
+
+    def call(self, method_name: str, *params: Any) -> Any:
+        if method_name == 'system.multicall':
+            return self.multicall(params[0])
+
+        shard_list, shard_params = self.route(method_name, list(params))
+        answer_list = [getattr(self.proxy_list[shard], method_name)(*shard_params) for shard in shard_list]
+
+        return self.joinAnswers(method_name, params, answer_list)
+
+    # returns list of aria2 processes that receive the call and parameters of call.
+    def route(self, method_name: str, params: list[Any]) -> tuple[range | list[int], list[Any]]:
+        name = method_name.split('.', 1)[-1]
+        if name in LIST_METHODS:
+            # every process returns all downloads until the last one that is needed.
+            # offset and num are applied to the joined list. see joinAnswers
+            if isPage(name, params):
+                params = [0, params[0] + params[1], *params[2:]]
+
+            return range(len(self.proxy_list)), params
+
+        if name == 'changeGlobalOption' and params and isinstance(params[-1], dict):
+            options = {
+                key: splitSpeedLimit(value, len(self.proxy_list)) if key in SPEED_LIMIT_OPTIONS else value
+                for key, value in params[-1].items()
+            }
+            return range(len(self.proxy_list)), [*params[:-1], options]
+
+        if name in BROADCAST_METHODS or name in SUM_METHODS:
+            return range(len(self.proxy_list)), params
+
+        gid = ''
+        if name in ADD_METHODS:
+            for param in params:
+                if isinstance(param, dict):
+                    gid = str(param.get('gid', ''))
+        elif params and isinstance(params[0], str):
+            gid = params[0]
+
+        return [ghermez.shardOf(gid, len(self.proxy_list))], params
+
+    def joinAnswers(self, method_name: str, params: tuple[Any, ...], answer_list: list[Any]) -> Any:
+        name = method_name.split('.', 1)[-1]
+        if name in SUM_METHODS:
+            return {key: str(sum(int(answer[key]) for answer in answer_list)) for key in answer_list[0]}
+
+        if name not in LIST_METHODS:
+            return answer_list[0]
+
+        download_list = [download for answer in answer_list for download in answer]
+        if isPage(name, params):
+            return download_list[params[0] : params[0] + params[1]]
+
+        return download_list
+
+    # answers are returned in order of multicall_list like system.multicall of one aria2.
+    def multicall(self, multicall_list: list[dict[str, Any]]) -> list[Any]:
+        # key = index of aria2 process and value = list of (index of call, call)
+        shard_calls_dict: dict[int, list[tuple[int, dict[str, Any]]]] = {}
+        for index, call in enumerate(multicall_list):
+            shard_list, params = self.route(call['methodName'], list(call['params']))
+            for shard in shard_list:
+                shard_calls_dict.setdefault(shard, []).append(
+                    (index, {'methodName': call['methodName'], 'params': params}),
+                )
+
+        # answers of every call from all processes that received it
+        answers_list: list[list[Any]] = [[] for _ in multicall_list]
+        for shard, shard_calls in shard_calls_dict.items():
+            shard_answer_list = self.proxy_list[shard].system.multicall([call for _, call in shard_calls])
+            for (index, _), answer in zip(shard_calls, shard_answer_list):
+                answers_list[index].append(answer)
+
+        result_list = []
+        for call, answer_list in zip(multicall_list, answers_list):
+            # aria2 returns a list with result for successful calls and a fault dictionary for others.
+            fault_list = [answer for answer in answer_list if not isinstance(answer, list)]
+            if fault_list:
+                result_list.append(fault_list[0])
+            else:
+                result_list.append(
+                    [self.joinAnswers(call['methodName'], call['params'], [answer[0] for answer in answer_list])],
+                )
+
+        return result_list
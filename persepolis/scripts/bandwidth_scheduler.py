@@ -0,0 +1,291 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import math
+import time
+from time import sleep
+from typing import TYPE_CHECKING
+
+from . import globals
+
+try:
+    from PySide6.QtCore import QSettings, QThread
+except ImportError:
+    from PyQt5.QtCore import QSettings, QThread
+
+import ghermez
+from persepolis.constants import APP_NAME, ORG_NAME
+from persepolis.constants.status import ShutdownNotification
+from persepolis.scripts import download
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# bandwidth schedule is written in settings window. one rule in every line:
+#   <days> <start>-<end> <limit>
+# days: * or mon-fri or sat,sun
+# start and end: 09:00-18:00 (22:00-06:00 passes midnight)
+# limit: 2M (MiB/s) or 500K (KiB/s) or 0 (unlimited)
+# for example:
+#   mon-fri 09:00-18:00 2M
+#   sat,sun 10:00-22:00 5M
+# the first rule that matches current time is used. download speed is unlimited if no rule matches.
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+# seconds between two checks
+CHECK_INTERVAL = 10
+
+# aria2 considers 0 as unlimited. every download gets 1 KiB/s at least.
+MIN_SHARE = 1024
+
+
+class BandwidthRule:
+    def __init__(self, days: set[int], start: int, end: int, limit: int) -> None:
+        self.days = days
+        # minutes after midnight
+        self.start = start
+        self.end = end
+        # bytes per second and 0 means unlimited
+        self.limit = limit
+
+    def matches(self, now: time.struct_time) -> bool:
+        minute = now.tm_hour * 60 + now.tm_min
+        weekday = now.tm_wday
+
+        if self.start < self.end:
+            return weekday in self.days and self.start <= minute < self.end
+
+        # rule passes midnight. after midnight is a part of the previous day rule.
+        return (weekday in self.days and minute >= self.start) or (
+            (weekday - 1) % 7 in self.days and minute < self.end
+        )
+
+
+# convert 2M, 500K, 1.5M and 0 to bytes per second
+def limitBytes(limit: str) -> int:
+    limit = limit.strip().upper()
+    if limit in ('', '0', '0K', '0M', 'NONE'):
+        return 0
+
+    if limit[-1] == 'M':
+        return round(float(limit[:-1]) * 1024 * 1024)
+
+    if limit[-1] == 'K':
+        return round(float(limit[:-1]) * 1024)
+
+    return round(float(limit))
+
+
+def parseDays(text: str) -> set[int]:
+    if text == '*':
+        return set(range(7))
+
+    days = set()
+    for part in text.lower().split(','):
+        first, _, last = part.partition('-')
+        first_day = DAYS.index(first)
+        last_day = DAYS.index(last) if last else first_day
+        day = first_day
+        while True:
+            days.add(day)
+            if day == last_day:
+                break
+            day = (day + 1) % 7
+
+    return days
+
+
+def parseTime(text: str) -> int:
+    hour, _, minute = text.partition(':')
+    minutes = int(hour) * 60 + int(minute or 0)
+    if not 0 <= minutes <= 24 * 60:
+        raise ValueError(text)
+
+    return minutes
+
+
+# returns rules of schedule. invalid lines are written in log and skipped.
+def parseSchedule(schedule: str) -> list[BandwidthRule]:
+    rule_list = []
+    for schedule_line in schedule.splitlines():
+        line = schedule_line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        try:
+            days, time_range, limit = line.split()
+            start, end = time_range.split('-')
+            rule_list.append(BandwidthRule(parseDays(days), parseTime(start), parseTime(end), limitBytes(limit)))
+        except ValueError:
+            ghermez.sendToLog('Invalid bandwidth schedule rule: ' + line, 'ERROR')
+
+    return rule_list
+
+
+# returns global limit in bytes per second. 0 means unlimited.
+def currentLimit(rule_list: Sequence[BandwidthRule], now: time.struct_time) -> int:
+    for rule in rule_list:
+        if rule.matches(now):
+            return rule.limit
+
+    return 0
+
+
+# divide total between members. no member gets more than its cap and
+# the rest of small members is divided between others.
+def waterFill(total: float, cap_list: Sequence[float]) -> list[float]:
+    share_list = [0.0] * len(cap_list)
+    remaining = total
+    members_left = len(cap_list)
+    for i in sorted(range(len(cap_list)), key=lambda i: cap_list[i]):
+        share_list[i] = min(cap_list[i], remaining / members_left)
+        remaining = remaining - share_list[i]
+        members_left = members_left - 1
+
+    return share_list
+
+
+# group_dict: key = queue name and value = list of (gid, own limit of download) tuples.
+# queue_cap_dict: key = queue name and value = limit of queue.
+# limits are in bytes per second and 0 means unlimited.
+# global limit is divided between queues and then limit of every queue is divided between its downloads.
+def fairShare(
+    limit: int,
+    group_dict: dict[str, list[tuple[str, int]]],
+    queue_cap_dict: dict[str, int],
+) -> dict[str, int]:
+    group_name_list = list(group_dict)
+
+    group_cap_list = []
+    for group_name in group_name_list:
+        cap = sum(item_limit or math.inf for _, item_limit in group_dict[group_name])
+        if queue_cap_dict.get(group_name):
+            cap = min(cap, queue_cap_dict[group_name])
+        group_cap_list.append(cap)
+
+    share_dict = {}
+    for group_name, group_share in zip(group_name_list, waterFill(limit, group_cap_list)):
+        item_list = group_dict[group_name]
+        cap_list = [item_limit or math.inf for _, item_limit in item_list]
+        for (gid, _), share in zip(item_list, waterFill(group_share, cap_list)):
+            share_dict[gid] = max(MIN_SHARE, int(share))
+
+    return share_dict
+
+
+# BandwidthSchedulerThread applies bandwidth schedule of settings window.
+# limit of schedule is set as max-overall-download-limit of aria2 and
+# it's divided fairly between active queues with max-download-limit of every download.
+# when schedule is unlimited, downloads get their own limits back.
+class BandwidthSchedulerThread(QThread):
+    def __init__(self, parent) -> None:
+        super().__init__()
+        self.parent = parent
+        self.persepolis_setting = QSettings(ORG_NAME, APP_NAME)
+
+        self.schedule = None
+        self.rule_list = []
+        self.global_limit = None
+
+        # key = gid and value = last max-download-limit that is set by this thread
+        self.applied_limit_dict = {}
+
+    def run(self):
+        while globals.shutdown_notification == ShutdownNotification.Running and globals.aria_startup_answer != 'ready':
+            sleep(1)
+
+        while globals.shutdown_notification == ShutdownNotification.Running:
+            try:
+                self.checkSchedule()
+            except Exception as e:
+                ghermez.sendToLog('Bandwidth scheduler error: ' + str(e), 'ERROR')
+
+            sleep(CHECK_INTERVAL)
+
+    def checkSchedule(self):
+        # schedule may be changed in settings window
+        self.persepolis_setting.sync()
+        schedule = str(self.persepolis_setting.value('settings/bandwidth-schedule', ''))
+        if schedule != self.schedule:
+            self.schedule = schedule
+            self.rule_list = parseSchedule(schedule)
+
+        limit = currentLimit(self.rule_list, time.localtime())
+
+        if limit != self.global_limit and download.globalLimitSpeed(limit):
+            self.global_limit = limit
+            if limit:
+                limit_str = ghermez.humanReadableSize(limit, 'speed') + '/s'
+                ghermez.sendToLog('Global download speed limit: ' + limit_str, 'INFO')
+            else:
+                ghermez.sendToLog('Global download speed limit is canceled', 'INFO')
+
+        self.shareLimit(limit)
+
+    def shareLimit(self, limit):
+        group_dict = {}
+        own_limit_dict = {}
+        queue_cap_dict = {}
+        for gid in self.parent.temp_db.returnActiveGids():
+            download_dict = self.parent.persepolis_db.searchGidInDownloadTable(gid)
+            add_link_dictionary = self.parent.persepolis_db.searchGidInAddLinkTable(gid)
+            if not download_dict or not add_link_dictionary:
+                continue
+
+            category = download_dict['category']
+            if category not in queue_cap_dict:
+                queue_cap_dict[category] = self.queueLimit(category)
+
+            # limit of queue is applied to every download of queue
+            own_limit = limitBytes(str(add_link_dictionary['limit_value']))
+            if queue_cap_dict[category]:
+                own_limit = min(own_limit or math.inf, queue_cap_dict[category])
+
+            own_limit_dict[gid] = own_limit
+            group_dict.setdefault(category, []).append((gid, own_limit))
+
+        # forget finished downloads
+        for gid in list(self.applied_limit_dict):
+            if gid not in own_limit_dict:
+                del self.applied_limit_dict[gid]
+
+        if limit:
+            # single downloads are not a queue. they share global limit with queues like one queue.
+            limit_dict = fairShare(limit, group_dict, queue_cap_dict)
+        elif self.applied_limit_dict:
+            # schedule is unlimited now. give back own limits of downloads.
+            limit_dict = {gid: own_limit_dict[gid] for gid in self.applied_limit_dict}
+        else:
+            return
+
+        changed_limit_dict = {
+            gid: gid_limit for gid, gid_limit in limit_dict.items() if self.applied_limit_dict.get(gid) != gid_limit
+        }
+        if changed_limit_dict and download.limitSpeedBatch(changed_limit_dict):
+            if limit:
+                self.applied_limit_dict.update(changed_limit_dict)
+            else:
+                self.applied_limit_dict.clear()
+
+    # returns limit of queue in bytes per second. 0 means unlimited.
+    def queueLimit(self, category):
+        if category == 'Single Downloads':
+            return 0
+
+        queue_dict = self.parent.persepolis_db.searchCategoryInCategoryTable(category)
+        if not queue_dict or queue_dict['limit_enable'] != 'yes':
+            return 0
+
+        return limitBytes(str(queue_dict['limit_value']))
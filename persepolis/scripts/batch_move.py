@@ -0,0 +1,225 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PySide6.QtCore import QThread, Signal
+except ImportError:
+    from PyQt5.QtCore import QThread
+    from PyQt5.QtCore import pyqtSignal as Signal
+
+import ghermez
+from persepolis.scripts.file_mover import releaseFilePath
+
+# number of hard disks that files are copied from them at the same time.
+# files of one hard disk are copied one by one.
+MAX_PARALLEL_COPIES = 2
+
+# progress is reported once in this number of seconds.
+PROGRESS_INTERVAL = 0.2
+
+
+class MoveItem:
+    def __init__(self, gid: str, old_path: str, new_path: str) -> None:
+        self.gid = gid
+        self.old_path = old_path
+        self.new_path = new_path
+        self.moved = False
+
+
+def deviceOf(path: str) -> int | None:
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+
+# returns list of renames and copies of every source device.
+# rename is instant if source and destination are on the same device.
+def planMoves(item_list: list[MoveItem]) -> tuple[list[MoveItem], dict[int | None, list[MoveItem]]]:
+    rename_list = []
+    copy_dict = {}
+
+    # destination folders are checked once
+    destination_device_dict = {}
+    for item in item_list:
+        new_folder_path = os.path.dirname(item.new_path)
+        if new_folder_path not in destination_device_dict:
+            destination_device_dict[new_folder_path] = deviceOf(new_folder_path)
+
+        source_device = deviceOf(item.old_path)
+        if source_device is not None and source_device == destination_device_dict[new_folder_path]:
+            rename_list.append(item)
+        else:
+            copy_dict.setdefault(source_device, []).append(item)
+
+    return rename_list, copy_dict
+
+
+# BatchMoveThread moves completed downloads that user selected to another folder.
+# moves are planned first and they are saved in move_db_table. if persepolis is closed
+# during moving, MainWindow starts this thread again without gid_list and moves are resumed.
+#
+# files on the same device as destination are renamed together. files of other devices are
+# copied by MAX_PARALLEL_COPIES threads and every thread copies files of one device.
+# new paths of all files are written in data base in one transaction at the end.
+#
+# MOVEPROGRESSSIGNAL sends number of finished moves and number of all moves.
+# MOVEFINISHEDSIGNAL sends number of moved files and list of file names that are not moved.
+class BatchMoveThread(QThread):
+    MOVEPROGRESSSIGNAL = Signal(int, int)
+    MOVEFINISHEDSIGNAL = Signal(int, list)
+
+    def __init__(self, parent, gid_list: list[str] | None = None, new_folder_path: str | None = None) -> None:
+        super().__init__()
+        self.parent = parent
+        self.gid_list = gid_list
+        self.new_folder_path = new_folder_path
+
+        # user canceled moving. current files are finished and others are not moved.
+        self.canceled = False
+
+        self.lock = threading.Lock()
+        self.finished_number = 0
+        self.total_number = 0
+        self.last_report = 0
+
+    def run(self):
+        item_list = self.resumeMoves() if self.gid_list is None else self.planNewMoves()
+        self.total_number = len(item_list)
+
+        rename_list, copy_dict = planMoves(item_list)
+        ghermez.sendToLog(
+            'Moving '
+            + str(len(item_list))
+            + ' files: '
+            + str(len(rename_list))
+            + ' renames and '
+            + str(len(item_list) - len(rename_list))
+            + ' copies',
+            'INFO',
+        )
+
+        for item in rename_list:
+            if self.canceled:
+                break
+
+            try:
+                # new_path is the empty file that is reserved for this item.
+                os.replace(item.old_path, item.new_path)
+                item.moved = True
+            except OSError:
+                # perhaps it's another device. for example a bind mount.
+                copy_dict.setdefault(None, []).append(item)
+                continue
+
+            self.reportProgress()
+
+        with ThreadPoolExecutor(MAX_PARALLEL_COPIES, thread_name_prefix='batch_mover') as executor:
+            for device_item_list in copy_dict.values():
+                executor.submit(self.copyItems, device_item_list)
+
+        # write new paths and delete planned moves in one transaction
+        self.parent.persepolis_db.finishMoves(
+            [
+                {'gid': item.gid, 'download_path': item.new_path} if item.moved else {'gid': item.gid}
+                for item in item_list
+            ],
+        )
+
+        failed_list = []
+        for item in item_list:
+            if not item.moved:
+                releaseFilePath(item.new_path)
+                failed_list.append(os.path.basename(item.old_path))
+
+        self.MOVEFINISHEDSIGNAL.emit(len(item_list) - len(failed_list), failed_list)
+
+    # find new paths of selected downloads and save them in move_db_table
+    def planNewMoves(self) -> list[MoveItem]:
+        add_link_dict = self.parent.persepolis_db.returnItemsInAddLinkTable(None)
+
+        item_list = []
+        for gid in self.gid_list:
+            old_path = add_link_dict[gid]['download_path']
+            if not os.path.isfile(old_path):
+                continue
+
+            # two selected files can have the same name. every name is reserved once.
+            try:
+                new_path = ghermez.reserveFilePath(self.new_folder_path, os.path.basename(old_path))
+            except OSError as e:
+                ghermez.sendToLog('Persepolis can not move ' + old_path + ': ' + str(e), 'ERROR')
+                continue
+
+            item_list.append(MoveItem(gid, old_path, new_path))
+
+        self.parent.persepolis_db.insertInMoveTable(
+            [{'gid': item.gid, 'new_path': item.new_path} for item in item_list],
+        )
+
+        return item_list
+
+    # read moves that were not finished from move_db_table
+    def resumeMoves(self) -> list[MoveItem]:
+        add_link_dict = self.parent.persepolis_db.returnItemsInAddLinkTable(None)
+
+        item_list = []
+        for move_dict in self.parent.persepolis_db.returnItemsInMoveTable():
+            if move_dict['gid'] not in add_link_dict:
+                continue
+
+            item = MoveItem(move_dict['gid'], add_link_dict[move_dict['gid']]['download_path'], move_dict['new_path'])
+
+            # file was moved but data base was not updated
+            if not os.path.isfile(item.old_path) and os.path.isfile(item.new_path):
+                item.moved = True
+
+            item_list.append(item)
+
+        return item_list
+
+    # this method is running in a thread of ThreadPoolExecutor.
+    def copyItems(self, item_list: list[MoveItem]) -> None:
+        for item in item_list:
+            if self.canceled:
+                return
+
+            if item.moved:
+                self.reportProgress()
+                continue
+
+            try:
+                ghermez.moveFileWithProgress(item.old_path, item.new_path)
+                item.moved = True
+            except OSError as e:
+                ghermez.sendToLog('Persepolis can not move ' + item.old_path + ': ' + str(e), 'ERROR')
+
+            self.reportProgress()
+
+    def reportProgress(self) -> None:
+        with self.lock:
+            self.finished_number = self.finished_number + 1
+            now = time.monotonic()
+            if now - self.last_report < PROGRESS_INTERVAL and self.finished_number != self.total_number:
+                return
+
+            self.last_report = now
+
+        self.MOVEPROGRESSSIGNAL.emit(self.finished_number, self.total_number)
@@ -18,12 +18,11 @@ from typing import Callable
 from . import globals
 
 try:
-    from PySide6.QtCore import QDir, QPoint, QSettings, QSize, Qt, QThread, Signal
+    from PySide6.QtCore import QDir, QPoint, QSettings, QSize, Qt
     from PySide6.QtGui import QCloseEvent, QIcon, QKeyEvent
     from PySide6.QtWidgets import QFileDialog, QPushButton, QTableWidgetItem, QWidget
 except ImportError:
-    from PyQt5.QtCore import QDir, QPoint, QSettings, QSize, Qt, QThread
-    from PyQt5.QtCore import pyqtSignal as Signal
+    from PyQt5.QtCore import QDir, QPoint, QSettings, QSize, Qt
     from PyQt5.QtGui import QCloseEvent, QIcon, QKeyEvent
     from PyQt5.QtWidgets import QFileDialog, QPushButton, QTableWidgetItem, QWidget
 
@@ -32,29 +31,7 @@ from copy import deepcopy
 from functools import partial
 
 from persepolis.gui.text_queue_ui import TextQueue_Ui
-from persepolis.scripts import logger, spider
-
-
-# This thread finds filename
-class QueueSpiderThread(QThread):
-    QUEUESPIDERRETURNEDFILENAME = Signal(str)
-
-    def __init__(self, download_dict: dict[str, str]) -> None:
-        super().__init__()
-        self.dict = download_dict
-
-    def run(self) -> None:
-        try:
-            filename = spider.queueSpider(self.dict)
-            if filename:
-                self.QUEUESPIDERRETURNEDFILENAME.emit(filename)
-            else:
-                logger.LOG_OBJ.error("Spider couldn't find download information", exc_info=True)
-
-        except Exception as e:
-            logger.LOG_OBJ.error("Spider couldn't find download information", exc_info=True)
-
-            logger.LOG_OBJ.error(str(e), exc_info=True)
+from persepolis.scripts import spider
 
 
 class BrowserPluginQueue(TextQueue_Ui):
@@ -85,11 +62,11 @@ class BrowserPluginQueue(TextQueue_Ui):
 
             if file_name == '***':
                 # spider finds file name
-                new_spider = QueueSpiderThread(link_dict)
-                self.parent.threadPool.append(new_spider)
-                self.parent.threadPool[-1].start()
-                self.parent.threadPool[-1].QUEUESPIDERRETURNEDFILENAME.connect(
+                self.parent.spider_service.submit(
+                    spider.queueSpider,
+                    link_dict,
                     partial(self.parent.queueSpiderCallBack, child=self, row_number=len(self.list_of_links) - k),
+                    owner=self,
                 )
             k = k + 1
 
@@ -361,6 +338,9 @@ class BrowserPluginQueue(TextQueue_Ui):
             self.close()
 
     def closeEvent(self, event: QCloseEvent) -> None:
+        # results of spider are not needed anymore
+        self.parent.spider_service.cancel(self)
+
         self.persepolis_setting.setValue('TextQueue/size', self.size())
         self.persepolis_setting.setValue('TextQueue/position', self.pos())
         self.persepolis_setting.sync()
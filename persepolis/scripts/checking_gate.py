@@ -0,0 +1,92 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+from persepolis.constants.status import CheckingFlag
+
+# CheckingGate is the pause/resume handshake between CheckDownloadInfoThread
+# (the poller) and the MainWindow methods that change download_table.
+#
+# UI side:
+#   requestPause() >> asks the poller to stop and blocks until poller acknowledged.
+#   resume() >> tells the poller that table job is done.
+#
+# poller side:
+#   pollWait(interval) >> sleeps for one poll interval, but wakes up immediately
+#   if a pause is requested. then it acknowledges the pause and blocks until resume() is called.
+#
+# state of the gate is a CheckingFlag (see constants/status.py):
+# Normal >> RemoveButtonPressed >> StoppingJobs >> Normal
+
+
+class CheckingGate:
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._flag = CheckingFlag.Normal
+
+    @property
+    def flag(self) -> CheckingFlag:
+        return self._flag
+
+    # True if poller is stopped and download_table can be changed safely.
+    def isPaused(self) -> bool:
+        return self._flag == CheckingFlag.StoppingJobs
+
+    # UI side. returns True when poller acknowledged the request.
+    # keep_waiting is checked every timeout seconds, and waiting is
+    # canceled if it returns False (for example when persepolis is closing).
+    def requestPause(self, timeout: float = 1, keep_waiting: Callable[[], bool] | None = None) -> bool:
+        with self._condition:
+            if self._flag == CheckingFlag.Normal:
+                self._flag = CheckingFlag.RemoveButtonPressed
+                self._condition.notify_all()
+
+            while not self._condition.wait_for(self.isPaused, timeout):
+                if keep_waiting is not None and not keep_waiting():
+                    return False
+
+            return True
+
+    # UI side. tell the poller that job is done!
+    def resume(self) -> None:
+        with self._condition:
+            self._flag = CheckingFlag.Normal
+            self._condition.notify_all()
+
+    # poller side. sleep interval seconds or until a pause request arrives.
+    # if pause is requested, acknowledge it and wait until resume() is called.
+    # keep_waiting is checked every resume_timeout seconds while the poller is paused.
+    def pollWait(
+        self,
+        interval: float,
+        resume_timeout: float = 1,
+        keep_waiting: Callable[[], bool] | None = None,
+    ) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self._flag == CheckingFlag.RemoveButtonPressed, interval)
+
+            if self._flag != CheckingFlag.RemoveButtonPressed:
+                return
+
+            # Ok loop is stopped!
+            self._flag = CheckingFlag.StoppingJobs
+            self._condition.notify_all()
+
+            # wait until job is done!
+            while not self._condition.wait_for(lambda: self._flag == CheckingFlag.Normal, resume_timeout):
+                if keep_waiting is not None and not keep_waiting():
+                    return
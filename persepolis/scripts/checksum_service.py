@@ -0,0 +1,229 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import mmap
+import os
+import queue
+import re
+import threading
+from typing import TYPE_CHECKING
+
+try:
+    from PySide6.QtCore import QObject, Signal
+except ImportError:
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtCore import pyqtSignal as Signal
+
+import ghermez
+
+if TYPE_CHECKING:
+    from ghermez import DataBase
+
+# checksums are saved in aria2 format: <type>=<hex digest>. for example sha-256=e3b0c442...
+# key = type and value = name of algorithm in hashlib.
+# aria2 checks these types itself. see --checksum in aria2c manual.
+ARIA2_CHECKSUM_TYPES = {
+    'md5': 'md5',
+    'sha-1': 'sha1',
+    'sha-224': 'sha224',
+    'sha-256': 'sha256',
+    'sha-384': 'sha384',
+    'sha-512': 'sha512',
+}
+
+# other types are checked by ChecksumService only
+CHECKSUM_TYPES = {**ARIA2_CHECKSUM_TYPES, 'blake2b': 'blake2b', 'sha3-256': 'sha3_256'}
+
+# other names of checksum types
+CHECKSUM_ALIASES = {'sha1': 'sha-1', 'sha224': 'sha-224', 'sha256': 'sha-256', 'sha384': 'sha-384', 'sha512': 'sha-512'}
+
+# type of checksum is found from length of hex digest if it's not written
+TYPES_OF_LENGTHS = {32: 'md5', 40: 'sha-1', 56: 'sha-224', 64: 'sha-256', 96: 'sha-384', 128: 'sha-512'}
+
+# file is hashed in chunks of this size. hashlib releases GIL for every chunk.
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+# number of files that are hashed at the same time
+MAX_WORKERS = 2
+
+# status of verification in checksum_db_table
+CHECKSUM_WAITING = 'waiting'
+CHECKSUM_VERIFIED = 'verified'
+CHECKSUM_MISMATCH = 'mismatch'
+CHECKSUM_ERROR = 'error'
+
+
+# convert "sha-256=hex", "SHA256:hex", "sha256 hex" and "hex" to aria2 format.
+# returns None if text is not a valid checksum.
+def parseChecksum(text: str | None) -> str | None:
+    if not text or text == 'None':
+        return None
+
+    match = re.fullmatch(r'\s*(?:([A-Za-z0-9-]+)\s*[=: ]\s*)?([0-9A-Fa-f]+)\s*', text)
+    if match is None:
+        return None
+
+    checksum_type, digest = match.groups()
+    if checksum_type is None:
+        checksum_type = TYPES_OF_LENGTHS.get(len(digest))
+    else:
+        checksum_type = CHECKSUM_ALIASES.get(checksum_type.lower(), checksum_type.lower())
+
+    if checksum_type not in CHECKSUM_TYPES:
+        return None
+
+    digest_length = hashlib.new(CHECKSUM_TYPES[checksum_type]).digest_size * 2
+    if len(digest) != digest_length:
+        return None
+
+    return checksum_type + '=' + digest.lower()
+
+
+# read sha-256 of file from file_path.sha256 if it's next to the file.
+# format of sidecar file is the output of sha256sum: "<hex>  <file name>"
+def sidecarChecksum(file_path: str) -> str | None:
+    try:
+        with open(file_path + '.sha256', errors='replace') as f:
+            first_line = f.readline(1024)
+    except OSError:
+        return None
+
+    words = first_line.split()
+    if not words:
+        return None
+
+    return parseChecksum('sha-256=' + words[0])
+
+
+# hash file with mmap. pages of file are read by operating system and file is not copied to memory.
+def hashFile(file_path: str, algorithm: str) -> str:
+    file_hash = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        # mmap doesn't work for empty files
+        if os.fstat(f.fileno()).st_size == 0:
+            return file_hash.hexdigest()
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            mapped_view = memoryview(mapped_file)
+            try:
+                for position in range(0, len(mapped_file), HASH_CHUNK_SIZE):
+                    file_hash.update(mapped_view[position : position + HASH_CHUNK_SIZE])
+            finally:
+                mapped_view.release()
+
+    return file_hash.hexdigest()
+
+
+class ChecksumJob:
+    def __init__(self, gid: str, file_path: str) -> None:
+        self.gid = gid
+        self.file_path = file_path
+
+
+# ChecksumService verifies completed downloads in worker threads, so a big file
+# doesn't block CheckDownloadInfoThread or user interface.
+# MainWindow submits downloads when MoveService moved them to download folder.
+#
+# checksums that aria2 supports are sent to aria2 with download options. aria2 checks them
+# itself and a download with wrong checksum is not completed (error code 32), so they are not hashed again.
+# other checksums and sidecar files (file.sha256) are checked here.
+#
+# CHECKSUMSIGNAL sends gid and status of verification.
+class ChecksumService(QObject):
+    CHECKSUMSIGNAL = Signal(str, str)
+
+    def __init__(self, persepolis_db: DataBase) -> None:
+        super().__init__()
+        self.persepolis_db = persepolis_db
+
+        self.jobs_queue: queue.Queue[ChecksumJob | None] = queue.Queue()
+
+        # gids that are waiting or hashing
+        self.jobs_set: set[str] = set()
+        self.lock = threading.Lock()
+
+        self.workers: list[threading.Thread] = []
+
+    def submit(self, gid: str, file_path: str) -> None:
+        with self.lock:
+            if gid in self.jobs_set:
+                return
+
+            self.jobs_set.add(gid)
+
+            # workers are started when they are needed
+            if len(self.workers) < MAX_WORKERS and len(self.workers) < len(self.jobs_set):
+                worker = threading.Thread(target=self.work, name='checksum', daemon=True)
+                self.workers.append(worker)
+                worker.start()
+
+        self.jobs_queue.put(ChecksumJob(gid, file_path))
+
+    # stop workers. MainWindow calls this method when persepolis is closing.
+    # downloads that are not verified stay in waiting status.
+    def shutdown(self) -> None:
+        for _ in self.workers:
+            self.jobs_queue.put(None)
+
+    def work(self) -> None:
+        while True:
+            job = self.jobs_queue.get()
+            if job is None:
+                break
+
+            try:
+                status = self.verify(job)
+            except Exception as e:
+                ghermez.sendToLog('Persepolis can not verify ' + job.file_path + ': ' + str(e), 'ERROR')
+                status = CHECKSUM_ERROR
+                self.persepolis_db.setChecksumStatus(job.gid, status)
+
+            with self.lock:
+                self.jobs_set.discard(job.gid)
+
+            if status is not None:
+                self.CHECKSUMSIGNAL.emit(job.gid, status)
+
+    # returns status of verification or None if download has no checksum.
+    def verify(self, job: ChecksumJob) -> str | None:
+        checksum_dict = self.persepolis_db.searchGidInChecksumTable(job.gid)
+        if checksum_dict is not None:
+            checksum = checksum_dict['checksum']
+            checksum_type = checksum.split('=', 1)[0]
+
+            # aria2 checked it before
+            if checksum_type in ARIA2_CHECKSUM_TYPES:
+                self.persepolis_db.setChecksumStatus(job.gid, CHECKSUM_VERIFIED)
+                return CHECKSUM_VERIFIED
+        else:
+            checksum = sidecarChecksum(job.file_path)
+            if checksum is None:
+                return None
+
+            self.persepolis_db.insertInChecksumTable([{'gid': job.gid, 'checksum': checksum}])
+
+        checksum_type, expected_digest = checksum.split('=', 1)
+        digest = hashFile(job.file_path, CHECKSUM_TYPES[checksum_type])
+
+        if hmac.compare_digest(digest, expected_digest):
+            status = CHECKSUM_VERIFIED
+        else:
+            status = CHECKSUM_MISMATCH
+            ghermez.sendToLog('Checksum of ' + job.file_path + ' is not correct!', 'ERROR')
+
+        self.persepolis_db.setChecksumStatus(job.gid, status)
+        return status
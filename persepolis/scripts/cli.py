@@ -0,0 +1,400 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# subcommands of ghermez for scripts. they send requests to running engine (see engine.py)
+# and don't start user interface. for example:
+#   cat links.txt | ghermez add --category Scheduled-Downloads | ghermez wait
+#   ghermez list --status error
+#   ghermez pause --match '*.iso'
+#   ghermez metrics
+# every line of output of other commands is a JSON object.
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import socket
+import sys
+import time
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+import ghermez
+from persepolis.constants import LONG_NAME
+from persepolis.constants.status import DownloadStatus
+from persepolis.scripts.engine_protocol import ENGINE_ERROR, SOCKET_NAME
+
+# number of requests in one JSON-RPC batch
+BATCH_SIZE = 500
+
+# exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NO_ENGINE = 2
+EXIT_TIMEOUT = 3
+
+# downloads with these statuses are finished and wait doesn't wait for them.
+# downloads of queues and downloads that are added with --no-start are stopped until they are started,
+# so stopped is a finished status only after wait saw the download started. see commandWait
+FINISHED_STATUSES = (DownloadStatus.Complete, DownloadStatus.Error)
+
+
+class EngineNotRunningError(Exception):
+    pass
+
+
+# EngineClient sends JSON-RPC requests to engine. see engine.py
+class EngineClient:
+    def __init__(self, socket_path: str) -> None:
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.socket.connect(socket_path)
+        except OSError as e:
+            self.socket.close()
+            raise EngineNotRunningError(str(e)) from e
+
+        self.stream = self.socket.makefile('rwb')
+        self.last_id = 0
+
+    def close(self) -> None:
+        self.stream.close()
+        self.socket.close()
+
+    # returns result of one call. engine errors are raised as RuntimeError.
+    def call(self, method: str, params: list[Any] | dict[str, Any] | None = None) -> Any:
+        result, error = self.batch([(method, params or [])])[0]
+        if error is not None:
+            raise RuntimeError(error['message'])
+
+        return result
+
+    # send calls in one batch. returns (result, error) of every call in order of calls.
+    def batch(self, call_list: list[tuple[str, list[Any] | dict[str, Any]]]) -> list[tuple[Any, Any]]:
+        request_list = []
+        for method, params in call_list:
+            self.last_id = self.last_id + 1
+            request_list.append({'jsonrpc': '2.0', 'id': self.last_id, 'method': method, 'params': params})
+
+        self.stream.write(json.dumps(request_list).encode() + b'\n')
+        self.stream.flush()
+
+        line = self.stream.readline()
+        # engine was closed
+        if not line:
+            raise EngineNotRunningError
+
+        answer = json.loads(line)
+        # one error is returned if batch is not valid
+        if isinstance(answer, dict):
+            return [(None, answer['error']) for _ in request_list]
+
+        answer_dict = {item['id']: item for item in answer}
+        return [
+            (answer_dict[request['id']].get('result'), answer_dict[request['id']].get('error'))
+            for request in request_list
+        ]
+
+
+def writeLine(dictionary: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(dictionary) + '\n')
+    sys.stdout.flush()
+
+
+def chunks(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+# returns arguments or first word of every line of standard input.
+# empty lines and comments of stdin are skipped. key of JSON lines is read,
+# so output of add and list can be sent to wait.
+def argumentsOrStdin(argument_list: list[str], key: str) -> Iterator[str]:
+    if argument_list and argument_list != ['-']:
+        yield from argument_list
+        return
+
+    if sys.stdin.isatty() and not argument_list:
+        return
+
+    for line in sys.stdin:
+        line_text = line.strip()
+        if not line_text or line_text.startswith('#'):
+            continue
+
+        if line_text.startswith('{'):
+            try:
+                value = json.loads(line_text).get(key)
+            except ValueError:
+                continue
+
+            if value:
+                yield str(value)
+        else:
+            yield line_text.split()[0]
+
+
+def commandAdd(client: EngineClient, args: argparse.Namespace) -> int:
+    # same options as --referer, --cookie, --agent, --headers and --name of persepolis.py
+    options = {
+        'category': args.category,
+        'referer': args.referer,
+        'load_cookies': args.cookie,
+        'user_agent': args.agent,
+        'header': args.headers,
+        'out': args.name,
+        'start': not args.no_start,
+    }
+    options = {key: value for key, value in options.items() if value is not None}
+
+    exit_code = EXIT_OK
+    for link_list in chunks(argumentsOrStdin(args.links, 'link'), BATCH_SIZE):
+        answer_list = client.batch([('addDownload', {'link': link, **options}) for link in link_list])
+        for link, (gid, error) in zip(link_list, answer_list):
+            if error is None:
+                writeLine({'gid': gid, 'link': link})
+            else:
+                writeLine({'gid': None, 'link': link, 'error': error['message']})
+                exit_code = EXIT_FAILED
+
+    return exit_code
+
+
+def commandList(client: EngineClient, args: argparse.Namespace) -> int:
+    for download_dict in filterDownloads(client.call('listDownloads', [args.category]), args):
+        writeLine(download_dict)
+
+    return EXIT_OK
+
+
+# wait until downloads are finished. a line is written when a download is finished.
+# status of waiting downloads is asked in batches of downloadStatus.
+def commandWait(client: EngineClient, args: argparse.Namespace) -> int:
+    waiting_gid_set = set(argumentsOrStdin(args.gids, 'gid'))
+    start_time = time.monotonic()
+    exit_code = EXIT_OK
+
+    # last status of every waiting download
+    download_dict = {}
+
+    # downloads that were not stopped in a check. they are finished when they are stopped.
+    started_gid_set = set()
+
+    while waiting_gid_set:
+        for gid_list in chunks(sorted(waiting_gid_set), BATCH_SIZE):
+            answer_list = client.batch([('downloadStatus', [gid]) for gid in gid_list])
+            for gid, (status_dict, error) in zip(gid_list, answer_list):
+                if error is not None:
+                    # engine returns ENGINE_ERROR for unknown gid
+                    message = 'download is not found' if error['code'] == ENGINE_ERROR else error['message']
+                    writeLine({'gid': gid, 'status': None, 'error': message})
+                    waiting_gid_set.discard(gid)
+                    exit_code = EXIT_FAILED
+
+                elif status_dict['status'] in FINISHED_STATUSES or (
+                    status_dict['status'] == DownloadStatus.Stopped and gid in started_gid_set
+                ):
+                    writeLine(status_dict)
+                    waiting_gid_set.discard(gid)
+                    if status_dict['status'] != DownloadStatus.Complete:
+                        exit_code = EXIT_FAILED
+
+                else:
+                    download_dict[gid] = status_dict
+                    if status_dict['status'] != DownloadStatus.Stopped:
+                        started_gid_set.add(gid)
+
+        if not waiting_gid_set:
+            break
+
+        if args.timeout is not None and time.monotonic() - start_time >= args.timeout:
+            for gid in sorted(waiting_gid_set):
+                writeLine(download_dict[gid])
+
+            return EXIT_TIMEOUT
+
+        time.sleep(args.interval)
+
+    return exit_code
+
+
+# pause active downloads or resume paused downloads that match filters
+def commandPauseResume(client: EngineClient, args: argparse.Namespace) -> int:
+    if args.command == 'pause':
+        method = 'pauseDownload'
+        status_list = [DownloadStatus.Downloading, DownloadStatus.Waiting]
+    else:
+        method = 'resumeDownload'
+        status_list = [DownloadStatus.Paused]
+
+    download_list = [
+        download_dict
+        for download_dict in filterDownloads(client.call('listDownloads', [args.category]), args)
+        if download_dict['status'] in status_list
+    ]
+
+    exit_code = EXIT_OK
+    for chunk in chunks(download_list, BATCH_SIZE):
+        answer_list = client.batch([(method, [download_dict['gid']]) for download_dict in chunk])
+        for download_dict, (status, error) in zip(chunk, answer_list):
+            if error is None:
+                writeLine({'gid': download_dict['gid'], 'status': status})
+            else:
+                writeLine({'gid': download_dict['gid'], 'status': download_dict['status'], 'error': error['message']})
+                exit_code = EXIT_FAILED
+
+    return exit_code
+
+
+# write metrics of engine in prometheus text format
+def commandMetrics(client: EngineClient, args: argparse.Namespace) -> int:  # noqa: ARG001
+    sys.stdout.write(client.call('metrics'))
+    return EXIT_OK
+
+
+# filter downloads with --gid, --status and --match
+def filterDownloads(download_list: list[dict[str, str]], args: argparse.Namespace) -> list[dict[str, str]]:
+    gid_set = set(args.gid or [])
+    status_set = set(args.status or [])
+    return [
+        download_dict
+        for download_dict in download_list
+        if (not gid_set or download_dict['gid'] in gid_set)
+        and (not status_set or download_dict['status'] in status_set)
+        and (
+            args.match is None
+            or fnmatch.fnmatch(str(download_dict['file_name']), args.match)
+            or fnmatch.fnmatch(str(download_dict['link']), args.match)
+        )
+    ]
+
+
+def addFilterArguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--category', action='store', help='Only downloads of this queue.')
+    parser.add_argument('--gid', action='append', help='Only this download. It can be repeated.')
+    parser.add_argument(
+        '--status',
+        action='append',
+        choices=[status.value for status in DownloadStatus],
+        help='Only downloads with this status. It can be repeated.',
+    )
+    parser.add_argument(
+        '--match',
+        action='store',
+        help='Only downloads that their file name or link matches this pattern.',
+    )
+
+
+def createParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='ghermez', description=LONG_NAME + ' command line client')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # options of all commands
+    socket_parser = argparse.ArgumentParser(add_help=False)
+    socket_parser.add_argument(
+        '--socket',
+        action='store',
+        help='Path of engine socket. default is ' + SOCKET_NAME + ' in config folder.',
+    )
+
+    add_parser = subparsers.add_parser(
+        'add',
+        parents=[socket_parser],
+        help='Add links. Links are read from stdin if no link is given.',
+    )
+    add_parser.add_argument('links', nargs='*', help='Download links.')
+    add_parser.add_argument(
+        '--category',
+        action='store',
+        help='Add links to this queue. They wait for the queue to start them.',
+    )
+    add_parser.add_argument('--referer', action='store', help='Set an http referrer (Referer).')
+    add_parser.add_argument('--cookie', action='store', help='Cookie')
+    add_parser.add_argument('--agent', action='store', help='Set user agent for HTTP(S) downloads.')
+    add_parser.add_argument('--headers', action='store', help='Append HEADER to HTTP request header.')
+    add_parser.add_argument('--name', action='store', help='The file name of the downloaded file.')
+    add_parser.add_argument('--no-start', action='store_true', help="Add links and don't start them.")
+
+    list_parser = subparsers.add_parser('list', parents=[socket_parser], help='Write downloads as JSON lines.')
+    addFilterArguments(list_parser)
+
+    wait_parser = subparsers.add_parser(
+        'wait',
+        parents=[socket_parser],
+        help='Wait until downloads are finished. gids are read from stdin if no gid is given.',
+    )
+    wait_parser.add_argument('gids', nargs='*', help='gid of downloads.')
+    wait_parser.add_argument('--timeout', action='store', type=float, help='Maximum seconds of waiting.')
+    wait_parser.add_argument('--interval', action='store', type=float, default=1, help='Seconds between checks.')
+
+    pause_parser = subparsers.add_parser(
+        'pause',
+        parents=[socket_parser],
+        help='Pause active downloads that match filters.',
+    )
+    addFilterArguments(pause_parser)
+
+    resume_parser = subparsers.add_parser(
+        'resume',
+        parents=[socket_parser],
+        help='Resume paused downloads that match filters.',
+    )
+    addFilterArguments(resume_parser)
+
+    subparsers.add_parser(
+        'metrics',
+        parents=[socket_parser],
+        help='Write metrics of engine in prometheus text format.',
+    )
+
+    return parser
+
+
+# returns True if persepolis must run a subcommand instead of user interface
+def main(argument_list: list[str]) -> int:
+    args = createParser().parse_args(argument_list)
+    socket_path = args.socket or os.path.join(ghermez.determineConfigFolder(), SOCKET_NAME)
+
+    try:
+        client = EngineClient(socket_path)
+    except EngineNotRunningError:
+        sys.stderr.write('ghermez engine is not running. start it with: python3 -m persepolis.scripts.engine\n')
+        return EXIT_NO_ENGINE
+
+    command_dict = {
+        'add': commandAdd,
+        'list': commandList,
+        'wait': commandWait,
+        'pause': commandPauseResume,
+        'resume': commandPauseResume,
+        'metrics': commandMetrics,
+    }
+
+    try:
+        return command_dict[args.command](client, args)
+    except EngineNotRunningError:
+        sys.stderr.write('ghermez: engine closed connection\n')
+        return EXIT_FAILED
+    except RuntimeError as e:
+        sys.stderr.write('ghermez: ' + str(e) + '\n')
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        return EXIT_FAILED
+    finally:
+        client.close()
@@ -0,0 +1,280 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import urlsplit
+
+import ghermez
+
+if TYPE_CHECKING:
+    from ghermez import DataBase
+
+# aria2 doesn't accept more than 16 connections per server.
+MIN_CONNECTIONS = 1
+MAX_CONNECTIONS = 16
+
+# speed is measured in windows of SAMPLE_WINDOW seconds.
+# aria2 restarts connections of download after changeOption,
+# so samples of first WARM_UP seconds after every change are ignored.
+SAMPLE_WINDOW = 30
+WARM_UP = 5
+
+# a change is kept if speed is increased more than 10 percent.
+MIN_IMPROVEMENT = 1.1
+
+# number of changes for every download
+MAX_STEPS = 4
+
+# small downloads are finished before tuner can measure anything.
+MIN_REMAINING_SIZE = 64 * 1024 * 1024
+
+ONE_MEGABYTE = 1024 * 1024
+
+
+# returns host of link in lowercase. port is not removed.
+def linkHost(link: str | None) -> str | None:
+    try:
+        host = urlsplit(link).netloc.rpartition('@')[2].lower()
+    except (ValueError, AttributeError):
+        return None
+
+    return host or None
+
+
+# every connection downloads at least 4 pieces of file. min-split-size is between 1M and 20M.
+def minSplitSize(file_size: int, connections: int) -> str:
+    min_split_size = file_size // (connections * 4 * ONE_MEGABYTE)
+    return str(max(1, min(20, min_split_size))) + 'M'
+
+
+# aria2 options for connections number
+def connectionOptions(connections: int, file_size: int) -> dict[str, str]:
+    return {
+        'max-connection-per-server': str(connections),
+        'split': str(connections),
+        'min-split-size': minSplitSize(file_size, connections),
+    }
+
+
+# options of host_db_table for aria2.addUri. see downloadAria in download.py
+def hostOptions(persepolis_db: DataBase, link: str) -> dict[str, str]:
+    host = linkHost(link)
+    if host is None:
+        return {}
+
+    host_dictionary = persepolis_db.searchHostInHostTable(host)
+    if host_dictionary is None:
+        return {}
+
+    return {
+        'max-connection-per-server': host_dictionary['connections'],
+        'split': host_dictionary['split'],
+        'min-split-size': host_dictionary['min_split_size'],
+    }
+
+
+class TunerState:
+    def __init__(self, gid: str, host: str, connections: int, file_size: int) -> None:
+        self.gid = gid
+        self.host = host
+        self.file_size = file_size
+
+        self.start_connections = connections
+        self.connections = connections
+        self.best_connections = connections
+        self.best_speed = 0.0
+
+        # 1 >> more connections, -1 >> less connections
+        self.direction = 1
+        self.steps = 0
+        self.done = False
+
+        self.startWindow()
+
+    def startWindow(self) -> None:
+        self.window_start = time.monotonic() + WARM_UP
+        self.speed_sum = 0
+        self.sample_number = 0
+
+
+# ConnectionTuner changes number of connections of active downloads and finds the best number for every host.
+# CheckDownloadInfoThread gives status of active downloads to observe method (aria2.tellActive output)
+# and gids of active downloads to forgetInactive method.
+#
+# tuning starts from current max-connection-per-server option of download.
+# first the number of connections is doubled. if speed increases, it's doubled again,
+# otherwise the number is halved from the best number.
+# hosts that limit speed of every connection get more connections and
+# hosts that punish many connections get less connections.
+# the best settings are saved in host_db_table and next downloads from the host start with them.
+class ConnectionTuner:
+    def __init__(
+        self,
+        persepolis_db: DataBase,
+        get_connections: Callable[[str], int | None],
+        change_option: Callable[[str, dict[str, str]], bool],
+    ) -> None:
+        self.persepolis_db = persepolis_db
+        self.get_connections = get_connections
+        self.change_option = change_option
+
+        # key = gid and value = TunerState
+        self.states: dict[str, TunerState] = {}
+
+    # download_status is one dictionary of aria2.tellActive output.
+    def observe(self, download_status: dict[str, Any]) -> None:
+        gid = download_status['gid']
+        if download_status.get('status') != 'active':
+            self.forget(gid)
+            return
+
+        state = self.states.get(gid)
+        if state is None:
+            state = self.startTuning(download_status)
+            if state is None:
+                return
+
+        if state.done:
+            return
+
+        now = time.monotonic()
+        if now < state.window_start:
+            return
+
+        state.speed_sum = state.speed_sum + int(download_status.get('downloadSpeed') or 0)
+        state.sample_number = state.sample_number + 1
+
+        if now - state.window_start >= SAMPLE_WINDOW:
+            remaining_size = int(download_status.get('totalLength') or 0) - int(
+                download_status.get('completedLength') or 0,
+            )
+            self.nextStep(state, state.speed_sum / state.sample_number, remaining_size)
+
+    # returns None if download must not be tuned.
+    def startTuning(self, download_status: dict[str, Any]) -> TunerState | None:
+        gid = download_status['gid']
+
+        try:
+            link = download_status['files'][0]['uris'][0]['uri']
+            file_size = int(download_status['totalLength'])
+            remaining_size = file_size - int(download_status['completedLength'])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+        # size of file is not known yet
+        if not file_size:
+            return None
+
+        host = linkHost(link)
+        connections = self.get_connections(gid)
+        if host is None or connections is None or remaining_size < MIN_REMAINING_SIZE:
+            # don't check this download again
+            state = TunerState(gid, host or '', connections or MIN_CONNECTIONS, file_size)
+            state.done = True
+        else:
+            state = TunerState(gid, host, connections, file_size)
+
+        self.states[gid] = state
+        return state
+
+    def nextStep(self, state: TunerState, speed: float, remaining_size: int) -> None:
+        # download is stalled. there is nothing to compare.
+        if not speed and not state.best_speed:
+            self.finishTuning(state)
+            return
+
+        if speed > state.best_speed * MIN_IMPROVEMENT:
+            # this number of connections is better. continue in this direction.
+            state.best_speed = speed
+            state.best_connections = state.connections
+
+        elif state.direction == 1 and state.best_connections == state.start_connections:
+            # more connections didn't help. try less connections.
+            state.direction = -1
+
+        else:
+            self.finishTuning(state)
+            return
+
+        next_connections = self.nextConnections(state)
+
+        # download is started with maximum number of connections. try less connections.
+        if next_connections == state.best_connections and state.best_connections == state.start_connections:
+            state.direction = -1
+            next_connections = self.nextConnections(state)
+
+        if (
+            next_connections == state.best_connections
+            or state.steps >= MAX_STEPS
+            or remaining_size < MIN_REMAINING_SIZE
+        ):
+            self.finishTuning(state)
+            return
+
+        if self.change_option(state.gid, connectionOptions(next_connections, state.file_size)):
+            state.connections = next_connections
+            state.steps = state.steps + 1
+            state.startWindow()
+        else:
+            self.finishTuning(state)
+
+    def nextConnections(self, state: TunerState) -> int:
+        next_connections = state.best_connections * 2 if state.direction == 1 else state.best_connections // 2
+        return max(MIN_CONNECTIONS, min(MAX_CONNECTIONS, next_connections))
+
+    # go back to the best number of connections and save it for the host.
+    def finishTuning(self, state: TunerState) -> None:
+        state.done = True
+
+        if state.connections != state.best_connections:
+            self.change_option(state.gid, connectionOptions(state.best_connections, state.file_size))
+            state.connections = state.best_connections
+
+        self.saveHost(state)
+
+    def saveHost(self, state: TunerState) -> None:
+        if not state.best_speed:
+            return
+
+        options = connectionOptions(state.best_connections, state.file_size)
+        self.persepolis_db.updateHostTable(
+            {
+                'host': state.host,
+                'connections': options['max-connection-per-server'],
+                'split': options['split'],
+                'min_split_size': options['min-split-size'],
+                'speed': str(int(state.best_speed)),
+                'modified_date': ghermez.nowDate(),
+            },
+        )
+        ghermez.sendToLog(
+            'Best number of connections for ' + state.host + ' is ' + str(state.best_connections),
+            'INFO',
+        )
+
+    # download is not active anymore.
+    # finished, paused and failed downloads are not in aria2.tellActive output.
+    # CheckDownloadInfoThread calls this method with gids of the last tellActive output.
+    def forgetInactive(self, active_gid_list: list[str]) -> None:
+        active_gid_set = set(active_gid_list)
+        for gid in list(self.states):
+            if gid not in active_gid_set:
+                self.forget(gid)
+
+    def forget(self, gid: str) -> None:
+        state = self.states.pop(gid, None)
+        if state is not None and not state.done and state.steps > 0:
+            self.saveHost(state)
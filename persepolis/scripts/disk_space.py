@@ -0,0 +1,138 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import platform
+import threading
+from typing import Any
+
+from persepolis.constants import OS
+from persepolis.scripts.os_commands import findMountPoint
+
+os_type = platform.system()
+
+if os_type == OS.WINDOWS:
+    from persepolis.scripts.useful_tools import freeSpace
+else:
+    from ghermez import freeSpace
+
+# this space is always kept free in every partition.
+MIN_FREE_SPACE = 64 * 1024 * 1024
+
+# aria2 takes all space of file when download starts with these file-allocation methods.
+# trunc creates sparse file and none writes file gradually.
+ALLOCATING_METHODS = ('prealloc', 'falloc')
+
+
+class Reservation:
+    def __init__(self, mount_point: str, size: int, completed: int, allocating: bool) -> None:
+        self.mount_point = mount_point
+        # bytes
+        self.size = size
+        self.completed = completed
+        # aria2 takes space of whole file when download starts. see observe method.
+        self.allocating = allocating
+        self.allocated = False
+
+    # bytes that will be written in partition yet.
+    def remaining(self) -> int:
+        if self.allocated:
+            return 0
+
+        return max(0, self.size - self.completed)
+
+
+# DiskLedger keeps space that is reserved by active downloads in every partition.
+# free space of partition that is reported by operating system doesn't contain
+# the parts of active downloads that are not written yet.
+# a new download is started only if it fits in free space minus reserved space of others.
+# see downloadAria in download.py
+class DiskLedger:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+
+        # key = gid and value = Reservation
+        self.reservations: dict[str, Reservation] = {}
+
+    # returns True if download is fitted in partition of download_path_temp and space is reserved for it.
+    # size is None if spider couldn't find size of file. these downloads are always started.
+    def reserve(
+        self,
+        gid: str,
+        download_path_temp: str,
+        size: int | None,
+        completed: int = 0,
+        file_allocation: str | None = None,
+    ) -> bool:
+        mount_point = findMountPoint(download_path_temp)
+
+        with self.lock:
+            if size:
+                free_space = freeSpace(mount_point)
+                if free_space is not None:
+                    reserved = sum(
+                        reservation.remaining()
+                        for reservation_gid, reservation in self.reservations.items()
+                        if reservation.mount_point == mount_point and reservation_gid != gid
+                    )
+                    if max(0, size - completed) + reserved + MIN_FREE_SPACE > free_space:
+                        return False
+
+            self.reservations[gid] = Reservation(
+                mount_point,
+                size or 0,
+                completed,
+                file_allocation in ALLOCATING_METHODS,
+            )
+
+        return True
+
+    # download_status is one dictionary of aria2.tellActive output.
+    def observe(self, download_status: dict[str, Any]) -> None:
+        with self.lock:
+            reservation = self.reservations.get(download_status['gid'])
+            if reservation is None:
+                return
+
+            try:
+                size = int(download_status['totalLength'])
+                completed = int(download_status['completedLength'])
+            except (KeyError, TypeError, ValueError):
+                return
+
+            # aria2 knows real size of file.
+            if size:
+                reservation.size = size
+                reservation.allocated = reservation.allocating
+
+            reservation.completed = completed
+
+    # download is completed, stopped or failed.
+    def release(self, gid: str) -> None:
+        with self.lock:
+            self.reservations.pop(gid, None)
+
+
+# convert size of download_db_table (for example '1.5 GiB') to bytes.
+# returns None if size is unknown.
+def sizeInByte(size: str | None) -> int | None:
+    units = {'B': 1, 'KiB': 1024, 'MiB': 1024**2, 'GiB': 1024**3, 'TiB': 1024**4}
+    size_value, _, unit = str(size).partition(' ')
+    if unit not in units:
+        return None
+
+    try:
+        return int(float(size_value) * units[unit])
+    except ValueError:
+        return None
@@ -21,16 +21,23 @@ import time
 import traceback
 import urllib.parse
 import xmlrpc.client
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
 import ghermez
-from ghermez import humanReadableSize, moveFile
 from persepolis.constants import APP_NAME, ORG_NAME, OS
 from persepolis.constants.status import DownloadStatus
-from persepolis.scripts.bubble import notifySend
-from persepolis.scripts.os_commands import makeTempDownloadDir
+from persepolis.scripts import aria2_options
+from persepolis.scripts.aria2_options import convertDownloadInformation, convertLimit
+from persepolis.scripts.aria2_pool import Aria2Pool
+from persepolis.scripts.checksum_service import ARIA2_CHECKSUM_TYPES
+from persepolis.scripts.connection_tuner import hostOptions
+from persepolis.scripts.disk_space import sizeInByte
+from persepolis.scripts.download_rules import routeDownloadPath
+from persepolis.scripts.metrics import COMMON_METRICS, MeasuredServer, Metrics, collectAria2, collectDownloads
 
 if TYPE_CHECKING:
+    from ghermez import DataBase
+
     try:
         from PySide6.QtWidgets import QWidget
     except ImportError:
@@ -50,11 +57,6 @@ home_address = os.path.expanduser('~')
 
 os_type = platform.system()
 
-if os_type == OS.WINDOWS:
-    from persepolis.scripts.useful_tools import freeSpace
-else:
-    from ghermez import freeSpace
-
 # persepolis setting
 persepolis_setting = QSettings(ORG_NAME, APP_NAME)
 
@@ -67,16 +69,51 @@ port = int(persepolis_setting.value('settings/rpc-port'))
 # get aria2_path
 aria2_path = persepolis_setting.value('settings/aria2_path')
 
+# number of aria2 processes. see aria2_pool.py
+aria2_daemons = max(int(persepolis_setting.value('settings/aria2-daemons', 1)), 1)
+
 # xml rpc
 SERVER_URI_FORMAT = 'http://{}:{:d}/rpc'
 server_uri = SERVER_URI_FORMAT.format(host, port)
-server = xmlrpc.client.ServerProxy(server_uri, allow_none=True)
+if aria2_daemons > 1:
+    server = Aria2Pool([SERVER_URI_FORMAT.format(host, port + shard) for shard in range(aria2_daemons)])
+else:
+    server = xmlrpc.client.ServerProxy(server_uri, allow_none=True)
+
+# MainWindow serves metrics on http://127.0.0.1:metrics_port/metrics if metrics_port is not 0.
+# calls to aria2 are measured only if metrics are served. see metrics.py
+metrics_port = int(persepolis_setting.value('settings/metrics-port', 0))
+metrics_registry = None
+if metrics_port:
+    metrics_registry = Metrics()
+    for name, metric_type, help_text in COMMON_METRICS:
+        metrics_registry.describe(name, metric_type, help_text)
+
+    server = MeasuredServer(server, metrics_registry, 'ghermez_aria2_rpc_duration_seconds')
+
+# aria2 saves paused and unfinished downloads in this file and adds them again when it starts.
+session_path = os.path.join(ghermez.determineConfigFolder(), 'aria2.session')
+
+# maximum number of downloads that are read from aria2 session
+MAX_SESSION_DOWNLOADS = 10000
+
+# gids of downloads that aria2 restored from session file and they are paused in aria2.
+# see reconcileSession
+session_gid_set: set[str] = set()
 
 
 # start aria2 with RPC
 def startAria() -> str:
     # return that starting is successful or not!
-    return ghermez.startAria(port, aria2_path)
+    return ghermez.startAria(port, aria2_path, session_path, aria2_daemons)
+
+
+# returns metrics in prometheus text format. MetricsServer calls this function in its thread.
+# aria2 and data base are checked now and duration of polls is measured by CheckDownloadInfoThread.
+def collectMetrics(persepolis_db: DataBase) -> str:
+    collectAria2(metrics_registry, server)
+    collectDownloads(metrics_registry, list(persepolis_db.returnItemsInDownloadTable(None).values()))
+    return metrics_registry.render()
 
 
 # check aria2 release version . Persepolis uses this function to
@@ -92,62 +129,140 @@ def aria2Version() -> str:
     return answer
 
 
-# this function sends download request to aria2
-def downloadAria(gid: str, parent: QWidget) -> bool | None:
-    # add_link_dictionary is a dictionary that contains user download request
-    # information.
+# aria2 adds downloads of session file again when it starts. data base is the reference:
+# downloads that are deleted, completed or failed in data base are removed from aria2,
+# and others are paused in aria2 and their status is changed to paused in data base.
+# so user resumes them with one click and aria2 continues them without adding them again.
+# returns list of restored gids.
+def reconcileSession(persepolis_db: DataBase) -> list[str]:
+    keys = ['gid', 'status']
+    try:
+        answer_list = server.system.multicall(
+            [
+                {'methodName': 'aria2.tellActive', 'params': [keys]},
+                {'methodName': 'aria2.tellWaiting', 'params': [0, MAX_SESSION_DOWNLOADS, keys]},
+            ],
+        )
+    except Exception:
+        ghermez.sendToLog('Persepolis can not read aria2 session', 'ERROR')
+        ghermez.sendToLog(str(traceback.format_exc()), 'ERROR')
+        return []
+
+    # aria2 returns a list with result for successful calls and a fault dictionary for others.
+    status_list = [status for answer in answer_list if isinstance(answer, list) for status in answer[0]]
+    downloads_dict = persepolis_db.returnItemsInDownloadTable(None)
+
+    restored_gid_list = []
+    multicall_list = []
+    for status in status_list:
+        gid = status['gid']
+        if gid in downloads_dict and downloads_dict[gid]['status'] == DownloadStatus.Stopped:
+            restored_gid_list.append(gid)
+            if status['status'] != DownloadStatus.Paused:
+                multicall_list.append({'methodName': 'aria2.forcePause', 'params': [gid]})
+        else:
+            multicall_list.append({'methodName': 'aria2.forceRemove', 'params': [gid]})
 
-    # get information from data_base
+    try:
+        if multicall_list:
+            server.system.multicall(multicall_list)
+
+        # results of removed downloads and downloads that were finished in session are deleted,
+        # so their gids can be used again. new session is saved now and aria2 saves it every minute.
+        server.system.multicall(
+            [
+                {'methodName': 'aria2.purgeDownloadResult', 'params': []},
+                {'methodName': 'aria2.saveSession', 'params': []},
+            ],
+        )
+    except Exception:
+        ghermez.sendToLog('Persepolis can not reconcile aria2 session', 'ERROR')
+        ghermez.sendToLog(str(traceback.format_exc()), 'ERROR')
+        return []
+
+    session_gid_set.update(restored_gid_list)
+    persepolis_db.updateDownloadTable(
+        [{'gid': gid, 'status': DownloadStatus.Paused} for gid in restored_gid_list],
+    )
+
+    ghermez.sendToLog(str(len(restored_gid_list)) + ' downloads are restored from aria2 session', 'INFO')
+    return restored_gid_list
+
+
+# remove download of session from aria2, so it can be added again with addUri.
+def forgetSessionDownload(gid: str) -> None:
+    session_gid_set.discard(gid)
+
+    # multicall doesn't raise exception if download is not found
+    server.system.multicall(
+        [
+            {'methodName': 'aria2.forceRemove', 'params': [gid]},
+            {'methodName': 'aria2.removeDownloadResult', 'params': [gid]},
+        ],
+    )
+
+
+# returns calls of system.multicall that start download.
+# download of session is unpaused with new options. it's not added again.
+def startCalls(gid: str, uri_list: list[str], aria_dict: dict) -> list[dict[str, Any]]:
+    if gid not in session_gid_set:
+        return [{'methodName': 'aria2.addUri', 'params': [uri_list, aria_dict]}]
+
+    options = {key: value for key, value in aria_dict.items() if key != 'gid'}
+    return [
+        {'methodName': 'aria2.changeOption', 'params': [gid, options]},
+        {'methodName': 'aria2.unpause', 'params': [gid]},
+    ]
+
+
+# send download request to aria2 and returns gid.
+def addOrUnpause(gid: str, uri_list: list[str], aria_dict: dict) -> str:
+    if gid in session_gid_set:
+        answer_list = server.system.multicall(startCalls(gid, uri_list, aria_dict))
+        session_gid_set.discard(gid)
+        if all(isinstance(answer, list) for answer in answer_list):
+            return answer_list[-1][0]
+
+        # aria2 doesn't have this download anymore or it's not paused.
+        ghermez.sendToLog('Download of aria2 session is added again - GID : ' + str(gid), 'WARNING')
+        forgetSessionDownload(gid)
+
+    return server.aria2.addUri(uri_list, aria_dict)
+
+
+# see findDownloadPathTemp in aria2_options.py
+def findDownloadPathTemp(download_path: str) -> str:
+    persepolis_setting.sync()
+    return aria2_options.findDownloadPathTemp(download_path, persepolis_setting)
+
+
+# see ariaDictionary in aria2_options.py
+def ariaDictionary(gid: str, add_link_dictionary: dict[str, str], limit: str, download_path_temp: str) -> dict:
+    return aria2_options.ariaDictionary(gid, add_link_dictionary, limit, download_path_temp, persepolis_setting)
+
+
+# get add_link_dictionary from data_base and replace 'NULL' and 'None' with None
+def searchAddLinkDictionary(gid: str, parent: QWidget) -> dict[str, str]:
     add_link_dictionary = parent.persepolis_db.searchGidInAddLinkTable(gid)
 
     for key in add_link_dictionary:
         if add_link_dictionary[key] in ['NULL', 'None']:
             add_link_dictionary[key] = None
 
-    link = add_link_dictionary['link']
-    ip = add_link_dictionary['ip']
-    port = add_link_dictionary['port']
-    proxy_user = add_link_dictionary['proxy_user']
-    proxy_passwd = add_link_dictionary['proxy_passwd']
-    download_user = add_link_dictionary['download_user']
-    download_passwd = add_link_dictionary['download_passwd']
-    connections = add_link_dictionary['connections']
-    limit = str(add_link_dictionary['limit_value'])
-    start_time = add_link_dictionary['start_time']
-    end_time = add_link_dictionary['end_time']
-    header = add_link_dictionary['header']
-    out = add_link_dictionary['out']
-    user_agent = add_link_dictionary['user_agent']
-    cookies = add_link_dictionary['load_cookies']
-    referer = add_link_dictionary['referer']
+    return add_link_dictionary
 
-    # make header option
-    header_list = []
-    header_list.append('Cookie: ' + str(cookies))
 
-    # convert Mega to Kilo, RPC does not Support floating point numbers.
-    if limit != '0':
-        limit_number = limit[:-1]
-        limit_number = float(limit_number)
-        limit_unit = limit[-1]
-        if limit_unit == 'K':
-            limit_number = round(limit_number)
-        else:
-            limit_number = round(1024 * limit_number)
-            limit_unit = 'K'
-        limit = str(limit_number) + limit_unit
+def downloadAria(gid: str, parent: QWidget) -> bool | None:
+    # add_link_dictionary is a dictionary that contains user download request
+    # information.
 
-    # create header list
-    if header is not None:
-        semicolon_split_header = header.split('; ')
-        for i in semicolon_split_header:
-            equal_split_header = i.split('=', 1)
-            join_header = ':'.join(equal_split_header)
-            if i != '':
-                header_list.append(join_header)
+    # get information from data_base
+    add_link_dictionary = searchAddLinkDictionary(gid, parent)
 
-    if len(header_list) == 0:
-        header_list = None
+    link = add_link_dictionary['link']
+    limit = convertLimit(str(add_link_dictionary['limit_value']))
+    start_time = add_link_dictionary['start_time']
+    end_time = add_link_dictionary['end_time']
 
     # update status and last_try_date in data_base
     status = DownloadStatus.Scheduled if start_time else DownloadStatus.Waiting
@@ -159,10 +274,6 @@ def downloadAria(gid: str, parent: QWidget) -> bool | None:
     download_dict = {'gid': gid, 'status': status, 'last_try_date': now_date}
     parent.persepolis_db.updateDownloadTable([download_dict])
 
-    # create ip_port from ip and port in desired format.
-    # for example "127.0.0.1:8118"
-    ip_port = str(ip) + ':' + str(port) if ip else ''
-
     # call startTime if start_time is available
     # startTime creates sleep loop if user set start_time
     # see startTime function for more information.
@@ -171,92 +282,37 @@ def downloadAria(gid: str, parent: QWidget) -> bool | None:
     if start_time_status == DownloadStatus.Scheduled:
         # read limit value again from data_base before starting download!
         # perhaps user changed this in progress bar window
-        add_link_dictionary = parent.persepolis_db.searchGidInAddLinkTable(gid)
-        limit = add_link_dictionary['limit_value']
-
-        # convert Mega to Kilo, RPC does not Support floating point numbers.
-        if limit != '0':
-            limit_number = limit[:-1]
-            limit_number = float(limit_number)
-            limit_unit = limit[-1]
-            if limit_unit == 'K':
-                limit_number = round(limit_number)
-            else:
-                limit_number = round(1024 * limit_number)
-                limit_unit = 'K'
-            limit = str(limit_number) + limit_unit
+        limit = convertLimit(parent.persepolis_db.searchGidInAddLinkTable(gid)['limit_value'])
 
         # set start_time value to None in data_base!
         parent.persepolis_db.setDefaultGidInAddlinkTable(gid, start_time=True)
 
-    # Find download_path_temp from persepolis_setting
-    # if download_path_temp and download_path aren't in same partition on hard disk,
-    # then create new temp folder in that partition.
-    # Why? when download is completed, file must be moved to download_path from temp folder.
-    # It helps moving speed :)
-    persepolis_setting.sync()
-
-    # Find default download_path_temp
-    download_path_temp = persepolis_setting.value('settings/download_path_temp')
+    # Find download_path_temp
+    download_path_temp = findDownloadPathTemp(add_link_dictionary['download_path'])
 
-    # Find user's selected download_path
-    download_path = add_link_dictionary['download_path']
-
-    # check is download_path is existed
-    if os.path.isdir(download_path):
-        if os.lstat(download_path).st_dev != os.lstat(download_path_temp).st_dev:
-            # Create folder and give new temp address from makeTempDownloadDir function.
-            # Please checkout osCommands.py for more information.
-            download_path_temp = makeTempDownloadDir(download_path)
-    else:
-        # write an error in ghermez
-        ghermez.sendToLog('download_path is not found!', 'ERROR')
+    # download waits in queue until it fits in free space of hard disk
+    if start_time_status != DownloadStatus.Stopped:
+        start_time_status = waitForDiskSpace(gid, download_path_temp, parent)
 
     if start_time_status != DownloadStatus.Stopped:
         # send download request to aria2
-        aria_dict = {
-            'gid': gid,
-            'max-tries': str(persepolis_setting.value('settings/max-tries')),
-            'retry-wait': int(persepolis_setting.value('settings/retry-wait')),
-            'timeout': int(persepolis_setting.value('settings/timeout')),
-            'header': header_list,
-            'out': out,
-            'user-agent': user_agent,
-            'referer': referer,
-            'all-proxy': ip_port,
-            'max-download-limit': limit,
-            'all-proxy-user': str(proxy_user),
-            'all-proxy-passwd': str(proxy_passwd),
-            'http-user': str(download_user),
-            'http-passwd': str(download_passwd),
-            'split': '16',
-            'max-connection-per-server': str(connections),
-            'min-split-size': '1M',
-            'continue': 'true',
-            'dir': str(download_path_temp),
-        }
-
-        if str(persepolis_setting.value('settings/dont-check-certificate')) == 'yes':
-            aria_dict['check-certificate'] = 'false'
+        aria_dict = ariaDictionary(gid, add_link_dictionary, limit, download_path_temp)
+        aria_dict.update(tunedOptions(link, parent))
+        aria_dict.update(checksumOptions(gid, parent))
 
-        if not link.startswith('https'):
-            aria_dict['http-user'] = str(download_user)
-            aria_dict['http-passwd'] = str(download_passwd)
-
-        aria_dict_copy = aria_dict.copy()
-        # remove empty key[value] from aria_dict
-        for aria_dict_key in aria_dict_copy:
-            if aria_dict_copy[aria_dict_key] in [None, 'None', '']:
-                del aria_dict[aria_dict_key]
+        # aria2 downloads parts of file from link and mirrors at the same time.
+        uri_list = [link, *parent.persepolis_db.searchGidInMirrorTable(gid)]
 
         try:
-            answer = server.aria2.addUri([link], aria_dict)
+            answer = addOrUnpause(gid, uri_list, aria_dict)
 
             ghermez.sendToLog(answer + ' Starts', 'INFO')
             if end_time:
                 endTime(end_time, gid, parent)
 
         except Exception:
+            parent.disk_ledger.release(gid)
+
             # write error status in data_base
             download_dict = {'gid': gid, 'status': DownloadStatus.Error}
             parent.persepolis_db.updateDownloadTable([download_dict])
@@ -274,8 +330,195 @@ def downloadAria(gid: str, parent: QWidget) -> bool | None:
         return None
 
 
+# reserve space of download in partition of download_path_temp. see disk_space.py
+# if download doesn't fit in free space, status of download is changed to scheduled and
+# this function waits until other downloads are finished or user frees some space.
+# returns DownloadStatus.Stopped if user canceled download.
+def waitForDiskSpace(gid: str, download_path_temp: str, parent: QWidget) -> DownloadStatus:
+    download_dict = parent.persepolis_db.searchGidInDownloadTable(gid)
+
+    # size that spider found
+    size = sizeInByte(download_dict['size'])
+    completed = sizeInByte(download_dict['downloaded_size']) or 0
+    file_allocation = persepolis_setting.value('settings/file-allocation')
+
+    if parent.disk_ledger.reserve(gid, download_path_temp, size, completed, file_allocation):
+        return DownloadStatus.Waiting
+
+    ghermez.sendToLog('Not enough free space! Download waits for free space - GID : ' + str(gid), 'INFO')
+    parent.persepolis_db.updateDownloadTable([{'gid': gid, 'status': DownloadStatus.Scheduled}])
+
+    while not parent.disk_ledger.reserve(gid, download_path_temp, size, completed, file_allocation):
+        time.sleep(5)
+
+        # user canceled download
+        download_dict = parent.persepolis_db.searchGidInDownloadTable(gid)
+        if download_dict['status'] == DownloadStatus.Stopped:
+            return DownloadStatus.Stopped
+
+    parent.persepolis_db.updateDownloadTable([{'gid': gid, 'status': DownloadStatus.Waiting}])
+    return DownloadStatus.Waiting
+
+
+# best connection settings that ConnectionTuner found for host of link.
+# see connection_tuner.py
+def tunedOptions(link: str, parent: QWidget) -> dict[str, str]:
+    if str(persepolis_setting.value('settings/auto-tune-connections')) != 'yes':
+        return {}
+
+    return hostOptions(parent.persepolis_db, link)
+
+
+# aria2 checks checksum of download itself if it supports its type. see checksum_service.py
+def checksumOptions(gid: str, parent: QWidget) -> dict[str, str]:
+    checksum_dict = parent.persepolis_db.searchGidInChecksumTable(gid)
+    if checksum_dict is None or checksum_dict['checksum'].split('=', 1)[0] not in ARIA2_CHECKSUM_TYPES:
+        return {}
+
+    return {'checksum': checksum_dict['checksum']}
+
+
+# send download requests of many downloads to aria2 with one system.multicall request.
+# start_time and end_time of downloads are not checked.
+# returns list of gids that aria2 started them and list of gids that don't fit in free space of hard disk
+# or aria2 lost them from session, or None if aria2 did not respond.
+# downloads of second list must be started by downloadAria later.
+def downloadAriaBatch(gid_list: list[str], parent: QWidget) -> tuple[list[str], list[str]] | None:
+    now_date = nowDate()
+    download_path_temp_dict = {}
+    file_allocation = persepolis_setting.value('settings/file-allocation')
+
+    multicall_gid_list = []
+    multicall_index_list = []
+    waiting_gid_list = []
+    multicall_list = []
+    download_dict_list = []
+    for gid in gid_list:
+        add_link_dictionary = searchAddLinkDictionary(gid, parent)
+
+        # find download_path_temp once for every download_path
+        download_path = add_link_dictionary['download_path']
+        if download_path not in download_path_temp_dict:
+            download_path_temp_dict[download_path] = findDownloadPathTemp(download_path)
+
+        # reserve space of download. see disk_space.py
+        download_dict = parent.persepolis_db.searchGidInDownloadTable(gid)
+        if not parent.disk_ledger.reserve(
+            gid,
+            download_path_temp_dict[download_path],
+            sizeInByte(download_dict['size']),
+            sizeInByte(download_dict['downloaded_size']) or 0,
+            file_allocation,
+        ):
+            waiting_gid_list.append(gid)
+            download_dict_list.append({'gid': gid, 'status': DownloadStatus.Scheduled, 'last_try_date': now_date})
+            continue
+
+        aria_dict = ariaDictionary(
+            gid,
+            add_link_dictionary,
+            convertLimit(str(add_link_dictionary['limit_value'])),
+            download_path_temp_dict[download_path],
+        )
+        aria_dict.update(tunedOptions(add_link_dictionary['link'], parent))
+        aria_dict.update(checksumOptions(gid, parent))
+        uri_list = [add_link_dictionary['link'], *parent.persepolis_db.searchGidInMirrorTable(gid)]
+        multicall_gid_list.append(gid)
+        # index of last call of every download
+        call_list = startCalls(gid, uri_list, aria_dict)
+        multicall_list.extend(call_list)
+        multicall_index_list.append(len(multicall_list) - 1)
+        download_dict_list.append({'gid': gid, 'status': DownloadStatus.Waiting, 'last_try_date': now_date})
+
+    parent.persepolis_db.updateDownloadTable(download_dict_list)
+
+    if not multicall_list:
+        return [], waiting_gid_list
+
+    try:
+        answer_list = server.system.multicall(multicall_list)
+    except Exception:
+        for gid in multicall_gid_list:
+            parent.disk_ledger.release(gid)
+
+        ghermez.sendToLog('Downloads did not start', 'ERROR')
+        ghermez.sendToLog(str(traceback.format_exc()), 'ERROR')
+        return None
+
+    # aria2 returns a list with gid for successful calls and a fault dictionary for others.
+    started_gid_list = []
+    error_dict_list = []
+    for gid, index in zip(multicall_gid_list, multicall_index_list):
+        answer = answer_list[index]
+        session_download = gid in session_gid_set
+        if session_download and not isinstance(answer_list[index - 1], list):
+            # changeOption failed
+            answer = answer_list[index - 1]
+
+        if isinstance(answer, list):
+            session_gid_set.discard(gid)
+            started_gid_list.append(gid)
+        elif session_download:
+            # aria2 doesn't have this download anymore. downloadAria adds it again.
+            parent.disk_ledger.release(gid)
+            forgetSessionDownload(gid)
+            waiting_gid_list.append(gid)
+        else:
+            parent.disk_ledger.release(gid)
+            error_dict_list.append({'gid': gid, 'status': DownloadStatus.Error})
+            ghermez.sendToLog('Download did not start - GID : ' + str(gid) + ' - ' + str(answer), 'ERROR')
+
+    parent.persepolis_db.updateDownloadTable(error_dict_list)
+    ghermez.sendToLog(str(len(started_gid_list)) + ' downloads Starts', 'INFO')
+
+    return started_gid_list, waiting_gid_list
+
+
+# this function returns download speed of every uri of download.
+# returns a list of dictionaries with uri, current_uri and download_speed keys.
+def getServers(gid: str) -> list[dict[str, str | int]]:
+    try:
+        file_servers_list = server.aria2.getServers(gid)
+    except Exception:
+        return []
+
+    return [
+        {
+            'uri': uri_server['uri'],
+            'current_uri': uri_server['currentUri'],
+            'download_speed': int(uri_server['downloadSpeed']),
+        }
+        for file_servers in file_servers_list
+        for uri_server in file_servers['servers']
+    ]
+
+
+# returns max-connection-per-server option of download or None if aria2 didn't respond.
+def getConnections(gid: str) -> int | None:
+    try:
+        return int(server.aria2.getOption(gid)['max-connection-per-server'])
+    except Exception:
+        return None
+
+
+# change connection options of download. see connection_tuner.py
+def changeConnections(gid: str, options: dict[str, str]) -> bool:
+    try:
+        server.aria2.changeOption(gid, options)
+    except Exception:
+        ghermez.sendToLog("Couldn't change number of connections - GID : " + str(gid), 'ERROR')
+        return False
+
+    ghermez.sendToLog(
+        'Number of connections is changed to ' + options['max-connection-per-server'] + ' - GID : ' + str(gid),
+        'INFO',
+    )
+    return True
+
+
 # this function returns list of download information
-def tellActive() -> tuple[None, None] | tuple[list, list]:
+# observer is called with information of every download before conversion.
+def tellActive(observer: Callable[[dict[str, Any]], None] | None = None) -> tuple[None, None] | tuple[list, list]:
     # get download information from aria2
     try:
         downloads_status = server.aria2.tellActive(
@@ -300,6 +543,9 @@ def tellActive() -> tuple[None, None] | tuple[list, list]:
 
     # convert download information in desired format.
     for download_dict in downloads_status:
+        if observer is not None:
+            observer(download_dict)
+
         converted_info_dict = convertDownloadInformation(download_dict)
 
         # add gid to gid_list
@@ -339,8 +585,6 @@ def tellStatus(gid: str, parent: QWidget) -> dict[str, Any] | None:
 
     # if download has completed , then move file to the download folder
     if converted_info_dict['status'] == DownloadStatus.Complete:
-        file_name = converted_info_dict['file_name']
-
         # find user preferred download_path from addlink_db_table in data_base
         add_link_dictionary = parent.persepolis_db.searchGidInAddLinkTable(gid)
 
@@ -348,15 +592,6 @@ def tellStatus(gid: str, parent: QWidget) -> dict[str, Any] | None:
 
         download_path = add_link_dictionary['download_path']
 
-        # if user specified download_path is equal to persepolis_setting download_path,
-        # then subfolder must added to download path.
-        if persepolis_setting.value('settings/download_path') == download_path:
-            download_path = ghermez.findDownloadPath(
-                file_name,
-                download_path,
-                persepolis_setting.value('settings/subfolder'),
-            )
-
         # find temp download path
         file_status = str(download_status['files'])
         file_status = file_status[1:-1]
@@ -373,21 +608,37 @@ def tellStatus(gid: str, parent: QWidget) -> dict[str, Any] | None:
         except ValueError:
             file_size = None
 
+        # if user specified download_path is equal to persepolis_setting download_path,
+        # then folder of download rules is added to download path. see download_rules.py
+        download_path = routeDownloadPath(
+            download_path,
+            add_link_dictionary['link'],
+            file_name,
+            parent.persepolis_db.searchGidInDownloadTable(gid)['category'],
+            file_size,
+            persepolis_setting,
+        )
+
         # if file is related to VideoFinder thread, don't move it from temp folder...
+        # other files are moved to download folder by MoveService in background.
+        # download_path is the temp file until MoveService writes the final path, so it's
+        # written before the job is submitted.
+        # tellStatus may be called again before MainWindow knows that download is completed,
+        # so file is submitted only once. see move_service.py
         video_finder_dictionary = parent.persepolis_db.searchGidInVideoFinderTable(gid)
-        if video_finder_dictionary:
-            file_path = path
-        else:
-            file_path = downloadCompleteAction(parent, path, download_path, file_name, file_size)
+        if video_finder_dictionary or (os.path.isfile(path) and not parent.move_service.isMoving(gid)):
+            # update download_path in addlink_db_table
+            add_link_dictionary['download_path'] = path
+            parent.persepolis_db.updateAddLinkTable([add_link_dictionary])
 
-        # update download_path in addlink_db_table
-        add_link_dictionary['download_path'] = file_path
-        parent.persepolis_db.updateAddLinkTable([add_link_dictionary])
+            if not video_finder_dictionary:
+                parent.move_service.submit(gid, path, download_path, file_name, file_size)
 
     # if an error occurred!
     if converted_info_dict['status'] == DownloadStatus.Error:
-        # add errorMessage to converted_info_dict
+        # add errorMessage and errorCode to converted_info_dict
         converted_info_dict['error'] = str(download_status['errorMessage'])
+        converted_info_dict['error_code'] = str(download_status['errorCode'])
 
         # remove download from aria2
         server.aria2.removeDownloadResult(gid)
@@ -396,436 +647,6 @@ def tellStatus(gid: str, parent: QWidget) -> dict[str, Any] | None:
     return converted_info_dict
 
 
-# this function converts download information that received from aria2 in desired format.
-# input format must be a dictionary.
-def convertDownloadInformation(download_status: dict[str, str]) -> dict[str, Any]:
-    # find file_name
-    try:
-        # file_status contains name of download file and link of download file
-        file_status = str(download_status['files'])
-        file_status = file_status[1:-1]
-        file_status = ast.literal_eval(file_status)
-        path = str(file_status['path'])
-        file_name = urllib.parse.unquote(os.path.basename(path))
-        if not (file_name):
-            file_name = None
-
-        uris = file_status['uris']
-        uri = uris[0]
-        link = uri['uri']
-
-    except Exception:
-        file_name = None
-        link = None
-
-    for i in download_status:
-        if not (download_status[i]):
-            download_status[i] = None
-
-    # find file_size
-    try:
-        file_size = float(download_status['totalLength'])
-    except ValueError:
-        file_size = None
-
-    # find downloaded size
-    try:
-        downloaded = float(download_status['completedLength'])
-    except ValueError:
-        downloaded = None
-
-    # convert file_size and downloaded_size to KiB and MiB and GiB
-    if downloaded is not None and file_size is not None and file_size != 0:
-        file_size_back = file_size
-
-        # converting file_size to KiB or MiB or GiB
-        size_str = humanReadableSize(file_size)
-        downloaded_back = downloaded
-
-        downloaded_str = humanReadableSize(downloaded)
-
-        # find download percent from file_size and downloaded_size
-        file_size = file_size_back
-        downloaded = downloaded_back
-        percent = int(downloaded * 100 / file_size)
-        percent_str = str(percent) + '%'
-    else:
-        percent_str = None
-        size_str = None
-        downloaded_str = None
-
-    # find download_speed
-    try:
-        download_speed = int(download_status['downloadSpeed'])
-    except ValueError:
-        download_speed = 0
-
-    # convert download_speed to desired units.
-    # and find estimate_time_left
-    if downloaded is not None and download_speed != 0:
-        estimate_time_left = int((file_size - downloaded) / download_speed)
-
-        # converting file_size to KiB or MiB or GiB
-        download_speed_str = humanReadableSize(download_speed, 'speed') + '/s'
-
-        eta = ''
-        ONE_HOUR = 3600
-        ONE_MIN = 60
-        if estimate_time_left >= ONE_HOUR:
-            eta = eta + str(int(estimate_time_left / 3600)) + 'h'
-            estimate_time_left = estimate_time_left % 3600
-            eta = eta + str(int(estimate_time_left / 60)) + 'm'
-            estimate_time_left = estimate_time_left % 60
-            eta = eta + str(estimate_time_left) + 's'
-        elif estimate_time_left >= ONE_MIN:
-            eta = eta + str(int(estimate_time_left / 60)) + 'm'
-            estimate_time_left = estimate_time_left % 60
-            eta = eta + str(estimate_time_left) + 's'
-        else:
-            eta = eta + str(estimate_time_left) + 's'
-        estimate_time_left_str = eta
-
-    else:
-        download_speed_str = '0'
-        estimate_time_left_str = None
-
-    # find number of connections
-    try:
-        connections_str = str(download_status['connections'])
-    except (UnicodeEncodeError, KeyError):
-        connections_str = None
-
-    # find status of download
-    try:
-        status_str = str(download_status['status'])
-    except (UnicodeEncodeError, KeyError):
-        status_str = None
-
-    # rename active status to downloading
-    if status_str == 'active':
-        status_str = DownloadStatus.Downloading
-
-    # rename removed status to stopped
-    if status_str == 'removed':
-        status_str = DownloadStatus.Stopped
-
-    if status_str == 'None':
-        status_str = None
-
-    # set 0 second for estimate_time_left_str if download is completed.
-    if status_str == 'complete':
-        estimate_time_left_str = '0s'
-
-    # return information in dictionary format
-    return {
-        'gid': download_status['gid'],
-        'file_name': file_name,
-        'status': status_str,
-        'size': size_str,
-        'downloaded_size': downloaded_str,
-        'percent': percent_str,
-        'connections': connections_str,
-        'rate': download_speed_str,
-        'estimate_time_left': estimate_time_left_str,
-        'link': link,
-    }
-
-
-# download complete actions!
-# this method is returning file_path of file in the user's download folder
-# and move downloaded file after download completion.
-def downloadCompleteAction(parent: QWidget, path: str, download_path: str, file_name: str, file_size: int) -> str:
-    # remove query from name, If file_name contains query components.
-    # check if query existed.
-    # query form is 1.mp3?foo=bar 2.mp3?blatz=pow 3.mp3?fizz=buzz
-    file_name_split = file_name.split('.')
-    file_extension = file_name_split[-1]
-    file_name_without_extension = file_name_split[0]
-
-    # if '?' in file_extension, then file_name contains query components.
-    if '?' in file_extension:
-        file_extension = file_extension.split('?')[0]
-        file_name = f'{file_name_without_extension}.{file_extension}'
-
-    # rename file if file already existed
-    i = 1
-    file_path = os.path.join(download_path, file_name)
-
-    while os.path.isfile(file_path):
-        file_name_split = file_name.split('.')
-        extension_length = len(file_name_split[-1]) + 1
-
-        new_name = file_name[0:-extension_length] + '_' + str(i) + file_name[-extension_length:]
-        file_path = os.path.join(download_path, new_name)
-        i = i + 1
-
-    free_space = freeSpace(download_path)
-
-    if free_space is not None and file_size is not None:
-        # compare free disk space and file_size
-        if free_space >= file_size:
-            # move the file to the download folder
-            move_answer = moveFile(str(path), str(file_path), 'file')
-
-            if not (move_answer):
-                # write error message in log
-                ghermez.sendToLog('Persepolis can not move file', 'ERROR')
-                file_path = path
-
-        else:
-            # notify user if we have insufficient disk space
-            # and do not move file from temp download folder to download folder
-            file_path = path
-            ghermez.sendToLog('Insufficient disk space in download folder', 'ERROR')
-
-            # show notification
-            notifySend('Insufficient disk space!', 'Please change download folder', 10000, 'fail', parent=parent)
-
-    else:
-        # move the file to the download folder
-        move_answer = moveFile(str(path), str(file_path), 'file')
-
-        if not (move_answer):
-            ghermez.sendToLog('Persepolis can not move file', 'ERROR')
-            file_path = path
-
-    return str(file_path)
-
-
-# this function returns folder of download according to file extension
-def findDownloadPath(file_name: str, download_path: str, subfolder: str) -> str:
-    file_name_split = file_name.split('.')
-    file_extension = file_name_split[-1]
-
-    # convert extension letters to lower case
-    # for example "JPG" will be converted in "jpg"
-    file_extension = file_extension.lower()
-
-    # remove query from file_extension if existed
-    # if '?' in file_extension, then file_name contains query components.
-    if '?' in file_extension:
-        file_extension = file_extension.split('?')[0]
-
-    # audio formats
-    audio = [
-        'act',
-        'aiff',
-        'aac',
-        'amr',
-        'ape',
-        'au',
-        'awb',
-        'dct',
-        'dss',
-        'dvf',
-        'flac',
-        'gsm',
-        'iklax',
-        'ivs',
-        'm4a',
-        'm4p',
-        'mmf',
-        'mp3',
-        'mpc',
-        'msv',
-        'ogg',
-        'oga',
-        'opus',
-        'ra',
-        'raw',
-        'sln',
-        'tta',
-        'vox',
-        'wav',
-        'wma',
-        'wv',
-    ]
-
-    # video formats
-    video = [
-        '3g2',
-        '3gp',
-        'asf',
-        'avi',
-        'drc',
-        'flv',
-        'm4v',
-        'mkv',
-        'mng',
-        'mov',
-        'qt',
-        'mp4',
-        'm4p',
-        'mpg',
-        'mp2',
-        'mpeg',
-        'mpe',
-        'mpv',
-        'm2v',
-        'mxf',
-        'nsv',
-        'ogv',
-        'rmvb',
-        'roq',
-        'svi',
-        'vob',
-        'webm',
-        'wmv',
-        'yuv',
-        'rm',
-    ]
-
-    # document formats
-    document = [
-        'doc',
-        'docx',
-        'html',
-        'htm',
-        'fb2',
-        'odt',
-        'sxw',
-        'pdf',
-        'ps',
-        'rtf',
-        'tex',
-        'txt',
-        'epub',
-        'pubmobi',
-        'azw',
-        'azw3',
-        'azw4',
-        'kf8',
-        'chm',
-        'cbt',
-        'cbr',
-        'cbz',
-        'cb7',
-        'cba',
-        'ibooks',
-        'djvu',
-        'md',
-    ]
-
-    # compressed formats
-    compressed = [
-        'a',
-        'ar',
-        'cpio',
-        'shar',
-        'LBR',
-        'iso',
-        'lbr',
-        'mar',
-        'tar',
-        'bz2',
-        'F',
-        'gz',
-        'lz',
-        'lzma',
-        'lzo',
-        'rz',
-        'sfark',
-        'sz',
-        'xz',
-        'Z',
-        'z',
-        'infl',
-        '7z',
-        's7z',
-        'ace',
-        'afa',
-        'alz',
-        'apk',
-        'arc',
-        'arj',
-        'b1',
-        'ba',
-        'bh',
-        'cab',
-        'cfs',
-        'cpt',
-        'dar',
-        'dd',
-        'dgc',
-        'dmg',
-        'ear',
-        'gca',
-        'ha',
-        'hki',
-        'ice',
-        'jar',
-        'kgb',
-        'lzh',
-        'lha',
-        'lzx',
-        'pac',
-        'partimg',
-        'paq6',
-        'paq7',
-        'paq8',
-        'pea',
-        'pim',
-        'pit',
-        'qda',
-        'rar',
-        'rk',
-        'sda',
-        'sea',
-        'sen',
-        'sfx',
-        'sit',
-        'sitx',
-        'sqx',
-        'tar.gz',
-        'tgz',
-        'tar.Z',
-        'tar.bz2',
-        'tbz2',
-        'tar.lzma',
-        'tlz',
-        'uc',
-        'uc0',
-        'uc2',
-        'ucn',
-        'ur2',
-        'ue2',
-        'uca',
-        'uha',
-        'war',
-        'wim',
-        'xar',
-        'xp3',
-        'yz1',
-        'zip',
-        'zipx',
-        'zoo',
-        'zpaq',
-        'zz',
-        'ecc',
-        'par',
-        'par2',
-    ]
-
-    if str(subfolder) == 'yes':
-        if file_extension in audio:
-            return os.path.join(download_path, 'Audios')
-
-        # aria2c downloads youtube links file_name with 'videoplayback' name?!
-        elif (file_extension in video) or (file_name == 'videoplayback'):  # noqa: RET505
-            return os.path.join(download_path, 'Videos')
-
-        elif file_extension in document:
-            return os.path.join(download_path, 'Documents')
-
-        elif file_extension in compressed:
-            return os.path.join(download_path, 'Compressed')
-
-        else:
-            return os.path.join(download_path, 'Others')
-    else:
-        return download_path
-
-
 # shutdown aria2
 def shutDown() -> bool:
     try:
@@ -852,6 +673,7 @@ def downloadStop(gid: str, parent: QWidget) -> str:
         try:
             # send remove download request to aria2.
             # see aria2 documentation for more information.
+            session_gid_set.discard(gid)
             answer = server.aria2.remove(gid)
             if status == DownloadStatus.Downloading:
                 server.aria2.removeDownloadResult(gid)
@@ -927,6 +749,61 @@ def limitSpeed(gid: str, limit: str) -> None:
         ghermez.sendToLog('Speed limitation was unsuccessful', 'ERROR')
 
 
+# returns gid of waiting downloads in order of aria2 waiting list or None if aria2 didn't respond.
+def tellWaiting() -> list[str] | None:
+    try:
+        waiting_list = server.aria2.tellWaiting(0, 1000, ['gid'])
+    except Exception:
+        return None
+
+    return [download_dict['gid'] for download_dict in waiting_list]
+
+
+# move downloads in aria2 waiting list with one system.multicall request.
+# position_list is a list of (gid, position) tuples and they are applied in order.
+def changePositionBatch(position_list: list[tuple[str, int]]) -> bool:
+    multicall_list = [
+        {'methodName': 'aria2.changePosition', 'params': [gid, position, 'POS_SET']}
+        for gid, position in position_list
+    ]
+
+    try:
+        server.system.multicall(multicall_list)
+    except Exception:
+        ghermez.sendToLog("Couldn't change position of downloads", 'ERROR')
+        return False
+
+    return True
+
+
+# change max-overall-download-limit of aria2. limit is in bytes per second and 0 means unlimited.
+def globalLimitSpeed(limit: int) -> bool:
+    try:
+        server.aria2.changeGlobalOption({'max-overall-download-limit': str(limit)})
+    except Exception:
+        ghermez.sendToLog('Global speed limitation was unsuccessful', 'ERROR')
+        return False
+
+    return True
+
+
+# change max-download-limit of many downloads with one system.multicall request.
+# limit_dict: key = gid and value = limit in bytes per second (0 means unlimited).
+def limitSpeedBatch(limit_dict: dict[str, int]) -> bool:
+    multicall_list = [
+        {'methodName': 'aria2.changeOption', 'params': [gid, {'max-download-limit': str(limit)}]}
+        for gid, limit in limit_dict.items()
+    ]
+
+    try:
+        server.system.multicall(multicall_list)
+    except Exception:
+        ghermez.sendToLog('Speed limitation was unsuccessful', 'ERROR')
+        return False
+
+    return True
+
+
 # this function returns GID of active downloads in list format.
 def activeDownloads() -> list[str]:
     try:
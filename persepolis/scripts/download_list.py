@@ -0,0 +1,288 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import os
+import xml.etree.ElementTree as ET
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+from persepolis.scripts.checksum_service import parseChecksum
+from persepolis.scripts.link_import import isDownloadLink, mirrorList
+
+# this file reads and writes download lists of other download managers.
+# aria2 input file: (see --input-file in aria2c manual)
+#   every download is one line of tab separated uris, options of download are in the next lines
+#   and they are started with white space. for example:
+#   http://example.com/file.iso
+#     out=file.iso  # noqa: ERA001
+#     dir=/home/user/Downloads
+#     header=Authorization: Bearer token
+# Metalink: version 4 (RFC 5854, .meta4) and version 3 (.metalink) are read. version 4 is written.
+#
+# every download is returned as a dictionary with keys of addlink_db_table.
+# values that are not in the file are None.
+
+METALINK4_NAMESPACE = 'urn:ietf:params:xml:ns:metalink'
+METALINK3_NAMESPACE = 'http://www.metalinker.org/'
+
+# keys of addlink_db_table that are read from download lists.
+# checksum is saved in checksum_db_table. see checksum_service.py
+ADDLINK_KEYS = (
+    'link',
+    'out',
+    'download_path',
+    'referer',
+    'user_agent',
+    'header',
+    'load_cookies',
+    'download_user',
+    'download_passwd',
+    'ip',
+    'port',
+    'proxy_user',
+    'proxy_passwd',
+    'connections',
+    'limit_value',
+    'mirrors',
+    'checksum',
+)
+
+# aria2 options and keys of addlink_db_table that are same
+ARIA2_OPTIONS = {
+    'out': 'out',
+    'dir': 'download_path',
+    'referer': 'referer',
+    'user-agent': 'user_agent',
+    'http-user': 'download_user',
+    'http-passwd': 'download_passwd',
+    'all-proxy-user': 'proxy_user',
+    'all-proxy-passwd': 'proxy_passwd',
+    'max-connection-per-server': 'connections',
+    'checksum': 'checksum',
+}
+
+
+def emptyDictionary() -> dict[str, str | None]:
+    return dict.fromkeys(ADDLINK_KEYS)
+
+
+# persepolis keeps headers in "name=value; name=value" format. see download.ariaDictionary
+# Cookie header is kept in load_cookies.
+def addHeader(dictionary: dict[str, str | None], header: str) -> None:
+    name, _, value = header.partition(':')
+    name = name.strip()
+    value = value.strip()
+
+    if name.lower() == 'cookie':
+        dictionary['load_cookies'] = value
+    elif dictionary['header']:
+        dictionary['header'] = dictionary['header'] + '; ' + name + '=' + value
+    else:
+        dictionary['header'] = name + '=' + value
+
+
+def addAria2Option(dictionary: dict[str, str | None], option: str, value: str) -> None:
+    if option in ARIA2_OPTIONS:
+        dictionary[ARIA2_OPTIONS[option]] = value
+
+    elif option == 'header':
+        addHeader(dictionary, value)
+
+    elif option == 'max-download-limit':
+        dictionary['limit_value'] = value.upper() if value != '0' else '0'
+
+    elif option == 'all-proxy':
+        # proxy is saved as ip and port
+        proxy = urlsplit(value if '://' in value else 'http://' + value)
+        dictionary['ip'] = proxy.hostname
+        dictionary['port'] = str(proxy.port) if proxy.port else None
+
+
+# read aria2 input file line by line.
+def readAria2InputFile(file_path: str) -> Iterator[dict[str, str | None]]:
+    dictionary = None
+    with open(file_path, errors='replace') as f:
+        for line in f:
+            # comments and empty lines
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+
+            # option of the last download
+            if line[0] in ' \t':
+                if dictionary is not None:
+                    option, _, value = line.strip().partition('=')
+                    addAria2Option(dictionary, option.strip(), value.strip())
+                continue
+
+            if dictionary is not None:
+                yield dictionary
+                dictionary = None
+
+            # first valid uri of the line is the download link and others are mirrors
+            uri_list = [uri for uri in line.strip().split('\t') if isDownloadLink(uri)]
+            if uri_list:
+                dictionary = emptyDictionary()
+                dictionary['link'] = uri_list[0]
+                dictionary['mirrors'] = ' '.join(uri_list[1:]) or None
+
+    if dictionary is not None:
+        yield dictionary
+
+
+# returns the strongest hash of file element in aria2 format. for example sha-256=hex
+# Metalink 4: <hash type="sha-256">hex</hash>
+# Metalink 3: <verification><hash type="sha256">hex</hash></verification>
+# hashes of pieces are not used.
+def metalinkChecksum(element: ET.Element) -> str | None:
+    checksum_dict = {}
+    for hash_element in element.iter():
+        if hash_element.tag not in ('{' + METALINK4_NAMESPACE + '}hash', '{' + METALINK3_NAMESPACE + '}hash'):
+            continue
+
+        checksum = parseChecksum(str(hash_element.get('type')) + '=' + (hash_element.text or '').strip())
+        if checksum:
+            checksum_type, _, digest = checksum.partition('=')
+            checksum_dict[checksum_type] = digest
+
+    for checksum_type in ('sha-512', 'sha-384', 'sha-256', 'sha-224', 'sha-1', 'md5'):
+        if checksum_type in checksum_dict:
+            return checksum_type + '=' + checksum_dict[checksum_type]
+
+    return None
+
+
+# attribute of Metalink element as integer. default is returned for invalid values.
+def metalinkNumber(value: str | None, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# read Metalink file. file elements are parsed one by one and removed from memory.
+def readMetalink(file_path: str) -> Iterator[dict[str, str | None]]:
+    # ElementTree doesn't load external entities.
+    for _, element in ET.iterparse(file_path):  # noqa: S314
+        if element.tag not in ('{' + METALINK4_NAMESPACE + '}file', '{' + METALINK3_NAMESPACE + '}file'):
+            continue
+
+        # Metalink 4: lower priority is better. Metalink 3: higher preference is better.
+        url_list = []
+        # invalid priority or preference is ignored and the default value is used.
+        for url in element.iter():
+            if url.tag == '{' + METALINK4_NAMESPACE + '}url':
+                order = metalinkNumber(url.get('priority'), 999999)
+            elif url.tag == '{' + METALINK3_NAMESPACE + '}url':
+                order = -metalinkNumber(url.get('preference'), 0)
+            else:
+                continue
+
+            link = (url.text or '').strip()
+            if isDownloadLink(link):
+                url_list.append((order, link))
+
+        if url_list:
+            url_list.sort(key=lambda url: url[0])
+
+            dictionary = emptyDictionary()
+            dictionary['link'] = url_list[0][1]
+            dictionary['mirrors'] = ' '.join(url[1] for url in url_list[1:]) or None
+            # name can be a relative path. don't let it to write out of download folder.
+            name = os.path.basename(element.get('name') or '')
+            dictionary['out'] = name if name not in ('', '.', '..') else None
+            dictionary['checksum'] = metalinkChecksum(element)
+            yield dictionary
+
+        element.clear()
+
+
+# find type of download list from file name.
+def readDownloadList(file_path: str) -> Iterator[dict[str, str | None]]:
+    if file_path.lower().endswith(('.meta4', '.metalink')):
+        return readMetalink(file_path)
+
+    return readAria2InputFile(file_path)
+
+
+def aria2OptionLines(dictionary: dict[str, str]) -> Iterator[str]:
+    for option, key in ARIA2_OPTIONS.items():
+        if dictionary.get(key) not in (None, 'None', ''):
+            yield option + '=' + str(dictionary[key])
+
+    if dictionary.get('header') not in (None, 'None', ''):
+        for header in dictionary['header'].split('; '):
+            name, _, value = header.partition('=')
+            if name:
+                yield 'header=' + name + ': ' + value
+
+    if dictionary.get('load_cookies') not in (None, 'None', ''):
+        yield 'header=Cookie: ' + dictionary['load_cookies']
+
+    if dictionary.get('limit_value') not in (None, 'None', '', '0'):
+        yield 'max-download-limit=' + str(dictionary['limit_value'])
+
+    if dictionary.get('ip') not in (None, 'None', ''):
+        yield 'all-proxy=' + str(dictionary['ip']) + ':' + str(dictionary['port'])
+
+
+# write add_link dictionaries in aria2 input file format.
+def writeAria2InputFile(file_path: str, dictionary_list: Iterable[dict[str, str]]) -> int:
+    number = 0
+    with open(file_path, 'w') as f:
+        for dictionary in dictionary_list:
+            f.write('\t'.join([dictionary['link'], *mirrorList(dictionary.get('mirrors'))]) + '\n')
+            f.writelines('  ' + option_line + '\n' for option_line in aria2OptionLines(dictionary))
+            number = number + 1
+
+    return number
+
+
+# write add_link dictionaries in Metalink 4 format.
+def writeMetalink(file_path: str, dictionary_list: Iterable[dict[str, str]]) -> int:
+    number = 0
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<metalink xmlns="' + METALINK4_NAMESPACE + '">\n')
+        for dictionary in dictionary_list:
+            out = dictionary.get('out')
+            if out in (None, 'None', ''):
+                out = urlsplit(dictionary['link']).path.split('/')[-1] or 'index.html'
+
+            f.write('  <file name=' + quoteattr(out) + '>\n')
+            uri_list = [dictionary['link'], *mirrorList(dictionary.get('mirrors'))]
+            f.writelines(
+                '    <url priority="' + str(priority) + '">' + escape(uri) + '</url>\n'
+                for priority, uri in enumerate(uri_list, 1)
+            )
+
+            # checksum is saved in aria2 format (type=hex). type of hash is same in Metalink 4.
+            checksum = parseChecksum(dictionary.get('checksum'))
+            if checksum:
+                checksum_type, _, digest = checksum.partition('=')
+                f.write('    <hash type=' + quoteattr(checksum_type) + '>' + digest + '</hash>\n')
+            f.write('  </file>\n')
+            number = number + 1
+        f.write('</metalink>\n')
+
+    return number
+
+
+# find type of download list from file name.
+def writeDownloadList(file_path: str, dictionary_list: Iterable[dict[str, str]]) -> int:
+    if file_path.lower().endswith(('.meta4', '.metalink')):
+        return writeMetalink(file_path, dictionary_list)
+
+    return writeAria2InputFile(file_path, dictionary_list)
@@ -0,0 +1,456 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import fnmatch
+import mimetypes
+import os
+import re
+import shlex
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import ghermez
+
+if TYPE_CHECKING:
+    try:
+        from PySide6.QtCore import QSettings
+    except ImportError:
+        from PyQt5.QtCore import QSettings
+
+# download rules are written in settings window. one rule in every line.
+# a rule has some conditions and some actions and every one of them is written as key=value.
+# conditions:
+#   domain=example.com,cdn.net    host of link or its subdomains
+#   ext=mp4,mkv                   extension of file name
+#   mime=video/*,application/pdf  MIME type that is guessed from file name
+#   name=*.part1.rar              file name pattern
+#   category='My Queue'           queue of download (Single Downloads for single downloads)
+#   min_size=100M max_size=2G     size of file
+# actions:
+#   folder=Videos/YouTube         relative folders are created in default download folder
+#   limit=500K                    speed limit (K or M)
+#   connections=8                 number of connections
+# for example:
+#   domain=youtube.com,googlevideo.com folder=Videos/YouTube connections=8
+#   ext=iso min_size=1G folder='/mnt/big disk/iso' limit=2M
+# all conditions of a rule must match. every action is taken from the first matching rule that has it.
+#
+# folder is chosen when download is completed, because name and size of file are known then.
+# limit and connections are set when download is added. conditions that need size are not matched then.
+# rules don't change download folder, limit and connections that user changed in add link window.
+CONDITION_KEYS = ('domain', 'ext', 'mime', 'name', 'category', 'min_size', 'max_size')
+ACTION_KEYS = ('folder', 'limit', 'connections')
+
+# old "Create subfolders for Music,Videos, ..." option is these rules and they are used after user rules.
+AUDIO_EXTENSIONS = (
+    'act',
+    'aiff',
+    'aac',
+    'amr',
+    'ape',
+    'au',
+    'awb',
+    'dct',
+    'dss',
+    'dvf',
+    'flac',
+    'gsm',
+    'iklax',
+    'ivs',
+    'm4a',
+    'm4p',
+    'mmf',
+    'mp3',
+    'mpc',
+    'msv',
+    'ogg',
+    'oga',
+    'opus',
+    'ra',
+    'raw',
+    'sln',
+    'tta',
+    'vox',
+    'wav',
+    'wma',
+    'wv',
+)
+
+VIDEO_EXTENSIONS = (
+    '3g2',
+    '3gp',
+    'asf',
+    'avi',
+    'drc',
+    'flv',
+    'm4v',
+    'mkv',
+    'mng',
+    'mov',
+    'qt',
+    'mp4',
+    'mpg',
+    'mp2',
+    'mpeg',
+    'mpe',
+    'mpv',
+    'm2v',
+    'mxf',
+    'nsv',
+    'ogv',
+    'rmvb',
+    'roq',
+    'svi',
+    'vob',
+    'webm',
+    'wmv',
+    'yuv',
+    'rm',
+)
+
+DOCUMENT_EXTENSIONS = (
+    'doc',
+    'docx',
+    'html',
+    'htm',
+    'fb2',
+    'odt',
+    'sxw',
+    'pdf',
+    'ps',
+    'rtf',
+    'tex',
+    'txt',
+    'epub',
+    'pub',
+    'mobi',
+    'azw',
+    'azw3',
+    'azw4',
+    'kf8',
+    'chm',
+    'cbt',
+    'cbr',
+    'cbz',
+    'cb7',
+    'cba',
+    'ibooks',
+    'djvu',
+    'md',
+)
+
+COMPRESSED_EXTENSIONS = (
+    'a',
+    'ar',
+    'cpio',
+    'shar',
+    'lbr',
+    'iso',
+    'mar',
+    'tar',
+    'bz2',
+    'f',
+    'gz',
+    'lz',
+    'lzma',
+    'lzo',
+    'rz',
+    'sfark',
+    'sz',
+    'xz',
+    'z',
+    'infl',
+    '7z',
+    's7z',
+    'ace',
+    'afa',
+    'alz',
+    'apk',
+    'arc',
+    'arj',
+    'b1',
+    'ba',
+    'bh',
+    'cab',
+    'cfs',
+    'cpt',
+    'dar',
+    'dd',
+    'dgc',
+    'dmg',
+    'ear',
+    'gca',
+    'ha',
+    'hki',
+    'ice',
+    'jar',
+    'kgb',
+    'lzh',
+    'lha',
+    'lzx',
+    'pac',
+    'partimg',
+    'paq6',
+    'paq7',
+    'paq8',
+    'pea',
+    'pim',
+    'pit',
+    'qda',
+    'rar',
+    'rk',
+    'sda',
+    'sea',
+    'sen',
+    'sfx',
+    'sit',
+    'sitx',
+    'sqx',
+    'tgz',
+    'tbz2',
+    'tlz',
+    'uc',
+    'uc0',
+    'uc2',
+    'ucn',
+    'ur2',
+    'ue2',
+    'uca',
+    'uha',
+    'war',
+    'wim',
+    'xar',
+    'xp3',
+    'yz1',
+    'zip',
+    'zipx',
+    'zoo',
+    'zpaq',
+    'zz',
+    'ecc',
+    'par',
+    'par2',
+)
+
+SUBFOLDER_RULES = (
+    'ext=' + ','.join(AUDIO_EXTENSIONS) + ' folder=Audios',
+    'ext=' + ','.join(VIDEO_EXTENSIONS) + ' folder=Videos',
+    # aria2c downloads youtube links file_name with 'videoplayback' name?!
+    'name=videoplayback folder=Videos',
+    'ext=' + ','.join(DOCUMENT_EXTENSIONS) + ' folder=Documents',
+    'ext=' + ','.join(COMPRESSED_EXTENSIONS) + ' folder=Compressed',
+    'folder=Others',
+)
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
+
+
+class DownloadRule:
+    def __init__(self, rule_line: str) -> None:
+        # ValueError is raised if rule is not valid
+        options = {}
+        for token in shlex.split(rule_line, comments=True):
+            key, separator, value = token.partition('=')
+            if not separator or key not in CONDITION_KEYS + ACTION_KEYS or key in options:
+                raise ValueError(token)
+            options[key] = value
+
+        if not any(key in options for key in ACTION_KEYS):
+            raise ValueError(rule_line)
+
+        self.extensions = splitValues(options.get('ext'))
+        self.categories = set(splitValues(options.get('category'), lower=False))
+        self.min_size = parseSize(options['min_size']) if 'min_size' in options else None
+        self.max_size = parseSize(options['max_size']) if 'max_size' in options else None
+
+        # domains and patterns are compiled once
+        domains = splitValues(options.get('domain'))
+        self.domain_regex = (
+            re.compile(r'(?:^|\.)(?:' + '|'.join(re.escape(domain.lstrip('.')) for domain in domains) + r')$')
+            if domains
+            else None
+        )
+        self.mime_regex = compilePatterns(splitValues(options.get('mime')))
+        self.name_regex = compilePatterns(splitValues(options.get('name')))
+
+        self.folder = options.get('folder') or None
+
+        self.limit = options.get('limit', '').upper() or None
+        if self.limit is not None and not re.fullmatch(r'\d+(\.\d+)?[KM]|0', self.limit):
+            raise ValueError(self.limit)
+
+        self.connections = options.get('connections') or None
+        if self.connections is not None and not 1 <= int(self.connections) <= 64:  # noqa: PLR2004
+            raise ValueError(self.connections)
+
+    # size is None if it's unknown and rules with size conditions don't match.
+    def matches(self, host: str, file_name: str, mime: str, category: str, size: int | None) -> bool:
+        if self.domain_regex and not self.domain_regex.search(host):
+            return False
+
+        if self.categories and category not in self.categories:
+            return False
+
+        if self.mime_regex and not self.mime_regex.match(mime):
+            return False
+
+        if self.name_regex and not self.name_regex.match(file_name):
+            return False
+
+        if self.min_size is not None and (size is None or size < self.min_size):
+            return False
+
+        return not (self.max_size is not None and (size is None or size > self.max_size))
+
+
+# DownloadRouter finds the first rule that matches a download.
+# rules are indexed by extension when router is created. so for every download only the rules
+# of its extension and the rules without extension condition are checked, not all rules.
+class DownloadRouter:
+    def __init__(self, rule_list: list[DownloadRule]) -> None:
+        # rules without ext condition are checked for every extension
+        self.any_extension_rules = tuple(rule for rule in rule_list if not rule.extensions)
+
+        # key = extension and value = rules that must be checked, in order of rule_list
+        self.extension_index: dict[str, tuple[DownloadRule, ...]] = {}
+        for extension in {extension for rule in rule_list for extension in rule.extensions}:
+            self.extension_index[extension] = tuple(
+                rule for rule in rule_list if not rule.extensions or extension in rule.extensions
+            )
+
+    # returns value of action ('folder', 'limit' or 'connections') or None if no rule matches.
+    def route(
+        self,
+        action: str,
+        link: str | None,
+        file_name: str | None,
+        category: str | None = None,
+        size: int | None = None,
+    ) -> str | None:
+        file_name = file_name or ''
+        host = (urlsplit(link).hostname or '') if link else ''
+        extension = fileExtension(file_name)
+        mime = (mimetypes.guess_type('file.' + extension)[0] or '') if extension else ''
+
+        for rule in self.extension_index.get(extension, self.any_extension_rules):
+            value = getattr(rule, action)
+            if value is not None and rule.matches(host, file_name, mime, str(category), size):
+                return value
+
+        return None
+
+
+# lower case extension without query. "1.MP3?foo=bar" is "mp3"
+def fileExtension(file_name: str) -> str:
+    if '.' not in file_name:
+        return ''
+
+    return file_name.rsplit('.', 1)[-1].split('?', 1)[0].lower()
+
+
+def splitValues(value: str | None, lower: bool = True) -> list[str]:
+    if not value:
+        return []
+
+    return [part.strip().lower() if lower else part.strip() for part in value.split(',') if part.strip()]
+
+
+# all patterns are compiled in one regex
+def compilePatterns(pattern_list: list[str]) -> re.Pattern | None:
+    if not pattern_list:
+        return None
+
+    return re.compile('|'.join('(?:' + fnmatch.translate(pattern) + ')' for pattern in pattern_list), re.IGNORECASE)
+
+
+# convert 100M, 1.5G and 4096 to bytes
+def parseSize(size: str) -> int:
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?', size.strip().upper())
+    if match is None:
+        raise ValueError(size)
+
+    return round(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+# returns rules of text. invalid lines are written in log and skipped.
+def parseRules(rules_text: str) -> list[DownloadRule]:
+    rule_list = []
+    for rule_line in rules_text.splitlines():
+        line = rule_line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        try:
+            rule_list.append(DownloadRule(line))
+        except ValueError:
+            ghermez.sendToLog('Invalid download rule: ' + line, 'ERROR')
+
+    return rule_list
+
+
+# router is compiled once for every rules text.
+@lru_cache(maxsize=4)
+def compileRouter(rules_text: str, subfolder: bool) -> DownloadRouter:
+    rule_list = parseRules(rules_text)
+    if subfolder:
+        rule_list.extend(DownloadRule(rule_line) for rule_line in SUBFOLDER_RULES)
+
+    return DownloadRouter(rule_list)
+
+
+def loadRouter(persepolis_setting: QSettings) -> DownloadRouter:
+    return compileRouter(
+        str(persepolis_setting.value('settings/download-rules', '')),
+        str(persepolis_setting.value('settings/subfolder')) == 'yes',
+    )
+
+
+# set limit and connections of rule for a new download. see callBack in mainwindow.py
+def applyAddRules(add_link_dictionary: dict[str, str], category: str, persepolis_setting: QSettings) -> None:
+    link = add_link_dictionary.get('link')
+    file_name = add_link_dictionary.get('out') or (urlsplit(link).path.rsplit('/', 1)[-1] if link else '')
+    router = loadRouter(persepolis_setting)
+
+    if str(add_link_dictionary.get('limit_value')) in ('0', '0K', 'None'):
+        limit = router.route('limit', link, file_name, category)
+        if limit is not None:
+            add_link_dictionary['limit_value'] = limit
+
+    if str(add_link_dictionary.get('connections')) == str(persepolis_setting.value('settings/connections')):
+        connections = router.route('connections', link, file_name, category)
+        if connections is not None:
+            add_link_dictionary['connections'] = connections
+
+
+# returns folder of completed download. download_path is folder that is saved in addlink_db_table.
+# rules are used only if download_path is default download folder.
+def routeDownloadPath(
+    download_path: str,
+    link: str | None,
+    file_name: str,
+    category: str | None,
+    size: int | None,
+    persepolis_setting: QSettings,
+) -> str:
+    if persepolis_setting.value('settings/download_path') != download_path:
+        return download_path
+
+    folder = loadRouter(persepolis_setting).route('folder', link, file_name, category, size)
+    if folder is None:
+        return download_path
+
+    # relative folder is in default download folder
+    return os.path.join(download_path, os.path.expanduser(folder))
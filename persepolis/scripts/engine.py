@@ -0,0 +1,890 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# engine runs downloads without user interface. for example on a server:
+#   python3 -m persepolis.scripts.engine
+# it starts aria2, reads settings and data base of ghermez and listens to a unix socket.
+# clients send JSON-RPC 2.0 requests to socket. every request and answer is one line.
+# names of methods are in RPC_METHODS and params are arguments of methods of Engine.
+#
+# this file must not import Qt. engine and MainWindow use the same data base,
+# so engine doesn't start if ghermez is running.
+#
+# engine is a small front end for servers and scripts. it shares Qt-free parts of
+# MainWindow: completed downloads are moved by FileMover (see file_mover.py) and
+# connections are tuned by ConnectionTuner (see connection_tuner.py).
+# these features of MainWindow are not in engine:
+# DiskLedger, retry of failed downloads, checksum verification, restoring downloads of
+# last session, bandwidth and priority schedulers, video finder and after download actions.
+
+from __future__ import annotations
+
+import argparse
+import ast
+import configparser
+import getpass
+import inspect
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+import xmlrpc.client
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import ghermez
+from persepolis.constants import APP_NAME, OS, VERSION
+from persepolis.constants.status import DownloadStatus
+from persepolis.scripts.aria2_options import (
+    ariaDictionary,
+    convertDownloadInformation,
+    convertLimit,
+    findDownloadPathTemp,
+)
+from persepolis.scripts.aria2_pool import Aria2Pool
+from persepolis.scripts.connection_tuner import ConnectionTuner, hostOptions
+from persepolis.scripts.download_rules import applyAddRules, routeDownloadPath
+from persepolis.scripts.engine_protocol import (
+    ENGINE_ERROR,
+    INTERNAL_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    SOCKET_NAME,
+)
+from persepolis.scripts.file_mover import FileMover
+from persepolis.scripts.link_import import isDownloadLink, mirrorList
+from persepolis.scripts.metrics import (
+    COMMON_METRICS,
+    GAUGE,
+    HISTOGRAM,
+    MeasuredDataBase,
+    MeasuredServer,
+    Metrics,
+    MetricsServer,
+    collectAria2,
+    collectDownloads,
+)
+
+os_type = platform.system()
+
+if os_type != OS.WINDOWS:
+    import fcntl
+
+# address of aria2 processes
+SERVER_URI_FORMAT = 'http://localhost:{:d}/rpc'
+
+# downloads are checked and queues are started once in this number of seconds.
+POLL_INTERVAL = 1
+
+# maximum length of one request
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# keys of aria2.tellStatus that convertDownloadInformation needs
+STATUS_KEYS = [
+    'status',
+    'connections',
+    'errorCode',
+    'errorMessage',
+    'downloadSpeed',
+    'dir',
+    'totalLength',
+    'completedLength',
+    'files',
+]
+
+# these categories are not queues
+NOT_QUEUES = ('All Downloads', 'Single Downloads')
+
+# methods of Engine that clients can call
+RPC_METHODS = (
+    'version',
+    'addDownload',
+    'listDownloads',
+    'downloadStatus',
+    'startDownload',
+    'pauseDownload',
+    'resumeDownload',
+    'stopDownload',
+    'removeDownload',
+    'startQueue',
+    'stopQueue',
+    'metrics',
+    'shutdown',
+)
+
+# name, type and help of metrics of engine. see metrics.py
+METRICS = (
+    *COMMON_METRICS,
+    ('ghermez_download_speed_bytes', GAUGE, 'Download speed of active downloads in bytes per second.'),
+    ('ghermez_queue_backlog', GAUGE, 'Number of stopped downloads of every queue.'),
+    ('ghermez_queue_running', GAUGE, '1 if queue is running.'),
+    ('ghermez_engine_rpc_duration_seconds', HISTOGRAM, 'Duration of JSON-RPC requests of clients.'),
+    ('ghermez_engine_lock_wait_seconds', HISTOGRAM, 'Waiting time for lock of engine.'),
+    ('ghermez_db_duration_seconds', HISTOGRAM, 'Duration of data base calls with waiting time for its lock.'),
+)
+
+
+class EngineError(Exception):
+    pass
+
+
+# EngineSettings reads settings of ghermez without Qt. it has value method of QSettings.
+# QSettings saves settings in ghermez.conf in ini format on linux and bsd.
+# default values are used on other operating systems and for keys that are not saved.
+class EngineSettings:
+    def __init__(self) -> None:
+        self.setting_path = os.path.join(ghermez.determineConfigFolder(), APP_NAME + '.conf')
+        self.default_dict = {'settings/' + key: value for key, value in ghermez.returnDefaultSettings([]).items()}
+        self.setting_dict: dict[str, str] = {}
+        self.sync()
+
+    # read settings file again. MainWindow may change it.
+    def sync(self) -> None:
+        config = configparser.RawConfigParser(interpolation=None, strict=False)
+        # keys are case sensitive
+        config.optionxform = str
+        try:
+            config.read(self.setting_path, encoding='utf-8')
+        except configparser.Error as e:
+            ghermez.sendToLog('Engine can not read ' + self.setting_path + ': ' + str(e), 'ERROR')
+            return
+
+        setting_dict = {}
+        for section in config.sections():
+            # keys of General section have no group in QSettings
+            prefix = '' if section == 'General' else section + '/'
+            for key, text in config.items(section):
+                # QSettings writes strings with special characters in quotes
+                if len(text) >= 2 and text[0] == text[-1] == '"':  # noqa: PLR2004
+                    setting_dict[prefix + key] = text[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+                else:
+                    setting_dict[prefix + key] = text
+
+        self.setting_dict = setting_dict
+
+    def value(self, key: str, default: Any = None) -> Any:
+        if key in self.setting_dict:
+            return self.setting_dict[key]
+
+        return self.default_dict.get(key, default)
+
+
+# Engine owns aria2, data base and queues. it checks downloads and starts queues like
+# CheckDownloadInfoThread and Queue threads of MainWindow without user interface.
+# downloads of a queue are started one by one in order of queue.
+#
+# requests of clients and polling of aria2 run in different threads,
+# so they are done one by one with lock.
+#
+# calls to aria2 and data base are measured. metrics are sent to clients with metrics method
+# and to prometheus with MetricsServer. see metrics.py
+class Engine:
+    def __init__(self, persepolis_setting: EngineSettings) -> None:
+        self.persepolis_setting = persepolis_setting
+
+        self.registry = Metrics()
+        for name, metric_type, help_text in METRICS:
+            self.registry.describe(name, metric_type, help_text)
+
+        # status of downloads that were active in last session is changed to stopped.
+        self.persepolis_db = MeasuredDataBase(ghermez.DataBase(), self.registry, 'ghermez_db_duration_seconds')
+        self.persepolis_db.createTables()
+        self.persepolis_db.setDBTablesToDefaultValue()
+
+        self.port = int(persepolis_setting.value('settings/rpc-port'))
+        self.aria2_daemons = max(int(persepolis_setting.value('settings/aria2-daemons', 1)), 1)
+        # see download.py
+        if self.aria2_daemons > 1:
+            server = Aria2Pool([SERVER_URI_FORMAT.format(self.port + shard) for shard in range(self.aria2_daemons)])
+        else:
+            server = xmlrpc.client.ServerProxy(SERVER_URI_FORMAT.format(self.port), allow_none=True)
+
+        self.server = MeasuredServer(server, self.registry, 'ghermez_aria2_rpc_duration_seconds')
+
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+
+        # categories that their queue is running
+        self.running_queue_set: set[str] = set()
+
+        # completed downloads are moved to download folder one by one. see file_mover.py
+        self.file_mover = FileMover(self.persepolis_db, None, self.moveDone)
+
+        # see connection_tuner.py
+        self.connection_tuner = None
+        if str(persepolis_setting.value('settings/auto-tune-connections')) == 'yes':
+            self.connection_tuner = ConnectionTuner(self.persepolis_db, self.getConnections, self.changeConnections)
+
+        self.poller: threading.Thread | None = None
+
+    # start aria2 and polling. returns False if aria2 doesn't respond.
+    def start(self) -> bool:
+        ghermez.sendToLog('Starting Aria2', 'INFO')
+
+        # try 5 time if aria2 doesn't respond!
+        for _ in range(5):
+            answer = ghermez.startAria(
+                self.port,
+                self.persepolis_setting.value('settings/aria2_path'),
+                None,
+                self.aria2_daemons,
+            )
+            if answer != 'did not respond':
+                break
+
+            if self.stop_event.wait(2):
+                return False
+        else:
+            ghermez.sendToLog("Aria2 didn't respond!", 'ERROR')
+            return False
+
+        ghermez.sendToLog('Aria2 version: ' + str(answer), 'INFO')
+
+        # engine or MainWindow was closed during moving completed downloads
+        self.file_mover.resumeJobs()
+
+        self.poller = threading.Thread(target=self.poll, name='engine', daemon=True)
+        self.poller.start()
+        return True
+
+    # stop polling and aria2. downloads are stopped and they can be resumed later.
+    def close(self) -> None:
+        self.stop_event.set()
+        if self.poller is not None:
+            self.poller.join()
+
+        # current move is finished. other moves are resumed in next start.
+        self.file_mover.shutdown(wait=True)
+
+        try:
+            self.server.aria2.shutdown()
+        except (OSError, xmlrpc.client.Error):
+            ghermez.sendToLog('Aria2 Shutdown Error', 'ERROR')
+
+    # hold lock of engine and measure waiting time for it
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        start_time = time.monotonic()
+        with self.lock:
+            self.registry.observe('ghermez_engine_lock_wait_seconds', time.monotonic() - start_time)
+            yield
+
+    def poll(self) -> None:
+        while not self.stop_event.wait(POLL_INTERVAL):
+            with self.locked(), self.registry.timer('ghermez_poll_duration_seconds'):
+                try:
+                    self.checkDownloads()
+                    self.runQueues()
+                except (OSError, xmlrpc.client.Error) as e:
+                    self.registry.inc('ghermez_poll_errors_total')
+                    ghermez.sendToLog('Engine can not connect to aria2: ' + str(e), 'ERROR')
+
+    # get status of active downloads from aria2 and write it in data base
+    def checkDownloads(self) -> None:
+        active_gid_list = self.persepolis_db.findActiveDownloads(None)
+        if not active_gid_list:
+            self.registry.replace('ghermez_download_speed_bytes', [])
+            if self.connection_tuner is not None:
+                self.connection_tuner.forgetInactive([])
+            return
+
+        answer_list = self.server.system.multicall(
+            [{'methodName': 'aria2.tellStatus', 'params': [gid, STATUS_KEYS]} for gid in active_gid_list],
+        )
+
+        download_list = []
+        speed_list = []
+        for gid, answer in zip(active_gid_list, answer_list):
+            # aria2 doesn't know this download. perhaps aria2 was restarted.
+            if not isinstance(answer, list):
+                download_list.append({'gid': gid, 'status': DownloadStatus.Stopped})
+                continue
+
+            download_status = answer[0]
+            download_status['gid'] = gid
+            if download_status['status'] == 'active':
+                speed_list.append(({'gid': gid}, int(download_status['downloadSpeed'])))
+            if self.connection_tuner is not None:
+                self.connection_tuner.observe(download_status)
+            file_list = download_status['files']
+            download_dict = convertDownloadInformation(download_status)
+
+            # result of finished downloads is removed from aria2, so stopped list of aria2 doesn't grow.
+            if download_dict['status'] == DownloadStatus.Complete:
+                self.finishDownload(gid, file_list, download_status['totalLength'])
+                self.server.aria2.removeDownloadResult(gid)
+
+            elif download_dict['status'] == DownloadStatus.Error:
+                ghermez.sendToLog(
+                    gid + ' failed: ' + str(download_status['errorCode']) + ' ' + str(download_status['errorMessage']),
+                    'ERROR',
+                )
+                self.server.aria2.removeDownloadResult(gid)
+
+            # keys without value are not changed in data base
+            download_list.append({key: value for key, value in download_dict.items() if value is not None})
+
+        self.persepolis_db.updateDownloadTable(download_list)
+        self.registry.replace('ghermez_download_speed_bytes', speed_list)
+
+        # observe forgets downloads that are not active. downloads that aria2 doesn't know are forgotten here.
+        if self.connection_tuner is not None:
+            self.connection_tuner.forgetInactive(
+                [gid for gid, answer in zip(active_gid_list, answer_list) if isinstance(answer, list)],
+            )
+
+    # move completed download from temp download folder to download folder. see tellStatus in download.py
+    def finishDownload(self, gid: str, file_list: list[dict[str, Any]], total_length: str | None) -> None:
+        add_link_dictionary = self.persepolis_db.searchGidInAddLinkTable(gid)
+        path = file_list[0]['path']
+        if not os.path.isfile(path) or self.file_mover.isMoving(gid):
+            return
+
+        file_name = os.path.basename(path)
+        try:
+            file_size = int(total_length)
+        except (TypeError, ValueError):
+            file_size = None
+
+        self.persepolis_setting.sync()
+        download_path = routeDownloadPath(
+            add_link_dictionary['download_path'],
+            add_link_dictionary['link'],
+            file_name,
+            self.persepolis_db.searchGidInDownloadTable(gid)['category'],
+            file_size,
+            self.persepolis_setting,
+        )
+
+        # download_path is the temp file until it's moved.
+        self.persepolis_db.updateAddLinkTable([{'gid': gid, 'download_path': path}])
+        self.file_mover.submit(gid, path, download_path, file_name, file_size)
+
+    # FileMover calls this method in its thread. see file_mover.py
+    def moveDone(self, gid: str, result_dictionary: dict[str, Any]) -> None:
+        if result_dictionary['error'] == 'no_error':
+            ghermez.sendToLog(
+                result_dictionary['file_name'] + ' is downloaded to ' + result_dictionary['final_path'],
+                'INFO',
+            )
+        else:
+            ghermez.sendToLog(
+                gid + ' is not moved to download folder: ' + result_dictionary['error'],
+                'ERROR',
+            )
+
+    # see getConnections in download.py
+    def getConnections(self, gid: str) -> int | None:
+        try:
+            return int(self.server.aria2.getOption(gid)['max-connection-per-server'])
+        except (OSError, xmlrpc.client.Error, KeyError, ValueError):
+            return None
+
+    # see changeConnections in download.py
+    def changeConnections(self, gid: str, options: dict[str, str]) -> bool:
+        try:
+            self.server.aria2.changeOption(gid, options)
+        except (OSError, xmlrpc.client.Error):
+            ghermez.sendToLog("Couldn't change number of connections - GID : " + gid, 'ERROR')
+            return False
+
+        ghermez.sendToLog(
+            'Number of connections is changed to ' + options['max-connection-per-server'] + ' - GID : ' + gid,
+            'INFO',
+        )
+        return True
+
+    # start next download of running queues if queue has no active download
+    def runQueues(self) -> None:
+        for category in list(self.running_queue_set):
+            if self.persepolis_db.findActiveDownloads(category):
+                continue
+
+            gid = self.nextQueueDownload(category)
+            if gid is None:
+                self.running_queue_set.discard(category)
+                ghermez.sendToLog(category + ' queue is finished', 'INFO')
+                continue
+
+            try:
+                self.startDownload(gid)
+            except EngineError as e:
+                # status of download is error now and next download is started in next poll.
+                ghermez.sendToLog(str(e), 'ERROR')
+
+    # returns first stopped download of queue
+    def nextQueueDownload(self, category: str) -> str | None:
+        category_dict = self.persepolis_db.searchCategoryInCategoryTable(category)
+        gid_list = ast.literal_eval(category_dict['gid_list'])
+        if category_dict['reverse'] == 'yes':
+            gid_list.reverse()
+
+        download_dict = self.persepolis_db.returnItemsInDownloadTable(category)
+        for gid in gid_list:
+            if gid in download_dict and download_dict[gid]['status'] == DownloadStatus.Stopped:
+                return gid
+
+        return None
+
+    def searchDownload(self, gid: str) -> dict[str, str]:
+        download_dict = self.persepolis_db.searchGidInDownloadTable(gid)
+        if download_dict is None:
+            raise EngineError('download ' + gid + ' is not found')
+
+        return download_dict
+
+    # see gidGenerator in mainwindow.py
+    def gidGenerator(self) -> str:
+        while True:
+            gid = hex(random.randint(1152921504606846976, 18446744073709551615))[2:18]  # noqa: S311
+            if self.persepolis_db.searchGidInDownloadTable(gid) is None:
+                return gid
+
+    # methods of JSON-RPC
+
+    def version(self) -> dict[str, str]:
+        return {'engine': VERSION, 'aria2': str(self.server.aria2.getVersion()['version'])}
+
+    # add a download like callBack in mainwindow.py. returns gid of download.
+    # downloads of queues are started with queue.
+    def addDownload(
+        self,
+        link: str,
+        category: str = 'Single Downloads',
+        out: str | None = None,
+        download_path: str | None = None,
+        referer: str | None = None,
+        user_agent: str | None = None,
+        header: str | None = None,
+        load_cookies: str | None = None,
+        download_user: str | None = None,
+        download_passwd: str | None = None,
+        connections: int | None = None,
+        limit_value: str = '0',
+        mirrors: str | None = None,
+        start: bool = True,
+    ) -> str:
+        if not isDownloadLink(link):
+            raise EngineError(link + ' is not a download link')
+
+        if category == 'All Downloads' or self.persepolis_db.searchCategoryInCategoryTable(category) is None:
+            raise EngineError(category + ' is not a queue')
+
+        self.persepolis_setting.sync()
+        gid = self.gidGenerator()
+        add_link_dictionary = {
+            'gid': gid,
+            'out': out,
+            'start_time': None,
+            'end_time': None,
+            'link': link,
+            'ip': None,
+            'port': None,
+            'proxy_user': None,
+            'proxy_passwd': None,
+            'download_user': download_user,
+            'download_passwd': download_passwd,
+            'connections': connections or self.persepolis_setting.value('settings/connections'),
+            'limit_value': limit_value,
+            'download_path': download_path or self.persepolis_setting.value('settings/download_path'),
+            'referer': referer,
+            'load_cookies': load_cookies,
+            'user_agent': user_agent,
+            'header': header,
+            'after_download': None,
+        }
+
+        # set speed limit and connections of download rules. see download_rules.py
+        applyAddRules(add_link_dictionary, category, self.persepolis_setting)
+
+        add_link_dictionary = {key: str(value) for key, value in add_link_dictionary.items()}
+
+        date = ghermez.nowDate()
+        download_dict = {
+            'file_name': out or '***',
+            'status': DownloadStatus.Stopped,
+            'size': '***',
+            'downloaded_size': '***',
+            'percent': '***',
+            'connections': '***',
+            'rate': '***',
+            'estimate_time_left': '***',
+            'gid': gid,
+            'link': link,
+            'first_try_date': date,
+            'last_try_date': date,
+            'category': category,
+        }
+
+        self.persepolis_db.insertInDownloadTable([download_dict])
+        self.persepolis_db.insertInAddLinkTable([add_link_dictionary])
+        self.persepolis_db.insertInMirrorTable([{'gid': gid, 'uri': uri} for uri in mirrorList(mirrors)])
+
+        if start and category == 'Single Downloads':
+            self.startDownload(gid)
+
+        return gid
+
+    def listDownloads(self, category: str | None = None) -> list[dict[str, str]]:
+        return list(self.persepolis_db.returnItemsInDownloadTable(category).values())
+
+    # returns information of download and path of file
+    def downloadStatus(self, gid: str) -> dict[str, str]:
+        download_dict = self.searchDownload(gid)
+        add_link_dictionary = self.persepolis_db.searchGidInAddLinkTable(gid)
+        return {**download_dict, 'download_path': add_link_dictionary['download_path']}
+
+    # send download to aria2
+    def startDownload(self, gid: str) -> str:
+        download_dict = self.searchDownload(gid)
+        if download_dict['status'] not in (DownloadStatus.Stopped, DownloadStatus.Error):
+            raise EngineError('download ' + gid + ' is ' + download_dict['status'])
+
+        add_link_dictionary = self.persepolis_db.searchGidInAddLinkTable(gid)
+
+        self.persepolis_setting.sync()
+        download_path_temp = findDownloadPathTemp(add_link_dictionary['download_path'], self.persepolis_setting)
+        limit = convertLimit(str(add_link_dictionary['limit_value']))
+        aria_dict = ariaDictionary(gid, add_link_dictionary, limit, download_path_temp, self.persepolis_setting)
+        if self.connection_tuner is not None:
+            aria_dict.update(hostOptions(self.persepolis_db, add_link_dictionary['link']))
+
+        # aria2 downloads parts of file from link and mirrors at the same time.
+        uri_list = [add_link_dictionary['link'], *self.persepolis_db.searchGidInMirrorTable(gid)]
+
+        try:
+            self.server.aria2.addUri(uri_list, aria_dict)
+        except (OSError, xmlrpc.client.Error) as e:
+            self.persepolis_db.updateDownloadTable([{'gid': gid, 'status': DownloadStatus.Error}])
+            raise EngineError('download ' + gid + ' did not start: ' + str(e)) from e
+
+        self.persepolis_db.updateDownloadTable(
+            [{'gid': gid, 'status': DownloadStatus.Waiting, 'last_try_date': ghermez.nowDate()}],
+        )
+        ghermez.sendToLog(gid + ' Starts', 'INFO')
+        return DownloadStatus.Waiting
+
+    def pauseDownload(self, gid: str) -> str:
+        self.searchDownload(gid)
+        try:
+            self.server.aria2.pause(gid)
+        except xmlrpc.client.Fault as e:
+            raise EngineError('download ' + gid + ' is not active') from e
+
+        self.persepolis_db.updateDownloadTable([{'gid': gid, 'status': DownloadStatus.Paused}])
+        return DownloadStatus.Paused
+
+    def resumeDownload(self, gid: str) -> str:
+        self.searchDownload(gid)
+        try:
+            self.server.aria2.unpause(gid)
+        except xmlrpc.client.Fault as e:
+            raise EngineError('download ' + gid + ' is not paused') from e
+
+        self.persepolis_db.updateDownloadTable([{'gid': gid, 'status': DownloadStatus.Waiting}])
+        return DownloadStatus.Waiting
+
+    # see downloadStop in download.py
+    def stopDownload(self, gid: str) -> str:
+        download_dict = self.searchDownload(gid)
+        if download_dict['status'] == DownloadStatus.Complete:
+            return DownloadStatus.Complete
+
+        try:
+            self.server.aria2.forceRemove(gid)
+            self.server.aria2.removeDownloadResult(gid)
+        except xmlrpc.client.Fault:
+            # download is not in aria2
+            pass
+
+        self.persepolis_db.setDefaultGidInAddlinkTable(gid, start_time=True, end_time=True, after_download=True)
+        self.persepolis_db.updateDownloadTable([{'gid': gid, 'status': DownloadStatus.Stopped}])
+        return DownloadStatus.Stopped
+
+    # remove download from data base. downloaded file is deleted if delete_file is True.
+    def removeDownload(self, gid: str, delete_file: bool = False) -> bool:
+        download_dict = self.searchDownload(gid)
+        self.stopDownload(gid)
+
+        if delete_file and download_dict['status'] == DownloadStatus.Complete:
+            download_path = self.persepolis_db.searchGidInAddLinkTable(gid)['download_path']
+            ghermez.remove(download_path)
+
+        self.persepolis_db.deleteItemInDownloadTable(gid, download_dict['category'])
+        return True
+
+    def startQueue(self, category: str) -> bool:
+        if category in NOT_QUEUES or self.persepolis_db.searchCategoryInCategoryTable(category) is None:
+            raise EngineError(category + ' is not a queue')
+
+        self.running_queue_set.add(category)
+        ghermez.sendToLog(category + ' queue is started', 'INFO')
+        return True
+
+    # stop queue and its active download
+    def stopQueue(self, category: str) -> bool:
+        self.running_queue_set.discard(category)
+        for gid in self.persepolis_db.findActiveDownloads(category):
+            self.stopDownload(gid)
+
+        return True
+
+    # returns metrics in prometheus text format.
+    # aria2 and data base are checked now and other metrics are measured before.
+    def metrics(self) -> str:
+        with self.locked():
+            collectAria2(self.registry, self.server)
+
+            download_list = list(self.persepolis_db.returnItemsInDownloadTable(None).values())
+            collectDownloads(self.registry, download_list)
+
+            backlog_counter = Counter(
+                download_dict['category']
+                for download_dict in download_list
+                if download_dict['status'] == DownloadStatus.Stopped
+            )
+            queue_list = [category for category in self.persepolis_db.categoriesList() if category not in NOT_QUEUES]
+            self.registry.replace(
+                'ghermez_queue_backlog',
+                [({'category': category}, backlog_counter[category]) for category in queue_list],
+            )
+            self.registry.replace(
+                'ghermez_queue_running',
+                [({'category': category}, int(category in self.running_queue_set)) for category in queue_list],
+            )
+
+        return self.registry.render()
+
+    # stop engine after answer is sent. see main
+    def shutdown(self) -> bool:
+        self.stop_event.set()
+        return True
+
+
+# returns answer of one JSON-RPC request. answer of notification is None.
+def callMethod(engine: Engine, request: Any) -> dict[str, Any] | None:
+    if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+        return errorAnswer(None, INVALID_REQUEST, 'Invalid Request')
+
+    request_id = request.get('id')
+    method_name = request['method']
+    params = request.get('params', [])
+
+    if method_name not in RPC_METHODS:
+        answer = errorAnswer(request_id, METHOD_NOT_FOUND, 'Method not found')
+    elif not isinstance(params, (list, dict)):
+        answer = errorAnswer(request_id, INVALID_PARAMS, 'Invalid params')
+    else:
+        method = getattr(engine, method_name)
+        args, kwargs = ((), params) if isinstance(params, dict) else (params, {})
+        try:
+            # params are checked before call, so TypeError of method itself is an internal error.
+            inspect.signature(method).bind(*args, **kwargs)
+        except TypeError as e:
+            answer = errorAnswer(request_id, INVALID_PARAMS, str(e))
+        else:
+            answer = runMethod(engine, method, request_id, args, kwargs)
+
+    if 'id' not in request:
+        return None
+
+    return answer
+
+
+# call method of engine with params that are checked before.
+def runMethod(
+    engine: Engine,
+    method: Callable[..., Any],
+    request_id: Any,
+    args: list[Any] | tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    method_name = method.__name__
+    try:
+        with engine.registry.timer('ghermez_engine_rpc_duration_seconds', method=method_name), engine.locked():
+            result = method(*args, **kwargs)
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+    except EngineError as e:
+        return errorAnswer(request_id, ENGINE_ERROR, str(e))
+    except (OSError, xmlrpc.client.Error) as e:
+        return errorAnswer(request_id, ENGINE_ERROR, 'aria2 error: ' + str(e))
+    except Exception as e:
+        # connection of client is not closed
+        ghermez.sendToLog(method_name + ' failed: ' + traceback.format_exc(), 'ERROR')
+        return errorAnswer(request_id, INTERNAL_ERROR, str(e))
+
+
+def errorAnswer(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+# answer of a line. batch requests are in a list.
+def answerLine(engine: Engine, line: bytes) -> dict[str, Any] | list[dict[str, Any]] | None:
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return errorAnswer(None, PARSE_ERROR, 'Parse error')
+
+    if isinstance(request, list):
+        if not request:
+            return errorAnswer(None, INVALID_REQUEST, 'Invalid Request')
+
+        answer_list = [answer for answer in (callMethod(engine, item) for item in request) if answer is not None]
+        return answer_list or None
+
+    return callMethod(engine, request)
+
+
+class EngineRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE)
+            if not line:
+                break
+
+            if not line.strip():
+                continue
+
+            answer = answerLine(self.server.engine, line)
+            if answer is not None:
+                self.wfile.write(json.dumps(answer).encode() + b'\n')
+                self.wfile.flush()
+
+
+# unix sockets are not available on windows. main exits before EngineServer is used there.
+if hasattr(socket, 'AF_UNIX'):
+
+    class EngineServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path: str, engine: Engine) -> None:
+            self.engine = engine
+
+            # socket of last engine is not removed if engine was killed.
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+            # only user can connect to socket
+            old_umask = os.umask(0o177)
+            try:
+                super().__init__(socket_path, EngineRequestHandler)
+            finally:
+                os.umask(old_umask)
+
+
+# returns lock file of ghermez or None if ghermez is running. see persepolis.py
+def lockInstance() -> Any:
+    try:
+        user_name = os.getlogin()
+    except OSError:
+        # engine has no terminal when it is started by systemd
+        user_name = getpass.getuser()
+
+    lock_file = '/tmp/persepolis_exec_' + user_name + '.lock'  # noqa: S108
+    fp = open(lock_file, 'w')  # noqa: SIM115
+    try:
+        fcntl.lockf(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fp.close()
+        return None
+
+    return fp
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='ghermez-engine',
+        description='Download engine of ghermez without user interface',
+    )
+    parser.add_argument(
+        '--socket',
+        action='store',
+        dest='socket',
+        help='Path of control socket. default is ' + SOCKET_NAME + ' in config folder.',
+    )
+    parser.add_argument(
+        '--metrics-port',
+        action='store',
+        type=int,
+        default=None,
+        help='Serve metrics in prometheus text format on http://127.0.0.1:PORT/metrics (default: metrics-port setting)',
+    )
+    args = parser.parse_args()
+
+    if os_type == OS.WINDOWS or not hasattr(socket, 'AF_UNIX'):
+        sys.exit('ghermez engine needs unix sockets.')
+
+    ghermez.init_create_folders()
+    ghermez.initLogger()
+
+    lock_file = lockInstance()
+    if lock_file is None:
+        sys.exit('ghermez is running!')
+
+    engine = Engine(EngineSettings())
+
+    # stop engine with SIGTERM and Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: engine.stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: engine.stop_event.set())
+
+    if not engine.start():
+        sys.exit("Aria2 didn't respond!")
+
+    socket_path = args.socket or os.path.join(ghermez.determineConfigFolder(), SOCKET_NAME)
+    server = EngineServer(socket_path, engine)
+    server_thread = threading.Thread(target=server.serve_forever, name='engine_server', daemon=True)
+    server_thread.start()
+    ghermez.sendToLog('Engine is listening on ' + socket_path, 'INFO')
+
+    # MainWindow uses the same setting. see download.py
+    metrics_port = args.metrics_port
+    if metrics_port is None:
+        metrics_port = int(engine.persepolis_setting.value('settings/metrics-port', 0))
+
+    metrics_server = None
+    if metrics_port:
+        try:
+            metrics_server = MetricsServer(metrics_port, engine.metrics)
+        except OSError as e:
+            ghermez.sendToLog('Engine can not serve metrics: ' + str(e), 'ERROR')
+        else:
+            threading.Thread(target=metrics_server.serve_forever, name='metrics_server', daemon=True).start()
+
+    # wait with timeout, so signals are handled.
+    while not engine.stop_event.wait(1):
+        pass
+
+    ghermez.sendToLog('Engine is shutting down', 'INFO')
+    server.shutdown()
+    server.server_close()
+    if metrics_server is not None:
+        metrics_server.shutdown()
+        metrics_server.server_close()
+    os.remove(socket_path)
+
+    engine.close()
+    lock_file.close()
+
+
+if __name__ == '__main__':
+    main()
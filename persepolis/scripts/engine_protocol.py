@@ -0,0 +1,36 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# names that both engine and its clients need. this module doesn't import sockets,
+# so entry points can check arguments on every platform. see engine.py and cli.py
+
+from __future__ import annotations
+
+# name of socket of engine in config folder
+SOCKET_NAME = 'engine.sock'
+
+# error codes of JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+ENGINE_ERROR = -32000
+
+# subcommands of ghermez that are sent to engine. see cli.py
+COMMANDS = ('add', 'list', 'wait', 'pause', 'resume', 'metrics')
+
+
+def isCommand(argument_list: list[str]) -> bool:
+    return bool(argument_list) and argument_list[0] in COMMANDS
@@ -0,0 +1,265 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# this file must not import Qt. MoveService of MainWindow and Engine use FileMover.
+# see move_service.py and engine.py
+
+from __future__ import annotations
+
+import os
+import platform
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+import ghermez
+from persepolis.constants import OS
+
+if TYPE_CHECKING:
+    from ghermez import DataBase
+
+os_type = platform.system()
+
+if os_type == OS.WINDOWS:
+    from persepolis.scripts.useful_tools import freeSpace
+else:
+    from ghermez import freeSpace
+
+# completed downloads that are waiting for moving.
+# CheckDownloadInfoThread and Engine wait if queue is full.
+MAX_WAITING_MOVES = 256
+
+# progress of every move is reported once in this number of seconds.
+PROGRESS_INTERVAL = 0.5
+
+
+# remove empty file that ghermez.reserveFilePath created, if file is not moved to it.
+def releaseFilePath(file_path: str) -> None:
+    try:
+        if os.path.getsize(file_path) == 0:
+            os.remove(file_path)
+    except OSError:
+        pass
+
+
+class MoveJob:
+    def __init__(
+        self,
+        gid: str,
+        path: str,
+        download_path: str,
+        file_name: str,
+        file_size: int | None,
+        file_path: str,
+    ) -> None:
+        self.gid = gid
+        # temp file
+        self.path = path
+        # destination folder
+        self.download_path = download_path
+        self.file_name = file_name
+        self.file_size = file_size
+        # reserved destination file. see ghermez.reserveFilePath
+        self.file_path = file_path
+
+
+# FileMover moves completed downloads from temp download folder to download folder.
+# moving a big file to another hard disk takes minutes, so jobs are submitted and
+# checking of other downloads continues. files are moved one by one in a worker thread,
+# so two big copies don't compete for disk.
+#
+# until file is moved, download_path of download in addlink_db_table is the temp file.
+# caller writes it before submitting the job. name of destination file is reserved when
+# job is submitted and job is saved in move_db_table, so moves that are not finished
+# can be resumed in next start. worker writes the final path and deletes the job from
+# move_db_table together.
+#
+# progress_callback gets gid and a dictionary with file_name, copied_size and file_size keys.
+# done_callback gets gid and a dictionary with file_name, error and final_path keys.
+# error is 'no_error', 'not enough free space' or error message of operating system.
+# callbacks are called in worker thread. progress_callback can be None.
+class FileMover:
+    def __init__(
+        self,
+        persepolis_db: DataBase,
+        progress_callback: Callable[[str, dict[str, Any]], None] | None,
+        done_callback: Callable[[str, dict[str, Any]], None],
+    ) -> None:
+        self.persepolis_db = persepolis_db
+        self.progress_callback = progress_callback
+        self.done_callback = done_callback
+
+        self.jobs_queue: queue.Queue[MoveJob | None] = queue.Queue(MAX_WAITING_MOVES)
+
+        # key = gid and value = MoveJob (waiting or running)
+        self.jobs_dict: dict[str, MoveJob] = {}
+        self.lock = threading.Lock()
+
+        self.worker: threading.Thread | None = None
+        self.stop_event = threading.Event()
+
+    # returns False if file is moving now or destination file can't be reserved.
+    def submit(self, gid: str, path: str, download_path: str, file_name: str, file_size: int | None) -> bool:
+        with self.lock:
+            if gid in self.jobs_dict:
+                return False
+
+            # folder of download rules is created when it's needed. see download_rules.py
+            # name is reserved, so other completed downloads don't take it.
+            try:
+                os.makedirs(download_path, exist_ok=True)
+                file_path = ghermez.reserveFilePath(download_path, file_name)
+            except OSError as e:
+                ghermez.sendToLog('Persepolis can not move file', 'ERROR')
+                ghermez.sendToLog(str(e), 'ERROR')
+                self.done_callback(gid, {'file_name': file_name, 'error': str(e), 'final_path': path})
+                return False
+
+            self.persepolis_db.insertInMoveTable([{'gid': gid, 'new_path': file_path}])
+
+            job = MoveJob(gid, path, download_path, file_name, file_size, file_path)
+            self.addJob(job)
+
+        self.jobs_queue.put(job)
+        return True
+
+    # submit jobs of move_db_table again. their destination files are reserved before.
+    # MainWindow resumes them with BatchMoveThread. see batch_move.py
+    def resumeJobs(self) -> None:
+        add_link_dict = self.persepolis_db.returnItemsInAddLinkTable(None)
+
+        for move_dict in self.persepolis_db.returnItemsInMoveTable():
+            gid = move_dict['gid']
+            if gid not in add_link_dict:
+                continue
+
+            path = add_link_dict[gid]['download_path']
+            file_path = move_dict['new_path']
+            job = MoveJob(gid, path, os.path.dirname(file_path), os.path.basename(path), None, file_path)
+            with self.lock:
+                if gid in self.jobs_dict:
+                    continue
+
+                self.addJob(job)
+
+            self.jobs_queue.put(job)
+
+    # lock must be held
+    def addJob(self, job: MoveJob) -> None:
+        self.jobs_dict[job.gid] = job
+
+        # worker is started when it's needed
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.work, name='mover', daemon=True)
+            self.worker.start()
+
+    # returns True if job is waiting in queue or file is moving.
+    def isMoving(self, gid: str) -> bool:
+        return gid in self.jobs_dict
+
+    # stop worker after current job and wait for it if wait is True. files that are not
+    # moved stay in temp download folder and their jobs stay in move_db_table.
+    def shutdown(self, wait: bool = False) -> None:
+        self.stop_event.set()
+        if self.worker is None:
+            return
+
+        # worker checks stop_event before next job if queue is full
+        try:
+            self.jobs_queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+        if wait:
+            self.worker.join()
+
+    def work(self) -> None:
+        while True:
+            job = self.jobs_queue.get()
+            if job is None or self.stop_event.is_set():
+                break
+
+            try:
+                result_dictionary = self.runJob(job)
+            except Exception as e:
+                result_dictionary = {'file_name': job.file_name, 'error': str(e), 'final_path': job.path}
+
+            if result_dictionary['error'] != 'no_error':
+                releaseFilePath(job.file_path)
+
+            # write the final path in data base and delete the job from move_db_table.
+            # if temp file is not found, it's moved before and data base has the right path.
+            download_path = result_dictionary['final_path'] if os.path.isfile(result_dictionary['final_path']) else None
+            self.persepolis_db.finishMoves([{'gid': job.gid, 'download_path': download_path}])
+
+            with self.lock:
+                del self.jobs_dict[job.gid]
+
+            self.done_callback(job.gid, result_dictionary)
+
+    def runJob(self, job: MoveJob) -> dict[str, Any]:
+        result_dictionary = {'file_name': job.file_name, 'error': 'no_error', 'final_path': job.path}
+
+        if not os.path.isfile(job.path):
+            # file was moved but data base was not updated
+            if os.path.isfile(job.file_path) and os.path.getsize(job.file_path) > 0:
+                result_dictionary['final_path'] = job.file_path
+                return result_dictionary
+
+            result_dictionary['error'] = 'file not found'
+            return result_dictionary
+
+        # rename doesn't need free space
+        free_space = freeSpace(job.download_path)
+        if (
+            free_space is not None
+            and job.file_size is not None
+            and free_space < job.file_size
+            and not self.sameDevice(job.path, job.download_path)
+        ):
+            ghermez.sendToLog('Insufficient disk space in download folder', 'ERROR')
+            result_dictionary['error'] = 'not enough free space'
+            return result_dictionary
+
+        last_report = 0
+
+        def progress(copied_size: int, file_size: int) -> None:
+            nonlocal last_report
+            if self.progress_callback is None:
+                return
+
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL or copied_size == file_size:
+                last_report = now
+                self.progress_callback(
+                    job.gid,
+                    {'file_name': job.file_name, 'copied_size': copied_size, 'file_size': file_size},
+                )
+
+        try:
+            ghermez.moveFileWithProgress(job.path, job.file_path, progress)
+        except OSError as e:
+            ghermez.sendToLog('Persepolis can not move file', 'ERROR')
+            ghermez.sendToLog(str(e), 'ERROR')
+            result_dictionary['error'] = str(e)
+            return result_dictionary
+
+        result_dictionary['final_path'] = job.file_path
+        return result_dictionary
+
+    def sameDevice(self, path: str, download_path: str) -> bool:
+        try:
+            return os.stat(path).st_dev == os.stat(download_path).st_dev
+        except OSError:
+            return False
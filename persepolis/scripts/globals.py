@@ -1,4 +1,5 @@
-from persepolis.constants.status import CheckingFlag, ShutdownNotification
+from persepolis.constants.status import ShutdownNotification
+from persepolis.scripts.checking_gate import CheckingGate
 
 pyside6_is_installed = False
 
@@ -9,7 +10,8 @@ ffmpeg_is_installed = True
 
 shutdown_notification = ShutdownNotification.Running
 
-checking_flag = CheckingFlag.Normal
+# see checking_gate.py
+checking_gate = CheckingGate()
 
 # when rpc connection between persepolis and aria is disconnected >>
 # aria2_disconnected = False >> every thing is ok :)
@@ -18,8 +20,6 @@ aria2_disconnected = False
 # enum
 aria_startup_answer = None
 
-button_pressed_counter = 0
-
 plugin_links_checked = False
 
 temp_download_folder = ''
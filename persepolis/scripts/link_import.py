@@ -0,0 +1,204 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import hashlib
+import re
+from itertools import islice
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit, urlunsplit
+
+from persepolis.constants.status import DownloadStatus
+
+# aria2 can download these links
+DOWNLOAD_SCHEMES = ('http', 'https', 'ftp', 'sftp')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ftp': 21, 'sftp': 22}
+
+
+# links must be started with http or https or ftp or sftp and they must have a host.
+def isDownloadLink(text: str) -> bool:
+    try:
+        url = urlsplit(text)
+    except ValueError:
+        return False
+
+    return url.scheme.lower() in DOWNLOAD_SCHEMES and bool(url.netloc)
+
+
+# mirrors are written in one line and they are separated with white space.
+def mirrorList(text: str | None) -> list[str]:
+    if not text or text == 'None':
+        return []
+
+    return [uri for uri in text.split() if isDownloadLink(uri)]
+
+
+# links that are same but written differently must be same after normalization.
+# scheme and host are lowercased, default port and fragment are removed and empty path is '/'.
+def normalizeLink(link: str) -> str:
+    try:
+        url = urlsplit(link.strip())
+        port = url.port
+    except ValueError:
+        return link.strip()
+
+    scheme = url.scheme.lower()
+    netloc = (url.hostname or '').lower()
+    if ':' in netloc:
+        # ipv6 address
+        netloc = '[' + netloc + ']'
+
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = netloc + ':' + str(port)
+
+    if url.username is not None:
+        user_info = url.username
+        if url.password is not None:
+            user_info = user_info + ':' + url.password
+        netloc = user_info + '@' + netloc
+
+    return urlunsplit((scheme, netloc, url.path or '/', url.query, ''))
+
+
+# 16 bytes of blake2b hash is kept for every link, not the link itself.
+def linkHash(link: str) -> bytes:
+    return hashlib.blake2b(normalizeLink(link).encode(), digest_size=16).digest()
+
+
+# LinkIndex finds repeated links of an import in one pass.
+# it's created from items of download_db_table and links of import are checked with it:
+# new >> link is not in data base and it's not repeated in this import.
+# duplicate >> link is in data base (and it's not completed) or it's repeated in this import.
+# completed >> link is in data base and it's downloaded before.
+class LinkIndex:
+    def __init__(self, download_dict_list: Iterable[dict[str, str]]) -> None:
+        # key = hash of link and value = True if download is completed
+        self.index: dict[bytes, bool] = {}
+        for download_dict in download_dict_list:
+            key = linkHash(download_dict['link'])
+            self.index[key] = self.index.get(key, False) or download_dict['status'] == DownloadStatus.Complete
+
+        self.new_number = 0
+        self.duplicate_number = 0
+        self.completed_number = 0
+
+    # returns new dictionaries of add_link_dictionary_list and counts others.
+    def filterNew(self, add_link_dictionary_list: Iterable[dict[str, str]]) -> list[dict[str, str]]:
+        new_list = []
+        for add_link_dictionary in add_link_dictionary_list:
+            key = linkHash(add_link_dictionary['link'])
+            if key not in self.index:
+                self.index[key] = False
+                self.new_number = self.new_number + 1
+                new_list.append(add_link_dictionary)
+
+            elif self.index[key]:
+                self.completed_number = self.completed_number + 1
+
+            else:
+                self.duplicate_number = self.duplicate_number + 1
+
+        return new_list
+
+
+# link patterns:
+# [001-500] >> 001, 002, ..., 500 (width of the first number is kept)
+# [0-100:5] >> 0, 5, 10, ..., 100
+# [a-z] >> a, b, ..., z  # noqa: ERA001
+# {a,b,c} >> a, b, c  # noqa: ERA001
+# brackets of ipv6 addresses are not patterns, for example http://[::1]/file
+# {a,b,c} is only a pattern in path of link. braces and commas are usual in query strings,
+# so only ranges are expanded in query string.
+RANGE_REGEX = (
+    r'\[(?P<start>\d+)-(?P<end>\d+)(?::(?P<step>\d+))?\]'
+    r'|\[(?P<start_letter>[a-zA-Z])-(?P<end_letter>[a-zA-Z])(?::(?P<letter_step>\d+))?\]'
+)
+LINK_PATTERN = re.compile(RANGE_REGEX + r'|\{(?P<choices>[^{}]*,[^{}]*)\}')
+QUERY_PATTERN = re.compile(RANGE_REGEX)
+
+
+def hasLinkPattern(link: str) -> bool:
+    path, _separator, query = link.partition('?')
+    return LINK_PATTERN.search(path) is not None or QUERY_PATTERN.search(query) is not None
+
+
+# values of one pattern. values are generated one by one.
+def patternValues(match: re.Match) -> Iterator[str]:
+    if match.groupdict().get('choices') is not None:
+        yield from match.group('choices').split(',')
+
+    elif match.group('start') is not None:
+        start = match.group('start')
+        step = int(match.group('step') or 1) or 1
+        width = len(start) if start.startswith('0') else 0
+        for number in range(int(start), int(match.group('end')) + 1, step):
+            yield str(number).zfill(width)
+
+    else:
+        step = int(match.group('letter_step') or 1) or 1
+        for number in range(ord(match.group('start_letter')), ord(match.group('end_letter')) + 1, step):
+            yield chr(number)
+
+
+# expand all matches of pattern in text lazily.
+def expandPattern(text: str, pattern: re.Pattern) -> Iterator[str]:
+    match = pattern.search(text)
+    if match is None:
+        yield text
+        return
+
+    prefix = text[: match.start()]
+    for value in patternValues(match):
+        for rest in expandPattern(text[match.end() :], pattern):
+            yield prefix + value + rest
+
+
+# expand patterns of link lazily. link without pattern is returned as it is.
+# for example http://example.com/file[1-3].{bin,txt} >>
+# file1.bin, file1.txt, file2.bin, file2.txt, file3.bin, file3.txt
+def expandLinkPattern(link: str) -> Iterator[str]:
+    path, separator, query = link.partition('?')
+    for expanded_path in expandPattern(path, LINK_PATTERN):
+        for expanded_query in expandPattern(query, QUERY_PATTERN):
+            yield expanded_path + separator + expanded_query
+
+
+# read links of a text file line by line. file is not loaded in memory.
+# link patterns are expanded, invalid lines and repeated links are skipped.
+def readLinks(file_path: str) -> Iterator[str]:
+    # digests of links are kept instead of links, so memory doesn't grow with length of links.
+    seen_hashes = set()
+    with open(file_path, errors='replace') as f:
+        for line in f:
+            for link in expandLinkPattern(line.strip()):
+                if not isDownloadLink(link):
+                    continue
+
+                link_hash = linkHash(link)
+                if link_hash in seen_hashes:
+                    continue
+
+                seen_hashes.add(link_hash)
+                yield link
+
+
+# split an iterable to lists of chunk_size items.
+def chunks(iterable: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
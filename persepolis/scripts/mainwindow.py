@@ -17,7 +17,19 @@ from . import globals
 
 try:
     from PySide6 import __version__ as PYQT_VERSION_STR  # noqa: N812
-    from PySide6.QtCore import QCoreApplication, QDir, QLocale, QPoint, QSize, Qt, QThread, QTime, QTranslator, Signal
+    from PySide6.QtCore import (
+        QCoreApplication,
+        QDir,
+        QLocale,
+        QObject,
+        QPoint,
+        QSize,
+        Qt,
+        QThread,
+        QTime,
+        QTranslator,
+        Signal,
+    )
     from PySide6.QtCore import __version__ as QT_VERSION_STR  # noqa: N812
     from PySide6.QtGui import QAction, QCursor, QFont, QIcon, QStandardItem
     from PySide6.QtWidgets import (
@@ -29,6 +41,7 @@ try:
         QLineEdit,
         QMenu,
         QMessageBox,
+        QProgressDialog,
         QSystemTrayIcon,
     )
 
@@ -40,6 +53,7 @@ except ImportError:
         QCoreApplication,
         QDir,
         QLocale,
+        QObject,
         QPoint,
         QSize,
         Qt,
@@ -59,6 +73,7 @@ except ImportError:
         QLineEdit,
         QMenu,
         QMessageBox,
+        QProgressDialog,
         QSystemTrayIcon,
     )
 
@@ -69,32 +84,45 @@ import random
 import subprocess
 import sys
 import textwrap
+import threading
 import time
 import urllib.parse
 from ast import literal_eval
-from copy import deepcopy
 from functools import partial
 from time import sleep
 
 import ghermez
 from persepolis.constants import APP_NAME, LONG_NAME, OS, REPO_LINK
-from persepolis.constants.status import CheckingFlag, DownloadStatus, ShutdownNotification
+from persepolis.constants.status import DownloadStatus, ShutdownNotification
 from persepolis.gui import resources  # noqa: F401
 from persepolis.gui.mainwindow_ui import MainWindow_Ui, QTableWidgetItem
 from persepolis.scripts import download, spider
 from persepolis.scripts.about import AboutWindow
 from persepolis.scripts.addlink import AddLinkWindow
 from persepolis.scripts.after_download import AfterDownloadWindow
+from persepolis.scripts.bandwidth_scheduler import BandwidthSchedulerThread
+from persepolis.scripts.batch_move import BatchMoveThread
 from persepolis.scripts.browser_plugin_queue import BrowserPluginQueue
 from persepolis.scripts.bubble import notifySend
+from persepolis.scripts.checksum_service import CHECKSUM_MISMATCH, CHECKSUM_VERIFIED, ChecksumService, parseChecksum
+from persepolis.scripts.connection_tuner import ConnectionTuner
+from persepolis.scripts.disk_space import DiskLedger
+from persepolis.scripts.download_list import readDownloadList, writeDownloadList
+from persepolis.scripts.download_rules import applyAddRules
+from persepolis.scripts.link_import import LinkIndex, chunks, expandLinkPattern, hasLinkPattern, mirrorList
 from persepolis.scripts.log_window import LogWindow
+from persepolis.scripts.metrics import MetricsServer
+from persepolis.scripts.move_service import MoveService
+from persepolis.scripts.muxing_service import MuxingService
+from persepolis.scripts.priority_scheduler import PrioritySchedulerThread
 from persepolis.scripts.progress import ProgressWindow
 from persepolis.scripts.properties import PropertiesWindow
+from persepolis.scripts.retry_policy import RetryThread
 from persepolis.scripts.setting import PreferencesWindow
 from persepolis.scripts.shutdown import shutDown
-from persepolis.scripts.text_queue import TextQueue
+from persepolis.scripts.spider_service import SpiderService
+from persepolis.scripts.text_queue import LINKS_CHUNK_SIZE, TextQueue
 from persepolis.scripts.update import checkupdate
-from persepolis.scripts.useful_tools import muxer
 from persepolis.scripts.video_finder_progress import VideoFinderProgressWindow
 
 try:
@@ -112,10 +140,11 @@ except ModuleNotFoundError:
 # Normally, aria2 generates this GID for each download, but the user can
 # specify GIDs manually
 
-globals.button_pressed_counter = 0
-
 globals.plugin_links_checked = False
 
+# spider is called for this number of links of a link pattern. see addLinkPattern
+PATTERN_SPIDER_LINKS = 20
+
 # find os platform
 os_type, desktop_env = ghermez.osAndDesktopEnvironment()
 
@@ -224,9 +253,11 @@ class CheckVersionsThread(QThread):
 # start aria2 when Persepolis starts
 class StartAria2Thread(QThread):
     ARIA2RESPONDSIGNAL = Signal(str)
+    SESSIONSIGNAL = Signal(list)
 
-    def __init__(self) -> None:
+    def __init__(self, parent) -> None:
         super().__init__()
+        self.parent = parent
 
     def run(self):
         # aria_startup_answer is None when Persepolis starts! and after
@@ -267,6 +298,10 @@ class StartAria2Thread(QThread):
             ghermez.sendToLog('Aria2 is running', 'INFO')
             ghermez.sendToLog('Aria2 version: ' + str(answer), 'INFO')
 
+            # paused downloads of last session are ready before user can resume them.
+            # see reconcileSession in download.py
+            self.SESSIONSIGNAL.emit(download.reconcileSession(self.parent.persepolis_db))
+
         # emit the signal
         # ARIA2RESPONDSIGNAL have 3 conditions >>>
         # 1. no (aria didn't respond) 2. yes(aria is respond) 3.try again(Persepolis retry to connecting aria2)
@@ -294,31 +329,50 @@ class CheckSelectedRowThread(QThread):
 class CheckDownloadInfoThread(QThread):
     DOWNLOAD_INFO_SIGNAL = Signal(list)
     RECONNECTARIASIGNAL = Signal(str)
+    MIRRORSSIGNAL = Signal(str, list)
 
     def __init__(self, parent) -> None:
         super().__init__()
         self.parent = parent
 
+        # observers get status of every active download from aria2. see tellActive in download.py
+        # DiskLedger updates reserved space of downloads.
+        self.observer_list = [parent.disk_ledger.observe]
+
+        # ConnectionTuner finds the best number of connections for every host.
+        # see connection_tuner.py
+        self.connection_tuner = None
+        if str(parent.persepolis_setting.value('settings/auto-tune-connections')) == 'yes':
+            self.connection_tuner = ConnectionTuner(
+                parent.persepolis_db,
+                download.getConnections,
+                download.changeConnections,
+            )
+            self.observer_list.append(self.connection_tuner.observe)
+
     def run(self):
         while True:
             # wait until aria gets ready!(see StartAria2Thread for more information)
+            # pause requests are acknowledged here too, so MainWindow doesn't wait for aria2.
             while (
                 globals.shutdown_notification == ShutdownNotification.Running and globals.aria_startup_answer != 'ready'
             ):
-                sleep(1)
+                globals.checking_gate.pollWait(1, keep_waiting=self.keepPolling)
 
             # data base is updated one time in five times.
             update_data_base = False
             update_data_base_counter = 0
+            poll_start = None
             while globals.shutdown_notification != ShutdownNotification.ReadyForClose:
-                sleep(0.2)
-                if globals.checking_flag == CheckingFlag.RemoveButtonPressed:
-                    # Ok loop is stopped!
-                    globals.checking_flag = CheckingFlag.StoppingJobs
+                # duration of last poll without waiting time. see metrics.py
+                if download.metrics_registry is not None and poll_start is not None:
+                    download.metrics_registry.observe('ghermez_poll_duration_seconds', time.monotonic() - poll_start)
 
-                    # check that when job is done!
-                    while globals.checking_flag != CheckingFlag.Normal:
-                        sleep(0.2)
+                # sleep for one poll interval. if user pressed remove button or ...,
+                # loop is stopped here until MainWindow tells that job is done!
+                # see checking_gate.py for more information.
+                globals.checking_gate.pollWait(0.2, keep_waiting=self.keepPolling)
+                poll_start = time.monotonic()
 
                 # lets getting downloads information from aria and putting them in download_status_list!
 
@@ -331,7 +385,13 @@ class CheckDownloadInfoThread(QThread):
                 # every dictionary contains download information.
                 # gid_list is a list that contains gid of downloads in download_status_list.
                 # see download.py file for more information.
-                gid_list, download_status_list = download.tellActive()
+                gid_list, download_status_list = download.tellActive(self.observe)
+                if download.metrics_registry is not None and gid_list is None:
+                    download.metrics_registry.inc('ghermez_poll_errors_total')
+
+                # tuning of downloads that are not active anymore is finished.
+                if self.connection_tuner is not None and gid_list is not None:
+                    self.connection_tuner.forgetInactive(gid_list)
 
                 try:
                     for gid in active_gid_list:
@@ -376,6 +436,9 @@ class CheckDownloadInfoThread(QThread):
                     if update_data_base:
                         self.parent.persepolis_db.updateDownloadTable(download_status_list)
 
+                        # speed of mirrors is updated with data base.
+                        self.checkMirrors(gid_list or [])
+
                         # data base is updated 1 time in 5 times.
                         update_data_base = False
                         update_data_base_counter = -1
@@ -389,8 +452,32 @@ class CheckDownloadInfoThread(QThread):
             globals.shutdown_notification = ShutdownNotification.Ok
             break
 
+    def observe(self, download_status):
+        for observer in self.observer_list:
+            observer(download_status)
+
+    # get speed of every uri of active downloads that have mirrors and have an open progress window.
+    def checkMirrors(self, gid_list):
+        for gid in list(self.parent.progress_window_list_dict):
+            if gid not in gid_list:
+                continue
+
+            member_number = self.parent.progress_window_list_dict.get(gid)
+            if member_number is None:
+                continue
+
+            progress_window = self.parent.progress_window_list[member_number]
+            if getattr(progress_window, 'mirror_list', None):
+                server_list = download.getServers(gid)
+                if server_list:
+                    self.MIRRORSSIGNAL.emit(gid, server_list)
+
     # when rpc connection between persepolis and aria is
     # disconnected then aria2_disconnected = 1
+    # returns False if persepolis is closing and loop must not wait anymore.
+    def keepPolling(self):
+        return globals.shutdown_notification != ShutdownNotification.ReadyForClose
+
     def reconnectAria(self):
         globals.aria2_disconnected = False
         # check aria2 availability by aria2Version function(see download.py file fore more information)
@@ -410,35 +497,6 @@ class CheckDownloadInfoThread(QThread):
                     break
 
 
-# SpiderThread calls spider in spider.py .
-# spider finds file size and file name of download file .
-# spider works similar to spider in wget.
-class SpiderThread(QThread):
-    SPIDERSIGNAL = Signal(dict)
-
-    def __init__(self, add_link_dictionary, parent) -> None:
-        super().__init__()
-        self.add_link_dictionary = add_link_dictionary
-        self.parent = parent
-
-    def run(self):
-        try:
-            # get file_name and file size with spider
-            file_name, size = spider.spider(self.add_link_dictionary)
-
-            # update data base
-            dictionary = {'file_name': file_name, 'size': size, 'gid': self.add_link_dictionary['gid']}
-            self.parent.persepolis_db.updateDownloadTable([dictionary])
-            dictionary = self.parent.persepolis_db.searchGidInDownloadTable(dictionary['gid'])
-
-            # update table in MainWindow
-            self.SPIDERSIGNAL.emit(dictionary)
-
-        except Exception:
-            # write ERROR message
-            ghermez.sendToLog("Spider couldn't find download information", 'ERROR')
-
-
 # this thread sending download request to aria2
 class DownloadLink(QThread):
     ARIA2NOTRESPOND = Signal()
@@ -469,122 +527,256 @@ class DownloadLink(QThread):
                 self.ARIA2NOTRESPOND.emit()
 
 
+# this thread sends download requests of many downloads to aria2 together.
+# see downloadAriaBatch in download.py
+class DownloadLinkBatch(QThread):
+    ARIA2NOTRESPOND = Signal()
+
+    def __init__(self, gid_list, parent) -> None:
+        super().__init__()
+        self.gid_list = gid_list
+        self.parent = parent
+
+    def run(self):
+        # add gids of new downloads to the active gids in temp_db
+        for gid in self.gid_list:
+            self.parent.temp_db.insertInSingleTable(gid)
+
+        answer = download.downloadAriaBatch(self.gid_list, self.parent)
+        if answer is None:
+            version_answer = ghermez.aria2Version()
+
+            if version_answer == 'did not respond':
+                self.ARIA2NOTRESPOND.emit()
+
+            return
+
+        # downloads that didn't fit in free space of hard disk wait for free space one by one.
+        # user may stop them before their turn.
+        _, waiting_gid_list = answer
+        for gid in waiting_gid_list:
+            if self.parent.persepolis_db.searchGidInDownloadTable(gid)['status'] == DownloadStatus.Stopped:
+                continue
+
+            if download.downloadAria(gid, self.parent) is False:
+                break
+
+
 # Persepolis download audio and video separately and the muxing them :)
-# VideoFinder do this duty for Persepolis.
+# VideoFinderManager do this duty for Persepolis.
 # see data_base.py for understanding the code
 # we have video_finder_db_table in data base. it's contains some items that helps
-# VideoFinder for managing the situation.
+# VideoFinderManager for managing the situation.
 # video_gid >> GID of video link
 # audio_gid >> GID of audio link
 # video_completed >> Is video downloaded completely?
 # audio_completed >> Is audio downloaded completely?
-# checking >> VideoFinder must checking or not!
-class VideoFinder(QThread):
-    VIDEOFINDERCOMPLETED = Signal(dict)
-
-    def __init__(self, video_finder_dictionary, parent) -> None:
-        super().__init__()
-        self.parent = parent
+# checking >> VideoFinderManager must checking or not!
+#
+# every video/audio pair is a VideoFinderJob. jobs don't have any thread and don't poll anything.
+# checkDownloadInfo method tells the manager when a download is completed or failed,
+# and manager moves the job to the next step:
+# First: Download video (and audio at the same time, if bandwidth allows)
+# Second: Download audio
+# Third: Mux video and audio in muxing worker pool
+class VideoFinderJob:
+    def __init__(self, video_finder_dictionary, category) -> None:
         self.video_finder_dictionary = video_finder_dictionary
+        self.category = category
+        self.video_gid = video_finder_dictionary['video_gid']
+        self.audio_gid = video_finder_dictionary['audio_gid']
 
-    # First: Download video
-    # Second: Download audio
-    # Third: Mux video and audio
-    def run(self):
-        self.video_completed = self.video_finder_dictionary['video_completed']
-        self.audio_completed = self.video_finder_dictionary['audio_completed']
+        self.video_completed = video_finder_dictionary['video_completed']
+        self.audio_completed = video_finder_dictionary['audio_completed']
         self.muxing = 'no'
         self.checking = 'no'
         self.active = 'yes'
 
-        video_gid = self.video_finder_dictionary['video_gid']
-        audio_gid = self.video_finder_dictionary['audio_gid']
+        # VideoFinderManager handles downloads by itself, if category is "Single Downloads"
+        # otherwise Queue thread is downloading them and manager just checks the status.
+        self.manage_downloads = category == 'Single Downloads'
+
+        # video and audio are downloaded at the same time, if this is True.
+        self.concurrent = False
 
+        # gids that manager sent to aria2 for this job
+        self.started_gids = set()
+
+        # it's set when job is finished (muxing is done or downloading is canceled)
+        self.finished = threading.Event()
+
+    # Queue thread calls this method for waiting until the end of muxing.
+    def waitUntilFinished(self, timeout=None):
+        return self.finished.wait(timeout)
+
+
+class VideoFinderManager(QObject):
+    VIDEOFINDERCOMPLETED = Signal(dict)
+
+    def __init__(self, parent) -> None:
+        super().__init__()
+        self.parent = parent
+
+        # key = video_gid and value = VideoFinderJob
+        self.jobs_dict = {}
+
+        # Queue threads and main thread use the manager
+        self.lock = threading.RLock()
+
+        # muxing is done by MuxingService. see muxing_service.py
+        self.muxing_service = MuxingService(parent)
+        self.muxing_service.MUXINGDONESIGNAL.connect(self.muxingDone)
+
+    # create a job for video_finder_dictionary and start it.
+    def startJob(self, video_finder_dictionary):
         # find category
-        dictionary = self.parent.persepolis_db.searchGidInDownloadTable(video_gid)
-        category = dictionary['category']
+        dictionary = self.parent.persepolis_db.searchGidInDownloadTable(video_finder_dictionary['video_gid'])
+        job = VideoFinderJob(video_finder_dictionary, dictionary['category'])
 
-        # VideoFinder handles downloads by itself, if category is "Single Downloads"
-        if category == 'Single Downloads':
-            # create an item for this thread in temp_db if not exists!
-            try:
-                video_finder_plus_gid = 'video_finder_' + str(video_gid)
-                self.parent.temp_db.insertInQueueTable(video_finder_plus_gid)
-            except Exception:
-                # release lock
-                self.parent.temp_db.lock = False
-
-            # check start time and end time
-            add_link_dictionary = self.parent.persepolis_db.searchGidInAddLinkTable(video_gid)
-            start_time = add_link_dictionary['start_time']
-
-            if self.video_completed == 'no' and start_time:
-                # set start time only for video and cancel start time for audio.
-                # because video will downloaded first and start time must be set for first video! not second one
-                self.parent.persepolis_db.setDefaultGidInAddlinkTable(audio_gid, start_time=True)
-
-        # update checking status in data base for starting the job!
-        self.checking = 'yes'
-        self.video_finder_dictionary['checking'] = 'yes'
-
-        self.parent.persepolis_db.updateVideoFinderTable([self.video_finder_dictionary])
-
-        # if category "Single Downloads" >> manage download yourself.
-        # if category is not "Single Download" >> just check the status time to time and wait until download ends!
-        if self.video_completed == 'no':
-            if category == 'Single Downloads':
-                # start video downloading
-                new_download = DownloadLink(video_gid, self.parent)
-                self.parent.threadPool.append(new_download)
-                self.parent.threadPool[-1].start()
-                self.parent.threadPool[-1].ARIA2NOTRESPOND.connect(self.parent.aria2NotRespond)
+        with self.lock:
+            self.jobs_dict[job.video_gid] = job
 
-            # check the download status
-            # continue loop and check the download status
-            # if checking == 'no' >> problem occurred and downloading canceled.
-            while self.video_completed != 'yes' and self.checking == 'yes':
-                sleep(1)
+            if job.manage_downloads:
+                # create an item for this job in temp_db if not exists!
+                try:
+                    self.parent.temp_db.insertInQueueTable('video_finder_' + str(job.video_gid))
+                except Exception:
+                    # release lock
+                    self.parent.temp_db.lock = False
 
-        if self.video_completed == 'yes':
-            if self.video_finder_dictionary['video_completed'] == 'no':
-                # update data base
-                self.video_finder_dictionary['video_completed'] = 'yes'
-
-                self.parent.persepolis_db.updateVideoFinderTable([self.video_finder_dictionary])
-
-            # video is downloaded completely!
-            # let's start audio downloading
-            if self.audio_completed == 'no':
-                # if category "Single Downloads" >> start download yourself.
-                # if category is not "Single Download" >> just check the status time to time
-                if category == 'Single Downloads':
-                    new_download = DownloadLink(audio_gid, self.parent)
-                    self.parent.threadPool.append(new_download)
-                    self.parent.threadPool[-1].start()
-                    self.parent.threadPool[-1].ARIA2NOTRESPOND.connect(self.parent.aria2NotRespond)
-
-                # check the download status
-                # continue loop and check the download status
-                # if checking == 'no' >> problem occurred and downloading canceled.
-                while self.audio_completed != 'yes' and self.checking == 'yes':
-                    sleep(1)
+                # check start time and speed limit
+                add_link_dictionary = self.parent.persepolis_db.searchGidInAddLinkTable(job.video_gid)
+                start_time = add_link_dictionary['start_time']
 
-        self.checking = 'no'
+                if job.video_completed == 'no' and start_time:
+                    # set start time only for video and cancel start time for audio.
+                    # because video will downloaded first and start time must be set for first video! not second one
+                    self.parent.persepolis_db.setDefaultGidInAddlinkTable(job.audio_gid, start_time=True)
 
-        # lets start muxing!
-        if self.video_completed == 'yes' and self.audio_completed == 'yes':
-            self.video_finder_dictionary['audio_completed'] = 'yes'
-            self.video_finder_dictionary['checking'] = 'no'
-            self.video_finder_dictionary['muxing_status'] = 'started'
+                # if user didn't limit download speed and didn't set start time,
+                # then bandwidth allows to download video and audio at the same time.
+                job.concurrent = not (start_time) and str(add_link_dictionary['limit_value']) == '0'
 
-            self.muxing = 'started'
+            # update checking status in data base for starting the job!
+            job.checking = 'yes'
+            job.video_finder_dictionary['checking'] = 'yes'
+            self.parent.persepolis_db.updateVideoFinderTable([job.video_finder_dictionary])
 
-            # update data base
-            self.parent.persepolis_db.updateVideoFinderTable([self.video_finder_dictionary])
+            self.nextStep(job)
+
+        return job
+
+    # move job to the next step
+    def nextStep(self, job):
+        if job.checking != 'yes':
+            return
+
+        if job.video_completed == 'yes' and job.audio_completed == 'yes':
+            self.startMuxing(job)
+
+        elif job.manage_downloads:
+            if job.video_completed == 'no':
+                self.startDownload(job, job.video_gid)
+
+            if job.audio_completed == 'no' and (job.concurrent or job.video_completed == 'yes'):
+                self.startDownload(job, job.audio_gid)
+
+    def startDownload(self, job, gid):
+        # don't start a download two times
+        if gid in job.started_gids:
+            return
+        job.started_gids.add(gid)
+
+        new_download = DownloadLink(gid, self.parent)
+        self.parent.threadPool.append(new_download)
+        self.parent.threadPool[-1].start()
+        self.parent.threadPool[-1].ARIA2NOTRESPOND.connect(self.parent.aria2NotRespond)
+
+    # checkDownloadInfo calls this method when download of gid is completed.
+    def downloadCompleted(self, gid, video_finder_dictionary):
+        # update video finder data base
+        if gid == video_finder_dictionary['video_gid']:
+            video_finder_dictionary['video_completed'] = 'yes'
+        else:
+            video_finder_dictionary['audio_completed'] = 'yes'
+
+        with self.lock:
+            self.parent.persepolis_db.updateVideoFinderTable([video_finder_dictionary])
+
+            job = self.jobs_dict.get(video_finder_dictionary['video_gid'])
+            if job is None or job.checking != 'yes':
+                return
+
+            if gid == job.video_gid:
+                job.video_completed = 'yes'
+                job.video_finder_dictionary['video_completed'] = 'yes'
+            else:
+                job.audio_completed = 'yes'
+                job.video_finder_dictionary['audio_completed'] = 'yes'
+
+            self.nextStep(job)
+
+    # checkDownloadInfo calls this method when video or audio download is stopped or failed.
+    def downloadFailed(self, video_finder_dictionary):
+        # if download stopped, VideoFinderManager must be notified. so update data base.
+        if video_finder_dictionary['checking'] != 'yes':
+            return
+
+        video_finder_dictionary['checking'] = 'no'
+        self.parent.persepolis_db.updateVideoFinderTable([video_finder_dictionary])
+
+        self.cancelJob(video_finder_dictionary['video_gid'])
+
+    # stop checking the job. for example when queue is stopped.
+    def cancelJob(self, video_gid):
+        with self.lock:
+            job = self.jobs_dict.get(video_gid)
+            if job is None or job.checking != 'yes':
+                return
+
+            job.checking = 'no'
+
+            # other download of pair must be stopped too, if manager started it
+            completed_gids = {job.video_gid: job.video_completed, job.audio_gid: job.audio_completed}
+            for gid in job.started_gids:
+                if completed_gids[gid] == 'yes':
+                    continue
+
+                download_dict = self.parent.persepolis_db.searchGidInDownloadTable(gid)
+                if download_dict['status'] in (
+                    DownloadStatus.Downloading,
+                    DownloadStatus.Waiting,
+                    DownloadStatus.Paused,
+                    DownloadStatus.Scheduled,
+                ):
+                    download.downloadStop(gid, self.parent)
+
+            self.finishJob(job)
+
+    # audio and video files are downloaded completely.
+    # lets start muxing
+    def startMuxing(self, job):
+        job.checking = 'no'
+        job.muxing = 'started'
+
+        job.video_finder_dictionary['audio_completed'] = 'yes'
+        job.video_finder_dictionary['checking'] = 'no'
+        job.video_finder_dictionary['muxing_status'] = 'started'
+
+        # update data base
+        self.parent.persepolis_db.updateVideoFinderTable([job.video_finder_dictionary])
+
+        self.muxing_service.submit(job.video_gid, dict(job.video_finder_dictionary))
+
+    # user can cancel muxing from progress window.
+    def cancelMuxing(self, video_gid):
+        return self.muxing_service.cancel(video_gid)
+
+    # MuxingService emits MUXINGDONESIGNAL when muxing is finished or canceled.
+    def muxingDone(self, video_gid, result_dictionary):
+        with self.lock:
+            job = self.jobs_dict[video_gid]
 
-            # audio and video files are downloaded completely.
-            # lets start muxing
-            result_dictionary = muxer(self.parent, self.video_finder_dictionary)
             error_message = result_dictionary['error']
             ffmpeg_error_message = result_dictionary['ffmpeg_error_message']
 
@@ -592,32 +784,36 @@ class VideoFinder(QThread):
                 ghermez.sendToLog('ffmpeg error: ' + str(ffmpeg_error_message), 'ERROR')
 
             if error_message == 'no error':
-                self.video_finder_dictionary['muxing_status'] = 'complete'
-                self.muxing = 'complete'
+                job.video_finder_dictionary['muxing_status'] = 'complete'
+                job.muxing = 'complete'
             else:
-                self.video_finder_dictionary['muxing_status'] = 'error'
-                self.muxing = 'error'
+                job.video_finder_dictionary['muxing_status'] = 'error'
+                job.muxing = 'error'
 
             # update data base
-            self.parent.persepolis_db.updateVideoFinderTable([self.video_finder_dictionary])
+            self.parent.persepolis_db.updateVideoFinderTable([job.video_finder_dictionary])
 
             complete_dictionary = {
                 'error': error_message,
                 'final_path': result_dictionary['final_path'],
                 'final_size': result_dictionary['final_size'],
-                'video_gid': self.video_finder_dictionary['video_gid'],
-                'audio_gid': self.video_finder_dictionary['audio_gid'],
-                'download_path': self.video_finder_dictionary['download_path'],
-                'category': category,
+                'video_gid': job.video_gid,
+                'audio_gid': job.audio_gid,
+                'download_path': job.video_finder_dictionary['download_path'],
+                'category': job.category,
             }
 
             # emit error_message
             self.VIDEOFINDERCOMPLETED.emit(complete_dictionary)
 
-        self.active = 'no'
+            self.finishJob(job)
 
-        if category == 'Single Downloads':
+    def finishJob(self, job):
+        job.active = 'no'
+
+        if job.manage_downloads:
             # check if user selected shutdown after download in progress window.
+            video_finder_plus_gid = 'video_finder_' + str(job.video_gid)
             shutdown_dict = self.parent.temp_db.returnCategory(video_finder_plus_gid)
             shutdown_status = shutdown_dict['shutdown']
 
@@ -627,6 +823,8 @@ class VideoFinder(QThread):
                 shutdown_dict = {'category': video_finder_plus_gid, 'shutdown': 'shutdown'}
                 self.parent.temp_db.updateQueueTable(shutdown_dict)
 
+        job.finished.set()
+
 
 # this thread is managing queue and sending download request to aria2
 class Queue(QThread):
@@ -697,25 +895,19 @@ class Queue(QThread):
                         break
 
             for gid in gid_list:
-                # if gid is related to video finder, so start  Video Finder thread for checking status
-                # check video_finder_threads_dict, perhaps a thread started before for this gid
+                # if gid is related to video finder, so start a video finder job for checking status
+                # check jobs_dict, perhaps a job started before for this gid
                 if gid in self.parent.all_video_finder_gid_list:
                     video_finder_dictionary = self.parent.persepolis_db.searchGidInVideoFinderTable(gid)
 
-                    if video_finder_dictionary['video_gid'] not in self.parent.video_finder_threads_dict:
-                        # start new video finder thread
+                    if video_finder_dictionary['video_gid'] not in self.parent.video_finder_manager.jobs_dict:
+                        # start new video finder job
                         video_finder_gid_list = [
                             video_finder_dictionary['video_gid'],
                             video_finder_dictionary['audio_gid'],
                         ]
 
-                        new_video_finder = VideoFinder(video_finder_dictionary, self.parent)
-                        self.parent.threadPool.append(new_video_finder)
-                        self.parent.threadPool[-1].start()
-                        self.parent.threadPool[-1].VIDEOFINDERCOMPLETED.connect(self.parent.videoFinderCompleted)
-
-                        # add thread to video_finder_threads_dict
-                        self.parent.video_finder_threads_dict[video_finder_dictionary['video_gid']] = new_video_finder
+                        self.parent.video_finder_manager.startJob(video_finder_dictionary)
 
                         video_finder_list.append(video_finder_gid_list)
 
@@ -815,24 +1007,26 @@ class Queue(QThread):
                         # write in log the complete_message
                         ghermez.sendToLog(complete_message, 'INFO')
 
-                        # check that is this related to video finder thread or not.
+                        # check that is this related to video finder job or not.
                         if gid in self.parent.all_video_finder_gid_list:
-                            # find related thread
+                            # find related job
                             for video_list in video_finder_list:
                                 if gid in video_list:
                                     video_gid = video_list[0]
 
-                                    if video_gid in self.parent.video_finder_threads_dict:
-                                        video_finder_thread = self.parent.video_finder_threads_dict[video_gid]
+                                    if video_gid in self.parent.video_finder_manager.jobs_dict:
+                                        video_finder_job = self.parent.video_finder_manager.jobs_dict[video_gid]
+
+                                        # check the other file of the pair.
+                                        # if both of them are completed, muxing starts.
+                                        other_gid = video_list[1] if gid == video_gid else video_gid
+                                        other_dictionary = self.parent.persepolis_db.searchGidInDownloadTable(
+                                            other_gid,
+                                        )
 
-                                        # check the video and audio and muxing_status
-                                        if (
-                                            video_finder_thread.video_completed == 'yes'
-                                            and video_finder_thread.audio_completed == 'yes'
-                                        ):
+                                        if other_dictionary['status'] == DownloadStatus.Complete:
                                             # wait until end of muxing
-                                            while video_finder_thread.active == 'yes':
-                                                sleep(0.5)
+                                            video_finder_job.waitUntilFinished()
 
                                 break
 
@@ -881,7 +1075,7 @@ class Queue(QThread):
                         video_finder_dictionary = self.parent.persepolis_db.searchGidInVideoFinderTable(video_gid)
 
                         if video_finder_dictionary:
-                            # tell video finder thread to stop checking
+                            # tell video finder job to stop checking
                             if (
                                 video_finder_dictionary['video_completed'] == 'no'
                                 or video_finder_dictionary['audio_completed'] == 'no'
@@ -889,8 +1083,7 @@ class Queue(QThread):
                                 video_finder_dictionary['checking'] = 'no'
                                 self.parent.persepolis_db.updateVideoFinderTable([video_finder_dictionary])
 
-                                video_finder_thread = self.parent.video_finder_threads_dict[video_gid]
-                                video_finder_thread.checking = 'no'
+                                self.parent.video_finder_manager.cancelJob(video_gid)
 
                             elif (
                                 not (self.stop) and self.after and video_finder_dictionary['muxing_status'] == 'started'
@@ -899,14 +1092,12 @@ class Queue(QThread):
                                 # wait until the end of muxing
                                 # don't turn of the computer.
                                 # video finder will be deleted from data base when muxing ended.
-                                # so check data base every second
 
-                                video_finder_thread = self.parent.video_finder_threads_dict[
+                                video_finder_job = self.parent.video_finder_manager.jobs_dict[
                                     video_finder_dictionary['video_gid']
                                 ]
 
-                                while video_finder_thread.active == 'yes':
-                                    sleep(1)
+                                video_finder_job.waitUntilFinished()
 
                     if self.stop and self.after:
                         # It means user activated shutdown before and now user
@@ -1034,9 +1225,9 @@ class CheckingThread(QThread):
                     sleep(0.5)
 
 
-# this thread checks checking_flag
-# and when checking_flag changes to StoppingCheckDownloadInfo
-# QTABLEREADY signal is emitted
+# this thread asks CheckDownloadInfoThread to pause
+# and when CheckDownloadInfoThread acknowledged the request,
+# QTABLEREADY signal is emitted. see checking_gate.py
 class WaitThread(QThread):
     QTABLEREADY = Signal()
 
@@ -1044,26 +1235,10 @@ class WaitThread(QThread):
         super().__init__()
 
     def run(self):
-        globals.checking_flag = CheckingFlag.RemoveButtonPressed
-        while globals.checking_flag != CheckingFlag.StoppingJobs:
-            sleep(0.05)
-        self.QTABLEREADY.emit()
-
-
-# button_pressed_counter changed if user pressed move up and move down and ... actions
-# this thread is changing checking_flag to Normal if button_pressed_counter
-# don't change for 2 seconds
-class ButtonPressedThread(QThread):
-    def __init__(self) -> None:
-        super().__init__()
-
-    def run(self):
-        current_button_pressed_value = deepcopy(globals.button_pressed_counter) + 1
-        while current_button_pressed_value != globals.button_pressed_counter:
-            current_button_pressed_value = deepcopy(globals.button_pressed_counter)
-            sleep(2)
-        # job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        if globals.checking_gate.requestPause(
+            keep_waiting=lambda: globals.shutdown_notification == ShutdownNotification.Running,
+        ):
+            self.QTABLEREADY.emit()
 
 
 class ShutDownThread(QThread):
@@ -1116,58 +1291,6 @@ class KeepAwakeThread(QThread):
                 old_cursor_array = new_cursor_array
 
 
-# This thread moves files to another destination.
-# see moveSelectedDownloads method for more information.
-class MoveThread(QThread):
-    def __init__(self, parent, gid_list, new_folder_path) -> None:
-        super().__init__()
-        self.new_folder_path = new_folder_path
-        self.parent = parent
-        self.gid_list = gid_list
-
-    def run(self):
-        add_link_dict_list = []
-        # move selected downloads
-        # find row number for specific gid
-        for gid in self.gid_list:
-            # find download path
-            dictionary = self.parent.persepolis_db.searchGidInAddLinkTable(gid)
-            self.old_file_path = dictionary['download_path']
-
-            # find file_name
-            self.file_name = os.path.basename(self.old_file_path)
-
-            self.move = ghermez.moveFile(self.old_file_path, self.new_folder_path)
-
-            # if moving is not successful, notify user.
-            if not (self.move):
-                notifySend(
-                    str(self.file_name),
-                    QCoreApplication.translate('mainwindow_src_ui_tr', 'Operation was not successful!'),
-                    5000,
-                    'warning',
-                    parent=self.parent,
-                )
-            else:
-                new_file_path = os.path.join(self.new_folder_path, self.file_name)
-                add_link_dict = {'gid': gid, 'download_path': new_file_path}
-
-                # add add_link_dict to add_link_dict_list
-                add_link_dict_list.append(add_link_dict)
-
-        # update data base
-        self.parent.persepolis_db.updateAddLinkTable(add_link_dict_list)
-
-        # notify user that job is done!
-        notifySend(
-            QCoreApplication.translate('mainwindow_src_ui_tr', 'Moving is'),
-            QCoreApplication.translate('mainwindow_src_ui_tr', 'finished!'),
-            5000,
-            'warning',
-            parent=self.parent,
-        )
-
-
 class MainWindow(MainWindow_Ui):
     def __init__(self, start_in_tray, persepolis_main, persepolis_setting) -> None:
         super().__init__(persepolis_setting)
@@ -1260,12 +1383,6 @@ class MainWindow(MainWindow_Ui):
         # list of threads
         self.threadPool: list[QThread] = []
 
-        # start aria2
-        start_aria = StartAria2Thread()
-        self.threadPool.append(start_aria)
-        self.threadPool[-1].start()
-        self.threadPool[-1].ARIA2RESPONDSIGNAL.connect(self.startAriaMessage)
-
         # initializing
         # create an object for PluginsDB
         self.plugins_db = ghermez.PluginsDB()
@@ -1283,6 +1400,15 @@ class MainWindow(MainWindow_Ui):
         # see data_base.py for more information.
         self.persepolis_db.setDBTablesToDefaultValue()
 
+        # start aria2
+        # aria2 is started after setDBTablesToDefaultValue, because statuses of downloads
+        # of aria2 session are changed in data base. see StartAria2Thread
+        start_aria = StartAria2Thread(self)
+        self.threadPool.append(start_aria)
+        self.threadPool[-1].start()
+        self.threadPool[-1].ARIA2RESPONDSIGNAL.connect(self.startAriaMessage)
+        self.threadPool[-1].SESSIONSIGNAL.connect(self.sessionRestored)
+
         # get queues name from data base
         queues_list = self.persepolis_db.categoriesList()
 
@@ -1333,6 +1459,9 @@ class MainWindow(MainWindow_Ui):
                 self.download_table.setItem(0, i, item)
                 i = i + 1
 
+        # result of checksum verification is shown in tooltip of status
+        self.checksumToolTips()
+
         # get video_finder gids
         self.all_video_finder_gid_list, self.all_video_finder_video_gid_list, self.all_video_finder_audio_gid_list = (
             self.persepolis_db.returnVideoFinderGids()
@@ -1355,9 +1484,34 @@ class MainWindow(MainWindow_Ui):
         # queue_list_dict contains queue threads >> queue_list_dict[name of queue]
         self.queue_list_dict = {}
 
-        # this dictionary contains VideoFinder threads
-        # key = video_gid and value = VideoFinder thread
-        self.video_finder_threads_dict = {}
+        # SpiderService finds file name and file size of links in a limited number of threads.
+        # see spider_service.py
+        self.spider_service = SpiderService()
+
+        # MoveService moves completed downloads to download folder in background.
+        # see move_service.py
+        self.move_service = MoveService(self.persepolis_db)
+        self.move_service.MOVEPROGRESSSIGNAL.connect(self.moveProgress)
+        self.move_service.MOVEDONESIGNAL.connect(self.moveDone)
+
+        # ChecksumService verifies moved files in background. see checksum_service.py
+        self.checksum_service = ChecksumService(self.persepolis_db)
+        self.checksum_service.CHECKSUMSIGNAL.connect(self.checksumDone)
+
+        # persepolis was closed during moving selected downloads or completed downloads
+        # of MoveService. resume moving. see moveSelectedDownloads method and move_service.py
+        if self.persepolis_db.returnItemsInMoveTable():
+            self.startBatchMove()
+
+        # VideoFinderManager downloads audio and video of video finder links and muxes them.
+        # see VideoFinderManager for more information.
+        self.video_finder_manager = VideoFinderManager(self)
+        self.video_finder_manager.VIDEOFINDERCOMPLETED.connect(self.videoFinderCompleted)
+        self.video_finder_manager.muxing_service.MUXINGPROGRESSSIGNAL.connect(self.muxingProgress)
+
+        # DiskLedger keeps space that active downloads need in every partition.
+        # see disk_space.py
+        self.disk_ledger = DiskLedger()
 
         # CheckDownloadInfoThread
         check_download_info = CheckDownloadInfoThread(self)
@@ -1365,6 +1519,37 @@ class MainWindow(MainWindow_Ui):
         self.threadPool[-1].start()
         self.threadPool[-1].DOWNLOAD_INFO_SIGNAL.connect(self.checkDownloadInfo)
         self.threadPool[-1].RECONNECTARIASIGNAL.connect(self.reconnectAria)
+        self.threadPool[-1].MIRRORSSIGNAL.connect(self.mirrorsUpdate)
+
+        # RetryThread retries failed single downloads. see retry_policy.py
+        self.retry_thread = RetryThread(self)
+        self.threadPool.append(self.retry_thread)
+        self.threadPool[-1].start()
+        self.threadPool[-1].RETRYSIGNAL.connect(self.retryDownload)
+
+        # MetricsServer serves metrics of aria2, downloads and polls for prometheus.
+        # see metrics.py and metrics_port in download.py
+        self.metrics_server = None
+        if download.metrics_registry is not None:
+            try:
+                self.metrics_server = MetricsServer(
+                    download.metrics_port,
+                    partial(download.collectMetrics, self.persepolis_db),
+                )
+            except OSError as e:
+                ghermez.sendToLog('Persepolis can not serve metrics: ' + str(e), 'ERROR')
+            else:
+                threading.Thread(target=self.metrics_server.serve_forever, name='metrics_server', daemon=True).start()
+
+        # BandwidthSchedulerThread applies bandwidth schedule of settings window.
+        bandwidth_scheduler = BandwidthSchedulerThread(self)
+        self.threadPool.append(bandwidth_scheduler)
+        self.threadPool[-1].start()
+
+        # PrioritySchedulerThread sorts aria2 waiting list by priority of downloads and queues.
+        priority_scheduler = PrioritySchedulerThread(self)
+        self.threadPool.append(priority_scheduler)
+        self.threadPool[-1].start()
 
         # CheckSelectedRowThread
         check_selected_row = CheckSelectedRowThread()
@@ -1414,6 +1599,9 @@ class MainWindow(MainWindow_Ui):
         self.after_checkBox.toggled.connect(self.afterFrame)
         self.after_checkBox.setChecked(False)
 
+        # connecting queue_priority_spinBox to queuePriorityChanged
+        self.queue_priority_spinBox.valueChanged.connect(self.queuePriorityChanged)
+
         # connecting limit_checkBox to limitFrame
         self.limit_checkBox.toggled.connect(self.limitFrame)
 
@@ -1593,6 +1781,16 @@ class MainWindow(MainWindow_Ui):
             self.propertiesAction.setEnabled(True)
             self.category_tree_qwidget.setEnabled(True)
 
+    # downloads of aria2 session are paused. show their new status in download_table.
+    def sessionRestored(self, gid_list):
+        if not gid_list:
+            return
+
+        gid_set = set(gid_list)
+        for row in range(self.download_table.rowCount()):
+            if self.download_table.item(row, 8).text() in gid_set:
+                self.download_table.item(row, 1).setText(DownloadStatus.Paused)
+
     def reconnectAria(self, message):
         # this function is executing if RECONNECTARIASIGNAL is emitted by CheckingThread .
         # if message is 'did not respond' then a message(Persepolis can not connect to Aria2) shown
@@ -1704,35 +1902,34 @@ class MainWindow(MainWindow_Ui):
             if gid in self.all_video_finder_gid_list:
                 video_finder_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
 
-                video_finder_thread = self.video_finder_threads_dict[video_finder_dictionary['video_gid']]
                 video_finder_link = True
 
                 # is gid related to video? or audio
                 video_finder_video_gid = gid == video_finder_dictionary['video_gid']
 
-                # if download is completed update video finder data base
+                # if download is completed, update video finder data base
+                # and tell the VideoFinderManager to start the next step.
                 if status == DownloadStatus.Complete:
-                    if video_finder_video_gid:
-                        video_finder_dictionary['video_completed'] = 'yes'
-                        video_finder_thread.video_completed = 'yes'
-                    else:
-                        video_finder_dictionary['audio_completed'] = 'yes'
-                        video_finder_thread.audio_completed = 'yes'
-
-                    # update data base
-                    self.persepolis_db.updateVideoFinderTable([video_finder_dictionary])
-
-                # if download stopped, VideoFinder must be notified. so update data base.
-                if video_finder_dictionary['checking'] == 'yes' and (status in ('error', 'stopped')):
-                    video_finder_dictionary['checking'] = 'no'
-                    video_finder_thread.checking = 'no'
+                    self.video_finder_manager.downloadCompleted(gid, video_finder_dictionary)
 
-                    # update data base
-                    self.persepolis_db.updateVideoFinderTable([video_finder_dictionary])
+                # if download stopped, VideoFinderManager must be notified.
+                elif status in (DownloadStatus.Error, DownloadStatus.Stopped):
+                    self.video_finder_manager.downloadFailed(video_finder_dictionary)
 
             else:
                 video_finder_link = False
 
+            # space of finished downloads is not reserved anymore.
+            if status in (DownloadStatus.Complete, DownloadStatus.Error, DownloadStatus.Stopped):
+                self.disk_ledger.release(gid)
+
+            # failed single downloads are retried by RetryThread.
+            # completed downloads close circuit breaker of their host.
+            if status == DownloadStatus.Error and not video_finder_link:
+                self.retryFailedDownload(gid, download_dict)
+            elif status == DownloadStatus.Complete:
+                self.retry_thread.downloadCompleted(gid, download_dict['link'])
+
             if status == DownloadStatus.Error:
                 # check free space in temp_download_folder!
                 # perhaps insufficient space in hard disk caused this error!
@@ -1820,12 +2017,9 @@ class MainWindow(MainWindow_Ui):
                     # update download_table cell if update_list item in not None
                     text = update_list[i] if update_list[i] else self.download_table.item(row, i).text()
 
-                    # create a QTableWidgetItem
-                    item = QTableWidgetItem(text)
-
-                    # set item
+                    # text of item is changed, so tooltip of item (result of checksum) is kept.
                     try:
-                        self.download_table.setItem(row, i, item)
+                        self.download_table.item(row, i).setText(text)
                     except Exception as problem:
                         ghermez.sendToLog('Error occurred while updating download table', 'INFO')
                         ghermez.sendToLog(problem, 'ERROR')
@@ -2154,6 +2348,20 @@ class MainWindow(MainWindow_Ui):
 
         return my_gid
 
+    # generate number unique GIDs. gid_list of data base is read one time.
+    def gidListGenerator(self, number):
+        category_dict = self.persepolis_db.searchCategoryInCategoryTable('All Downloads')
+        used_gid_set = set(literal_eval(category_dict['gid_list']))
+
+        new_gid_list = []
+        while len(new_gid_list) < number:
+            my_gid = str(hex(random.randint(1152921504606846976, 18446744073709551615))[2:18])  # noqa: S311
+            if my_gid not in used_gid_set:
+                used_gid_set.add(my_gid)
+                new_gid_list.append(my_gid)
+
+        return new_gid_list
+
     # this method returns index of all selected rows in list format
     def userSelectedRows(self):
         try:
@@ -2381,12 +2589,12 @@ class MainWindow(MainWindow_Ui):
 
                     # set activity status and muxing status
                     # show/hide muxing_pushButton
-                    if video_gid in self.video_finder_threads_dict:
+                    if video_gid in self.video_finder_manager.jobs_dict:
                         # find thread
-                        video_finder_thread = self.video_finder_threads_dict[video_gid]
+                        video_finder_job = self.video_finder_manager.jobs_dict[video_gid]
 
                         # check activity
-                        if video_finder_thread.active == 'yes':
+                        if video_finder_job.active == 'yes':
                             video_finder_status = QCoreApplication.translate('mainwindow_ui_tr', 'Active')
 
                             # hide muxing_pushButton
@@ -2396,14 +2604,14 @@ class MainWindow(MainWindow_Ui):
                             video_finder_status = QCoreApplication.translate('mainwindow_ui_tr', 'Not Active')
 
                             if (
-                                video_finder_thread.video_completed == 'yes'
-                                and video_finder_thread.audio_completed == 'yes'
+                                video_finder_job.video_completed == 'yes'
+                                and video_finder_job.audio_completed == 'yes'
                             ):
                                 # show muxing_pushButton
                                 self.muxing_pushButton.show()
 
                         # check muxing status
-                        muxing = video_finder_thread.muxing
+                        muxing = video_finder_job.muxing
 
                         if muxing == 'no':
                             muxing_status = QCoreApplication.translate('mainwindow_ui_tr', 'Not Active')
@@ -2535,6 +2743,11 @@ class MainWindow(MainWindow_Ui):
 
     # callback of AddLinkWindow
     def callBack(self, add_link_dictionary, download_later, category):
+        # link has a range or list pattern. see link_import.py
+        if hasLinkPattern(add_link_dictionary['link']):
+            self.addLinkPattern(add_link_dictionary, download_later, category)
+            return
+
         exists = self.persepolis_db.searchLinkInAddLinkTable(add_link_dictionary['link'])
 
         if exists:
@@ -2563,6 +2776,9 @@ class MainWindow(MainWindow_Ui):
         # add gid to add_link_dictionary
         add_link_dictionary['gid'] = gid
 
+        # set speed limit and connections of download rules. see download_rules.py
+        applyAddRules(add_link_dictionary, category, self.persepolis_setting)
+
         # download_info_file_list is a list that contains ['file_name' ,
         # 'status' , 'size' , 'downloaded size' ,'download percentage' ,
         # 'number of connections' ,'Transfer rate' , 'estimate_time_left' ,
@@ -2602,6 +2818,18 @@ class MainWindow(MainWindow_Ui):
         # write information in data_base
         self.persepolis_db.insertInDownloadTable([download_dict])
         self.persepolis_db.insertInAddLinkTable([add_link_dictionary])
+        self.persepolis_db.insertInMirrorTable(
+            [{'gid': gid, 'uri': uri} for uri in mirrorList(add_link_dictionary.get('mirrors'))],
+        )
+        if 'priority' in add_link_dictionary:
+            self.persepolis_db.setPriority(gid, int(add_link_dictionary['priority']))
+
+        # checksum is verified when download is completed. see checksum_service.py
+        checksum = parseChecksum(add_link_dictionary.get('checksum'))
+        if checksum:
+            self.persepolis_db.insertInChecksumTable([{'gid': gid, 'checksum': checksum}])
+        elif add_link_dictionary.get('checksum') not in (None, 'None'):
+            ghermez.sendToLog('Checksum of ' + add_link_dictionary['link'] + ' is not valid and it is ignored', 'ERROR')
 
         # find selected category in left side panel
         for i in range(self.category_tree_model.rowCount()):
@@ -2659,18 +2887,12 @@ class MainWindow(MainWindow_Ui):
             if not (add_link_dictionary['start_time']):
                 message = QCoreApplication.translate('mainwindow_src_ui_tr', 'Download Starts')
             else:
-                new_spider = SpiderThread(add_link_dictionary, self)
-                self.threadPool.append(new_spider)
-                self.threadPool[-1].start()
-                self.threadPool[-1].SPIDERSIGNAL.connect(self.spiderUpdate)
+                self.startSpider(add_link_dictionary)
                 message = QCoreApplication.translate('mainwindow_src_ui_tr', 'Download Scheduled')
             notifySend(message, '', 10000, 'no', parent=self)
 
         else:
-            new_spider = SpiderThread(add_link_dictionary, self)
-            self.threadPool.append(new_spider)
-            self.threadPool[-1].start()
-            self.threadPool[-1].SPIDERSIGNAL.connect(self.spiderUpdate)
+            self.startSpider(add_link_dictionary)
 
     # when user presses resume button this method is called
     def resumeButtonPressed(self, _button=None):
@@ -2736,18 +2958,12 @@ class MainWindow(MainWindow_Ui):
                 if gid in self.all_video_finder_gid_list:
                     result_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
                     if result_dictionary['checking'] == 'no':
-                        # create new thread for this download
-                        # see VideoFinder thread for more information
-                        new_download = VideoFinder(result_dictionary, self)
-                        self.threadPool.append(new_download)
-                        self.threadPool[-1].start()
-                        self.threadPool[-1].VIDEOFINDERCOMPLETED.connect(self.videoFinderCompleted)
-
-                        # add thread to video_finder_threads_dict
-                        self.video_finder_threads_dict[result_dictionary['video_gid']] = new_download
+                        # create new video finder job for this download
+                        # see VideoFinderManager for more information
+                        self.video_finder_manager.startJob(result_dictionary)
 
                     else:
-                        # we already have an active tread for this download...
+                        # we already have an active job for this download...
                         notifySend(
                             QCoreApplication.translate(
                                 'mainwindow_src_ui_tr',
@@ -2778,6 +2994,33 @@ class MainWindow(MainWindow_Ui):
                 # create new progress_window
                 self.progressBarOpen(gid)
 
+    # retry failed download if its error is temporary. see retry_policy.py
+    def retryFailedDownload(self, gid, download_dict):
+        dictionary = self.persepolis_db.searchGidInDownloadTable(gid)
+
+        # downloads of queues are managed by Queue threads
+        if dictionary and dictionary['category'] == 'Single Downloads':
+            self.retry_thread.downloadFailed(gid, download_dict.get('error_code'), download_dict.get('link'))
+
+    # RetryThread emits RETRYSIGNAL when it's time to retry the download.
+    def retryDownload(self, gid):
+        # download may be removed or resumed by user.
+        dictionary = self.persepolis_db.searchGidInDownloadTable(gid)
+        if (
+            not dictionary
+            or dictionary['status'] != DownloadStatus.Error
+            or dictionary['category'] != 'Single Downloads'
+        ):
+            self.retry_thread.cancel(gid)
+            return
+
+        ghermez.sendToLog('Retrying download - GID : ' + str(gid), 'INFO')
+
+        new_download = DownloadLink(gid, self)
+        self.threadPool.append(new_download)
+        self.threadPool[-1].start()
+        self.threadPool[-1].ARIA2NOTRESPOND.connect(self.aria2NotRespond)
+
     # this method called if aria2 crashed or disconnected!
     def aria2NotRespond(self):
         self.aria2Disconnected()
@@ -2813,6 +3056,9 @@ class MainWindow(MainWindow_Ui):
 
             gid = self.download_table.item(selected_row_return, 8).text()
 
+            # user stopped the download. don't retry it.
+            self.retry_thread.cancel(gid)
+
             # check if this gid is related to video finder
             if gid in self.all_video_finder_gid_list:
                 result_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
@@ -2951,7 +3197,7 @@ class MainWindow(MainWindow_Ui):
 
     # callBack of PropertiesWindow
     def propertiesCallback(self, add_link_dictionary, gid, category, video_finder_dictionary=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -2998,7 +3244,7 @@ class MainWindow(MainWindow_Ui):
                     self.download_table.removeRow(row)
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # This method is called if user presses "show/hide progress window" button in
     # MainWindow
@@ -3122,6 +3368,20 @@ class MainWindow(MainWindow_Ui):
         # hide system_tray_icon
         self.system_tray_icon.hide()
 
+        # kill running ffmpeg processes
+        self.video_finder_manager.muxing_service.shutdown()
+
+        # stop spider workers and close keep-alive connections
+        self.spider_service.shutdown()
+
+        # files that are not moved yet stay in temp download folder
+        self.move_service.shutdown()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+        self.checksum_service.shutdown()
+        spider.session_pool.close()
+
         ghermez.shutDown()  # shutting down Aria2
         sleep(0.5)
 
@@ -3399,7 +3659,7 @@ class MainWindow(MainWindow_Ui):
 
     # this method is called when user presses 'remove selected items' button
     def removeSelected(self, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -3448,11 +3708,11 @@ class MainWindow(MainWindow_Ui):
             if gid in self.all_video_finder_gid_list:
                 video_finder_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
 
-                if gid in self.video_finder_threads_dict:
-                    # check the Video Finder tread status
-                    video_finder_thread = self.video_finder_threads_dict[video_finder_dictionary['video_gid']]
+                if gid in self.video_finder_manager.jobs_dict:
+                    # check the video finder job status
+                    video_finder_job = self.video_finder_manager.jobs_dict[video_finder_dictionary['video_gid']]
 
-                    if video_finder_thread.active == 'yes':
+                    if video_finder_job.active == 'yes':
                         notifySend(
                             QCoreApplication.translate(
                                 'mainwindow_src_ui_tr',
@@ -3531,7 +3791,7 @@ class MainWindow(MainWindow_Ui):
                 ghermez.remove(file_name_aria)  # remove file.aria
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method is called when user presses 'delete selected items'
     def deleteSelected(self, _menu=None):
@@ -3566,7 +3826,7 @@ class MainWindow(MainWindow_Ui):
             if reply != QMessageBox.Yes:
                 return
 
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -3612,11 +3872,11 @@ class MainWindow(MainWindow_Ui):
             if gid in self.all_video_finder_gid_list:
                 video_finder_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
 
-                if gid in self.video_finder_threads_dict:
-                    # check the Video Finder tread status
-                    video_finder_thread = self.video_finder_threads_dict[video_finder_dictionary['video_gid']]
+                if gid in self.video_finder_manager.jobs_dict:
+                    # check the video finder job status
+                    video_finder_job = self.video_finder_manager.jobs_dict[video_finder_dictionary['video_gid']]
 
-                    if video_finder_thread.active == 'yes':
+                    if video_finder_job.active == 'yes':
                         notifySend(
                             QCoreApplication.translate(
                                 'mainwindow_src_ui_tr',
@@ -3717,11 +3977,11 @@ class MainWindow(MainWindow_Ui):
             self.persepolis_db.deleteItemInDownloadTable(gid, category)
 
         # telling the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method sorts download table by name
     def sortByName(self, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -3786,6 +4046,9 @@ class MainWindow(MainWindow_Ui):
 
             j = j + 1
 
+        # result of checksum verification is shown in tooltip of status
+        self.checksumToolTips()
+
         # save sorted list (gid_sorted_list) in data base
         category_dict = {'category': current_category_tree_text}
 
@@ -3797,11 +4060,11 @@ class MainWindow(MainWindow_Ui):
         self.persepolis_db.updateCategoryTable([category_dict])
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method sorts items in download_table by size
     def sortBySize(self, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -3883,6 +4146,9 @@ class MainWindow(MainWindow_Ui):
 
             j = j + 1
 
+        # result of checksum verification is shown in tooltip of status
+        self.checksumToolTips()
+
         # save sorted list (gid_sorted_list) in data base
         category_dict = {'category': current_category_tree_text}
 
@@ -3895,11 +4161,11 @@ class MainWindow(MainWindow_Ui):
         self.persepolis_db.updateCategoryTable([category_dict])
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method sorts download_table items with status
     def sortByStatus(self, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -3978,6 +4244,9 @@ class MainWindow(MainWindow_Ui):
 
             j = j + 1
 
+        # result of checksum verification is shown in tooltip of status
+        self.checksumToolTips()
+
         # save sorted list (gid_sorted_list) in data base
         category_dict = {'category': current_category_tree_text}
 
@@ -3990,11 +4259,11 @@ class MainWindow(MainWindow_Ui):
         self.persepolis_db.updateCategoryTable([category_dict])
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method sorts download table with date added information
     def sortByFirstTry(self, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -4072,6 +4341,9 @@ class MainWindow(MainWindow_Ui):
 
             j = j + 1
 
+        # result of checksum verification is shown in tooltip of status
+        self.checksumToolTips()
+
         # save sorted list (gid_list) in data base
         category_dict = {'category': current_category_tree_text}
 
@@ -4084,11 +4356,11 @@ class MainWindow(MainWindow_Ui):
         self.persepolis_db.updateCategoryTable([category_dict])
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method sorts download_table with order of last modify date
     def sortByLastTry(self, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -4168,6 +4440,9 @@ class MainWindow(MainWindow_Ui):
 
             j = j + 1
 
+        # result of checksum verification is shown in tooltip of status
+        self.checksumToolTips()
+
         # save sorted list (gid_list) in data base
         category_dict = {'category': current_category_tree_text}
 
@@ -4180,7 +4455,7 @@ class MainWindow(MainWindow_Ui):
         self.persepolis_db.updateCategoryTable([category_dict])
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method called , when user clicks on 'create new queue' button in
     # main window.
@@ -4269,9 +4544,353 @@ class MainWindow(MainWindow_Ui):
             self.text_queue_window_list.append(text_queue_window)
             self.text_queue_window_list[-1].show()
 
+    # import downloads from aria2 input file or Metalink file. see download_list.py
+    def importDownloadList(self, _menu=None):
+        f_path, _ = QFileDialog.getOpenFileName(
+            self,
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Select aria2 input file or Metalink file'),
+            '',
+            'aria2 input file, Metalink (*.txt *.meta4 *.metalink);;All files (*)',
+        )
+
+        if not os.path.isfile(str(f_path)):
+            return
+
+        # ask user for category
+        categories_list = [category for category in self.persepolis_db.categoriesList() if category != 'All Downloads']
+        category, ok = QInputDialog.getItem(
+            self,
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Import'),
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Add downloads to:'),
+            categories_list,
+            0,
+            False,
+        )
+
+        if not ok:
+            return
+
+        category = str(category)
+
+        try:
+            imported_list = list(readDownloadList(str(f_path)))
+        except Exception as e:
+            ghermez.sendToLog("Couldn't read " + str(f_path) + ' : ' + str(e), 'ERROR')
+            notifySend(
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'an error occurred'),
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'File format is not valid'),
+                10000,
+                'fail',
+                parent=self,
+            )
+            return
+
+        # remove repeated links
+        link_index = self.newLinkIndex()
+        imported_list = link_index.filterNew(imported_list)
+        self.notifyImportResult(link_index)
+
+        if not imported_list:
+            return
+
+        # default values of options that are not in the file
+        self.persepolis_setting.sync()
+        default_dictionary = {
+            'start_time': None,
+            'end_time': None,
+            'connections': str(self.persepolis_setting.value('settings/connections')),
+            'limit_value': '0',
+            'download_path': str(self.persepolis_setting.value('settings/download_path')),
+            'after_download': None,
+        }
+
+        date = ghermez.nowDate()
+
+        download_table_dict_list = []
+        add_link_dictionary_list = []
+        mirror_dict_list = []
+        checksum_dict_list = []
+        for gid, imported_dictionary in zip(self.gidListGenerator(len(imported_list)), imported_list):
+            add_link_dictionary = default_dictionary.copy()
+            for key, value in imported_dictionary.items():
+                if value is not None:
+                    add_link_dictionary[key] = value
+
+            add_link_dictionary['gid'] = gid
+            applyAddRules(add_link_dictionary, category, self.persepolis_setting)
+
+            # convert values to pystring
+            for key in add_link_dictionary:
+                add_link_dictionary[key] = str(add_link_dictionary[key])
+
+            add_link_dictionary_list.append(add_link_dictionary)
+
+            mirror_dict_list.extend({'gid': gid, 'uri': uri} for uri in mirrorList(imported_dictionary['mirrors']))
+
+            checksum = parseChecksum(imported_dictionary['checksum'])
+            if checksum:
+                checksum_dict_list.append({'gid': gid, 'checksum': checksum})
+
+            download_table_dict_list.append(
+                {
+                    'file_name': imported_dictionary['out'] or '***',
+                    'status': DownloadStatus.Stopped,
+                    'size': '***',
+                    'downloaded_size': '***',
+                    'percent': '***',
+                    'connections': '***',
+                    'rate': '***',
+                    'estimate_time_left': '***',
+                    'gid': gid,
+                    'link': add_link_dictionary['link'],
+                    'first_try_date': date,
+                    'last_try_date': date,
+                    'category': category,
+                },
+            )
+
+        # write information in data_base. every list is written in one transaction.
+        self.persepolis_db.insertInDownloadTable(download_table_dict_list)
+        self.persepolis_db.insertInAddLinkTable(add_link_dictionary_list)
+        self.persepolis_db.insertInMirrorTable(mirror_dict_list)
+        self.persepolis_db.insertInChecksumTable(checksum_dict_list)
+
+        ghermez.sendToLog(str(len(add_link_dictionary_list)) + ' downloads imported from ' + str(f_path), 'INFO')
+
+        # single downloads are started now with one request to aria2
+        if category == 'Single Downloads':
+            download_batch = DownloadLinkBatch([dictionary['gid'] for dictionary in add_link_dictionary_list], self)
+            self.threadPool.append(download_batch)
+            self.threadPool[-1].start()
+            self.threadPool[-1].ARIA2NOTRESPOND.connect(self.aria2NotRespond)
+
+        # show category
+        for i in range(self.category_tree_model.rowCount()):
+            if str(self.category_tree_model.index(i, 0).data()) == category:
+                category_tree_model_index = self.category_tree_model.index(i, 0)
+                self.category_tree.setCurrentIndex(category_tree_model_index)
+
+                if not globals.checking_gate.isPaused():
+                    wait_check = WaitThread()
+                    self.threadPool.append(wait_check)
+                    self.threadPool[-1].start()
+                    self.threadPool[-1].QTABLEREADY.connect(
+                        partial(self.categoryTreeSelected2, category_tree_model_index),
+                    )
+                else:
+                    self.categoryTreeSelected2(category_tree_model_index)
+                break
+
+    # export downloads of selected category to aria2 input file or Metalink file.
+    def exportDownloadList(self, _menu=None):
+        category = str(self.category_tree.currentIndex().data())
+
+        f_path, filters = QFileDialog.getSaveFileName(
+            self,
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Export downloads'),
+            os.path.join(os.path.expanduser('~'), category + '.txt'),
+            'aria2 input file (*.txt);;Metalink (*.meta4)',
+        )
+
+        if not f_path:
+            return
+
+        # add extension of selected filter
+        if 'meta4' in filters and not str(f_path).lower().endswith(('.meta4', '.metalink')):
+            f_path = str(f_path) + '.meta4'
+
+        if category == 'All Downloads':
+            add_link_dictionary_dict = self.persepolis_db.returnItemsInAddLinkTable()
+        else:
+            add_link_dictionary_dict = self.persepolis_db.returnItemsInAddLinkTable(category)
+
+        # mirrors and checksum are written with download link
+        for gid, add_link_dictionary in add_link_dictionary_dict.items():
+            add_link_dictionary['mirrors'] = ' '.join(self.persepolis_db.searchGidInMirrorTable(gid))
+            checksum_dict = self.persepolis_db.searchGidInChecksumTable(gid)
+            add_link_dictionary['checksum'] = checksum_dict['checksum'] if checksum_dict else None
+
+        try:
+            number = writeDownloadList(str(f_path), add_link_dictionary_dict.values())
+        except Exception as e:
+            ghermez.sendToLog("Couldn't write " + str(f_path) + ' : ' + str(e), 'ERROR')
+            return
+
+        notifySend(
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Export'),
+            str(number) + ' ' + QCoreApplication.translate('mainwindow_src_ui_tr', 'downloads exported'),
+            10000,
+            'no',
+            parent=self,
+        )
+
+    # add all links of a link pattern (for example file[001-500].bin) to the category.
+    # links are generated lazily and added in chunks, like text_queue_window. every chunk is
+    # written in data base together and its rows are added to download_table in one pass,
+    # so links of the pattern are not kept in memory all together.
+    def addLinkPattern(self, add_link_dictionary, download_later, category):
+        category = str(category)
+
+        # user can't set one file name for all links
+        add_link_dictionary['out'] = None
+
+        # downloads of queues are started with their queue. see callBack
+        if category != 'Single Downloads':
+            download_later = True
+
+        status = DownloadStatus.Waiting if not download_later else DownloadStatus.Stopped
+
+        # find selected category in left side panel
+        for i in range(self.category_tree_model.rowCount()):
+            if str(self.category_tree_model.index(i, 0).data()) == category:
+                category_index = i
+                break
+
+        category_tree_model_index = self.category_tree_model.index(category_index, 0)
+        category_is_shown = globals.current_category_tree_index.data() == category
+
+        # one LinkIndex is used for all chunks
+        link_index = self.newLinkIndex()
+
+        # spider finds file name and size of the first links only.
+        # file name of other links is found when they are downloaded.
+        spider_number = 0
+
+        # get now time and date
+        date = ghermez.nowDate()
+
+        for link_list in chunks(expandLinkPattern(add_link_dictionary['link']), LINKS_CHUNK_SIZE):
+            add_link_dictionary_list = []
+            for link in link_list:
+                dictionary = add_link_dictionary.copy()
+                dictionary['link'] = link
+                add_link_dictionary_list.append(dictionary)
+
+            add_link_dictionary_list = link_index.filterNew(add_link_dictionary_list)
+            if not add_link_dictionary_list:
+                continue
+
+            download_table_dict_list = []
+            for dictionary in add_link_dictionary_list:
+                dictionary['gid'] = self.gidGenerator()
+                applyAddRules(dictionary, category, self.persepolis_setting)
+
+                download_table_dict_list.append(
+                    {
+                        'file_name': '***',
+                        'status': status,
+                        'size': '***',
+                        'downloaded_size': '***',
+                        'percent': '***',
+                        'connections': '***',
+                        'rate': '***',
+                        'estimate_time_left': '***',
+                        'gid': dictionary['gid'],
+                        'link': dictionary['link'],
+                        'first_try_date': date,
+                        'last_try_date': date,
+                        'category': category,
+                    },
+                )
+
+            # write information in data_base
+            self.persepolis_db.insertInDownloadTable(download_table_dict_list)
+            self.persepolis_db.insertInAddLinkTable(add_link_dictionary_list)
+
+            # download_table of another category is read from data base after all chunks.
+            if category_is_shown:
+                self.insertDownloadTableRows(download_table_dict_list)
+
+            for dictionary in add_link_dictionary_list[: PATTERN_SPIDER_LINKS - spider_number]:
+                self.startSpider(dictionary)
+                spider_number = spider_number + 1
+
+            # downloads of chunk are started now with one request to aria2
+            if not download_later:
+                download_batch = DownloadLinkBatch([dictionary['gid'] for dictionary in add_link_dictionary_list], self)
+                self.threadPool.append(download_batch)
+                self.threadPool[-1].start()
+                self.threadPool[-1].ARIA2NOTRESPOND.connect(self.aria2NotRespond)
+
+        self.notifyImportResult(link_index)
+
+        if not link_index.new_number:
+            return
+
+        # highlight selected category in category_tree
+        self.category_tree.setCurrentIndex(category_tree_model_index)
+        if not category_is_shown:
+            self.categoryTreeSelected(category_tree_model_index)
+
+    # add rows of new downloads to the top of download_table in one pass.
+    # the last item of download_table_dict_list is on the top, like downloads that are added one by one.
+    def insertDownloadTableRows(self, download_table_dict_list):
+        keys_list = [
+            'file_name',
+            'status',
+            'size',
+            'downloaded_size',
+            'percent',
+            'connections',
+            'rate',
+            'estimate_time_left',
+            'gid',
+            'link',
+            'first_try_date',
+            'last_try_date',
+            'category',
+        ]
+
+        self.download_table.setUpdatesEnabled(False)
+        self.download_table.model().insertRows(0, len(download_table_dict_list))
+        for row, dictionary in enumerate(reversed(download_table_dict_list)):
+            for column, key in enumerate(keys_list):
+                self.download_table.setItem(row, column, QTableWidgetItem(str(dictionary[key])))
+
+        self.download_table.setUpdatesEnabled(True)
+
+    # LinkIndex finds links of an import that are in data base. see link_import.py
+    def newLinkIndex(self):
+        return LinkIndex(self.persepolis_db.returnItemsInDownloadTable().values())
+
+    # show number of new, duplicate and completed links of an import
+    def notifyImportResult(self, link_index):
+        message = (
+            str(link_index.new_number)
+            + ' '
+            + QCoreApplication.translate('mainwindow_src_ui_tr', 'new')
+            + ', '
+            + str(link_index.duplicate_number)
+            + ' '
+            + QCoreApplication.translate('mainwindow_src_ui_tr', 'duplicate')
+            + ', '
+            + str(link_index.completed_number)
+            + ' '
+            + QCoreApplication.translate('mainwindow_src_ui_tr', 'already downloaded')
+        )
+
+        ghermez.sendToLog('Import: ' + message, 'INFO')
+
+        if link_index.duplicate_number or link_index.completed_number:
+            notifySend(
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'Repeated links are not added'),
+                message,
+                10000,
+                'warning',
+                parent=self,
+            )
+
     # callback of text_queue_window and plugin_queue_window.AboutWindow
     # See importText and pluginQueue method for more information.
+    # repeated links are removed from add_link_dictionary_list.
     def queueCallback(self, add_link_dictionary_list, category):
+        link_index = self.newLinkIndex()
+        add_link_dictionary_list = link_index.filterNew(add_link_dictionary_list)
+        self.notifyImportResult(link_index)
+
+        if not add_link_dictionary_list:
+            return
+
         download_table_dict_list = []
 
         # defining path of category_file
@@ -4304,6 +4923,7 @@ class MainWindow(MainWindow_Ui):
             gid = self.gidGenerator()
 
             add_link_dictionary['gid'] = gid
+            applyAddRules(add_link_dictionary, selected_category, self.persepolis_setting)
 
             # download_info_file_list is a list that contains ['file_name' ,
             # 'status' , 'size' , 'downloaded size' ,'download percentage' ,
@@ -4357,10 +4977,7 @@ class MainWindow(MainWindow_Ui):
                 j = j + 1
 
             # spider is finding file size and file name
-            new_spider = SpiderThread(add_link_dictionary, self)
-            self.threadPool.append(new_spider)
-            self.threadPool[-1].start()
-            self.threadPool[-1].SPIDERSIGNAL.connect(self.spiderUpdate)
+            self.startSpider(add_link_dictionary)
 
         # write information in data_base
         self.persepolis_db.insertInDownloadTable(download_table_dict_list)
@@ -4371,7 +4988,7 @@ class MainWindow(MainWindow_Ui):
     def categoryTreeSelected(self, item):
         new_selection = item
         if globals.current_category_tree_index != new_selection:
-            if globals.checking_flag != CheckingFlag.StoppingJobs:
+            if not globals.checking_gate.isPaused():
                 wait_check = WaitThread()
                 self.threadPool.append(wait_check)
                 self.threadPool[-1].start()
@@ -4475,6 +5092,9 @@ class MainWindow(MainWindow_Ui):
             'category',
         ]
 
+        # result of checksum verification is shown in tooltip of status
+        checksum_dict = self.persepolis_db.returnChecksumStatuses()
+
         # insert items in download_table
         for gid in gid_list:
             # create new row
@@ -4489,8 +5109,11 @@ class MainWindow(MainWindow_Ui):
 
                 i = i + 1
 
+            if gid in checksum_dict:
+                self.download_table.item(0, 1).setToolTip(self.checksumText(checksum_dict[gid]))
+
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
         # update toolBar and tablewidget_menu items
         self.toolBarAndContextMenuItems(str(current_category_tree_text))
@@ -4862,7 +5485,7 @@ class MainWindow(MainWindow_Ui):
     # this method is called , when user want to add a download to a queue with
     # context menu. see also toolBarAndContextMenuItems() method
     def addToQueue(self, data, _menu=None):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -4896,11 +5519,11 @@ class MainWindow(MainWindow_Ui):
                 if gid in self.all_video_finder_gid_list:
                     video_finder_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
 
-                    # check the Video Finder tread status
-                    if video_finder_dictionary['video_gid'] in self.video_finder_threads_dict:
-                        video_finder_thread = self.video_finder_threads_dict[video_finder_dictionary['video_gid']]
+                    # check the video finder job status
+                    if video_finder_dictionary['video_gid'] in self.video_finder_manager.jobs_dict:
+                        video_finder_job = self.video_finder_manager.jobs_dict[video_finder_dictionary['video_gid']]
 
-                        if video_finder_thread.active == 'no':
+                        if video_finder_job.active == 'no':
                             # add both of video and audio links
                             gid_list.append(video_finder_dictionary['video_gid'])
                             gid_list.append(video_finder_dictionary['audio_gid'])
@@ -4983,7 +5606,7 @@ class MainWindow(MainWindow_Ui):
                 parent=self,
             )
 
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     # this method activates or deactivates start_frame according to situation
     def startFrame(self, _checkBox):
@@ -5012,6 +5635,11 @@ class MainWindow(MainWindow_Ui):
             self.queue_panel_widget_frame.hide()
             self.queue_panel_show_button.setText(QCoreApplication.translate('mainwindow_src_ui_tr', 'Show options'))
 
+    # priority of queue is saved immediately. PrioritySchedulerThread uses it in next check.
+    def queuePriorityChanged(self, priority):
+        category = str(self.category_tree.currentIndex().data())
+        self.persepolis_db.setQueuePriority(category, priority)
+
     # this metode is activating after_pushButton with limit_comboBox changing
     def limitComboBoxChanged(self, _connect):
         self.limit_pushButton.setEnabled(True)
@@ -5151,6 +5779,11 @@ class MainWindow(MainWindow_Ui):
         # read queue_info_dict from data base
         queue_info_dict = self.persepolis_db.searchCategoryInCategoryTable(category)
 
+        # queue priority. signals are blocked, because value is not changed by user.
+        self.queue_priority_spinBox.blockSignals(True)
+        self.queue_priority_spinBox.setValue(self.persepolis_db.searchCategoryInQueuePriorityTable(category))
+        self.queue_priority_spinBox.blockSignals(False)
+
         for key in queue_info_dict:
             if queue_info_dict[key] in ['NULL', 'None']:
                 queue_info_dict[key] = None
@@ -5277,13 +5910,7 @@ class MainWindow(MainWindow_Ui):
     # this method is called when user pressed moveUpSelectedAction
     # this method subtituts selected  items with upper one
     def moveUpSelected(self, _menu=None):
-        globals.button_pressed_counter += 1
-
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
-            button_pressed_thread = ButtonPressedThread()
-            self.threadPool.append(button_pressed_thread)
-            self.threadPool[-1].start()
-
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -5308,9 +5935,6 @@ class MainWindow(MainWindow_Ui):
         # move up selected rows
         for old_row in rows_list:
             new_row = int(old_row) - 1
-            old_row_items_list = []
-            new_row_items_list = []
-
             if new_row >= 0:
                 new_rows_list.append(new_row)
                 # old index and new index of item in gid_list
@@ -5321,23 +5945,13 @@ class MainWindow(MainWindow_Ui):
                 gid_list[old_index], gid_list[new_index] = gid_list[new_index], gid_list[old_index]
 
                 # subtitute items in download_table
-                # read current items in download_table
-                for i in range(13):
-                    old_row_items_list.append(self.download_table.item(old_row, i).text())
-
-                    new_row_items_list.append(self.download_table.item(new_row, i).text())
-
-                # substituting
+                # items are moved, so their tooltips (result of checksum) are moved too.
                 for i in range(13):
-                    # old row
-                    item = QTableWidgetItem(new_row_items_list[i])
+                    old_row_item = self.download_table.takeItem(old_row, i)
+                    new_row_item = self.download_table.takeItem(new_row, i)
 
-                    self.download_table.setItem(old_row, i, item)
-
-                    # new row
-                    item = QTableWidgetItem(old_row_items_list[i])
-
-                    self.download_table.setItem(new_row, i, item)
+                    self.download_table.setItem(old_row, i, new_row_item)
+                    self.download_table.setItem(new_row, i, old_row_item)
 
         # remove highlight from old rows
         self.download_table.clearSelection()
@@ -5356,16 +5970,13 @@ class MainWindow(MainWindow_Ui):
         # update data base
         self.persepolis_db.updateCategoryTable([category_dict])
 
+        # tell the CheckDownloadInfoThread that job is done!
+        globals.checking_gate.resume()
+
     # this method is called if user pressed moveDownSelected action
     # this method is substituting selected download item with lower download item
     def moveDownSelected(self, _menu=None):
-        globals.button_pressed_counter += 1
-
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
-            button_pressed_thread = ButtonPressedThread()
-            self.threadPool.append(button_pressed_thread)
-            self.threadPool[-1].start()
-
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -5405,26 +6016,13 @@ class MainWindow(MainWindow_Ui):
                 gid_list[old_index], gid_list[new_index] = gid_list[new_index], gid_list[old_index]
 
                 # subtitute items in download_table
-                old_row_items_list = []
-                new_row_items_list = []
-
-                # read current items in download_table
-                for i in range(13):
-                    old_row_items_list.append(self.download_table.item(old_row, i).text())
-
-                    new_row_items_list.append(self.download_table.item(new_row, i).text())
-
-                # substituting
+                # items are moved, so their tooltips (result of checksum) are moved too.
                 for i in range(13):
-                    # old row
-                    item = QTableWidgetItem(new_row_items_list[i])
+                    old_row_item = self.download_table.takeItem(old_row, i)
+                    new_row_item = self.download_table.takeItem(new_row, i)
 
-                    self.download_table.setItem(old_row, i, item)
-
-                    # new_row
-                    item = QTableWidgetItem(old_row_items_list[i])
-
-                    self.download_table.setItem(new_row, i, item)
+                    self.download_table.setItem(old_row, i, new_row_item)
+                    self.download_table.setItem(new_row, i, old_row_item)
 
         # remove highlight from old rows
         self.download_table.clearSelection()
@@ -5443,6 +6041,9 @@ class MainWindow(MainWindow_Ui):
         # update data base
         self.persepolis_db.updateCategoryTable([category_dict])
 
+        # tell the CheckDownloadInfoThread that job is done!
+        globals.checking_gate.resume()
+
     # this method is called if user pressed moveSelectedDownloads action
     # this method moves download files to another destination.
     def moveSelectedDownloads(self, _menu=None):
@@ -5502,12 +6103,58 @@ class MainWindow(MainWindow_Ui):
                     parent=self,
                 )
 
-        # move files with MoveThread
-        # MoveThread is created to pervent UI freezing.
-        move_thread = MoveThread(self, gid_list, new_folder_path)
-        self.threadPool.append(move_thread)
+        # move files with BatchMoveThread
+        # BatchMoveThread is created to pervent UI freezing.
+        if gid_list:
+            self.startBatchMove(gid_list, new_folder_path)
+
+    # start BatchMoveThread and show its progress in one progress dialog.
+    # if gid_list is None, moves that were not finished last time are resumed. see batch_move.py
+    def startBatchMove(self, gid_list=None, new_folder_path=None):
+        move_progress_dialog = QProgressDialog(
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Moving files...'),
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Cancel'),
+            0,
+            0,
+            self,
+        )
+        move_progress_dialog.setWindowTitle(QCoreApplication.translate('mainwindow_src_ui_tr', 'Moving files'))
+        move_progress_dialog.setMinimumDuration(500)
+
+        batch_move_thread = BatchMoveThread(self, gid_list, new_folder_path)
+        move_progress_dialog.canceled.connect(partial(setattr, batch_move_thread, 'canceled', True))
+        batch_move_thread.MOVEPROGRESSSIGNAL.connect(partial(self.batchMoveProgress, move_progress_dialog))
+        batch_move_thread.MOVEFINISHEDSIGNAL.connect(partial(self.batchMoveFinished, move_progress_dialog))
+
+        self.threadPool.append(batch_move_thread)
         self.threadPool[-1].start()
 
+    def batchMoveProgress(self, move_progress_dialog, finished_number, total_number):
+        move_progress_dialog.setMaximum(total_number)
+        move_progress_dialog.setValue(finished_number)
+
+    def batchMoveFinished(self, move_progress_dialog, moved_number, failed_list):
+        move_progress_dialog.close()
+
+        # if moving is not successful, notify user.
+        if failed_list:
+            notifySend(
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'Operation was not successful!'),
+                ', '.join(failed_list[:5]) + (' ...' if len(failed_list) > 5 else ''),  # noqa: PLR2004
+                5000,
+                'warning',
+                parent=self,
+            )
+
+        # notify user that job is done!
+        notifySend(
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Moving is'),
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'finished!') + ' (' + str(moved_number) + ')',
+            5000,
+            'warning',
+            parent=self,
+        )
+
     # see browser_plugin_queue.py file
 
     def queueSpiderCallBack(self, filename, child, row_number):
@@ -5536,6 +6183,21 @@ class MainWindow(MainWindow_Ui):
             child.change_name_lineEdit.setText(file_name)
             child.change_name_checkBox.setChecked(True)
 
+    # spider finds file size and file name of download file.
+    # spider works similar to spider in wget.
+    def startSpider(self, add_link_dictionary):
+        self.spider_service.submit(self.spiderWorker, add_link_dictionary, self.spiderUpdate)
+
+    # this method is running in a SpiderService worker thread.
+    def spiderWorker(self, add_link_dictionary):
+        # get file_name and file size with spider
+        file_name, size = spider.spider(add_link_dictionary)
+
+        # update data base
+        dictionary = {'file_name': file_name, 'size': size, 'gid': add_link_dictionary['gid']}
+        self.persepolis_db.updateDownloadTable([dictionary])
+        return self.persepolis_db.searchGidInDownloadTable(dictionary['gid'])
+
     def spiderUpdate(self, download_dict):
         gid = download_dict['gid']
         row = None
@@ -5566,19 +6228,16 @@ class MainWindow(MainWindow_Ui):
                 # update download_table cell if update_list item in not None
                 text = update_list[i] if update_list[i] else self.download_table.item(row, i).text()
 
-                # create a QTableWidgetItem
-                item = QTableWidgetItem(text)
-
-                # set item
+                # text of item is changed, so tooltip of item (result of checksum) is kept.
                 try:
-                    self.download_table.setItem(row, i, item)
+                    self.download_table.item(row, i).setText(text)
                 except Exception as problem:
                     ghermez.sendToLog('Error occurred while updating download table', 'INFO')
                     ghermez.sendToLog(problem, 'ERROR')
 
     # this method deletes all items in data base
     def clearDownloadList(self, _item):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -5595,6 +6254,9 @@ class MainWindow(MainWindow_Ui):
             error_messageBox.setText(QCoreApplication.translate('mainwindow_src_ui_tr', 'Stop all downloads first!'))
             error_messageBox.setWindowTitle('Error!')
             error_messageBox.exec_()
+
+            # tell the CheckDownloadInfoThread that job is done!
+            globals.checking_gate.resume()
             return
 
         # reset data base
@@ -5610,7 +6272,7 @@ class MainWindow(MainWindow_Ui):
         self.download_table.setRowCount(0)
 
         # tell the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
 
     def showVideoFinderAddLinkWindow(self, input_dict=None, _menu=None):
         # first check youtube_dl_is_installed and ffmpeg_is_installed value!
@@ -5650,7 +6312,7 @@ class MainWindow(MainWindow_Ui):
     # call back of VideoFinderAddLink window.
     def videoFinderCallBack(self, add_link_dictionary_list, download_later, category):
         # if we have only one link so we can download it like other ordinary links
-        # but if we have seperated video and audio, then we must use VideoFinder thread and ...
+        # but if we have seperated video and audio, then we must use VideoFinderManager and ...
         if len(add_link_dictionary_list) == 1:
             self.callBack(add_link_dictionary_list[0], download_later, category)
             return
@@ -5771,15 +6433,9 @@ class MainWindow(MainWindow_Ui):
         self.all_video_finder_audio_gid_list.append(dictionary['audio_gid'])
 
         # if user didn't press download_later_pushButton in add_link window
-        # then create new qthread for new download!
+        # then create new video finder job for new download!
         if not (download_later):
-            new_download = VideoFinder(dictionary, self)
-            self.threadPool.append(new_download)
-            self.threadPool[-1].start()
-            self.threadPool[-1].VIDEOFINDERCOMPLETED.connect(self.videoFinderCompleted)
-
-            # add thread to video_finder_threads_dict
-            self.video_finder_threads_dict[dictionary['video_gid']] = new_download
+            self.video_finder_manager.startJob(dictionary)
 
             # open progress window for download.
             self.progressBarOpen(dictionary['video_gid'])
@@ -5790,25 +6446,19 @@ class MainWindow(MainWindow_Ui):
             else:
                 # write name and size of download files in download's table
                 for add_link_dictionary in add_link_dictionary_list:
-                    new_spider = SpiderThread(add_link_dictionary, self)
-                    self.threadPool.append(new_spider)
-                    self.threadPool[-1].start()
-                    self.threadPool[-1].SPIDERSIGNAL.connect(self.spiderUpdate)
+                    self.startSpider(add_link_dictionary)
 
         else:
             # write name and size of download files in download's table
             for add_link_dictionary in add_link_dictionary_list:
-                new_spider = SpiderThread(add_link_dictionary, self)
-                self.threadPool.append(new_spider)
-                self.threadPool[-1].start()
-                self.threadPool[-1].SPIDERSIGNAL.connect(self.spiderUpdate)
+                self.startSpider(add_link_dictionary)
 
-    # this method is called by VideoFinder thread
+    # this method is called by VideoFinderManager
     # this method handles error_message
     # if video finder done it's job successfully,
     # then this method shows AfterDownloadWindow
     def videoFinderCompleted(self, complete_dictionary):
-        if globals.checking_flag != CheckingFlag.StoppingJobs:
+        if not globals.checking_gate.isPaused():
             wait_check = WaitThread()
             self.threadPool.append(wait_check)
             self.threadPool[-1].start()
@@ -5817,8 +6467,8 @@ class MainWindow(MainWindow_Ui):
             self.videoFinderCompleted2(complete_dictionary)
 
     def videoFinderCompleted2(self, complete_dictionary):
-        # remove item from video_finder_threads_dict
-        del self.video_finder_threads_dict[complete_dictionary['video_gid']]
+        # remove item from video_finder_jobs_dict
+        del self.video_finder_manager.jobs_dict[complete_dictionary['video_gid']]
 
         error_message = complete_dictionary['error']
 
@@ -5953,8 +6603,137 @@ class MainWindow(MainWindow_Ui):
                 parent=self,
             )
 
+        elif error_message == 'muxing canceled':
+            notifySend(
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'Muxing canceled'),
+                complete_dictionary['download_path'],
+                10000,
+                'warning',
+                parent=self,
+            )
+
         # telling the CheckDownloadInfoThread that job is done!
-        globals.checking_flag = CheckingFlag.Normal
+        globals.checking_gate.resume()
+
+    # MuxingService emits MUXINGPROGRESSSIGNAL during muxing.
+    # show muxing percent and estimate time left in progress window.
+    def muxingProgress(self, video_gid, progress_dictionary):
+        if video_gid not in self.progress_window_list_dict:
+            return
+
+        member_number = self.progress_window_list_dict[video_gid]
+        progress_window = self.progress_window_list[member_number]
+
+        muxing_status = str(progress_dictionary['percent']) + '%'
+        if progress_dictionary['estimate_time_left']:
+            muxing_status = (
+                muxing_status
+                + ' - '
+                + QCoreApplication.translate('mainwindow_src_ui_tr', 'Estimated time left: ')
+                + progress_dictionary['estimate_time_left']
+            )
+
+        progress_window.muxing_status_label.setText(
+            QCoreApplication.translate('video_finder_progress_ui_tr', '<b>Muxing status: </b>') + muxing_status,
+        )
+        progress_window.download_progressBar.setValue(progress_dictionary['percent'])
+
+    # CheckDownloadInfoThread emits MIRRORSSIGNAL for downloads that have mirrors.
+    # show download speed of every uri in progress window.
+    def mirrorsUpdate(self, gid, server_list):
+        if gid not in self.progress_window_list_dict:
+            return
+
+        member_number = self.progress_window_list_dict[gid]
+        progress_window = self.progress_window_list[member_number]
+
+        mirrors_status = QCoreApplication.translate('progress_src_ui_tr', '<b>Mirrors: </b>')
+        for server in server_list:
+            host = urllib.parse.urlsplit(server['uri']).netloc
+            speed = ghermez.humanReadableSize(float(server['download_speed']), 'speed') + '/s'
+            mirrors_status = mirrors_status + '<br>' + host + ': ' + speed
+
+        progress_window.mirrors_label.setText(mirrors_status)
+
+    # MoveService emits MOVEPROGRESSSIGNAL when a completed download is copied to another hard disk.
+    def moveProgress(self, _gid, progress_dict):
+        percent = int(progress_dict['copied_size'] * 100 / (progress_dict['file_size'] or 1))
+        self.statusbar.showMessage(
+            QCoreApplication.translate('mainwindow_src_ui_tr', 'Moving ')
+            + progress_dict['file_name']
+            + ': '
+            + str(percent)
+            + '%',
+        )
+
+    # MoveService emits MOVEDONESIGNAL when a completed download is moved to download folder.
+    def moveDone(self, gid, result_dictionary):
+        if result_dictionary['error'] == 'no_error':
+            self.statusbar.clearMessage()
+
+            # verify checksum of file. see checksum_service.py
+            self.checksum_service.submit(gid, result_dictionary['final_path'])
+
+            # download complete window shows the final path
+            for afterdownloadwindow in self.afterdownload_list:
+                if afterdownloadwindow.dict['gid'] == gid:
+                    afterdownloadwindow.add_link_dict['download_path'] = result_dictionary['final_path']
+                    afterdownloadwindow.save_as_lineEdit.setText(result_dictionary['final_path'])
+                    afterdownloadwindow.save_as_lineEdit.setToolTip(result_dictionary['final_path'])
+
+        elif result_dictionary['error'] == 'not enough free space':
+            notifySend(
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'Insufficient disk space!'),
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'Please change download folder'),
+                10000,
+                'fail',
+                parent=self,
+            )
+
+        elif result_dictionary['error'] != 'file not found':
+            notifySend(
+                str(result_dictionary['file_name']),
+                QCoreApplication.translate('mainwindow_src_ui_tr', 'Persepolis can not move file'),
+                10000,
+                'fail',
+                parent=self,
+            )
+
+    # see checksum_service.py
+    def checksumText(self, status):
+        if status == CHECKSUM_VERIFIED:
+            return QCoreApplication.translate('mainwindow_src_ui_tr', 'Checksum is verified')
+
+        if status == CHECKSUM_MISMATCH:
+            return QCoreApplication.translate('mainwindow_src_ui_tr', 'Checksum is not correct! File is corrupted.')
+
+        return QCoreApplication.translate('mainwindow_src_ui_tr', 'Checksum is not verified')
+
+    # show result of checksum verification in tooltip of status of all rows of download_table
+    def checksumToolTips(self):
+        checksum_dict = self.persepolis_db.returnChecksumStatuses()
+        for row in range(self.download_table.rowCount()):
+            gid = self.download_table.item(row, 8).text()
+            if gid in checksum_dict:
+                self.download_table.item(row, 1).setToolTip(self.checksumText(checksum_dict[gid]))
+
+    def checksumDone(self, gid, status):
+        for row in range(self.download_table.rowCount()):
+            if self.download_table.item(row, 8).text() == gid:
+                self.download_table.item(row, 1).setToolTip(self.checksumText(status))
+                file_name = self.download_table.item(row, 0).text()
+                break
+        else:
+            file_name = self.persepolis_db.searchGidInDownloadTable(gid)['file_name']
+
+        if status == CHECKSUM_MISMATCH:
+            notifySend(
+                str(file_name),
+                self.checksumText(status),
+                10000,
+                'fail',
+                parent=self,
+            )
 
     # this method is called, if user clicks on muxing_pushButton
     def muxingPushButtonPressed(self, _button):
@@ -5983,15 +6762,9 @@ class MainWindow(MainWindow_Ui):
             # read data from data base
             result_dictionary = self.persepolis_db.searchGidInVideoFinderTable(gid)
 
-            # create new thread for this download
-            # see VideoFinder thread for more information
-            new_download = VideoFinder(result_dictionary, self)
-            self.threadPool.append(new_download)
-            self.threadPool[-1].start()
-            self.threadPool[-1].VIDEOFINDERCOMPLETED.connect(self.videoFinderCompleted)
-
-            # add thread to video_finder_threads_dict
-            self.video_finder_threads_dict[result_dictionary['video_gid']] = new_download
+            # create new video finder job for this download
+            # see VideoFinderManager for more information
+            self.video_finder_manager.startJob(result_dictionary)
 
             # create new progress_window
             self.progressBarOpen(gid)
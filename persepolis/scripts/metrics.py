@@ -0,0 +1,246 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import bisect
+import functools
+import http.server
+import threading
+import time
+import xmlrpc.client
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from persepolis.constants.status import DownloadStatus
+from persepolis.scripts.aria2_pool import MethodGroup
+
+# buckets of duration histograms in seconds
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# content type of prometheus text format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+GAUGE = 'gauge'
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+
+# name, type and help of metrics that engine and MainWindow both serve.
+# see engine.py and download.py
+COMMON_METRICS = (
+    ('ghermez_aria2_up', GAUGE, '1 if aria2 answered last request of metrics.'),
+    ('ghermez_global_download_speed_bytes', GAUGE, 'Download speed of aria2 in bytes per second.'),
+    ('ghermez_global_upload_speed_bytes', GAUGE, 'Upload speed of aria2 in bytes per second.'),
+    ('ghermez_aria2_downloads', GAUGE, 'Number of active, waiting and stopped downloads in aria2.'),
+    ('ghermez_downloads', GAUGE, 'Number of downloads in data base by status.'),
+    ('ghermez_poll_errors_total', COUNTER, 'Number of polls that aria2 did not answer.'),
+    ('ghermez_poll_duration_seconds', HISTOGRAM, 'Duration of checking downloads and queues.'),
+    ('ghermez_aria2_rpc_duration_seconds', HISTOGRAM, 'Duration of XML-RPC calls to aria2.'),
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # number of values of every bucket. last one is +Inf.
+        self.count_list = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count_list[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum = self.sum + value
+
+
+def formatLabels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+
+    label_list = []
+    for name, value in labels:
+        value_text = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        label_list.append(name + '="' + value_text + '"')
+
+    return '{' + ','.join(label_list) + '}'
+
+
+def formatNumber(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+
+    return repr(float(value))
+
+
+# Metrics keeps values of gauges, counters and histograms. every metric is described once
+# with describe and its values are set with labels. render returns prometheus text format.
+# metrics are changed by many threads, so they are locked.
+class Metrics:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+
+        # key = name of metric and value = (type, help)
+        self.description_dict: dict[str, tuple[str, str]] = {}
+
+        # key = name of metric and value = dictionary of labels and values
+        self.value_dict: dict[str, dict[tuple[tuple[str, str], ...], Any]] = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        self.description_dict[name] = (metric_type, help_text)
+        self.value_dict[name] = {}
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self.lock:
+            self.value_dict[name][tuple(sorted(labels.items()))] = value
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.value_dict[name][key] = self.value_dict[name].get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            histogram = self.value_dict[name].get(key)
+            if histogram is None:
+                histogram = Histogram(DURATION_BUCKETS)
+                self.value_dict[name][key] = histogram
+
+            histogram.observe(value)
+
+    # replace all values of metric. for example speed of downloads, so finished downloads are removed.
+    # value_list contains labels and value of every item.
+    def replace(self, name: str, value_list: list[tuple[dict[str, str], float]]) -> None:
+        new_value_dict = {tuple(sorted(labels.items())): value for labels, value in value_list}
+        with self.lock:
+            self.value_dict[name] = new_value_dict
+
+    # observe duration of with block in histogram
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start_time, **labels)
+
+    def render(self) -> str:
+        line_list = []
+        with self.lock:
+            for name, (metric_type, help_text) in self.description_dict.items():
+                line_list.append('# HELP ' + name + ' ' + help_text)
+                line_list.append('# TYPE ' + name + ' ' + metric_type)
+
+                for labels, value in self.value_dict[name].items():
+                    if metric_type == HISTOGRAM:
+                        line_list.extend(self.renderHistogram(name, labels, value))
+                    else:
+                        line_list.append(name + formatLabels(labels) + ' ' + formatNumber(value))
+
+        return '\n'.join(line_list) + '\n'
+
+    def renderHistogram(self, name: str, labels: tuple[tuple[str, str], ...], histogram: Histogram) -> list[str]:
+        line_list = []
+        cumulative_count = 0
+        for bucket, count in zip((*histogram.buckets, '+Inf'), histogram.count_list):
+            cumulative_count = cumulative_count + count
+            bucket_labels = (*labels, ('le', bucket if bucket == '+Inf' else formatNumber(bucket)))
+            line_list.append(name + '_bucket' + formatLabels(bucket_labels) + ' ' + str(cumulative_count))
+
+        line_list.append(name + '_sum' + formatLabels(labels) + ' ' + formatNumber(histogram.sum))
+        line_list.append(name + '_count' + formatLabels(labels) + ' ' + str(cumulative_count))
+        return line_list
+
+
+# MeasuredServer has the interface of xmlrpc.client.ServerProxy and Aria2Pool.
+# it observes duration of every call to aria2 in histogram of metric_name.
+class MeasuredServer:
+    def __init__(self, server: Any, metrics: Metrics, metric_name: str) -> None:
+        self.server = server
+        self.metrics = metrics
+        self.metric_name = metric_name
+        self.aria2 = MethodGroup(self, 'aria2')
+        self.system = MethodGroup(self, 'system')
+
+    def call(self, method_name: str, *params: Any) -> Any:
+        method = functools.reduce(getattr, method_name.split('.'), self.server)
+        with self.metrics.timer(self.metric_name, method=method_name):
+            return method(*params)
+
+
+# MeasuredDataBase observes duration of every method of data base in histogram of metric_name.
+# methods of data base wait for lock of data base, so waiting time is in duration.
+class MeasuredDataBase:
+    def __init__(self, persepolis_db: Any, metrics: Metrics, metric_name: str) -> None:
+        self.persepolis_db = persepolis_db
+        self.metrics = metrics
+        self.metric_name = metric_name
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self.persepolis_db, name)
+
+        def measuredMethod(*args: Any, **kwargs: Any) -> Any:
+            with self.metrics.timer(self.metric_name, method=name):
+                return method(*args, **kwargs)
+
+        return measuredMethod
+
+
+# aria2 is checked when metrics are requested
+def collectAria2(metrics: Metrics, server: Any) -> None:
+    try:
+        global_stat = server.aria2.getGlobalStat()
+    except (OSError, xmlrpc.client.Error):
+        metrics.set('ghermez_aria2_up', 0)
+        return
+
+    metrics.set('ghermez_aria2_up', 1)
+    metrics.set('ghermez_global_download_speed_bytes', int(global_stat['downloadSpeed']))
+    metrics.set('ghermez_global_upload_speed_bytes', int(global_stat['uploadSpeed']))
+    for state in ('active', 'waiting', 'stopped'):
+        metrics.set('ghermez_aria2_downloads', int(global_stat['num' + state.capitalize()]), state=state)
+
+
+# download_list is the list of dictionaries of download_db_table
+def collectDownloads(metrics: Metrics, download_list: list[dict[str, str]]) -> None:
+    status_counter = Counter(download_dict['status'] for download_dict in download_list)
+    metrics.replace(
+        'ghermez_downloads',
+        [({'status': status.value}, status_counter[status.value]) for status in DownloadStatus],
+    )
+
+
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = self.server.collect().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # requests are not written in terminal
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+# MetricsServer answers GET /metrics on localhost. collect returns text of metrics.
+class MetricsServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, collect: Callable[[], str]) -> None:
+        self.collect = collect
+        super().__init__(('127.0.0.1', port), MetricsRequestHandler)
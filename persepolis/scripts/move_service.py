@@ -0,0 +1,59 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+try:
+    from PySide6.QtCore import QObject, Signal
+except ImportError:
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtCore import pyqtSignal as Signal
+
+from persepolis.scripts.file_mover import FileMover
+
+if TYPE_CHECKING:
+    from ghermez import DataBase
+
+
+# MoveService moves completed downloads from temp download folder to download folder.
+# tellStatus submits the job and CheckDownloadInfoThread continues checking other downloads.
+# see tellStatus in download.py and FileMover in file_mover.py
+#
+# tellStatus writes the temp file as download_path before submitting the job.
+# moves that are not finished when persepolis is closed stay in move_db_table and
+# they are resumed by BatchMoveThread in next start. see batch_move.py
+#
+# MOVEPROGRESSSIGNAL sends gid and a dictionary with file_name, copied_size and file_size keys.
+# MOVEDONESIGNAL sends gid and a dictionary with file_name, error and final_path keys.
+# error is 'no_error', 'not enough free space' or error message of operating system.
+class MoveService(QObject):
+    MOVEPROGRESSSIGNAL = Signal(str, dict)
+    MOVEDONESIGNAL = Signal(str, dict)
+
+    def __init__(self, persepolis_db: DataBase) -> None:
+        super().__init__()
+        self.file_mover = FileMover(persepolis_db, self.MOVEPROGRESSSIGNAL.emit, self.MOVEDONESIGNAL.emit)
+
+    # returns False if file is moving now or destination file can't be reserved.
+    def submit(self, gid: str, path: str, download_path: str, file_name: str, file_size: int | None) -> bool:
+        return self.file_mover.submit(gid, path, download_path, file_name, file_size)
+
+    # returns True if job is waiting in queue or file is moving.
+    def isMoving(self, gid: str) -> bool:
+        return self.file_mover.isMoving(gid)
+
+    # stop worker after current job. MainWindow calls this method when persepolis is closing.
+    def shutdown(self) -> None:
+        self.file_mover.shutdown()
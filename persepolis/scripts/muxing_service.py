@@ -0,0 +1,157 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING, Any
+
+try:
+    from PySide6.QtCore import QObject, Signal
+except ImportError:
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtCore import pyqtSignal as Signal
+
+import ghermez
+from persepolis.scripts.useful_tools import muxer
+
+if TYPE_CHECKING:
+    import subprocess
+
+    try:
+        from PySide6.QtWidgets import QWidget
+    except ImportError:
+        from PyQt5.QtWidgets import QWidget
+
+
+class MuxingJob:
+    def __init__(self, video_gid: str, video_finder_dictionary: dict[str, str]) -> None:
+        self.video_gid = video_gid
+        self.video_finder_dictionary = video_finder_dictionary
+        self.pipe: subprocess.Popen | None = None
+        self.canceled = False
+
+
+# MuxingService runs ffmpeg muxing jobs of video finder.
+# jobs are waiting in a queue and number of running ffmpeg processes
+# is limited to number of cpu cores. so if many video finder downloads are
+# completed at the same time, ffmpeg processes don't stampede the cpu.
+#
+# MUXINGPROGRESSSIGNAL sends video_gid and a dictionary with percent and estimate_time_left keys.
+# MUXINGDONESIGNAL sends video_gid and result dictionary of muxer function.
+# if job is canceled, error value in result dictionary is 'muxing canceled'.
+class MuxingService(QObject):
+    MUXINGPROGRESSSIGNAL = Signal(str, dict)
+    MUXINGDONESIGNAL = Signal(str, dict)
+
+    def __init__(self, parent: QWidget, max_workers: int | None = None) -> None:
+        super().__init__()
+        self.parent = parent
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self.jobs_queue: queue.Queue[MuxingJob | None] = queue.Queue()
+
+        # key = video_gid and value = MuxingJob (waiting or running)
+        self.jobs_dict: dict[str, MuxingJob] = {}
+        self.lock = threading.Lock()
+
+        self.workers: list[threading.Thread] = []
+
+    # add a muxing job to the queue
+    def submit(self, video_gid: str, video_finder_dictionary: dict[str, str]) -> None:
+        with self.lock:
+            if video_gid in self.jobs_dict:
+                return
+
+            job = MuxingJob(video_gid, video_finder_dictionary)
+            self.jobs_dict[video_gid] = job
+
+            # workers are started when they are needed
+            if len(self.workers) < self.max_workers:
+                worker = threading.Thread(target=self.work, name='muxer', daemon=True)
+                self.workers.append(worker)
+                worker.start()
+
+        self.jobs_queue.put(job)
+
+    # returns True if job is waiting in queue or ffmpeg is running for it.
+    def isMuxing(self, video_gid: str) -> bool:
+        return video_gid in self.jobs_dict
+
+    # cancel waiting job or kill ffmpeg process of running job.
+    def cancel(self, video_gid: str) -> bool:
+        with self.lock:
+            job = self.jobs_dict.get(video_gid)
+            if job is None:
+                return False
+
+            job.canceled = True
+            if job.pipe is not None and job.pipe.poll() is None:
+                job.pipe.terminate()
+
+        ghermez.sendToLog('Muxing canceled - GID : ' + str(video_gid), 'INFO')
+        return True
+
+    # cancel all jobs and stop workers. MainWindow calls this method when persepolis is closing.
+    def shutdown(self) -> None:
+        for video_gid in list(self.jobs_dict):
+            self.cancel(video_gid)
+
+        for _ in self.workers:
+            self.jobs_queue.put(None)
+
+    def work(self) -> None:
+        while True:
+            job = self.jobs_queue.get()
+            if job is None:
+                break
+
+            result_dictionary = self.canceledResult() if job.canceled else self.runJob(job)
+
+            with self.lock:
+                del self.jobs_dict[job.video_gid]
+
+            self.MUXINGDONESIGNAL.emit(job.video_gid, result_dictionary)
+
+    def runJob(self, job: MuxingJob) -> dict[str, Any]:
+        def started(pipe: subprocess.Popen) -> None:
+            with self.lock:
+                job.pipe = pipe
+                # job was canceled before ffmpeg started
+                if job.canceled:
+                    pipe.terminate()
+
+        def progress(progress_dictionary: dict[str, Any]) -> None:
+            self.MUXINGPROGRESSSIGNAL.emit(job.video_gid, progress_dictionary)
+
+        try:
+            result_dictionary = muxer(self.parent, job.video_finder_dictionary, progress, started)
+        except Exception as error:
+            result_dictionary = {
+                'error': 'ffmpeg error',
+                'ffmpeg_error_message': str(error),
+                'final_path': None,
+                'final_size': None,
+            }
+
+        # if ffmpeg was finished before canceling, keep the result.
+        # muxer removed incomplete output file.
+        if job.canceled and result_dictionary['error'] != 'no error':
+            result_dictionary = self.canceledResult()
+
+        return result_dictionary
+
+    def canceledResult(self) -> dict[str, Any]:
+        return {'error': 'muxing canceled', 'ffmpeg_error_message': None, 'final_path': None, 'final_size': None}
@@ -141,7 +141,12 @@ class PersepolisApplication(QApplication):
 
 
 # create  terminal arguments
-parser = argparse.ArgumentParser(description=LONG_NAME)
+# subcommands are handled by cli.py before this file is imported. see __main__.py
+parser = argparse.ArgumentParser(
+    description=LONG_NAME,
+    epilog='Commands for scripts: add, list, wait, pause, resume and metrics. '
+    'They send requests to ghermez engine. Run "ghermez <command> --help" for more information.',
+)
 # parser.add_argument('chromium', nargs = '?', default = 'no',
 #                     help='this switch is used for chrome native messaging in Linux and Mac')
 parser.add_argument('--link', action='store', nargs=1, help='Download link.(Use "" for links)')
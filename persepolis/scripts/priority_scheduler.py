@@ -0,0 +1,87 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from time import sleep
+
+from . import globals
+
+try:
+    from PySide6.QtCore import QThread
+except ImportError:
+    from PyQt5.QtCore import QThread
+
+import ghermez
+from persepolis.constants.status import ShutdownNotification
+from persepolis.scripts import download
+
+# seconds between two checks
+CHECK_INTERVAL = 2
+
+
+# returns moves that sort waiting_list by priority. downloads with same priority keep their order.
+# every move is a (gid, position) tuple for aria2.changePosition with POS_SET.
+def positionChanges(waiting_list: list[str], priority_dict: dict[str, int]) -> list[tuple[str, int]]:
+    sorted_list = sorted(waiting_list, key=lambda gid: -priority_dict.get(gid, 0))
+
+    current_list = list(waiting_list)
+    position_list = []
+    for position, gid in enumerate(sorted_list):
+        if current_list[position] != gid:
+            current_list.remove(gid)
+            current_list.insert(position, gid)
+            position_list.append((gid, position))
+
+    return position_list
+
+
+# PrioritySchedulerThread keeps aria2 waiting list sorted by priority.
+# priority of download is set in add link window or properties window and
+# priority of queue is set in queue panel. downloads without priority get priority of their queue.
+# aria2 starts downloads from the front of waiting list, so urgent downloads start sooner
+# without stopping other downloads.
+class PrioritySchedulerThread(QThread):
+    def __init__(self, parent) -> None:
+        super().__init__()
+        self.parent = parent
+
+    def run(self):
+        while globals.shutdown_notification == ShutdownNotification.Running and globals.aria_startup_answer != 'ready':
+            sleep(1)
+
+        while globals.shutdown_notification == ShutdownNotification.Running:
+            sleep(CHECK_INTERVAL)
+
+            # most of the time, nothing is waiting in aria2.
+            waiting_list = download.tellWaiting()
+            if waiting_list is None or len(waiting_list) < 2:  # noqa: PLR2004
+                continue
+
+            priority_dict = self.parent.persepolis_db.returnPriorities()
+            if not priority_dict:
+                continue
+
+            # every aria2 process has its own waiting list and positions are relative to it.
+            # see aria2_pool.py
+            shard_waiting_dict = {}
+            for gid in waiting_list:
+                shard_waiting_dict.setdefault(ghermez.shardOf(gid, download.aria2_daemons), []).append(gid)
+
+            position_list = [
+                position
+                for shard_waiting_list in shard_waiting_dict.values()
+                for position in positionChanges(shard_waiting_list, priority_dict)
+            ]
+            if position_list and download.changePositionBatch(position_list):
+                ghermez.sendToLog(str(len(position_list)) + ' downloads are moved in waiting list', 'INFO')
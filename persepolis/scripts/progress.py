@@ -75,6 +75,11 @@ class ProgressWindow(ProgressWindow_Ui):
         if self.translator.load(':/translations/locales/ui_' + locale, 'ts'):
             QCoreApplication.installTranslator(self.translator)
 
+        # other uris of download. see mirrorsUpdate in mainwindow.py
+        self.mirror_list = self.parent.persepolis_db.searchGidInMirrorTable(gid)
+        if self.mirror_list:
+            self.mirrors_label.show()
+
         # check if limit speed activated by user or not
         add_link_dictionary = self.parent.persepolis_db.searchGidInAddLinkTable(gid)
 
@@ -177,6 +177,10 @@ class PropertiesWindow(AddLinkWindow_Ui):
         except ValueError:
             pass
 
+        # priority
+        self.priority = self.parent.persepolis_db.searchGidInPriorityTable(self.gid_1)
+        self.priority_spinBox.setValue(self.priority)
+
         # get categories name and add them to add_queue_comboBox
         categories_list = self.parent.persepolis_db.categoriesList()
         for queue in categories_list:
@@ -428,6 +432,12 @@ class PropertiesWindow(AddLinkWindow_Ui):
             self.add_link_dictionary_2['user_agent'] = user_agent
             self.add_link_dictionary_2['load_cookies'] = load_cookies
 
+        # priority of video and audio are same
+        if self.priority_spinBox.value() != self.priority:
+            self.parent.persepolis_db.setPriority(self.gid_1, self.priority_spinBox.value())
+            if self.video_finder_dictionary:
+                self.parent.persepolis_db.setPriority(self.gid_2, self.priority_spinBox.value())
+
         new_category = str(self.add_queue_comboBox.currentText())
 
         # it means category changed and data base must be updated.
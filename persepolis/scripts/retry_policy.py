@@ -0,0 +1,244 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from time import sleep
+
+from . import globals
+
+try:
+    from PySide6.QtCore import QThread, Signal
+except ImportError:
+    from PyQt5.QtCore import QThread
+    from PyQt5.QtCore import pyqtSignal as Signal
+
+import ghermez
+from persepolis.constants.status import ShutdownNotification
+from persepolis.scripts.connection_tuner import linkHost
+
+# aria2 exit status codes. see EXIT STATUS section of aria2c manual.
+# key = errorCode and value = (max number of retries, base delay in seconds)
+# other errors (file not found, disk is full, authorization failed, ...) are not retried.
+RETRY_POLICIES = {
+    '1': (3, 30),  # unknown error
+    '2': (5, 15),  # time out
+    '5': (5, 30),  # download speed was too slow
+    '6': (8, 15),  # network problem
+    '8': (1, 5),  # server doesn't support resume
+    '19': (5, 60),  # name resolution failed
+    '21': (3, 30),  # FTP command failed
+    '22': (3, 30),  # unexpected HTTP response header
+    '23': (2, 60),  # too many redirects
+    '29': (6, 60),  # server is overloaded or in maintenance
+    '32': (2, 5),  # checksum validation failed
+}
+
+# these errors show that host has a problem, not the file. they are counted by circuit breaker of host.
+HOST_ERROR_CODES = {'2', '6', '19', '22', '29'}
+
+MAX_DELAY = 3600
+
+# circuit breaker of host is opened after BREAKER_THRESHOLD host errors in a row.
+# breaker is closed after BREAKER_COOLDOWN seconds and it's doubled for every next error.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60
+MAX_BREAKER_COOLDOWN = 1800
+
+# seconds between two checks
+CHECK_INTERVAL = 1
+
+
+# exponential backoff with jitter. delay is between half and all of base_delay * 2 ^ attempt.
+# jitter stops downloads of one host from retrying at the same time.
+def backoffDelay(attempt: int, base_delay: float) -> float:
+    delay = min(MAX_DELAY, base_delay * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+
+
+class CircuitBreaker:
+    def __init__(self) -> None:
+        # keys are hosts
+        self.failures: dict[str, int] = {}
+        self.open_until: dict[str, float] = {}
+
+    def isOpen(self, host: str, now: float) -> bool:
+        return self.open_until.get(host, 0) > now
+
+    # returns True if breaker is opened.
+    def recordFailure(self, host: str, now: float) -> bool:
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if self.failures[host] < BREAKER_THRESHOLD:
+            return False
+
+        cooldown = min(MAX_BREAKER_COOLDOWN, BREAKER_COOLDOWN * 2 ** (self.failures[host] - BREAKER_THRESHOLD))
+        self.open_until[host] = now + cooldown
+        return True
+
+    # breaker is half open when cooldown is finished. only one download of host is tried
+    # and breaker is opened again until result of that download is known.
+    def isHalfOpen(self, host: str) -> bool:
+        return self.failures.get(host, 0) >= BREAKER_THRESHOLD
+
+    def holdOpen(self, host: str, now: float) -> None:
+        self.open_until[host] = now + BREAKER_COOLDOWN
+
+    # returns False if nothing changed.
+    def recordSuccess(self, host: str) -> bool:
+        if not self.failures.get(host):
+            return False
+
+        self.failures.pop(host, None)
+        self.open_until.pop(host, None)
+        return True
+
+
+class RetryItem:
+    def __init__(self, gid: str, attempts: int, next_try: float, error_code: str, host: str) -> None:
+        self.gid = gid
+        self.attempts = attempts
+        self.next_try = next_try
+        self.error_code = error_code
+        self.host = host
+
+
+# RetryThread retries failed single downloads.
+# MainWindow.checkDownloadInfo calls downloadFailed and downloadCompleted and
+# this thread emits RETRYSIGNAL when it's time to start the download again.
+# downloads of hosts that their circuit breaker is open wait, but other hosts proceed.
+# retry items and circuit breakers are saved in data base and they survive restarts.
+class RetryThread(QThread):
+    RETRYSIGNAL = Signal(str)
+
+    def __init__(self, parent) -> None:
+        super().__init__()
+        self.parent = parent
+        self.lock = threading.Lock()
+
+        self.breaker = CircuitBreaker()
+        for breaker_dict in self.parent.persepolis_db.returnItemsInBreakerTable():
+            self.breaker.failures[breaker_dict['host']] = int(breaker_dict['failures'])
+            self.breaker.open_until[breaker_dict['host']] = float(breaker_dict['open_until'])
+
+        # key = gid and value = RetryItem
+        self.retry_dict: dict[str, RetryItem] = {}
+        for retry_dict in self.parent.persepolis_db.returnItemsInRetryTable():
+            self.retry_dict[retry_dict['gid']] = RetryItem(
+                retry_dict['gid'],
+                int(retry_dict['attempts']),
+                float(retry_dict['next_try']),
+                retry_dict['error_code'],
+                retry_dict['host'],
+            )
+
+    # returns delay of next try or None if download must not be retried.
+    def downloadFailed(self, gid: str, error_code: str | None, link: str | None) -> float | None:
+        now = time.time()
+        host = linkHost(link) or ''
+        error_code = str(error_code)
+
+        with self.lock:
+            if host and error_code in HOST_ERROR_CODES:
+                if self.breaker.recordFailure(host, now):
+                    ghermez.sendToLog('Circuit breaker is open for ' + host, 'INFO')
+                self.saveBreaker(host)
+
+            item = self.retry_dict.get(gid)
+            attempts = item.attempts if item else 0
+
+            max_retries, base_delay = RETRY_POLICIES.get(error_code, (0, 0))
+            if attempts >= max_retries:
+                self.forget(gid)
+                return None
+
+            delay = backoffDelay(attempts, base_delay)
+            item = RetryItem(gid, attempts + 1, now + delay, error_code, host)
+            self.retry_dict[gid] = item
+            self.parent.persepolis_db.updateRetryTable(
+                {
+                    'gid': gid,
+                    'attempts': str(item.attempts),
+                    'next_try': str(item.next_try),
+                    'error_code': error_code,
+                    'host': host,
+                },
+            )
+
+        ghermez.sendToLog(
+            'Download will be retried in ' + str(int(delay)) + ' seconds - GID : ' + str(gid),
+            'INFO',
+        )
+        return delay
+
+    def downloadCompleted(self, gid: str, link: str | None) -> None:
+        host = linkHost(link) or ''
+        with self.lock:
+            if gid in self.retry_dict:
+                self.forget(gid)
+
+            if host and self.breaker.recordSuccess(host):
+                ghermez.sendToLog('Circuit breaker is closed for ' + host, 'INFO')
+                self.saveBreaker(host)
+
+    # user stopped or removed the download.
+    def cancel(self, gid: str) -> None:
+        with self.lock:
+            if gid in self.retry_dict:
+                self.forget(gid)
+
+    # lock must be held by caller
+    def forget(self, gid: str) -> None:
+        self.retry_dict.pop(gid, None)
+        self.parent.persepolis_db.deleteItemInRetryTable(gid)
+
+    # lock must be held by caller
+    def saveBreaker(self, host: str) -> None:
+        if not host:
+            return
+
+        self.parent.persepolis_db.updateBreakerTable(
+            {
+                'host': host,
+                'failures': str(self.breaker.failures.get(host, 0)),
+                'open_until': str(self.breaker.open_until.get(host, 0)),
+            },
+        )
+
+    def run(self):
+        while globals.shutdown_notification == ShutdownNotification.Running and globals.aria_startup_answer != 'ready':
+            sleep(1)
+
+        while globals.shutdown_notification == ShutdownNotification.Running:
+            sleep(CHECK_INTERVAL)
+
+            now = time.time()
+            due_list = []
+            with self.lock:
+                for item in sorted(self.retry_dict.values(), key=lambda item: item.next_try):
+                    if item.next_try > now or self.breaker.isOpen(item.host, now):
+                        continue
+
+                    if self.breaker.isHalfOpen(item.host):
+                        # only one download is tried
+                        self.breaker.holdOpen(item.host, now)
+                        self.saveBreaker(item.host)
+
+                    # next try is set again when download fails again
+                    item.next_try = float('inf')
+                    due_list.append(item.gid)
+
+            for gid in due_list:
+                self.RETRYSIGNAL.emit(gid)
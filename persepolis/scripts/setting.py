@@ -105,12 +105,20 @@ class PreferencesWindow(Setting_Ui):
         self.time_out_spinBox.setValue(int(self.persepolis_setting.value('timeout')))
         self.connections_spinBox.setValue(int(self.persepolis_setting.value('connections')))
         self.rpc_port_spinbox.setValue(int(self.persepolis_setting.value('rpc-port')))
+        self.aria2_daemons_spinBox.setValue(int(self.persepolis_setting.value('aria2-daemons')))
 
         if str(self.persepolis_setting.value('dont-check-certificate')) == 'yes':
             self.dont_check_certificate_checkBox.setChecked(True)
         else:
             self.dont_check_certificate_checkBox.setChecked(False)
 
+        if str(self.persepolis_setting.value('auto-tune-connections')) == 'yes':
+            self.auto_tune_connections_checkBox.setChecked(True)
+        else:
+            self.auto_tune_connections_checkBox.setChecked(False)
+
+        self.bandwidth_schedule_plainTextEdit.setPlainText(str(self.persepolis_setting.value('bandwidth-schedule')))
+
         # add support for other languages
         locale = str(self.persepolis_setting.value('settings/locale'))
         QLocale.setDefault(QLocale(locale))
@@ -153,6 +161,8 @@ class PreferencesWindow(Setting_Ui):
         else:
             self.subfolder_checkBox.setChecked(False)
 
+        self.download_rules_plainTextEdit.setPlainText(str(self.persepolis_setting.value('download-rules')))
+
         # notifications_tab
         self.volume_label.setText('Volume : ' + str(self.persepolis_setting.value('sound-volume')))
         self.volume_dial.setValue(int(self.persepolis_setting.value('sound-volume')))
@@ -211,6 +221,14 @@ class PreferencesWindow(Setting_Ui):
         # call setDarkLightIcon if index is changed
         self.icons_size_comboBox.currentIndexChanged.connect(self.setDarkLightIcon)
 
+        # set file allocation method. see --file-allocation in aria2c manual.
+        file_allocations = ['none', 'prealloc', 'trunc', 'falloc']
+        self.file_allocation_comboBox.addItems(file_allocations)
+        current_file_allocation_index = self.file_allocation_comboBox.findText(
+            str(self.persepolis_setting.value('file-allocation')),
+        )
+        self.file_allocation_comboBox.setCurrentIndex(current_file_allocation_index)
+
         # set notification
         notifications = ['Native notification', 'QT notification']
         self.notification_comboBox.addItems(notifications)
@@ -686,6 +704,7 @@ class PreferencesWindow(Setting_Ui):
         self.connections_spinBox.setValue(int(self.setting_dict['connections']))
 
         self.rpc_port_spinbox.setValue(int(self.setting_dict['rpc-port']))
+        self.aria2_daemons_spinBox.setValue(int(self.setting_dict['aria2-daemons']))
         self.aria2_path_lineEdit.setText('')
         self.aria2_path_checkBox.setChecked(False)
 
@@ -697,11 +716,24 @@ class PreferencesWindow(Setting_Ui):
         # dont_check_certificate_checkBox
         self.dont_check_certificate_checkBox.setChecked(False)
 
+        # auto_tune_connections_checkBox
+        self.auto_tune_connections_checkBox.setChecked(True)
+
+        # file_allocation_comboBox
+        current_file_allocation_index = self.file_allocation_comboBox.findText(
+            str(self.setting_dict['file-allocation']),
+        )
+        self.file_allocation_comboBox.setCurrentIndex(current_file_allocation_index)
+
+        # bandwidth_schedule_plainTextEdit
+        self.bandwidth_schedule_plainTextEdit.setPlainText(self.setting_dict['bandwidth-schedule'])
+
         # save_as_tab
         self.download_folder_lineEdit.setText(str(self.setting_dict['download_path']))
         self.temp_download_lineEdit.setText(str(self.setting_dict['download_path_temp']))
 
         self.subfolder_checkBox.setChecked(True)
+        self.download_rules_plainTextEdit.setPlainText(self.setting_dict['download-rules'])
 
         # notifications_tab
         self.volume_label.setText('Volume : ' + str(self.setting_dict['sound-volume']))
@@ -824,6 +856,7 @@ class PreferencesWindow(Setting_Ui):
         self.persepolis_setting.setValue('timeout', self.time_out_spinBox.value())
         self.persepolis_setting.setValue('connections', self.connections_spinBox.value())
         self.persepolis_setting.setValue('rpc-port', self.rpc_port_spinbox.value())
+        self.persepolis_setting.setValue('aria2-daemons', self.aria2_daemons_spinBox.value())
         self.persepolis_setting.setValue('download_path', self.download_folder_lineEdit.text())
         self.persepolis_setting.setValue('download_path_temp', self.temp_download_lineEdit.text())
         self.persepolis_setting.setValue('sound-volume', self.volume_dial.value())
@@ -840,6 +873,15 @@ class PreferencesWindow(Setting_Ui):
         else:
             self.persepolis_setting.setValue('dont-check-certificate', 'no')
 
+        if self.auto_tune_connections_checkBox.isChecked():
+            self.persepolis_setting.setValue('auto-tune-connections', 'yes')
+        else:
+            self.persepolis_setting.setValue('auto-tune-connections', 'no')
+
+        self.persepolis_setting.setValue('bandwidth-schedule', self.bandwidth_schedule_plainTextEdit.toPlainText())
+
+        self.persepolis_setting.setValue('file-allocation', self.file_allocation_comboBox.currentText())
+
         # changing icons
 
         icons = self.icon_comboBox.currentText()
@@ -992,6 +1034,8 @@ class PreferencesWindow(Setting_Ui):
         else:
             self.persepolis_setting.setValue('subfolder', 'no')
 
+        self.persepolis_setting.setValue('download-rules', self.download_rules_plainTextEdit.toPlainText())
+
         for folder in folder_list:
             ghermez.makeDirs(folder)
 
@@ -1149,10 +1193,12 @@ class PreferencesWindow(Setting_Ui):
                 'download_path',
                 'custom-font',
                 'rpc-port',
+                'aria2-daemons',
                 'max-tries',
                 'retry-wait',
                 'timeout',
                 'connections',
+                'auto-tune-connections',
                 'style',
                 'font',
                 'font-size',
@@ -13,10 +13,17 @@
 
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
 from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
 
 import requests
-from requests.cookies import cookiejar_from_dict
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
 from ghermez import humanReadableSize
 
@@ -24,34 +31,134 @@ from ghermez import humanReadableSize
 # http://docs.python-requests.org/en/master/
 
 
-# spider function finds name of file and file size from header
-def spider(add_link_dictionary: dict[str, str]) -> tuple[str, str | None]:
-    # get user's download request from add_link_dictionary
+# SessionPool keeps one keep-alive requests.Session for every host.
+# so spidering many links of one host, reuses tcp connections and tls handshakes.
+# number of parallel requests to one host is limited by per_host_limit.
+#
+# sessions are shared between different downloads, so nothing of a download (cookies, auth, referer, ...)
+# is stored in the session. they are sent with every request and cookies of responses are not kept.
+class SessionPool:
+    def __init__(self, per_host_limit: int = 4, max_hosts: int = 64) -> None:
+        self.per_host_limit = per_host_limit
+        self.max_hosts = max_hosts
+        self.lock = threading.Lock()
+
+        # key = scheme://host:port and value = (session, semaphore)
+        self.hosts: OrderedDict[str, tuple[requests.Session, threading.BoundedSemaphore]] = OrderedDict()
+
+    def hostOf(self, link: str) -> str:
+        url = urlsplit(link)
+        return url.scheme + '://' + url.netloc
+
+    def get(self, link: str) -> tuple[requests.Session, threading.BoundedSemaphore]:
+        host = self.hostOf(link)
+        with self.lock:
+            if host in self.hosts:
+                self.hosts.move_to_end(host)
+                return self.hosts[host]
+
+            requests_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host_limit)
+            requests_session.mount('http://', adapter)
+            requests_session.mount('https://', adapter)
+
+            # don't keep cookies of responses
+            requests_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+            self.hosts[host] = (requests_session, threading.BoundedSemaphore(self.per_host_limit))
+
+            # close least recently used session
+            if len(self.hosts) > self.max_hosts:
+                _, (old_session, _) = self.hosts.popitem(last=False)
+                old_session.close()
+
+            return self.hosts[host]
+
+    def close(self) -> None:
+        with self.lock:
+            for requests_session, _ in self.hosts.values():
+                requests_session.close()
+            self.hosts.clear()
+
+
+session_pool = SessionPool()
+
+# spider needs only these headers. MetadataCache keeps them.
+METADATA_HEADERS = ('Content-Disposition', 'Content-Length', 'ETag', 'Last-Modified', 'Accept-Ranges')
+
+
+# MetadataCache keeps headers of HEAD responses for ttl seconds.
+# add link window, queue windows, MainWindow and video finder are probing the same links again and again.
+# with this cache they share results and repeated imports of the same links don't touch the network.
+#
+# key of the cache is link and a fingerprint of everything that can change the response
+# (proxy, download user/pass, cookies, referer and user agent).
+# fingerprint is a hash, so passwords and cookies are not kept in memory as keys.
+# when cache is full, least recently used item is removed.
+class MetadataCache:
+    def __init__(self, ttl: float = 300, max_size: int = 4096) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+        # key = (link, fingerprint) and value = (expire time, headers)
+        self.items: OrderedDict[tuple[str, str], tuple[float, CaseInsensitiveDict]] = OrderedDict()
+
+    def fingerprint(self, *request_information: object) -> str:
+        return hashlib.sha256(repr(request_information).encode()).hexdigest()
+
+    def get(self, key: tuple[str, str]) -> CaseInsensitiveDict | None:
+        with self.lock:
+            if key not in self.items:
+                return None
+
+            expire_time, header = self.items[key]
+            if expire_time < time.monotonic():
+                del self.items[key]
+                return None
+
+            self.items.move_to_end(key)
+            return header
+
+    def set(self, key: tuple[str, str], header: CaseInsensitiveDict) -> None:
+        with self.lock:
+            self.items[key] = (time.monotonic() + self.ttl, header)
+            self.items.move_to_end(key)
+
+            if len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.items.clear()
+
+
+metadata_cache = MetadataCache()
+
+
+# send a HEAD request with download information of add_link_dictionary and return headers.
+# if use_proxy or use_auth is True, proxy and download user/pass of add_link_dictionary is used too.
+# headers of successful responses are kept in metadata_cache.
+def findHeaders(add_link_dictionary: dict[str, str], use_proxy: bool = False, use_auth: bool = False) -> dict:
     link = add_link_dictionary['link']
-    ip = add_link_dictionary['ip']
-    port = add_link_dictionary['port']
-    proxy_user = add_link_dictionary['proxy_user']
-    proxy_passwd = add_link_dictionary['proxy_passwd']
-    download_user = add_link_dictionary['download_user']
-    download_passwd = add_link_dictionary['download_passwd']
-    header = add_link_dictionary['header']
-    out = add_link_dictionary['out']
     user_agent = add_link_dictionary['user_agent']
     raw_cookies = add_link_dictionary['load_cookies']
     referer = add_link_dictionary['referer']
 
-    # define a requests session
-    requests_session = requests.Session()
-    if ip:
-        ip_port = 'http://' + str(ip) + ':' + str(port)
+    headers = {}
+    cookies = None
+    proxies = None
+    auth = None
+
+    if use_proxy and add_link_dictionary['ip']:
+        ip_port = 'http://' + str(add_link_dictionary['ip']) + ':' + str(add_link_dictionary['port'])
+        proxy_user = add_link_dictionary['proxy_user']
         if proxy_user:
-            ip_port = 'http://' + proxy_user + ':' + proxy_passwd + '@' + ip_port
-        # set proxy to the session
-        requests_session.proxies = {'http': ip_port}
+            ip_port = 'http://' + proxy_user + ':' + add_link_dictionary['proxy_passwd'] + '@' + ip_port
+        proxies = {'http': ip_port}
 
-    if download_user:
-        # set download user pass to the session
-        requests_session.auth = (download_user, download_passwd)
+    if use_auth and add_link_dictionary['download_user']:
+        auth = (add_link_dictionary['download_user'], add_link_dictionary['download_passwd'])
 
     # set cookies
     if raw_cookies:
@@ -59,25 +166,39 @@ def spider(add_link_dictionary: dict[str, str]) -> tuple[str, str | None]:
         cookie.load(raw_cookies)
 
         cookies = {key: morsel.value for key, morsel in cookie.items()}
-        requests_session.cookies = cookiejar_from_dict(cookies)
 
     # set referer
     if referer:
-        requests_session.headers.update({'referer': referer})  # setting referer to the session
+        headers['referer'] = referer
 
     # set user_agent
     if user_agent:
-        requests_session.headers.update({'user-agent': user_agent})  # setting user_agent to the session
+        headers['user-agent'] = user_agent
+
+    cache_key = (link, metadata_cache.fingerprint(proxies, auth, cookies, headers))
+    header = metadata_cache.get(cache_key)
+    if header is not None:
+        return header
 
-    # find headers
     try:
-        response = requests_session.head(link)
-        header = response.headers
+        requests_session, host_limit = session_pool.get(link)
+        with host_limit:
+            response = requests_session.head(link, headers=headers, cookies=cookies, proxies=proxies, auth=auth)
     except Exception:
-        header = {}
+        return {}
 
-    filename = None
-    file_size = None
+    header = CaseInsensitiveDict(
+        {name: response.headers[name] for name in METADATA_HEADERS if name in response.headers},
+    )
+
+    if response.ok:
+        metadata_cache.set(cache_key, header)
+
+    return header
+
+
+# find file name from Content-Disposition header
+def filenameFromHeaders(header: dict) -> str | None:
     if 'Content-Disposition' in header:  # checking if filename is available
         content_disposition = header['Content-Disposition']
         if content_disposition.find('filename') != -1:
@@ -85,7 +206,21 @@ def spider(add_link_dictionary: dict[str, str]) -> tuple[str, str | None]:
             filename_splited = filename_splited[-1]
 
             # getting file name in desired format
-            filename = filename_splited[1:-1]
+            return filename_splited[1:-1]
+
+    return None
+
+
+# spider function finds name of file and file size from header
+def spider(add_link_dictionary: dict[str, str]) -> tuple[str, str | None]:
+    link = add_link_dictionary['link']
+    out = add_link_dictionary['out']
+
+    # find headers
+    header = findHeaders(add_link_dictionary, use_proxy=True, use_auth=True)
+
+    file_size = None
+    filename = filenameFromHeaders(header)
 
     if not (filename):
         filename = link.split('/')[-1]
@@ -113,42 +248,11 @@ def queueSpider(add_link_dictionary: dict[str, str]) -> str:
             add_link_dictionary[i] = None
 
     link = add_link_dictionary['link']
-    header = add_link_dictionary['header']
-    user_agent = add_link_dictionary['user_agent']
-    raw_cookies = add_link_dictionary['load_cookies']
-    referer = add_link_dictionary['referer']
-
-    requests_session = requests.Session()  # defining a requests Session
-
-    if raw_cookies:  # set cookies
-        cookie = SimpleCookie()
-        cookie.load(raw_cookies)
-
-        cookies = {key: morsel.value for key, morsel in cookie.items()}
-        requests_session.cookies = cookiejar_from_dict(cookies)
-
-    if referer:
-        # set referer to the session
-        requests_session.headers.update({'referer': referer})
-
-    if user_agent:
-        # set user_agent to the session
-        requests_session.headers.update({'user-agent': user_agent})
 
     # find headers
-    try:
-        response = requests_session.head(link)
-        header = response.headers
-    except Exception:
-        header = {}
-    filename = None
-    if 'Content-Disposition' in header:  # checking if filename is available
-        content_disposition = header['Content-Disposition']
-        if content_disposition.find('filename') != -1:
-            filename_splited = content_disposition.split('filename=')
-            filename_splited = filename_splited[-1]
-            # getting file name in desired format
-            filename = filename_splited[1:-1]
+    header = findHeaders(add_link_dictionary)
+
+    filename = filenameFromHeaders(header)
 
     if not (filename):
         filename = link.split('/')[-1]
@@ -162,35 +266,8 @@ def addLinkSpider(add_link_dictionary: dict[str, str]) -> tuple[str | None, str
         if i not in add_link_dictionary:
             add_link_dictionary[i] = None
 
-    link = add_link_dictionary['link']
-    header = add_link_dictionary['header']
-    user_agent = add_link_dictionary['user_agent']
-    raw_cookies = add_link_dictionary['load_cookies']
-    referer = add_link_dictionary['referer']
-
-    requests_session = requests.Session()  # defining a requests Session
-
-    if raw_cookies:  # set cookies
-        cookie = SimpleCookie()
-        cookie.load(raw_cookies)
-
-        cookies = {key: morsel.value for key, morsel in cookie.items()}
-        requests_session.cookies = cookiejar_from_dict(cookies)
-
-    if referer:
-        # set referer to the session
-        requests_session.headers.update({'referer': referer})
-
-    if user_agent:
-        # set user_agent to the session
-        requests_session.headers.update({'user-agent': user_agent})
-
     # find headers
-    try:
-        response = requests_session.head(link)
-        header = response.headers
-    except Exception:
-        header = {}
+    header = findHeaders(add_link_dictionary)
 
     # find file size
     file_size = None
@@ -201,13 +278,8 @@ def addLinkSpider(add_link_dictionary: dict[str, str]) -> tuple[str | None, str
         file_size = str(humanReadableSize(file_size))
 
     # find file name
-    file_name = None
-    if 'Content-Disposition' in header:  # checking if filename is available
-        content_disposition = header['Content-Disposition']
-        if content_disposition.find('filename') != -1:
-            filename_splited = content_disposition.split('filename=')
-            filename_splited = filename_splited[-1]
-            # getting file name in desired format
-            file_name = str(filename_splited[1:-1])
+    file_name = filenameFromHeaders(header)
+    if file_name:
+        file_name = str(file_name)
 
     return file_name, file_size  # If no Content-Length ? fixed it.
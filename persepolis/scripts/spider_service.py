@@ -0,0 +1,137 @@
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from typing import Any, Callable
+
+try:
+    from PySide6.QtCore import QObject, Signal
+except ImportError:
+    from PyQt5.QtCore import QObject
+    from PyQt5.QtCore import pyqtSignal as Signal
+
+import ghermez
+
+
+class SpiderJob:
+    def __init__(
+        self,
+        job_id: int,
+        function: Callable[[dict[str, str]], Any],
+        add_link_dictionary: dict[str, str],
+        callback: Callable[[Any], None],
+        owner: object,
+    ) -> None:
+        self.job_id = job_id
+        self.function = function
+        self.add_link_dictionary = add_link_dictionary
+        self.callback = callback
+        self.owner = owner
+
+
+# SpiderService runs spider functions of spider.py in a fixed number of worker threads.
+# TextQueue and BrowserPluginQueue used to start one thread for every link,
+# now they submit links to this service and results are coming back as soon as they are ready.
+# connections are reused by session_pool of spider.py and it limits parallel requests to one host.
+#
+# callback is called in main thread with result of function.
+# if result is empty, callback is not called and an error is written in log.
+class SpiderService(QObject):
+    SPIDERRESULTSIGNAL = Signal(int, object)
+
+    def __init__(self, max_workers: int = 8) -> None:
+        super().__init__()
+        self.max_workers = max_workers
+
+        self.jobs_queue: queue.Queue[SpiderJob | None] = queue.Queue()
+
+        # key = job_id and value = SpiderJob (waiting or running)
+        self.jobs_dict: dict[int, SpiderJob] = {}
+        self.lock = threading.Lock()
+        self.job_counter = itertools.count(1)
+
+        self.workers: list[threading.Thread] = []
+
+        self.SPIDERRESULTSIGNAL.connect(self.deliver)
+
+    # add a job to the queue. owner is used for canceling jobs of a window.
+    def submit(
+        self,
+        function: Callable[[dict[str, str]], Any],
+        add_link_dictionary: dict[str, str],
+        callback: Callable[[Any], None],
+        owner: object = None,
+    ) -> int:
+        job = SpiderJob(next(self.job_counter), function, add_link_dictionary, callback, owner)
+        with self.lock:
+            self.jobs_dict[job.job_id] = job
+
+            # workers are started when they are needed
+            if len(self.workers) < self.max_workers and len(self.workers) < len(self.jobs_dict):
+                worker = threading.Thread(target=self.work, name='spider', daemon=True)
+                self.workers.append(worker)
+                worker.start()
+
+        self.jobs_queue.put(job)
+        return job.job_id
+
+    # cancel all jobs of owner. for example when TextQueue window is closed.
+    def cancel(self, owner: object) -> None:
+        with self.lock:
+            for job_id in [job_id for job_id, job in self.jobs_dict.items() if job.owner is owner]:
+                del self.jobs_dict[job_id]
+
+    # stop workers. MainWindow calls this method when persepolis is closing.
+    def shutdown(self) -> None:
+        with self.lock:
+            self.jobs_dict.clear()
+
+        for _ in self.workers:
+            self.jobs_queue.put(None)
+
+    def work(self) -> None:
+        while True:
+            job = self.jobs_queue.get()
+            if job is None:
+                break
+
+            # job is canceled
+            if job.job_id not in self.jobs_dict:
+                continue
+
+            try:
+                result = job.function(job.add_link_dictionary)
+            except Exception as e:
+                ghermez.sendToLog("Spider couldn't find download information", 'ERROR')
+                ghermez.sendToLog(str(e), 'ERROR')
+                result = None
+
+            self.SPIDERRESULTSIGNAL.emit(job.job_id, result)
+
+    # this method is running in main thread.
+    def deliver(self, job_id: int, result: Any) -> None:
+        with self.lock:
+            job = self.jobs_dict.pop(job_id, None)
+
+        # job is canceled
+        if job is None:
+            return
+
+        if result:
+            job.callback(result)
+        else:
+            ghermez.sendToLog("Spider couldn't find download information", 'ERROR')
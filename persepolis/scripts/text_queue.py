@@ -32,30 +32,38 @@ from functools import partial
 
 from persepolis.gui.text_queue_ui import TextQueue_Ui
 from persepolis.scripts import logger, spider
+from persepolis.scripts.link_import import chunks, readLinks
 
-# This thread finds filename
+# number of links that are added to links_table together
+LINKS_CHUNK_SIZE = 2000
 
+# number of rows after visible rows that spider is called for them
+SPIDER_AHEAD_ROWS = 20
 
-class QueueSpiderThread(QThread):
-    QUEUESPIDERRETURNEDFILENAME = Signal(str)
 
-    def __init__(self, download_dict: dict[str, str]) -> None:
+# this thread reads links from text file and sends them in chunks to the TextQueue.
+class LinkReaderThread(QThread):
+    LINKSCHUNKSIGNAL = Signal(list)
+
+    def __init__(self, file_path: str) -> None:
         super().__init__()
-        self.dict = download_dict
+        self.file_path = file_path
+        self.stopped = False
 
     def run(self) -> None:
         try:
-            filename = spider.queueSpider(self.dict)
-            if filename:
-                self.QUEUESPIDERRETURNEDFILENAME.emit(filename)
-            else:
-                logger.LOG_OBJ.error("Spider couldn't find download information", exc_info=True)
+            for chunk in chunks(readLinks(self.file_path), LINKS_CHUNK_SIZE):
+                if self.stopped:
+                    break
+                self.LINKSCHUNKSIGNAL.emit(chunk)
 
         except Exception as e:
-            # write error in log
-            logger.LOG_OBJ.error("Spider couldn't find download information", exc_info=True)
+            logger.LOG_OBJ.error("Couldn't read links from " + str(self.file_path), exc_info=True)
             logger.LOG_OBJ.error(str(e), exc_info=True)
 
+    def stop(self) -> None:
+        self.stopped = True
+
 
 class TextQueue(TextQueue_Ui):
     def __init__(
@@ -73,48 +81,22 @@ class TextQueue(TextQueue_Ui):
 
         globals.icons = ':/' + str(self.persepolis_setting.value('settings/icons')) + '/'
 
-        # read text file lines and put links in list format.
-        with open(self.file_path) as f:
-            f_links_list = f.readlines()
-
-        f_links_list.reverse()
-
-        # check links! links must be started with http or https or ftp
-        link_list = []
-        for link in f_links_list:
-            text = link.strip()
-            if 'tp:/' in text[2:6] or 'tps:/' in text[2:7]:
-                link_list.append(text)
-
-        k = 1
-        for link in link_list:
-            self.links_table.insertRow(0)
-
-            # file_name
-            file_name = '***'
-            link_dict = {'link': link}
-
-            # spider finds file name
-            new_spider = QueueSpiderThread(link_dict)
-            self.parent.threadPool.append(new_spider)
-            self.parent.threadPool[-1].start()
-            self.parent.threadPool[-1].QUEUESPIDERRETURNEDFILENAME.connect(
-                partial(self.parent.queueSpiderCallBack, child=self, row_number=len(link_list) - k),
-            )
-            k = k + 1
-
-            item = QTableWidgetItem(file_name)
+        # rows that spider is called for them
+        self.spidered_rows = set()
 
-            # add checkbox to the item
-            item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            item.setCheckState(Qt.Checked)
+        # LinkReaderThread reads links from file and sends them in chunks.
+        self.link_reader = LinkReaderThread(self.file_path)
+        self.link_reader.LINKSCHUNKSIGNAL.connect(self.addLinksChunk)
+        self.link_reader.finished.connect(self.linkReaderFinished)
+        self.links_are_read = False
 
-            # insert file_name
-            self.links_table.setItem(0, 0, item)
+        # links are added to queue after reading file, if ok button is pressed before that.
+        self.ok_is_pending = False
+        self.parent.threadPool.append(self.link_reader)
+        self.parent.threadPool[-1].start()
 
-            # insert link
-            item = QTableWidgetItem(str(link))
-            self.links_table.setItem(0, 1, item)
+        # spider finds file names of visible rows only.
+        self.links_table.verticalScrollBar().valueChanged.connect(self.spiderVisibleRows)
 
         # get categories name and add them to add_queue_comboBox
         categories_list = self.parent.persepolis_db.categoriesList()
@@ -257,7 +239,75 @@ class TextQueue(TextQueue_Ui):
         if os.path.isdir(fname):
             self.download_folder_lineEdit.setText(fname)
 
+    # add a chunk of links to the end of links_table.
+    def addLinksChunk(self, link_list: list[str]) -> None:
+        first_row = self.links_table.rowCount()
+
+        self.links_table.setUpdatesEnabled(False)
+        self.links_table.setRowCount(first_row + len(link_list))
+
+        for row, link in enumerate(link_list, first_row):
+            # file_name is found by spider later
+            item = QTableWidgetItem('***')
+
+            # add checkbox to the item
+            item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+            item.setCheckState(Qt.Checked)
+
+            # insert file_name
+            self.links_table.setItem(row, 0, item)
+
+            # insert link
+            item = QTableWidgetItem(str(link))
+            self.links_table.setItem(row, 1, item)
+
+        self.links_table.setUpdatesEnabled(True)
+
+        self.spiderVisibleRows()
+
+    # call spider for visible rows of links_table and some rows after them.
+    def spiderVisibleRows(self, _value: int | None = None) -> None:
+        row_count = self.links_table.rowCount()
+        if row_count == 0:
+            return
+
+        first_row = max(self.links_table.rowAt(0), 0)
+        last_row = self.links_table.rowAt(self.links_table.viewport().height() - 1)
+        if last_row == -1:
+            last_row = row_count - 1
+
+        for row in range(first_row, min(last_row + SPIDER_AHEAD_ROWS, row_count - 1) + 1):
+            if row in self.spidered_rows:
+                continue
+
+            self.spidered_rows.add(row)
+
+            link_dict = {'link': self.links_table.item(row, 1).text()}
+
+            # spider finds file name
+            self.parent.spider_service.submit(
+                spider.queueSpider,
+                link_dict,
+                partial(self.parent.queueSpiderCallBack, child=self, row_number=row),
+                owner=self,
+            )
+
+    # finished signal is received after all chunks of links, so links_table is complete now.
+    def linkReaderFinished(self) -> None:
+        self.links_are_read = True
+        if self.ok_is_pending and not self.link_reader.stopped:
+            self.addLinksToQueue()
+
     def okButtonPressed(self, _button: QPushButton) -> None:
+        # links are added after all links are added to links_table. GUI is not blocked until then.
+        if not self.links_are_read:
+            self.ok_is_pending = True
+            self.ok_pushButton.setEnabled(False)
+            return
+
+        self.addLinksToQueue()
+
+    def addLinksToQueue(self) -> None:
         # write user's input data to init file
         self.persepolis_setting.setValue('add_link_initialization/ip', self.ip_lineEdit.text())
         self.persepolis_setting.setValue('add_link_initialization/port', self.port_spinBox.value())
@@ -346,8 +396,10 @@ class TextQueue(TextQueue_Ui):
                 link = self.links_table.item(row, 1).text()
                 self.add_link_dictionary_list[i]['link'] = str(link)
 
-                # add file name to the dict
-                self.add_link_dictionary_list[i]['out'] = self.links_table.item(row, 0).text()
+                # add file name to the dict, if spider found it.
+                file_name = self.links_table.item(row, 0).text()
+                if file_name != '***':
+                    self.add_link_dictionary_list[i]['out'] = file_name
 
                 i = i + 1
         # reverse list
@@ -365,6 +417,10 @@ class TextQueue(TextQueue_Ui):
             self.close()
 
     def closeEvent(self, event: QCloseEvent) -> None:
+        # stop reading links and spidering them
+        self.link_reader.stop()
+        self.parent.spider_service.cancel(self)
+
         self.persepolis_setting.setValue('TextQueue/size', self.size())
         self.persepolis_setting.setValue('TextQueue/position', self.pos())
         self.persepolis_setting.sync()
@@ -13,7 +13,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable
 
 try:
     from PySide6.QtWidgets import QStyleFactory, QWidget
@@ -24,6 +24,8 @@ import os
 import platform
 import subprocess
 import sys
+import threading
+import time
 import urllib.parse
 
 import ghermez
@@ -88,6 +90,18 @@ def humanReadableSize(size: float, input_type: str = 'file_size') -> str:
     return str(round(size, None)) + ' ' + labels[i]
 
 
+# this function converts seconds to the '1h2m3s' format.
+def humanReadableTime(seconds: int) -> str:
+    ONE_HOUR = 3600
+    ONE_MIN = 60
+    if seconds >= ONE_HOUR:
+        hours = str(seconds // ONE_HOUR) + 'h'
+        return hours + str(seconds % ONE_HOUR // ONE_MIN) + 'm' + str(seconds % ONE_MIN) + 's'
+    if seconds >= ONE_MIN:
+        return str(seconds // ONE_MIN) + 'm' + str(seconds % ONE_MIN) + 's'
+    return str(seconds) + 's'
+
+
 # this function converts human readable size to byte
 
 
@@ -152,7 +166,15 @@ def returnDefaultSettings() -> dict[str, str]:
     return ghermez.returnDefaultSettings(available_styles)
 
 
-def muxer(parent: QWidget, video_finder_dictionary: dict[str, str]) -> dict[str, Any]:
+# this function muxes video and audio files of video finder with ffmpeg.
+# progress_callback is called with parseMuxingProgress output during muxing.
+# started_callback is called with ffmpeg process, when muxing started.
+def muxer(
+    parent: QWidget,
+    video_finder_dictionary: dict[str, str],
+    progress_callback: Callable[[dict[str, Any]], None] | None = None,
+    started_callback: Callable[[subprocess.Popen], None] | None = None,
+) -> dict[str, Any]:
     result_dictionary = {'error': 'no_error', 'ffmpeg_error_message': None, 'final_path': None, 'final_size': None}
 
     # find file path
@@ -214,33 +236,9 @@ def muxer(parent: QWidget, video_finder_dictionary: dict[str, str]) -> dict[str,
                 final_path_plus_name = os.path.join(final_path, new_name)
                 i = i + 1
 
-            # start muxing
+            # find ffmpeg path
             if os_type in OS.UNIX_LIKE:
-                pipe = subprocess.Popen(
-                    [
-                        'ffmpeg',
-                        '-i',
-                        video_file_path,
-                        '-i',
-                        audio_file_path,
-                        '-c',
-                        'copy',
-                        '-shortest',
-                        '-map',
-                        '0:v:0',
-                        '-map',
-                        '1:a:0',
-                        '-loglevel',
-                        'error',
-                        '-strict',
-                        '-2',
-                        final_path_plus_name,
-                    ],
-                    stderr=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stdin=subprocess.PIPE,
-                    shell=False,
-                )
+                ffmpeg_path = 'ffmpeg'
 
             elif os_type == OS.DARWIN:
                 # ffmpeg path in mac
@@ -249,69 +247,83 @@ def muxer(parent: QWidget, video_finder_dictionary: dict[str, str]) -> dict[str,
                 current_directory = os.path.dirname(cwd)
                 ffmpeg_path = os.path.join(current_directory, 'ffmpeg')
 
-                pipe = subprocess.Popen(
-                    [
-                        ffmpeg_path,
-                        '-i',
-                        video_file_path,
-                        '-i',
-                        audio_file_path,
-                        '-c',
-                        'copy',
-                        '-shortest',
-                        '-map',
-                        '0:v:0',
-                        '-map',
-                        '1:a:0',
-                        '-loglevel',
-                        'error',
-                        '-strict',
-                        '-2',
-                        final_path_plus_name,
-                    ],
-                    stderr=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stdin=subprocess.PIPE,
-                    shell=False,
-                )
-
             elif os_type == OS.WINDOWS:
                 # ffmpeg path in windows
                 cwd = sys.argv[0]
                 current_directory = os.path.dirname(cwd)
                 ffmpeg_path = os.path.join(current_directory, 'ffmpeg.exe')
 
+            # ffmpeg writes progress information in key=value format to the stdout.
+            # see parseMuxingProgress function.
+            command = [
+                ffmpeg_path,
+                '-i',
+                video_file_path,
+                '-i',
+                audio_file_path,
+                '-c',
+                'copy',
+                '-shortest',
+                '-map',
+                '0:v:0',
+                '-map',
+                '1:a:0',
+                '-loglevel',
+                'error',
+                '-strict',
+                '-2',
+                '-progress',
+                'pipe:1',
+                '-nostats',
+                final_path_plus_name,
+            ]
+
+            popen_kwargs = {}
+            if os_type == OS.WINDOWS:
                 # NO_WINDOW option avoids opening additional CMD window in MS Windows.
                 NO_WINDOW = 0x08000000
+                popen_kwargs['creationflags'] = NO_WINDOW
 
-                pipe = subprocess.Popen(
-                    [
-                        ffmpeg_path,
-                        '-i',
-                        video_file_path,
-                        '-i',
-                        audio_file_path,
-                        '-c',
-                        'copy',
-                        '-shortest',
-                        '-map',
-                        '0:v:0',
-                        '-map',
-                        '1:a:0',
-                        '-loglevel',
-                        'error',
-                        '-strict',
-                        '-2',
-                        final_path_plus_name,
-                    ],
-                    stdout=subprocess.PIPE,
-                    stdin=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    shell=False,
-                    creationflags=NO_WINDOW,
-                )
-
-            if pipe.wait() == 0:
+            # start muxing
+            pipe = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                shell=False,
+                **popen_kwargs,
+            )
+
+            # muxing service needs pipe for canceling the muxing.
+            if started_callback is not None:
+                started_callback(pipe)
+
+            # stderr is read in another thread. if ffmpeg fills the stderr pipe
+            # while stdout is read here, both processes wait forever.
+            stderr_list = []
+            stderr_reader = threading.Thread(target=lambda: stderr_list.append(pipe.stderr.read()), daemon=True)
+            stderr_reader.start()
+
+            # read progress information until the end of muxing
+            start_time = time.monotonic()
+            progress_dictionary = {}
+            for line in pipe.stdout:
+                key, _, value = line.decode('utf-8', 'ignore').strip().partition('=')
+                progress_dictionary[key] = value
+
+                # every progress block ends with progress=continue or progress=end
+                if key == 'progress':
+                    if progress_callback is not None:
+                        progress_callback(
+                            parseMuxingProgress(progress_dictionary, final_file_size, time.monotonic() - start_time),
+                        )
+                    progress_dictionary = {}
+
+            return_code = pipe.wait()
+            stderr_reader.join()
+            ffmpeg_error_message = b''.join(stderr_list)
+
+            if return_code == 0:
                 # muxing was finished successfully.
                 result_dictionary['error'] = 'no error'
 
@@ -320,8 +332,41 @@ def muxer(parent: QWidget, video_finder_dictionary: dict[str, str]) -> dict[str,
 
             else:
                 result_dictionary['error'] = 'ffmpeg error'
-                out, ffmpeg_error_message = pipe.communicate()
+
+                # remove incomplete output file
+                if os.path.isfile(final_path_plus_name):
+                    ghermez.remove(final_path_plus_name)
 
                 result_dictionary['ffmpeg_error_message'] = ffmpeg_error_message.decode('utf-8', 'ignore')
 
     return result_dictionary
+
+
+# this function finds muxing percent and estimate time left from one progress block of ffmpeg.
+# ffmpeg copies streams (-c copy), so size of output file is near to the sum of video and audio sizes.
+def parseMuxingProgress(
+    progress_dictionary: dict[str, str],
+    final_file_size: int,
+    elapsed_time: float,
+) -> dict[str, Any]:
+    try:
+        muxed_size = int(progress_dictionary.get('total_size', 0))
+    except ValueError:
+        muxed_size = 0
+
+    if progress_dictionary.get('progress') == 'end':
+        percent = 100
+    elif final_file_size > 0:
+        percent = min(int(muxed_size * 100 / final_file_size), 99)
+    else:
+        percent = 0
+
+    if percent == 100:  # noqa: PLR2004
+        estimate_time_left = '0s'
+    elif muxed_size > 0 and elapsed_time > 0:
+        speed = muxed_size / elapsed_time
+        estimate_time_left = humanReadableTime(int((final_file_size - muxed_size) / speed))
+    else:
+        estimate_time_left = None
+
+    return {'percent': percent, 'estimate_time_left': estimate_time_left}
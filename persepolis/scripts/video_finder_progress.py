@@ -188,6 +188,10 @@ class VideoFinderProgressWindow(VideoFinderProgressWindow_Ui):
 
         self.parent.temp_db.updateQueueTable(dictionary)
 
+        # if downloads are finished and ffmpeg is running, cancel muxing.
+        if self.parent.video_finder_manager.cancelMuxing(self.gid_list[0]):
+            return
+
         answer = download.downloadStop(self.gid, self.parent)
 
         # if aria2 did not respond , then this function is checking for aria2
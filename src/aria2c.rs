@@ -2,8 +2,7 @@
 
 use std::{
     collections::HashMap,
-    ffi::OsStr,
-    path::{Path, PathBuf},
+    path::Path,
     process::{Command, Stdio},
     thread, time,
 };
@@ -28,58 +27,68 @@ use crate::{
     useful_tools::{humanReadableSize, round},
 };
 
-static SERVER_URL: Lazy<RwLock<String>> = Lazy::new(|| RwLock::new(String::new()));
+// urls of aria2 processes. downloads are divided between them by gid. see shardOf
+static SERVER_URLS: Lazy<RwLock<Vec<String>>> = Lazy::new(|| RwLock::new(Vec::new()));
 
-// start aria2 with RPC
+// start aria2 with RPC.
+// if daemons is more than one, daemons aria2 processes are started on consecutive ports
+// from port, and every process has its own session file.
 #[pyfunction]
-#[pyo3(signature = (port, _aria2_path=None))]
-pub fn startAria(port: u16, _aria2_path: Option<String>) -> Option<String> {
+#[pyo3(signature = (port, _aria2_path=None, session_path=None, daemons=1))]
+pub fn startAria(
+    port: u16,
+    _aria2_path: Option<String>,
+    session_path: Option<String>,
+    daemons: u16,
+) -> Option<String> {
+    let daemons = daemons.max(1);
     Runtime::new().unwrap().handle().block_on(async {
-        let mut tmp = SERVER_URL.write().await;
-        *tmp = format!("ws://127.0.0.1:{port}/jsonrpc");
+        let mut tmp = SERVER_URLS.write().await;
+        *tmp = (0..daemons)
+            .map(|shard| format!("ws://127.0.0.1:{}/jsonrpc", port + shard))
+            .collect();
     });
 
-    #[cfg(any(target_os = "linux", target_os = "macos"))]
-    let _child = match Command::new("aria2c")
-        .arg("--no-conf")
-        .arg("--enable-rpc")
-        .arg(format!("--rpc-listen-port={}", port))
-        .arg("--rpc-allow-origin-all")
-        .arg("--quiet=true")
-        .stdin(Stdio::inherit())
-        .stdout(Stdio::inherit())
-        .spawn()
+    #[cfg(target_os = "windows")]
+    let aria2d = if _aria2_path
+        .clone()
+        .is_some_and(|x| !x.is_empty() && Path::new(&x).is_file())
     {
-        Err(why) => panic!("couldn't spawn aria2c: {:?}", why),
-        Ok(child) => child,
+        _aria2_path.as_ref().unwrap().to_string()
+    } else {
+        let aria2 = env::current_dir().unwrap().join("aria2c.exe");
+        aria2.to_str().unwrap().to_string()
     };
 
     #[cfg(target_os = "windows")]
     {
-        let aria2d = if _aria2_path
-            .clone()
-            .is_some_and(|x| !x.is_empty() && Path::new(&x).is_file())
-        {
-            _aria2_path.as_ref().unwrap().to_string()
-        } else {
-            let aria2 = env::current_dir().unwrap().join("aria2c.exe");
-            aria2.to_str().unwrap().to_string()
-        };
-
         if !Path::new(&aria2d).exists() {
             error!("Aria2 does not exist in the current path!");
             return None;
         }
+    }
+
+    for shard in 0..daemons {
+        let args = aria2Arguments(port + shard, shardSessionPath(session_path.clone(), shard));
+
+        #[cfg(any(target_os = "linux", target_os = "macos"))]
+        let _child = match Command::new("aria2c")
+            .args(&args)
+            .stdin(Stdio::inherit())
+            .stdout(Stdio::inherit())
+            .spawn()
+        {
+            Err(why) => panic!("couldn't spawn aria2c: {:?}", why),
+            Ok(child) => child,
+        };
 
         // NO_WINDOW option avoids opening additional CMD window in MS Windows.
+        #[cfg(target_os = "windows")]
         const NO_WINDOW: u32 = 0x08000000;
 
-        let _child = match Command::new(aria2d)
-            .arg("--no-conf")
-            .arg("--enable-rpc")
-            .arg(format!("--rpc-listen-port={}", port))
-            .arg("--rpc-allow-origin-all")
-            .arg("--quiet=true")
+        #[cfg(target_os = "windows")]
+        let _child = match Command::new(&aria2d)
+            .args(&args)
             .stdin(Stdio::inherit())
             .stdout(Stdio::inherit())
             .stderr(Stdio::inherit())
@@ -98,21 +107,86 @@ pub fn startAria(port: u16, _aria2_path: Option<String>) -> Option<String> {
     Some(answer)
 }
 
+// first aria2 process uses session_path and others use session_path-<shard>
+fn shardSessionPath(session_path: Option<String>, shard: u16) -> Option<String> {
+    if shard == 0 {
+        session_path
+    } else {
+        session_path.map(|x| format!("{x}-{shard}"))
+    }
+}
+
+// returns index of aria2 process that downloads gid.
+// gids are random hex numbers, so downloads are divided equally.
+// persepolis uses this function for XML-RPC requests, too. see aria2_pool.py
+#[pyfunction]
+pub fn shardOf(gid: &str, shards: usize) -> usize {
+    if shards <= 1 {
+        return 0;
+    }
+
+    let number = u64::from_str_radix(gid, 16).unwrap_or_else(|_| gid.bytes().map(u64::from).sum());
+    (number % shards as u64) as usize
+}
+
+// url of aria2 process of gid
+async fn serverUrl(gid: &str) -> String {
+    let server_urls = SERVER_URLS.read().await;
+    server_urls
+        .get(shardOf(gid, server_urls.len()))
+        .cloned()
+        .unwrap_or_default()
+}
+
+// aria2 saves paused and unfinished downloads in session file every
+// SESSION_INTERVAL seconds and when it's shut down.
+// downloads of session file are added again when aria2 starts.
+const SESSION_INTERVAL: u32 = 60;
+
+fn aria2Arguments(port: u16, session_path: Option<String>) -> Vec<String> {
+    let mut args = vec![
+        "--no-conf".to_string(),
+        "--enable-rpc".to_string(),
+        format!("--rpc-listen-port={}", port),
+        "--rpc-allow-origin-all".to_string(),
+        "--quiet=true".to_string(),
+    ];
+
+    if let Some(session_path) = session_path.filter(|x| !x.is_empty()) {
+        if Path::new(&session_path).is_file() {
+            args.push(format!("--input-file={}", session_path));
+        }
+        args.push(format!("--save-session={}", session_path));
+        args.push(format!("--save-session-interval={}", SESSION_INTERVAL));
+    }
+
+    args
+}
+
 // check aria2 release version . Ghermez uses this function to
 // check that aria2 RPC connection is available or not.
 #[pyfunction]
 pub fn aria2Version() -> String {
+    // all aria2 processes must respond
     let version = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
-        match Client::connect(&server_url, None).await {
-            Ok(client) => client.get_version().await,
-            Err(e) => Err(e),
+        let server_urls = SERVER_URLS.read().await;
+        let mut version = None;
+        for server_url in server_urls.iter() {
+            let answer = match Client::connect(server_url, None).await {
+                Ok(client) => client.get_version().await,
+                Err(e) => Err(e),
+            };
+            match answer {
+                Ok(v) => version = version.or(Some(v.version)),
+                Err(_) => return None,
+            }
         }
+        version
     });
 
     match version {
-        Ok(v) => v.version,
-        Err(_) => {
+        Some(v) => v,
+        None => {
             // write ERROR messages in terminal and log
             error!("Aria2 didn't respond!");
             "did not respond".to_string()
@@ -122,7 +196,7 @@ pub fn aria2Version() -> String {
 
 fn _download_aria(url: &str) -> String {
     let gid = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
+        let server_url = serverUrl("").await;
         let client = Client::connect(&server_url, None).await.unwrap();
         let options = TaskOptions::default();
 
@@ -152,13 +226,18 @@ pub fn tellActive() -> (Option<GidList>, Option<DownloadStatusList>) {
         "completedLength".to_string(),
         "files".to_string(),
     ];
-    // get download information from aria2
+    // get download information from all aria2 processes
     let downloads_status_result = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
-        match Client::connect(&server_url, None).await {
-            Ok(client) => client.custom_tell_active(Some(args)).await,
-            Err(e) => Err(e),
+        let server_urls = SERVER_URLS.read().await;
+        let mut downloads_status = vec![];
+        for server_url in server_urls.iter() {
+            let answer = match Client::connect(server_url, None).await {
+                Ok(client) => client.custom_tell_active(Some(args.clone())).await,
+                Err(e) => Err(e),
+            };
+            downloads_status.extend(answer?);
         }
+        Ok::<_, aria2_ws::Error>(downloads_status)
     });
 
     let downloads_status: Vec<CustomStatus> = match downloads_status_result {
@@ -197,7 +276,7 @@ fn _tellStatus(gid: &str) -> Map<String, serde_json::Value> {
         "files".to_string(),
     ];
     let status = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
+        let server_url = serverUrl(gid).await;
         let client = Client::connect(&server_url, None).await.unwrap();
         client.custom_tell_status(gid, Some(args)).await.unwrap()
     });
@@ -314,82 +393,16 @@ fn convertDownloadInformation(download_status: CustomStatus) -> HashMap<String,
     ])
 }
 
-// this function returns folder of download according to file extension
-#[pyfunction]
-pub fn findDownloadPath(file_name: &str, download_path: PathBuf, subfolder: &str) -> PathBuf {
-    if subfolder != "yes" {
-        return download_path;
-    }
-
-    let mut file_extension = Path::new(file_name)
-        .extension()
-        .and_then(OsStr::to_str)
-        .unwrap()
-        // convert extension letters to lower case
-        // for example "JPG" will be converted in "jpg"
-        .to_lowercase();
-
-    // remove query from file_extension if existed
-    // if '?' in file_extension, then file_name contains query components.
-    if file_extension.contains('?') {
-        file_extension = file_extension.split('?').next().unwrap().to_string();
-    }
-
-    // audio formats
-    let audio = [
-        "act", "aiff", "aac", "amr", "ape", "au", "awb", "dct", "dss", "dvf", "flac", "gsm",
-        "iklax", "ivs", "m4a", "m4p", "mmf", "mp3", "mpc", "msv", "ogg", "oga", "opus", "ra",
-        "raw", "sln", "tta", "vox", "wav", "wma", "wv",
-    ];
-
-    // video formats
-    let video = [
-        "3g2", "3gp", "asf", "avi", "drc", "flv", "m4v", "mkv", "mng", "mov", "qt", "mp4", "m4p",
-        "mpg", "mp2", "mpeg", "mpe", "mpv", "m2v", "mxf", "nsv", "ogv", "rmvb", "roq", "svi",
-        "vob", "webm", "wmv", "yuv", "rm",
-    ];
-
-    // document formats
-    let document = [
-        "doc", "docx", "html", "htm", "fb2", "odt", "sxw", "pdf", "ps", "rtf", "tex", "txt",
-        "epub", "pub", "mobi", "azw", "azw3", "azw4", "kf8", "chm", "cbt", "cbr", "cbz", "cb7",
-        "cba", "ibooks", "djvu", "md",
-    ];
-
-    // compressed formats
-    let compressed = [
-        "a", "ar", "cpio", "shar", "LBR", "iso", "lbr", "mar", "tar", "bz2", "F", "gz", "lz",
-        "lzma", "lzo", "rz", "sfark", "sz", "xz", "Z", "z", "infl", "7z", "s7z", "ace", "afa",
-        "alz", "apk", "arc", "arj", "b1", "ba", "bh", "cab", "cfs", "cpt", "dar", "dd", "dgc",
-        "dmg", "ear", "gca", "ha", "hki", "ice", "jar", "kgb", "lzh", "lha", "lzx", "pac",
-        "partimg", "paq6", "paq7", "paq8", "pea", "pim", "pit", "qda", "rar", "rk", "sda", "sea",
-        "sen", "sfx", "sit", "sitx", "sqx", "tar.gz", "tgz", "tar.Z", "tar.bz2", "tbz2",
-        "tar.lzma", "tlz", "uc", "uc0", "uc2", "ucn", "ur2", "ue2", "uca", "uha", "war", "wim",
-        "xar", "xp3", "yz1", "zip", "zipx", "zoo", "zpaq", "zz", "ecc", "par", "par2",
-    ];
-
-    if audio.contains(&file_extension.as_str()) {
-        download_path.join("Audios")
-    }
-    // aria2c downloads youtube links file_name with 'videoplayback' name?!
-    else if video.contains(&file_extension.as_str()) {
-        download_path.join("Videos")
-    } else if document.contains(&file_extension.as_str()) {
-        download_path.join("Documents")
-    } else if compressed.contains(&file_extension.as_str()) {
-        download_path.join("Compressed")
-    } else {
-        download_path.join("Other")
-    }
-}
-
 // shutdown aria2
 #[pyfunction]
 pub fn shutDown() -> bool {
     let answer = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
-        let client = Client::connect(&server_url, None).await.unwrap();
-        client.shutdown().await
+        let server_urls = SERVER_URLS.read().await;
+        for server_url in server_urls.iter() {
+            let client = Client::connect(server_url, None).await?;
+            client.shutdown().await?;
+        }
+        Ok::<_, aria2_ws::Error>(())
     });
     match answer {
         Ok(_) => {
@@ -410,7 +423,7 @@ pub fn downloadPause(gid: &str) -> Option<String> {
 
     // send pause request to aria2.
     let answer = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
+        let server_url = serverUrl(gid).await;
         let client = Client::connect(&server_url, None).await.unwrap();
         client.pause(gid).await
     });
@@ -426,7 +439,7 @@ pub fn downloadPause(gid: &str) -> Option<String> {
 pub fn downloadUnpause(gid: &str) -> Option<String> {
     // send unpause request to aria2
     let answer = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
+        let server_url = serverUrl(gid).await;
         let client = Client::connect(&server_url, None).await.unwrap();
         client.unpause(gid).await
     });
@@ -460,7 +473,7 @@ pub fn limitSpeed(gid: &str, limit: &str) {
     };
 
     let answer = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
+        let server_url = serverUrl(gid).await;
         let client = Client::connect(&server_url, None).await.unwrap();
         client.change_option(gid, options).await
     });
@@ -475,11 +488,17 @@ pub fn limitSpeed(gid: &str, limit: &str) {
 #[pyfunction]
 pub fn activeDownloads() -> Vec<String> {
     let answer = Runtime::new().unwrap().handle().block_on(async {
-        let server_url = SERVER_URL.read().await;
-        let client = Client::connect(&server_url, None).await.unwrap();
-        client
-            .custom_tell_active(Some(vec!["gid".to_string()]))
-            .await
+        let server_urls = SERVER_URLS.read().await;
+        let mut answer = vec![];
+        for server_url in server_urls.iter() {
+            let client = Client::connect(server_url, None).await?;
+            answer.extend(
+                client
+                    .custom_tell_active(Some(vec!["gid".to_string()]))
+                    .await?,
+            );
+        }
+        Ok::<_, aria2_ws::Error>(answer)
     });
 
     let answer = match answer {
@@ -484,6 +484,160 @@ impl DataBase {
                 (),
             )
             .unwrap();
+
+        // host_db_table contains best connection settings of every host.
+        // see connection_tuner.py
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS host_db_table(
+                host TEXT PRIMARY KEY,
+                connections TEXT,
+                split TEXT,
+                min_split_size TEXT,
+                speed TEXT,
+                modified_date TEXT
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        // priority_db_table and queue_priority_db_table contain priority of downloads and queues.
+        // downloads with higher priority are moved to the front of aria2 waiting list.
+        // see priority_scheduler.py
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS priority_db_table(
+                gid TEXT PRIMARY KEY,
+                priority INTEGER,
+                FOREIGN KEY(gid) REFERENCES download_db_table(gid)
+                ON UPDATE CASCADE
+                ON DELETE CASCADE
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS queue_priority_db_table(
+                category TEXT PRIMARY KEY,
+                priority INTEGER,
+                FOREIGN KEY(category) REFERENCES category_db_table(category)
+                ON UPDATE CASCADE
+                ON DELETE CASCADE
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        // retry_db_table contains failed downloads that will be retried.
+        // breaker_db_table contains circuit breaker of hosts. see retry_policy.py
+        // next_try and open_until are unix times.
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS retry_db_table(
+                gid TEXT PRIMARY KEY,
+                attempts TEXT,
+                next_try TEXT,
+                error_code TEXT,
+                host TEXT,
+                FOREIGN KEY(gid) REFERENCES download_db_table(gid)
+                ON UPDATE CASCADE
+                ON DELETE CASCADE
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS breaker_db_table(
+                host TEXT PRIMARY KEY,
+                failures TEXT,
+                open_until TEXT
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        // move_db_table contains planned moves of completed downloads to new_path.
+        // download_path in addlink_db_table is changed and row is deleted when moving is finished.
+        // if persepolis is closed during moving, moves are resumed. see batch_move.py
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS move_db_table(
+                gid TEXT PRIMARY KEY,
+                new_path TEXT,
+                FOREIGN KEY(gid) REFERENCES download_db_table(gid)
+                ON UPDATE CASCADE
+                ON DELETE CASCADE
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        // checksum_db_table contains expected checksum of downloads in aria2 format (for example sha-256=hex)
+        // and result of verification. see checksum_service.py
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS checksum_db_table(
+                gid TEXT PRIMARY KEY,
+                checksum TEXT,
+                status TEXT,
+                FOREIGN KEY(gid) REFERENCES download_db_table(gid)
+                ON UPDATE CASCADE
+                ON DELETE CASCADE
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        // mirror_db_table contains other uris (mirrors) of downloads.
+        // first uri of download is in link column of addlink_db_table.
+        transaction
+            .execute(
+                "
+            CREATE TABLE IF NOT EXISTS mirror_db_table(
+                ID INTEGER PRIMARY KEY,
+                gid TEXT,
+                uri TEXT,
+                FOREIGN KEY(gid) REFERENCES download_db_table(gid)
+                ON UPDATE CASCADE
+                ON DELETE CASCADE
+            )
+            ",
+                (),
+            )
+            .unwrap();
+
+        transaction
+            .execute(
+                "CREATE INDEX IF NOT EXISTS mirror_db_table_gid ON mirror_db_table(gid)",
+                (),
+            )
+            .unwrap();
+
+        // searchLinkInAddLinkTable uses this index
+        transaction
+            .execute(
+                "CREATE INDEX IF NOT EXISTS addlink_db_table_link ON addlink_db_table(link)",
+                (),
+            )
+            .unwrap();
         transaction.commit().unwrap();
 
         // job is done! open the lock
@@ -570,14 +724,11 @@ impl DataBase {
     fn insertInDownloadTable(&self, list: Vec<HashMap<&str, &str>>) {
         // lock data base
         let mut connection = self.connection.lock().unwrap();
-        let mut transaction = connection.transaction().unwrap();
 
-        let transaction_size = 5;
-        for (i, dict) in list.clone().into_iter().enumerate() {
-            if i % transaction_size == 0 {
-                transaction.commit().unwrap();
-                transaction = connection.transaction().unwrap();
-            }
+        // all items are inserted in one transaction
+        let transaction = connection.transaction().unwrap();
+
+        for dict in &list {
             transaction
                 .execute(
                     "
@@ -655,15 +806,11 @@ impl DataBase {
     fn insertInAddLinkTable(&self, list: Vec<HashMap<&str, &str>>) {
         // lock data base
         let mut connection = self.connection.lock().unwrap();
-        let mut transaction = connection.transaction().unwrap();
 
-        let transaction_size = 5;
-        for (i, dict) in list.clone().into_iter().enumerate() {
-            if i % transaction_size == 0 {
-                transaction.commit().unwrap();
-                transaction = connection.transaction().unwrap();
-            }
+        // all items are inserted in one transaction
+        let transaction = connection.transaction().unwrap();
 
+        for dict in &list {
             // first column and after download column is NULL
             transaction
                 .execute(
@@ -763,6 +910,392 @@ impl DataBase {
         None
     }
 
+    // insert mirrors of downloads in mirror_db_table.
+    // every dictionary has gid and uri keys.
+    fn insertInMirrorTable(&self, list: Vec<HashMap<&str, &str>>) {
+        // lock data base
+        let mut connection = self.connection.lock().unwrap();
+        let transaction = connection.transaction().unwrap();
+
+        for dict in &list {
+            // first column is NULL
+            transaction
+                .execute(
+                    "INSERT INTO mirror_db_table VALUES(NULL, ?1, ?2)",
+                    [dict.get("gid"), dict.get("uri")],
+                )
+                .unwrap();
+        }
+        transaction.commit().unwrap();
+    }
+
+    // insert or replace best connection settings of a host.
+    fn updateHostTable(&self, dict: HashMap<&str, &str>) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .execute(
+                "INSERT OR REPLACE INTO host_db_table VALUES(?1, ?2, ?3, ?4, ?5, ?6)",
+                [
+                    dict.get("host"),
+                    dict.get("connections"),
+                    dict.get("split"),
+                    dict.get("min_split_size"),
+                    dict.get("speed"),
+                    dict.get("modified_date"),
+                ],
+            )
+            .unwrap();
+    }
+
+    fn searchHostInHostTable(&self, host: &str) -> Option<HashMap<String, String>> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection
+            .prepare("SELECT * FROM host_db_table WHERE host = ?1")
+            .unwrap();
+
+        let mut rows = stmt.query([host]).unwrap();
+        if let Some(row) = rows.next().unwrap() {
+            return Some(HashMap::from([
+                ("host".to_string(), row.get(0).unwrap()),
+                ("connections".to_string(), row.get(1).unwrap()),
+                ("split".to_string(), row.get(2).unwrap()),
+                ("min_split_size".to_string(), row.get(3).unwrap()),
+                ("speed".to_string(), row.get(4).unwrap()),
+                ("modified_date".to_string(), row.get(5).unwrap()),
+            ]));
+        }
+        None
+    }
+
+    fn updateRetryTable(&self, dict: HashMap<&str, &str>) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .execute(
+                "INSERT OR REPLACE INTO retry_db_table VALUES(?1, ?2, ?3, ?4, ?5)",
+                [
+                    dict.get("gid"),
+                    dict.get("attempts"),
+                    dict.get("next_try"),
+                    dict.get("error_code"),
+                    dict.get("host"),
+                ],
+            )
+            .unwrap();
+    }
+
+    fn deleteItemInRetryTable(&self, gid: &str) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .execute("DELETE FROM retry_db_table WHERE gid = ?1", [gid])
+            .unwrap();
+    }
+
+    fn returnItemsInRetryTable(&self) -> Vec<HashMap<String, String>> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection.prepare("SELECT * FROM retry_db_table").unwrap();
+
+        let items: Vec<HashMap<String, String>> = stmt
+            .query_map([], |row| {
+                Ok(HashMap::from([
+                    ("gid".to_string(), row.get(0)?),
+                    ("attempts".to_string(), row.get(1)?),
+                    ("next_try".to_string(), row.get(2)?),
+                    ("error_code".to_string(), row.get(3)?),
+                    ("host".to_string(), row.get(4)?),
+                ]))
+            })
+            .unwrap()
+            .map(|item| item.unwrap())
+            .collect();
+        items
+    }
+
+    fn updateBreakerTable(&self, dict: HashMap<&str, &str>) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .execute(
+                "INSERT OR REPLACE INTO breaker_db_table VALUES(?1, ?2, ?3)",
+                [
+                    dict.get("host"),
+                    dict.get("failures"),
+                    dict.get("open_until"),
+                ],
+            )
+            .unwrap();
+    }
+
+    fn returnItemsInBreakerTable(&self) -> Vec<HashMap<String, String>> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection
+            .prepare("SELECT * FROM breaker_db_table")
+            .unwrap();
+
+        let items: Vec<HashMap<String, String>> = stmt
+            .query_map([], |row| {
+                Ok(HashMap::from([
+                    ("host".to_string(), row.get(0)?),
+                    ("failures".to_string(), row.get(1)?),
+                    ("open_until".to_string(), row.get(2)?),
+                ]))
+            })
+            .unwrap()
+            .map(|item| item.unwrap())
+            .collect();
+        items
+    }
+
+    // insert planned moves. all moves are written in one transaction.
+    fn insertInMoveTable(&self, list: Vec<HashMap<&str, &str>>) {
+        // lock data base
+        let mut connection = self.connection.lock().unwrap();
+        let transaction = connection.transaction().unwrap();
+
+        for dict in &list {
+            transaction
+                .execute(
+                    "INSERT OR REPLACE INTO move_db_table VALUES(?1, ?2)",
+                    [dict.get("gid"), dict.get("new_path")],
+                )
+                .unwrap();
+        }
+        transaction.commit().unwrap();
+    }
+
+    fn returnItemsInMoveTable(&self) -> Vec<HashMap<String, String>> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection.prepare("SELECT * FROM move_db_table").unwrap();
+
+        let items: Vec<HashMap<String, String>> = stmt
+            .query_map([], |row| {
+                Ok(HashMap::from([
+                    ("gid".to_string(), row.get(0)?),
+                    ("new_path".to_string(), row.get(1)?),
+                ]))
+            })
+            .unwrap()
+            .map(|item| item.unwrap())
+            .collect();
+        items
+    }
+
+    // write download_path of moved files and delete their planned moves in one transaction.
+    // download_path is not changed if it's None (moving was not successful).
+    fn finishMoves(&self, list: Vec<HashMap<&str, &str>>) {
+        // lock data base
+        let mut connection = self.connection.lock().unwrap();
+        let transaction = connection.transaction().unwrap();
+
+        for dict in &list {
+            transaction
+                .execute(
+                    "UPDATE addlink_db_table SET download_path = coalesce(?1, download_path) WHERE gid = ?2",
+                    [dict.get("download_path"), dict.get("gid")],
+                )
+                .unwrap();
+            transaction
+                .execute(
+                    "DELETE FROM move_db_table WHERE gid = ?1",
+                    [dict.get("gid")],
+                )
+                .unwrap();
+        }
+        transaction.commit().unwrap();
+    }
+
+    // insert checksums of downloads. all checksums are written in one transaction.
+    fn insertInChecksumTable(&self, list: Vec<HashMap<&str, &str>>) {
+        // lock data base
+        let mut connection = self.connection.lock().unwrap();
+        let transaction = connection.transaction().unwrap();
+
+        for dict in &list {
+            transaction
+                .execute(
+                    "INSERT OR REPLACE INTO checksum_db_table VALUES(?1, ?2, ?3)",
+                    [
+                        dict.get("gid"),
+                        dict.get("checksum"),
+                        Some(dict.get("status").unwrap_or(&"waiting")),
+                    ],
+                )
+                .unwrap();
+        }
+        transaction.commit().unwrap();
+    }
+
+    fn searchGidInChecksumTable(&self, gid: &str) -> Option<HashMap<String, String>> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .query_row(
+                "SELECT * FROM checksum_db_table WHERE gid = ?1",
+                [gid],
+                |row| {
+                    Ok(HashMap::from([
+                        ("gid".to_string(), row.get(0)?),
+                        ("checksum".to_string(), row.get(1)?),
+                        ("status".to_string(), row.get(2)?),
+                    ]))
+                },
+            )
+            .ok()
+    }
+
+    fn setChecksumStatus(&self, gid: &str, status: &str) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .execute(
+                "UPDATE checksum_db_table SET status = ?1 WHERE gid = ?2",
+                [status, gid],
+            )
+            .unwrap();
+    }
+
+    // returns status of verification of all downloads that have a checksum.
+    fn returnChecksumStatuses(&self) -> HashMap<String, String> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection
+            .prepare("SELECT gid, status FROM checksum_db_table")
+            .unwrap();
+
+        let statuses: HashMap<String, String> = stmt
+            .query_map([], |row| Ok((row.get(0)?, row.get(1)?)))
+            .unwrap()
+            .map(|status| status.unwrap())
+            .collect();
+        statuses
+    }
+
+    // priority 0 is default and it's not saved.
+    fn setPriority(&self, gid: &str, priority: i64) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        if priority == 0 {
+            connection
+                .execute("DELETE FROM priority_db_table WHERE gid = ?1", [gid])
+                .unwrap();
+        } else {
+            connection
+                .execute(
+                    "INSERT OR REPLACE INTO priority_db_table VALUES(?1, ?2)",
+                    (gid, priority),
+                )
+                .unwrap();
+        }
+    }
+
+    fn setQueuePriority(&self, category: &str, priority: i64) {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        if priority == 0 {
+            connection
+                .execute(
+                    "DELETE FROM queue_priority_db_table WHERE category = ?1",
+                    [category],
+                )
+                .unwrap();
+        } else {
+            connection
+                .execute(
+                    "INSERT OR REPLACE INTO queue_priority_db_table VALUES(?1, ?2)",
+                    (category, priority),
+                )
+                .unwrap();
+        }
+    }
+
+    fn searchGidInPriorityTable(&self, gid: &str) -> i64 {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .query_row(
+                "SELECT priority FROM priority_db_table WHERE gid = ?1",
+                [gid],
+                |row| row.get(0),
+            )
+            .unwrap_or(0)
+    }
+
+    fn searchCategoryInQueuePriorityTable(&self, category: &str) -> i64 {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        connection
+            .query_row(
+                "SELECT priority FROM queue_priority_db_table WHERE category = ?1",
+                [category],
+                |row| row.get(0),
+            )
+            .unwrap_or(0)
+    }
+
+    // returns priority of downloads that their priority is not 0.
+    // priority of download is used if it's set, otherwise priority of its queue is used.
+    fn returnPriorities(&self) -> HashMap<String, i64> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection
+            .prepare(
+                "
+            SELECT download_db_table.gid, COALESCE(priority_db_table.priority, queue_priority_db_table.priority, 0)
+            FROM download_db_table
+            LEFT JOIN priority_db_table ON priority_db_table.gid = download_db_table.gid
+            LEFT JOIN queue_priority_db_table ON queue_priority_db_table.category = download_db_table.category
+            WHERE COALESCE(priority_db_table.priority, queue_priority_db_table.priority, 0) != 0
+            ",
+            )
+            .unwrap();
+
+        let priorities: HashMap<String, i64> = stmt
+            .query_map([], |row| Ok((row.get(0)?, row.get(1)?)))
+            .unwrap()
+            .map(|priority| priority.unwrap())
+            .collect();
+        priorities
+    }
+
+    // returns mirrors of download
+    fn searchGidInMirrorTable(&self, gid: &str) -> Vec<String> {
+        // lock data base
+        let connection = self.connection.lock().unwrap();
+
+        let mut stmt = connection
+            .prepare("SELECT uri FROM mirror_db_table WHERE gid = ?1 ORDER BY ID")
+            .unwrap();
+
+        let mirrors: Vec<String> = stmt
+            .query_map([gid], |row| row.get::<usize, String>(0))
+            .unwrap()
+            .map(|uri| uri.unwrap())
+            .collect();
+        mirrors
+    }
+
     fn searchGidInDownloadTable(&self, gid: &str) -> Option<HashMap<String, String>> {
         // lock data base
         let connection = self.connection.lock().unwrap();
@@ -851,12 +1384,11 @@ impl DataBase {
         // lock data base
         let connection = self.connection.lock().unwrap();
 
-        let result = connection.execute("SELECT * FROM addlink_db_table WHERE link = (?1)", [link]);
+        let mut stmt = connection
+            .prepare("SELECT 1 FROM addlink_db_table WHERE link = (?1) LIMIT 1")
+            .unwrap();
 
-        if result.is_ok_and(|r| r > 0) {
-            return true;
-        }
-        false
+        stmt.exists([link]).unwrap_or(false)
     }
 
     fn searchGidInAddLinkTable(&self, gid: &str) -> Option<HashMap<String, String>> {
@@ -9,13 +9,15 @@ mod startup;
 mod useful_tools;
 
 use aria2c::{
-    activeDownloads, aria2Version, downloadPause, downloadUnpause, findDownloadPath, limitSpeed,
-    nowDate, shutDown, startAria, tellActive,
+    activeDownloads, aria2Version, downloadPause, downloadUnpause, limitSpeed, nowDate, shardOf,
+    shutDown, startAria, tellActive,
 };
 use database::{DataBase, PluginsDB, TempDB};
 use initialization::{init_create_folders, init_log_file};
 use logger::{initLogger, sendToLog};
-use os_command::{makeDirs, moveFile, remove, removeDir, touch, xdgOpen};
+use os_command::{
+    makeDirs, moveFile, moveFileWithProgress, remove, removeDir, reserveFilePath, touch, xdgOpen,
+};
 use startup::{addstartup, checkstartup, removestartup};
 use useful_tools::{
     convertToByte, determineConfigFolder, humanReadableSize, osAndDesktopEnvironment,
@@ -30,8 +32,8 @@ use useful_tools::freeSpace;
 fn ghermez(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(startAria, m)?)?;
     m.add_function(wrap_pyfunction!(aria2Version, m)?)?;
+    m.add_function(wrap_pyfunction!(shardOf, m)?)?;
     m.add_function(wrap_pyfunction!(tellActive, m)?)?;
-    m.add_function(wrap_pyfunction!(findDownloadPath, m)?)?;
     m.add_function(wrap_pyfunction!(shutDown, m)?)?;
     m.add_function(wrap_pyfunction!(downloadPause, m)?)?;
     m.add_function(wrap_pyfunction!(downloadUnpause, m)?)?;
@@ -69,6 +71,8 @@ fn ghermez(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(removeDir, m)?)?;
     m.add_function(wrap_pyfunction!(makeDirs, m)?)?;
     m.add_function(wrap_pyfunction!(moveFile, m)?)?;
+    m.add_function(wrap_pyfunction!(moveFileWithProgress, m)?)?;
+    m.add_function(wrap_pyfunction!(reserveFilePath, m)?)?;
 
     Ok(())
 }
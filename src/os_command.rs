@@ -1,12 +1,16 @@
 #![allow(non_snake_case)]
 
+use std::collections::HashMap;
 use std::fs::{self, OpenOptions};
-use std::path::Path;
+use std::io::{self, Read};
+use std::path::{Path, PathBuf};
 use std::process::{Command, Stdio};
+use std::sync::Mutex;
 
 #[cfg(target_os = "windows")]
 use std::os::windows::process::CommandExt;
 
+use once_cell::sync::Lazy;
 use pyo3::prelude::*;
 
 #[cfg(target_os = "linux")]
@@ -242,6 +246,87 @@ pub fn makeDirs(folder_path: &str, hidden: bool) -> String {
     folder_path.to_string()
 }
 
+// files are copied in chunks of this size between two progress reports.
+const MOVE_CHUNK_SIZE: u64 = 64 * 1024 * 1024;
+
+// EXDEV in linux and macos and ERROR_NOT_SAME_DEVICE in windows
+fn isCrossDevice(error: &io::Error) -> bool {
+    #[cfg(not(target_os = "windows"))]
+    let cross_device_error = 18;
+    #[cfg(target_os = "windows")]
+    let cross_device_error = 17;
+
+    error.raw_os_error() == Some(cross_device_error)
+}
+
+// rename old_file_path to new_file_path. rename doesn't work between two file systems,
+// so file is copied to a temporary file next to new_file_path and it's renamed after fsync.
+// new_file_path is never a half copied file and old file is removed after that.
+// progress is called with copied bytes and file size after every chunk.
+fn moveAcrossDevices(
+    old_file_path: &Path,
+    new_file_path: &Path,
+    progress: &mut dyn FnMut(u64, u64),
+) -> io::Result<()> {
+    match fs::rename(old_file_path, new_file_path) {
+        Ok(()) => return Ok(()),
+        Err(error) if !isCrossDevice(&error) => return Err(error),
+        Err(_) => {}
+    }
+
+    let mut source = fs::File::open(old_file_path)?;
+    let metadata = source.metadata()?;
+    let file_size = metadata.len();
+
+    let file_name = new_file_path
+        .file_name()
+        .ok_or_else(|| io::Error::new(io::ErrorKind::InvalidInput, "file name is not valid"))?;
+    let mut temp_file_name = file_name.to_os_string();
+    temp_file_name.push(".part");
+    let temp_file_path = new_file_path.with_file_name(temp_file_name);
+
+    // perhaps the last move was interrupted
+    let _ = fs::remove_file(&temp_file_path);
+
+    let copy_result = (|| -> io::Result<()> {
+        let mut target = OpenOptions::new()
+            .write(true)
+            .create_new(true)
+            .open(&temp_file_path)?;
+
+        // io::copy uses copy_file_range or sendfile in linux between two files,
+        // so data is not copied to user space.
+        let mut copied_size = 0;
+        loop {
+            let chunk_size = io::copy(&mut (&mut source).take(MOVE_CHUNK_SIZE), &mut target)?;
+            if chunk_size == 0 {
+                break;
+            }
+            copied_size += chunk_size;
+            progress(copied_size, file_size);
+        }
+
+        target.set_permissions(metadata.permissions())?;
+        target.sync_all()?;
+        fs::rename(&temp_file_path, new_file_path)?;
+
+        // save new entry of directory on disk too
+        #[cfg(not(target_os = "windows"))]
+        if let Some(parent_path) = new_file_path.parent() {
+            fs::File::open(parent_path)?.sync_all()?;
+        }
+
+        Ok(())
+    })();
+
+    if let Err(error) = copy_result {
+        let _ = fs::remove_file(&temp_file_path);
+        return Err(error);
+    }
+
+    fs::remove_file(old_file_path)
+}
+
 // move downloaded file to another destination.
 #[pyfunction]
 #[pyo3(signature = (old_file_path, new_path, new_path_type="folder"))]
@@ -258,8 +343,12 @@ pub fn moveFile(old_file_path: &str, new_path: &str, new_path_type: &str) -> boo
         };
         if check_path {
             // move file to new_path
-            let result = fs::rename(old_file_path, new_path);
-            result.is_ok()
+            let new_file_path = if new_path_type == "folder" {
+                Path::new(new_path).join(Path::new(old_file_path).file_name().unwrap())
+            } else {
+                PathBuf::from(new_path)
+            };
+            moveAcrossDevices(Path::new(old_file_path), &new_file_path, &mut |_, _| {}).is_ok()
         } else {
             false
         }
@@ -267,3 +356,138 @@ pub fn moveFile(old_file_path: &str, new_path: &str, new_path_type: &str) -> boo
         false
     }
 }
+
+// move file to new_file_path and call progress with copied bytes and file size.
+// progress is called only if file is copied to another file system.
+// OSError is raised if moving is not successful.
+#[pyfunction]
+#[pyo3(signature = (old_file_path, new_file_path, progress=None))]
+pub fn moveFileWithProgress(
+    py: Python,
+    old_file_path: &str,
+    new_file_path: &str,
+    progress: Option<PyObject>,
+) -> PyResult<()> {
+    // GIL is released during copy, so other python threads are not blocked.
+    py.allow_threads(|| {
+        moveAcrossDevices(
+            Path::new(old_file_path),
+            Path::new(new_file_path),
+            &mut |copied_size, file_size| {
+                if let Some(progress) = &progress {
+                    Python::with_gil(|py| {
+                        if let Err(error) = progress.call1(py, (copied_size, file_size)) {
+                            error.print(py);
+                        }
+                    });
+                }
+            },
+        )
+    })?;
+
+    Ok(())
+}
+
+// names that are taken in a folder. key is (stem, extension) of name without suffix
+// and value is (name without suffix is taken, highest suffix).
+// for example video.mp4 and video_3.mp4 are saved as ("video", ".mp4") -> (true, 3)
+type SuffixCounters = HashMap<(String, String), (bool, u64)>;
+
+// folders are scanned once and their counters are kept here.
+static SUFFIX_CACHE: Lazy<Mutex<HashMap<PathBuf, SuffixCounters>>> =
+    Lazy::new(|| Mutex::new(HashMap::new()));
+
+// cache is cleared if it has more folders than this.
+const MAX_CACHED_FOLDERS: usize = 64;
+
+// split "video.mp4" to ("video", ".mp4"). query of download links is removed,
+// so "1.mp3?foo=bar" is ("1", ".mp3").
+fn splitFileName(file_name: &str) -> (String, String) {
+    match file_name.rsplit_once('.') {
+        Some((stem, extension)) if !stem.is_empty() => {
+            let extension = extension.split('?').next().unwrap_or_default();
+            (stem.to_string(), format!(".{extension}"))
+        }
+        _ => (file_name.to_string(), String::new()),
+    }
+}
+
+// "video_3" is ("video", 3) and "video" is ("video", 0)
+fn splitSuffix(stem: &str) -> (&str, u64) {
+    if let Some((name, suffix)) = stem.rsplit_once('_') {
+        if !name.is_empty()
+            && !suffix.is_empty()
+            && suffix.bytes().all(|byte| byte.is_ascii_digit())
+        {
+            if let Ok(number) = suffix.parse() {
+                return (name, number);
+            }
+        }
+    }
+    (stem, 0)
+}
+
+// read the folder once and find highest suffix of every name.
+fn scanFolder(folder_path: &Path) -> SuffixCounters {
+    let mut counters = SuffixCounters::new();
+    let Ok(entries) = fs::read_dir(folder_path) else {
+        return counters;
+    };
+
+    for entry in entries.flatten() {
+        let (stem, extension) = splitFileName(&entry.file_name().to_string_lossy());
+        let (name, number) = splitSuffix(&stem);
+        let counter = counters
+            .entry((name.to_string(), extension))
+            .or_insert((false, 0));
+        if number == 0 {
+            counter.0 = true;
+        }
+        counter.1 = counter.1.max(number);
+    }
+
+    counters
+}
+
+// find a free name for file_name in folder_path and create an empty file with that name.
+// if name is taken, _1, _2, ... suffixes are added to it. empty file is created with
+// O_EXCL, so two downloads that are completed at the same time never get the same name.
+// file is moved to returned path after that and rename replaces the empty file.
+// OSError is raised if file can not be created.
+#[pyfunction]
+pub fn reserveFilePath(folder_path: &str, file_name: &str) -> PyResult<String> {
+    let folder_path = Path::new(folder_path);
+    let (stem, extension) = splitFileName(file_name);
+
+    let mut cache = SUFFIX_CACHE.lock().unwrap();
+    if !cache.contains_key(folder_path) && cache.len() >= MAX_CACHED_FOLDERS {
+        cache.clear();
+    }
+    let counter = cache
+        .entry(folder_path.to_path_buf())
+        .or_insert_with(|| scanFolder(folder_path))
+        .entry((stem.clone(), extension.clone()))
+        .or_insert((false, 0));
+
+    loop {
+        // other programs can create files after the scan, so counter is only a good guess
+        // and O_EXCL decides. next name is tried if this one is taken.
+        let file_path = if counter.0 {
+            counter.1 += 1;
+            folder_path.join(format!("{stem}_{}{extension}", counter.1))
+        } else {
+            counter.0 = true;
+            folder_path.join(format!("{stem}{extension}"))
+        };
+
+        match OpenOptions::new()
+            .write(true)
+            .create_new(true)
+            .open(&file_path)
+        {
+            Ok(_) => return Ok(file_path.to_string_lossy().into_owned()),
+            Err(error) if error.kind() == io::ErrorKind::AlreadyExists => continue,
+            Err(error) => return Err(error.into()),
+        }
+    }
+}
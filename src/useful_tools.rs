@@ -274,6 +274,8 @@ pub fn returnDefaultSettings(_available_styles: Vec<&str>) -> HashMap<&str, Stri
         ("show-menubar", "no".to_string()),
         ("show-sidepanel", "yes".to_string()),
         ("rpc-port", "6801".to_string()),
+        ("aria2-daemons", "1".to_string()),
+        ("metrics-port", "0".to_string()),
         ("notification", "Native notification".to_string()),
         ("after-dialog", "yes".to_string()),
         ("tray-icon", "yes".to_string()),
@@ -325,6 +327,10 @@ pub fn returnDefaultSettings(_available_styles: Vec<&str>) -> HashMap<&str, Stri
             move_down_selection_shortcut.to_string(),
         ),
         ("dont-check-certificate", "no".to_string()),
+        ("auto-tune-connections", "yes".to_string()),
+        ("file-allocation", "prealloc".to_string()),
+        ("bandwidth-schedule", "".to_string()),
+        ("download-rules", "".to_string()),
     ]);
     default_setting_dict
 }